@@ -0,0 +1,36 @@
+#!/bin/bash
+# Run the LIS tests listed by get-tests.sh with workers bound to Hyper-V
+# hosts, as partitioned by tempest.lis.scheduler.
+#
+# run-scheduled-tests.sh <tests_dir> <workers> <host1,host2,...> [zone]
+set -e
+
+tests_dir=$1
+workers=$2
+hosts=$3
+zone=${4:-nova}
+output_dir=$(mktemp -d)
+
+bash lis-setup/get-tests.sh $tests_dir | \
+    python -m tempest.lis.scheduler --workers $workers --hosts $hosts \
+        --zone $zone --output-dir $output_dir
+
+pids=()
+for test_list in $output_dir/worker-*.txt; do
+    worker=$(basename $test_list .txt)
+    if [ ! -s "$test_list" ]; then
+        continue
+    fi
+    TEMPEST_CONFIG_DIR=$output_dir TEMPEST_CONFIG=$worker.conf \
+        python -m subunit.run discover -t ./ ./tempest/test_discover \
+        --load-list $test_list > $output_dir/$worker.subunit &
+    pids+=($!)
+done
+
+status=0
+for pid in ${pids[@]}; do
+    wait $pid || status=1
+done
+
+cat $output_dir/worker-*.subunit | testr load || status=1
+exit $status
@@ -13,8 +13,6 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-import copy
-
 from oslo_log import log as logging
 
 from tempest.common import negative_rest_client
@@ -183,8 +181,33 @@ CONF = config.CONF
 LOG = logging.getLogger(__name__)
 
 
+class LazyClient(object):
+    """Service client of a Manager built on first access.
+
+    Decorates a Manager method building the client. The client is then
+    stored on the manager under the name of the method, so later accesses
+    are plain attribute lookups.
+    """
+
+    def __init__(self, build):
+        self.build = build
+        self.name = build.__name__
+        self.__doc__ = build.__doc__
+
+    def __get__(self, manager, owner=None):
+        if manager is None:
+            return self
+        client = self.build(manager)
+        # Concurrent first accesses all get the client stored first
+        return manager.__dict__.setdefault(self.name, client)
+
+
 class Manager(manager.Manager):
-    """Top level manager for OpenStack tempest clients"""
+    """Top level manager for OpenStack tempest clients
+
+    Service clients are built on first access, so creating a manager only
+    costs the authentication of its credentials.
+    """
 
     default_params = {
         'disable_ssl_certificate_validation':
@@ -204,167 +227,216 @@ class Manager(manager.Manager):
     def __init__(self, credentials, service=None):
         """Initialization of Manager class.
 
-        Setup all services clients and make them available for tests cases.
+        Make all services clients available for tests cases.
         :param credentials: type Credentials or TestResources
         :param service: Service name
         """
         super(Manager, self).__init__(credentials=credentials)
-        self._set_compute_clients()
-        self._set_database_clients()
-        self._set_identity_clients()
-        self._set_volume_clients()
-        self._set_object_storage_clients()
+        self.service = service
+        # Token clients read auth_url, fail early if it is not configured
+        if CONF.identity_feature_enabled.api_v2 and not CONF.identity.uri:
+            msg = 'Identity v2 API enabled, but no identity.uri set'
+            raise exceptions.InvalidConfiguration(msg)
+        if CONF.identity_feature_enabled.api_v3 and not CONF.identity.uri_v3:
+            msg = 'Identity v3 API enabled, but no identity.uri_v3 set'
+            raise exceptions.InvalidConfiguration(msg)
+
+    @staticmethod
+    def _unavailable(client_name, service):
+        raise AttributeError('%s is not available, %s is disabled' %
+                             (client_name, service))
+
+    def _compute_params(self):
+        params = {
+            'service': CONF.compute.catalog_type,
+            'region': CONF.compute.region or CONF.identity.region,
+            'endpoint_type': CONF.compute.endpoint_type,
+            'build_interval': CONF.compute.build_interval,
+            'build_timeout': CONF.compute.build_timeout
+        }
+        params.update(self.default_params)
+        return params
+
+    def _compute_volume_params(self):
+        params = self._compute_params()
+        params.update({
+            'build_interval': CONF.volume.build_interval,
+            'build_timeout': CONF.volume.build_timeout
+        })
+        return params
+
+    def _identity_params(self, endpoint_type):
+        params = {
+            'service': CONF.identity.catalog_type,
+            'region': CONF.identity.region,
+            'endpoint_type': endpoint_type
+        }
+        params.update(self.default_params_with_timeout_values)
+        return params
 
-        self.baremetal_client = BaremetalClient(
+    def _identity_v2_admin_params(self):
+        return self._identity_params(CONF.identity.v2_admin_endpoint_type)
+
+    def _identity_v2_public_params(self):
+        return self._identity_params(CONF.identity.v2_public_endpoint_type)
+
+    def _identity_v3_params(self):
+        return self._identity_params(CONF.identity.v3_endpoint_type)
+
+    def _volume_params(self):
+        params = {
+            'service': CONF.volume.catalog_type,
+            'region': CONF.volume.region or CONF.identity.region,
+            'endpoint_type': CONF.volume.endpoint_type,
+            'build_interval': CONF.volume.build_interval,
+            'build_timeout': CONF.volume.build_timeout
+        }
+        params.update(self.default_params)
+        return params
+
+    def _object_storage_params(self):
+        params = {
+            'service': CONF.object_storage.catalog_type,
+            'region': CONF.object_storage.region or CONF.identity.region,
+            'endpoint_type': CONF.object_storage.endpoint_type
+        }
+        params.update(self.default_params_with_timeout_values)
+        return params
+
+    def _network_params(self):
+        params = {
+            'service': CONF.network.catalog_type,
+            'region': CONF.network.region or CONF.identity.region,
+            'endpoint_type': CONF.network.endpoint_type,
+            'build_interval': CONF.network.build_interval,
+            'build_timeout': CONF.network.build_timeout
+        }
+        params.update(self.default_params)
+        return params
+
+    @LazyClient
+    def baremetal_client(self):
+        return BaremetalClient(
             self.auth_provider,
             CONF.baremetal.catalog_type,
             CONF.identity.region,
             endpoint_type=CONF.baremetal.endpoint_type,
             **self.default_params_with_timeout_values)
-        self.network_agents_client = NetworkAgentsClient(
-            self.auth_provider,
-            CONF.network.catalog_type,
-            CONF.network.region or CONF.identity.region,
-            endpoint_type=CONF.network.endpoint_type,
-            build_interval=CONF.network.build_interval,
-            build_timeout=CONF.network.build_timeout,
-            **self.default_params)
-        self.network_extensions_client = NetworkExtensionsClient(
-            self.auth_provider,
-            CONF.network.catalog_type,
-            CONF.network.region or CONF.identity.region,
-            endpoint_type=CONF.network.endpoint_type,
-            build_interval=CONF.network.build_interval,
-            build_timeout=CONF.network.build_timeout,
-            **self.default_params)
-        self.network_client = NetworkClient(
-            self.auth_provider,
-            CONF.network.catalog_type,
-            CONF.network.region or CONF.identity.region,
-            endpoint_type=CONF.network.endpoint_type,
-            build_interval=CONF.network.build_interval,
-            build_timeout=CONF.network.build_timeout,
-            **self.default_params)
-        self.networks_client = NetworksClient(
-            self.auth_provider,
-            CONF.network.catalog_type,
-            CONF.network.region or CONF.identity.region,
-            endpoint_type=CONF.network.endpoint_type,
-            build_interval=CONF.network.build_interval,
-            build_timeout=CONF.network.build_timeout,
-            **self.default_params)
-        self.subnetpools_client = SubnetpoolsClient(
-            self.auth_provider,
-            CONF.network.catalog_type,
-            CONF.network.region or CONF.identity.region,
-            endpoint_type=CONF.network.endpoint_type,
-            build_interval=CONF.network.build_interval,
-            build_timeout=CONF.network.build_timeout,
-            **self.default_params)
-        self.subnets_client = SubnetsClient(
-            self.auth_provider,
-            CONF.network.catalog_type,
-            CONF.network.region or CONF.identity.region,
-            endpoint_type=CONF.network.endpoint_type,
-            build_interval=CONF.network.build_interval,
-            build_timeout=CONF.network.build_timeout,
-            **self.default_params)
-        self.ports_client = PortsClient(
-            self.auth_provider,
-            CONF.network.catalog_type,
-            CONF.network.region or CONF.identity.region,
-            endpoint_type=CONF.network.endpoint_type,
-            build_interval=CONF.network.build_interval,
-            build_timeout=CONF.network.build_timeout,
-            **self.default_params)
-        self.network_quotas_client = NetworkQuotasClient(
-            self.auth_provider,
-            CONF.network.catalog_type,
-            CONF.network.region or CONF.identity.region,
-            endpoint_type=CONF.network.endpoint_type,
-            build_interval=CONF.network.build_interval,
-            build_timeout=CONF.network.build_timeout,
-            **self.default_params)
-        self.floating_ips_client = FloatingIPsClient(
-            self.auth_provider,
-            CONF.network.catalog_type,
-            CONF.network.region or CONF.identity.region,
-            endpoint_type=CONF.network.endpoint_type,
-            build_interval=CONF.network.build_interval,
-            build_timeout=CONF.network.build_timeout,
-            **self.default_params)
-        self.metering_labels_client = MeteringLabelsClient(
-            self.auth_provider,
-            CONF.network.catalog_type,
-            CONF.network.region or CONF.identity.region,
-            endpoint_type=CONF.network.endpoint_type,
-            build_interval=CONF.network.build_interval,
-            build_timeout=CONF.network.build_timeout,
-            **self.default_params)
-        self.metering_label_rules_client = MeteringLabelRulesClient(
+
+    @LazyClient
+    def network_agents_client(self):
+        return NetworkAgentsClient(
+            self.auth_provider, **self._network_params())
+
+    @LazyClient
+    def network_extensions_client(self):
+        return NetworkExtensionsClient(
+            self.auth_provider, **self._network_params())
+
+    @LazyClient
+    def network_client(self):
+        return NetworkClient(self.auth_provider, **self._network_params())
+
+    @LazyClient
+    def networks_client(self):
+        return NetworksClient(self.auth_provider, **self._network_params())
+
+    @LazyClient
+    def subnetpools_client(self):
+        return SubnetpoolsClient(self.auth_provider, **self._network_params())
+
+    @LazyClient
+    def subnets_client(self):
+        return SubnetsClient(self.auth_provider, **self._network_params())
+
+    @LazyClient
+    def ports_client(self):
+        return PortsClient(self.auth_provider, **self._network_params())
+
+    @LazyClient
+    def network_quotas_client(self):
+        return NetworkQuotasClient(
+            self.auth_provider, **self._network_params())
+
+    @LazyClient
+    def floating_ips_client(self):
+        return FloatingIPsClient(self.auth_provider, **self._network_params())
+
+    @LazyClient
+    def metering_labels_client(self):
+        return MeteringLabelsClient(
+            self.auth_provider, **self._network_params())
+
+    @LazyClient
+    def metering_label_rules_client(self):
+        return MeteringLabelRulesClient(
+            self.auth_provider, **self._network_params())
+
+    @LazyClient
+    def routers_client(self):
+        return RoutersClient(self.auth_provider, **self._network_params())
+
+    @LazyClient
+    def security_group_rules_client(self):
+        return SecurityGroupRulesClient(
+            self.auth_provider, **self._network_params())
+
+    @LazyClient
+    def security_groups_client(self):
+        return SecurityGroupsClient(
+            self.auth_provider, **self._network_params())
+
+    @LazyClient
+    def telemetry_client(self):
+        if not CONF.service_available.ceilometer:
+            self._unavailable('telemetry_client', 'ceilometer')
+        return TelemetryClient(
             self.auth_provider,
-            CONF.network.catalog_type,
-            CONF.network.region or CONF.identity.region,
-            endpoint_type=CONF.network.endpoint_type,
-            build_interval=CONF.network.build_interval,
-            build_timeout=CONF.network.build_timeout,
-            **self.default_params)
-        self.routers_client = RoutersClient(
+            CONF.telemetry.catalog_type,
+            CONF.identity.region,
+            endpoint_type=CONF.telemetry.endpoint_type,
+            **self.default_params_with_timeout_values)
+
+    @LazyClient
+    def alarming_client(self):
+        if not CONF.service_available.aodh:
+            self._unavailable('alarming_client', 'aodh')
+        return AlarmingClient(
             self.auth_provider,
-            CONF.network.catalog_type,
-            CONF.network.region or CONF.identity.region,
-            endpoint_type=CONF.network.endpoint_type,
-            build_interval=CONF.network.build_interval,
-            build_timeout=CONF.network.build_timeout,
-            **self.default_params)
-        self.security_group_rules_client = SecurityGroupRulesClient(
+            CONF.alarming.catalog_type,
+            CONF.identity.region,
+            endpoint_type=CONF.alarming.endpoint_type,
+            **self.default_params_with_timeout_values)
+
+    @LazyClient
+    def image_client(self):
+        if not CONF.service_available.glance:
+            self._unavailable('image_client', 'glance')
+        return ImagesClient(
             self.auth_provider,
-            CONF.network.catalog_type,
-            CONF.network.region or CONF.identity.region,
-            endpoint_type=CONF.network.endpoint_type,
-            build_interval=CONF.network.build_interval,
-            build_timeout=CONF.network.build_timeout,
+            CONF.image.catalog_type,
+            CONF.image.region or CONF.identity.region,
+            endpoint_type=CONF.image.endpoint_type,
+            build_interval=CONF.image.build_interval,
+            build_timeout=CONF.image.build_timeout,
             **self.default_params)
-        self.security_groups_client = SecurityGroupsClient(
+
+    @LazyClient
+    def image_client_v2(self):
+        if not CONF.service_available.glance:
+            self._unavailable('image_client_v2', 'glance')
+        return ImagesClientV2(
             self.auth_provider,
-            CONF.network.catalog_type,
-            CONF.network.region or CONF.identity.region,
-            endpoint_type=CONF.network.endpoint_type,
-            build_interval=CONF.network.build_interval,
-            build_timeout=CONF.network.build_timeout,
+            CONF.image.catalog_type,
+            CONF.image.region or CONF.identity.region,
+            endpoint_type=CONF.image.endpoint_type,
+            build_interval=CONF.image.build_interval,
+            build_timeout=CONF.image.build_timeout,
             **self.default_params)
-        if CONF.service_available.ceilometer:
-            self.telemetry_client = TelemetryClient(
-                self.auth_provider,
-                CONF.telemetry.catalog_type,
-                CONF.identity.region,
-                endpoint_type=CONF.telemetry.endpoint_type,
-                **self.default_params_with_timeout_values)
-        if CONF.service_available.aodh:
-            self.alarming_client = AlarmingClient(
-                self.auth_provider,
-                CONF.alarming.catalog_type,
-                CONF.identity.region,
-                endpoint_type=CONF.alarming.endpoint_type,
-                **self.default_params_with_timeout_values)
-        if CONF.service_available.glance:
-            self.image_client = ImagesClient(
-                self.auth_provider,
-                CONF.image.catalog_type,
-                CONF.image.region or CONF.identity.region,
-                endpoint_type=CONF.image.endpoint_type,
-                build_interval=CONF.image.build_interval,
-                build_timeout=CONF.image.build_timeout,
-                **self.default_params)
-            self.image_client_v2 = ImagesClientV2(
-                self.auth_provider,
-                CONF.image.catalog_type,
-                CONF.image.region or CONF.identity.region,
-                endpoint_type=CONF.image.endpoint_type,
-                build_interval=CONF.image.build_interval,
-                build_timeout=CONF.image.build_timeout,
-                **self.default_params)
-        self.orchestration_client = OrchestrationClient(
+
+    @LazyClient
+    def orchestration_client(self):
+        return OrchestrationClient(
             self.auth_provider,
             CONF.orchestration.catalog_type,
             CONF.orchestration.region or CONF.identity.region,
@@ -372,244 +444,421 @@ class Manager(manager.Manager):
             build_interval=CONF.orchestration.build_interval,
             build_timeout=CONF.orchestration.build_timeout,
             **self.default_params)
-        self.data_processing_client = DataProcessingClient(
+
+    @LazyClient
+    def data_processing_client(self):
+        return DataProcessingClient(
             self.auth_provider,
             CONF.data_processing.catalog_type,
             CONF.identity.region,
             endpoint_type=CONF.data_processing.endpoint_type,
             **self.default_params_with_timeout_values)
-        self.negative_client = negative_rest_client.NegativeRestClient(
-            self.auth_provider, service, **self.default_params)
 
-    def _set_compute_clients(self):
-        params = {
-            'service': CONF.compute.catalog_type,
-            'region': CONF.compute.region or CONF.identity.region,
-            'endpoint_type': CONF.compute.endpoint_type,
-            'build_interval': CONF.compute.build_interval,
-            'build_timeout': CONF.compute.build_timeout
-        }
-        params.update(self.default_params)
+    @LazyClient
+    def negative_client(self):
+        return negative_rest_client.NegativeRestClient(
+            self.auth_provider, self.service, **self.default_params)
+
+    # Compute
+    @LazyClient
+    def agents_client(self):
+        return AgentsClient(self.auth_provider, **self._compute_params())
+
+    @LazyClient
+    def compute_networks_client(self):
+        return ComputeNetworksClient(
+            self.auth_provider, **self._compute_params())
+
+    @LazyClient
+    def migrations_client(self):
+        return MigrationsClient(self.auth_provider, **self._compute_params())
 
-        self.agents_client = AgentsClient(self.auth_provider, **params)
-        self.compute_networks_client = ComputeNetworksClient(
-            self.auth_provider, **params)
-        self.migrations_client = MigrationsClient(self.auth_provider,
-                                                  **params)
-        self.security_group_default_rules_client = (
-            SecurityGroupDefaultRulesClient(self.auth_provider, **params))
-        self.certificates_client = CertificatesClient(self.auth_provider,
-                                                      **params)
-        self.servers_client = ServersClient(
+    @LazyClient
+    def security_group_default_rules_client(self):
+        return SecurityGroupDefaultRulesClient(
+            self.auth_provider, **self._compute_params())
+
+    @LazyClient
+    def certificates_client(self):
+        return CertificatesClient(self.auth_provider, **self._compute_params())
+
+    @LazyClient
+    def servers_client(self):
+        return ServersClient(
             self.auth_provider,
             enable_instance_password=CONF.compute_feature_enabled
                 .enable_instance_password,
-            **params)
-        self.server_groups_client = ServerGroupsClient(
-            self.auth_provider, **params)
-        self.limits_client = LimitsClient(self.auth_provider, **params)
-        self.compute_images_client = ComputeImagesClient(self.auth_provider,
-                                                         **params)
-        self.keypairs_client = KeyPairsClient(self.auth_provider, **params)
-        self.quotas_client = QuotasClient(self.auth_provider, **params)
-        self.quota_classes_client = QuotaClassesClient(self.auth_provider,
-                                                       **params)
-        self.flavors_client = FlavorsClient(self.auth_provider, **params)
-        self.extensions_client = ExtensionsClient(self.auth_provider,
-                                                  **params)
-        self.floating_ip_pools_client = FloatingIPPoolsClient(
-            self.auth_provider, **params)
-        self.floating_ips_bulk_client = FloatingIPsBulkClient(
-            self.auth_provider, **params)
-        self.compute_floating_ips_client = ComputeFloatingIPsClient(
-            self.auth_provider, **params)
-        self.compute_security_group_rules_client = \
-            ComputeSecurityGroupRulesClient(self.auth_provider, **params)
-        self.compute_security_groups_client = ComputeSecurityGroupsClient(
-            self.auth_provider, **params)
-        self.interfaces_client = InterfacesClient(self.auth_provider,
-                                                  **params)
-        self.fixed_ips_client = FixedIPsClient(self.auth_provider,
-                                               **params)
-        self.availability_zone_client = AvailabilityZoneClient(
-            self.auth_provider, **params)
-        self.aggregates_client = AggregatesClient(self.auth_provider,
-                                                  **params)
-        self.services_client = ServicesClient(self.auth_provider, **params)
-        self.tenant_usages_client = TenantUsagesClient(self.auth_provider,
-                                                       **params)
-        self.hosts_client = HostsClient(self.auth_provider, **params)
-        self.hypervisor_client = HypervisorClient(self.auth_provider,
-                                                  **params)
-        self.instance_usages_audit_log_client = \
-            InstanceUsagesAuditLogClient(self.auth_provider, **params)
-        self.tenant_networks_client = \
-            TenantNetworksClient(self.auth_provider, **params)
-        self.baremetal_nodes_client = BaremetalNodesClient(
-            self.auth_provider, **params)
-
-        # NOTE: The following client needs special timeout values because
-        # the API is a proxy for the other component.
-        params_volume = copy.deepcopy(params)
-        params_volume.update({
-            'build_interval': CONF.volume.build_interval,
-            'build_timeout': CONF.volume.build_timeout
-        })
-        self.volumes_extensions_client = ComputeVolumesClient(
-            self.auth_provider, **params_volume)
-        self.compute_versions_client = VersionsClient(self.auth_provider,
-                                                      **params_volume)
-        self.snapshots_extensions_client = ComputeSnapshotsClient(
-            self.auth_provider, **params_volume)
-
-    def _set_database_clients(self):
-        self.database_flavors_client = DatabaseFlavorsClient(
+            **self._compute_params())
+
+    @LazyClient
+    def server_groups_client(self):
+        return ServerGroupsClient(self.auth_provider, **self._compute_params())
+
+    @LazyClient
+    def limits_client(self):
+        return LimitsClient(self.auth_provider, **self._compute_params())
+
+    @LazyClient
+    def compute_images_client(self):
+        return ComputeImagesClient(
+            self.auth_provider, **self._compute_params())
+
+    @LazyClient
+    def keypairs_client(self):
+        return KeyPairsClient(self.auth_provider, **self._compute_params())
+
+    @LazyClient
+    def quotas_client(self):
+        return QuotasClient(self.auth_provider, **self._compute_params())
+
+    @LazyClient
+    def quota_classes_client(self):
+        return QuotaClassesClient(self.auth_provider, **self._compute_params())
+
+    @LazyClient
+    def flavors_client(self):
+        return FlavorsClient(self.auth_provider, **self._compute_params())
+
+    @LazyClient
+    def extensions_client(self):
+        return ExtensionsClient(self.auth_provider, **self._compute_params())
+
+    @LazyClient
+    def floating_ip_pools_client(self):
+        return FloatingIPPoolsClient(
+            self.auth_provider, **self._compute_params())
+
+    @LazyClient
+    def floating_ips_bulk_client(self):
+        return FloatingIPsBulkClient(
+            self.auth_provider, **self._compute_params())
+
+    @LazyClient
+    def compute_floating_ips_client(self):
+        return ComputeFloatingIPsClient(
+            self.auth_provider, **self._compute_params())
+
+    @LazyClient
+    def compute_security_group_rules_client(self):
+        return ComputeSecurityGroupRulesClient(
+            self.auth_provider, **self._compute_params())
+
+    @LazyClient
+    def compute_security_groups_client(self):
+        return ComputeSecurityGroupsClient(
+            self.auth_provider, **self._compute_params())
+
+    @LazyClient
+    def interfaces_client(self):
+        return InterfacesClient(self.auth_provider, **self._compute_params())
+
+    @LazyClient
+    def fixed_ips_client(self):
+        return FixedIPsClient(self.auth_provider, **self._compute_params())
+
+    @LazyClient
+    def availability_zone_client(self):
+        return AvailabilityZoneClient(
+            self.auth_provider, **self._compute_params())
+
+    @LazyClient
+    def aggregates_client(self):
+        return AggregatesClient(self.auth_provider, **self._compute_params())
+
+    @LazyClient
+    def services_client(self):
+        return ServicesClient(self.auth_provider, **self._compute_params())
+
+    @LazyClient
+    def tenant_usages_client(self):
+        return TenantUsagesClient(self.auth_provider, **self._compute_params())
+
+    @LazyClient
+    def hosts_client(self):
+        return HostsClient(self.auth_provider, **self._compute_params())
+
+    @LazyClient
+    def hypervisor_client(self):
+        return HypervisorClient(self.auth_provider, **self._compute_params())
+
+    @LazyClient
+    def instance_usages_audit_log_client(self):
+        return InstanceUsagesAuditLogClient(
+            self.auth_provider, **self._compute_params())
+
+    @LazyClient
+    def tenant_networks_client(self):
+        return TenantNetworksClient(
+            self.auth_provider, **self._compute_params())
+
+    @LazyClient
+    def baremetal_nodes_client(self):
+        return BaremetalNodesClient(
+            self.auth_provider, **self._compute_params())
+
+    # NOTE: The following clients need special timeout values because
+    # the API is a proxy for the other component.
+    @LazyClient
+    def volumes_extensions_client(self):
+        return ComputeVolumesClient(
+            self.auth_provider, **self._compute_volume_params())
+
+    @LazyClient
+    def compute_versions_client(self):
+        return VersionsClient(
+            self.auth_provider, **self._compute_volume_params())
+
+    @LazyClient
+    def snapshots_extensions_client(self):
+        return ComputeSnapshotsClient(
+            self.auth_provider, **self._compute_volume_params())
+
+    # Database
+    @LazyClient
+    def database_flavors_client(self):
+        return DatabaseFlavorsClient(
             self.auth_provider,
             CONF.database.catalog_type,
             CONF.identity.region,
             **self.default_params_with_timeout_values)
-        self.database_limits_client = DatabaseLimitsClient(
+
+    @LazyClient
+    def database_limits_client(self):
+        return DatabaseLimitsClient(
             self.auth_provider,
             CONF.database.catalog_type,
             CONF.identity.region,
             **self.default_params_with_timeout_values)
-        self.database_versions_client = DatabaseVersionsClient(
+
+    @LazyClient
+    def database_versions_client(self):
+        return DatabaseVersionsClient(
             self.auth_provider,
             CONF.database.catalog_type,
             CONF.identity.region,
             **self.default_params_with_timeout_values)
 
-    def _set_identity_clients(self):
-        params = {
-            'service': CONF.identity.catalog_type,
-            'region': CONF.identity.region
-        }
-        params.update(self.default_params_with_timeout_values)
+    # Identity, clients below use the admin endpoint type of Keystone API v2
+    @LazyClient
+    def endpoints_client(self):
+        return EndpointsClient(
+            self.auth_provider, **self._identity_v2_admin_params())
 
-        # Clients below use the admin endpoint type of Keystone API v2
-        params_v2_admin = params.copy()
-        params_v2_admin['endpoint_type'] = CONF.identity.v2_admin_endpoint_type
-        self.endpoints_client = EndpointsClient(self.auth_provider,
-                                                **params_v2_admin)
-        self.identity_client = IdentityClient(self.auth_provider,
-                                              **params_v2_admin)
-        self.tenants_client = TenantsClient(self.auth_provider,
-                                            **params_v2_admin)
-        self.roles_client = RolesClient(self.auth_provider, **params_v2_admin)
-        self.users_client = UsersClient(self.auth_provider, **params_v2_admin)
-        self.identity_services_client = IdentityServicesClient(
-            self.auth_provider, **params_v2_admin)
-
-        # Clients below use the public endpoint type of Keystone API v2
-        params_v2_public = params.copy()
-        params_v2_public['endpoint_type'] = (
-            CONF.identity.v2_public_endpoint_type)
-        self.identity_public_client = IdentityClient(self.auth_provider,
-                                                     **params_v2_public)
-        self.tenants_public_client = TenantsClient(self.auth_provider,
-                                                   **params_v2_public)
-        self.users_public_client = UsersClient(self.auth_provider,
-                                               **params_v2_public)
-
-        # Clients below use the endpoint type of Keystone API v3
-        params_v3 = params.copy()
-        params_v3['endpoint_type'] = CONF.identity.v3_endpoint_type
-        self.domains_client = DomainsClient(self.auth_provider,
-                                            **params_v3)
-        self.identity_v3_client = IdentityV3Client(self.auth_provider,
-                                                   **params_v3)
-        self.trusts_client = TrustsClient(self.auth_provider, **params_v3)
-        self.users_v3_client = UsersV3Client(self.auth_provider, **params_v3)
-        self.endpoints_v3_client = EndPointsV3Client(self.auth_provider,
-                                                     **params_v3)
-        self.roles_v3_client = RolesV3Client(self.auth_provider, **params_v3)
-        self.identity_services_v3_client = IdentityServicesV3Client(
-            self.auth_provider, **params_v3)
-        self.policies_client = PoliciesClient(self.auth_provider, **params_v3)
-        self.projects_client = ProjectsClient(self.auth_provider, **params_v3)
-        self.regions_client = RegionsClient(self.auth_provider, **params_v3)
-        self.credentials_client = CredentialsClient(self.auth_provider,
-                                                    **params_v3)
-        self.groups_client = GroupsClient(self.auth_provider, **params_v3)
-
-        # Token clients do not use the catalog. They only need default_params.
-        # They read auth_url, so they should only be set if the corresponding
-        # API version is marked as enabled
-        if CONF.identity_feature_enabled.api_v2:
-            if CONF.identity.uri:
-                self.token_client = TokenClient(
-                    CONF.identity.uri, **self.default_params)
-            else:
-                msg = 'Identity v2 API enabled, but no identity.uri set'
-                raise exceptions.InvalidConfiguration(msg)
-        if CONF.identity_feature_enabled.api_v3:
-            if CONF.identity.uri_v3:
-                self.token_v3_client = V3TokenClient(
-                    CONF.identity.uri_v3, **self.default_params)
-            else:
-                msg = 'Identity v3 API enabled, but no identity.uri_v3 set'
-                raise exceptions.InvalidConfiguration(msg)
-
-    def _set_volume_clients(self):
-        params = {
-            'service': CONF.volume.catalog_type,
-            'region': CONF.volume.region or CONF.identity.region,
-            'endpoint_type': CONF.volume.endpoint_type,
-            'build_interval': CONF.volume.build_interval,
-            'build_timeout': CONF.volume.build_timeout
-        }
-        params.update(self.default_params)
+    @LazyClient
+    def identity_client(self):
+        return IdentityClient(
+            self.auth_provider, **self._identity_v2_admin_params())
 
-        self.volume_qos_client = QosSpecsClient(self.auth_provider,
-                                                **params)
-        self.volume_qos_v2_client = QosSpecsV2Client(
-            self.auth_provider, **params)
-        self.volume_services_client = VolumeServicesClient(
-            self.auth_provider, **params)
-        self.volume_services_v2_client = VolumeServicesV2Client(
-            self.auth_provider, **params)
-        self.backups_client = BackupsClient(self.auth_provider, **params)
-        self.backups_v2_client = BackupsV2Client(self.auth_provider,
-                                                 **params)
-        self.snapshots_client = SnapshotsClient(self.auth_provider,
-                                                **params)
-        self.snapshots_v2_client = SnapshotsV2Client(self.auth_provider,
-                                                     **params)
-        self.volumes_client = VolumesClient(
-            self.auth_provider, default_volume_size=CONF.volume.volume_size,
-            **params)
-        self.volumes_v2_client = VolumesV2Client(
-            self.auth_provider, default_volume_size=CONF.volume.volume_size,
-            **params)
-        self.volume_types_client = VolumeTypesClient(self.auth_provider,
-                                                     **params)
-        self.volume_types_v2_client = VolumeTypesV2Client(
-            self.auth_provider, **params)
-        self.volume_hosts_client = VolumeHostsClient(self.auth_provider,
-                                                     **params)
-        self.volume_hosts_v2_client = VolumeHostsV2Client(
-            self.auth_provider, **params)
-        self.volume_quotas_client = VolumeQuotasClient(self.auth_provider,
-                                                       **params)
-        self.volume_quotas_v2_client = VolumeQuotasV2Client(self.auth_provider,
-                                                            **params)
-        self.volumes_extension_client = VolumeExtensionsClient(
-            self.auth_provider, **params)
-        self.volumes_v2_extension_client = VolumeExtensionsV2Client(
-            self.auth_provider, **params)
-        self.volume_availability_zone_client = \
-            VolumeAvailabilityZoneClient(self.auth_provider, **params)
-        self.volume_v2_availability_zone_client = \
-            VolumeAvailabilityZoneV2Client(self.auth_provider, **params)
-
-    def _set_object_storage_clients(self):
-        params = {
-            'service': CONF.object_storage.catalog_type,
-            'region': CONF.object_storage.region or CONF.identity.region,
-            'endpoint_type': CONF.object_storage.endpoint_type
-        }
-        params.update(self.default_params_with_timeout_values)
+    @LazyClient
+    def tenants_client(self):
+        return TenantsClient(
+            self.auth_provider, **self._identity_v2_admin_params())
+
+    @LazyClient
+    def roles_client(self):
+        return RolesClient(
+            self.auth_provider, **self._identity_v2_admin_params())
+
+    @LazyClient
+    def users_client(self):
+        return UsersClient(
+            self.auth_provider, **self._identity_v2_admin_params())
+
+    @LazyClient
+    def identity_services_client(self):
+        return IdentityServicesClient(
+            self.auth_provider, **self._identity_v2_admin_params())
+
+    # Clients below use the public endpoint type of Keystone API v2
+    @LazyClient
+    def identity_public_client(self):
+        return IdentityClient(
+            self.auth_provider, **self._identity_v2_public_params())
+
+    @LazyClient
+    def tenants_public_client(self):
+        return TenantsClient(
+            self.auth_provider, **self._identity_v2_public_params())
+
+    @LazyClient
+    def users_public_client(self):
+        return UsersClient(
+            self.auth_provider, **self._identity_v2_public_params())
+
+    # Clients below use the endpoint type of Keystone API v3
+    @LazyClient
+    def domains_client(self):
+        return DomainsClient(self.auth_provider, **self._identity_v3_params())
+
+    @LazyClient
+    def identity_v3_client(self):
+        return IdentityV3Client(
+            self.auth_provider, **self._identity_v3_params())
+
+    @LazyClient
+    def trusts_client(self):
+        return TrustsClient(self.auth_provider, **self._identity_v3_params())
+
+    @LazyClient
+    def users_v3_client(self):
+        return UsersV3Client(self.auth_provider, **self._identity_v3_params())
+
+    @LazyClient
+    def endpoints_v3_client(self):
+        return EndPointsV3Client(
+            self.auth_provider, **self._identity_v3_params())
+
+    @LazyClient
+    def roles_v3_client(self):
+        return RolesV3Client(self.auth_provider, **self._identity_v3_params())
+
+    @LazyClient
+    def identity_services_v3_client(self):
+        return IdentityServicesV3Client(
+            self.auth_provider, **self._identity_v3_params())
+
+    @LazyClient
+    def policies_client(self):
+        return PoliciesClient(self.auth_provider, **self._identity_v3_params())
+
+    @LazyClient
+    def projects_client(self):
+        return ProjectsClient(self.auth_provider, **self._identity_v3_params())
+
+    @LazyClient
+    def regions_client(self):
+        return RegionsClient(self.auth_provider, **self._identity_v3_params())
+
+    @LazyClient
+    def credentials_client(self):
+        return CredentialsClient(
+            self.auth_provider, **self._identity_v3_params())
+
+    @LazyClient
+    def groups_client(self):
+        return GroupsClient(self.auth_provider, **self._identity_v3_params())
+
+    # Token clients do not use the catalog. They only need default_params.
+    # They read auth_url, so they are only available if the corresponding
+    # API version is marked as enabled
+    @LazyClient
+    def token_client(self):
+        if not CONF.identity_feature_enabled.api_v2:
+            self._unavailable('token_client', 'identity v2 API')
+        return TokenClient(CONF.identity.uri, **self.default_params)
+
+    @LazyClient
+    def token_v3_client(self):
+        if not CONF.identity_feature_enabled.api_v3:
+            self._unavailable('token_v3_client', 'identity v3 API')
+        return V3TokenClient(CONF.identity.uri_v3, **self.default_params)
+
+    # Volume
+    @LazyClient
+    def volume_qos_client(self):
+        return QosSpecsClient(self.auth_provider, **self._volume_params())
+
+    @LazyClient
+    def volume_qos_v2_client(self):
+        return QosSpecsV2Client(self.auth_provider, **self._volume_params())
+
+    @LazyClient
+    def volume_services_client(self):
+        return VolumeServicesClient(
+            self.auth_provider, **self._volume_params())
+
+    @LazyClient
+    def volume_services_v2_client(self):
+        return VolumeServicesV2Client(
+            self.auth_provider, **self._volume_params())
+
+    @LazyClient
+    def backups_client(self):
+        return BackupsClient(self.auth_provider, **self._volume_params())
+
+    @LazyClient
+    def backups_v2_client(self):
+        return BackupsV2Client(self.auth_provider, **self._volume_params())
+
+    @LazyClient
+    def snapshots_client(self):
+        return SnapshotsClient(self.auth_provider, **self._volume_params())
+
+    @LazyClient
+    def snapshots_v2_client(self):
+        return SnapshotsV2Client(self.auth_provider, **self._volume_params())
+
+    @LazyClient
+    def volumes_client(self):
+        return VolumesClient(
+            self.auth_provider,
+            default_volume_size=CONF.volume.volume_size,
+            **self._volume_params())
+
+    @LazyClient
+    def volumes_v2_client(self):
+        return VolumesV2Client(
+            self.auth_provider,
+            default_volume_size=CONF.volume.volume_size,
+            **self._volume_params())
+
+    @LazyClient
+    def volume_types_client(self):
+        return VolumeTypesClient(self.auth_provider, **self._volume_params())
+
+    @LazyClient
+    def volume_types_v2_client(self):
+        return VolumeTypesV2Client(self.auth_provider, **self._volume_params())
+
+    @LazyClient
+    def volume_hosts_client(self):
+        return VolumeHostsClient(self.auth_provider, **self._volume_params())
+
+    @LazyClient
+    def volume_hosts_v2_client(self):
+        return VolumeHostsV2Client(self.auth_provider, **self._volume_params())
+
+    @LazyClient
+    def volume_quotas_client(self):
+        return VolumeQuotasClient(self.auth_provider, **self._volume_params())
+
+    @LazyClient
+    def volume_quotas_v2_client(self):
+        return VolumeQuotasV2Client(
+            self.auth_provider, **self._volume_params())
+
+    @LazyClient
+    def volumes_extension_client(self):
+        return VolumeExtensionsClient(
+            self.auth_provider, **self._volume_params())
+
+    @LazyClient
+    def volumes_v2_extension_client(self):
+        return VolumeExtensionsV2Client(
+            self.auth_provider, **self._volume_params())
+
+    @LazyClient
+    def volume_availability_zone_client(self):
+        return VolumeAvailabilityZoneClient(
+            self.auth_provider, **self._volume_params())
+
+    @LazyClient
+    def volume_v2_availability_zone_client(self):
+        return VolumeAvailabilityZoneV2Client(
+            self.auth_provider, **self._volume_params())
+
+    # Object storage
+    @LazyClient
+    def account_client(self):
+        return AccountClient(
+            self.auth_provider, **self._object_storage_params())
+
+    @LazyClient
+    def container_client(self):
+        return ContainerClient(
+            self.auth_provider, **self._object_storage_params())
 
-        self.account_client = AccountClient(self.auth_provider, **params)
-        self.container_client = ContainerClient(self.auth_provider, **params)
-        self.object_client = ObjectClient(self.auth_provider, **params)
+    @LazyClient
+    def object_client(self):
+        return ObjectClient(
+            self.auth_provider, **self._object_storage_params())
@@ -41,6 +41,16 @@ cleanup deletes the objects in the tempest and alternate tempest tenants
 but does not delete those tenants unless the **--delete-tempest-conf-objects**
 flag is used to force their deletion.
 
+**--workers**: Maximum number of resources of a kind deleted concurrently
+(8 by default). Independent kinds of resources, e.g. keypairs and volume
+snapshots, are cleaned up concurrently too, while dependent ones are cleaned
+up in order, e.g. ports before subnets before networks. The number of
+resources deleted and the time spent per service are reported at the end.
+
+**--page-size**: Number of resources requested per listing call for the
+kinds of resources that can be many, e.g. ports and volumes (1000 by
+default, 0 to list them with a single call).
+
 **Normal mode**: running with no arguments, will query your deployment and
 build a list of objects to delete after filtering out the objects found in
 saved_state.json and based on the **--delete-tempest-conf-objects** flag.
@@ -91,6 +101,7 @@ class TempestCleanup(command.Command):
         self.admin_mgr = credentials.AdminManager()
         self.dry_run_data = {}
         self.json_data = {}
+        self.report = cleanup_service.CleanupReport()
 
         self.admin_id = ""
         self.admin_role_id = ""
@@ -125,7 +136,9 @@ class TempestCleanup(command.Command):
                   'is_dry_run': is_dry_run,
                   'saved_state_json': self.json_data,
                   'is_preserve': False,
-                  'is_save_state': is_save_state}
+                  'is_save_state': is_save_state,
+                  'max_workers': self.options.workers,
+                  'page_size': self.options.page_size}
         tenant_service = cleanup_service.TenantService(admin_mgr, **kwargs)
         tenants = tenant_service.list()
         print ("Process %s tenants" % len(tenants))
@@ -139,15 +152,18 @@ class TempestCleanup(command.Command):
                   'is_dry_run': is_dry_run,
                   'saved_state_json': self.json_data,
                   'is_preserve': is_preserve,
-                  'is_save_state': is_save_state}
-        for service in self.global_services:
-            svc = service(admin_mgr, **kwargs)
-            svc.run()
+                  'is_save_state': is_save_state,
+                  'max_workers': self.options.workers,
+                  'page_size': self.options.page_size}
+        cleanup_service.run_services(self.global_services, admin_mgr,
+                                     report=self.report, **kwargs)
 
         if is_dry_run:
             with open(DRY_RUN_JSON, 'w+') as f:
                 f.write(json.dumps(self.dry_run_data, sort_keys=True,
                                    indent=2, separators=(',', ': ')))
+        else:
+            print ("\n".join(self.report.lines()))
 
         self._remove_admin_user_roles()
 
@@ -180,10 +196,11 @@ class TempestCleanup(command.Command):
                   'saved_state_json': None,
                   'is_preserve': is_preserve,
                   'is_save_state': False,
-                  'tenant_id': tenant_id}
-        for service in self.tenant_services:
-            svc = service(mgr, **kwargs)
-            svc.run()
+                  'tenant_id': tenant_id,
+                  'max_workers': self.options.workers,
+                  'page_size': self.options.page_size}
+        cleanup_service.run_services(self.tenant_services, mgr,
+                                     report=self.report, **kwargs)
 
     def _init_admin_ids(self):
         tn_cl = self.admin_mgr.tenants_client
@@ -225,6 +242,14 @@ class TempestCleanup(command.Command):
                             help="Generate JSON file:" + DRY_RUN_JSON +
                             ", that reports the objects that would have "
                             "been deleted had a full cleanup been run.")
+        parser.add_argument('--workers', type=int, default=8,
+                            dest='workers',
+                            help="Maximum number of resources of a kind "
+                            "deleted concurrently.")
+        parser.add_argument('--page-size', type=int, default=1000,
+                            dest='page_size',
+                            help="Number of resources requested per "
+                            "listing call, 0 to list all of them at once.")
         return parser
 
     def get_description(self):
@@ -276,9 +301,8 @@ class TempestCleanup(command.Command):
                   'saved_state_json': data,
                   'is_preserve': False,
                   'is_save_state': True}
-        for service in self.global_services:
-            svc = service(admin_mgr, **kwargs)
-            svc.run()
+        cleanup_service.run_services(self.global_services, admin_mgr,
+                                     **kwargs)
 
         with open(SAVED_STATE_JSON, 'w+') as f:
             f.write(json.dumps(data,
@@ -287,7 +311,8 @@ class TempestCleanup(command.Command):
     def _load_json(self):
         try:
             with open(SAVED_STATE_JSON) as json_file:
-                self.json_data = json.load(json_file)
+                self.json_data = cleanup_service.index_saved_state(
+                    json.load(json_file))
 
         except IOError as ex:
             LOG.exception("Failed loading saved state, please be sure you"
@@ -14,11 +14,18 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
+import itertools
+import threading
+import time
+
 from oslo_log import log as logging
 
 from tempest.common import credentials_factory as credentials
 from tempest.common import identity
+from tempest.common.utils import parallel
 from tempest import config
+from tempest.lib.common.utils import polling
 from tempest import test
 
 LOG = logging.getLogger(__name__)
@@ -82,6 +89,15 @@ def init_conf():
         CONF_NETWORKS = [CONF_PUB_NETWORK, CONF_PRIV_NETWORK]
 
 
+def index_saved_state(saved_state):
+    """Return the ids of a saved state as a set per kind of resource.
+
+    The listed resources are filtered against these sets, and the names
+    kept in saved_state.json for its readers are dropped.
+    """
+    return dict((kind, frozenset(ids)) for kind, ids in saved_state.items())
+
+
 def _get_network_id(net_name, tenant_name):
     am = credentials.AdminManager()
     net_cl = am.networks_client
@@ -98,9 +114,25 @@ def _get_network_id(net_name, tenant_name):
     return n_id
 
 
+# Statuses of resources whose deletion failed, which are not waited for
+DELETE_ERROR_STATUSES = ('error', 'error_deleting')
+
+
 class BaseService(object):
+    # Kind of resource deleted, for the logs
+    resource = None
+    # Polling key of the deletion, when the deleted items must be waited
+    # for before the services depending on this one run
+    deleted_key = None
+
     def __init__(self, kwargs):
         self.client = None
+        self.max_workers = 1
+        self.page_size = None
+        self.deleted = 0
+        self.failed = 0
+        # Ids of listed resources which are never deleted
+        self.preserved_ids = frozenset()
         for key, value in kwargs.items():
             setattr(self, key, value)
 
@@ -119,12 +151,110 @@ class BaseService(object):
         return [item for item in item_list
                 if item['tenant_id'] == self.tenant_id]
 
+    def _paginate(self, list_func, key, **params):
+        """Yield the listed items, requesting page_size items at a time.
+
+        Without a page_size, all the items are listed by a single request.
+        The items are not held past their page, and the next page is
+        requested before the items of a page are yielded, so that they can
+        be deleted while listing without losing the marker.
+        """
+        if not self.page_size:
+            items = list_func(**params)[key]
+            LOG.debug("List count, %s %s" % (len(items), key))
+            for item in items:
+                yield item
+            return
+        params['limit'] = self.page_size
+        items = list_func(**params)[key]
+        while items:
+            LOG.debug("Page count, %s %s" % (len(items), key))
+            next_items = []
+            # A shorter page is the last one, a longer one means that the
+            # limit was ignored
+            if len(items) == self.page_size:
+                params['marker'] = items[-1]['id']
+                next_items = list_func(**params)[key]
+                if next_items and next_items[-1]['id'] == params['marker']:
+                    # The marker was ignored, the page was already listed
+                    next_items = []
+            for item in items:
+                yield item
+            items = next_items
+
     def list(self):
         pass
 
-    def delete(self):
+    def delete_item(self, item):
         pass
 
+    def _try_delete_item(self, item):
+        try:
+            self.delete_item(item)
+            return True
+        except Exception:
+            LOG.exception("Delete %s exception." % self.resource)
+            return False
+
+    def delete(self):
+        """Delete the listed items, a page at a time as they are listed."""
+        items = (item for item in self.list()
+                 if item.get('id') not in self.preserved_ids)
+        deleted_ids = set()
+        while True:
+            batch = list(itertools.islice(items, self.page_size or None))
+            if not batch:
+                break
+            results = parallel.run_parallel(self._try_delete_item, batch,
+                                            max_workers=self.max_workers)
+            for item, ok in zip(batch, results):
+                if ok:
+                    self.deleted += 1
+                    deleted_ids.add(item.get('id'))
+                else:
+                    self.failed += 1
+        if self.deleted_key:
+            self._wait_for_deletion(deleted_ids)
+
+    def _wait_for_deletion(self, pending):
+        """Wait for the deleted items, by id, to disappear from the listing.
+
+        A single listing per poll checks all the items at once. Items
+        whose deletion errored, or which are still listed on timeout, are
+        counted as failed.
+        """
+        if not pending:
+            return
+        poller = polling.Poller(self.client.build_interval,
+                                key=self.deleted_key,
+                                timeout=self.client.build_timeout)
+        while True:
+            listed = set()
+            for item in self.list():
+                if item['id'] not in pending:
+                    continue
+                if item.get('status', '').lower() in DELETE_ERROR_STATUSES:
+                    LOG.warning("Deletion of %s %s failed with status %s",
+                                self.resource, item['id'], item['status'])
+                    self._count_failed(1)
+                else:
+                    listed.add(item['id'])
+            pending = listed
+            if not pending:
+                poller.done()
+                return
+            if time.time() - poller.start >= self.client.build_timeout:
+                LOG.warning("%s %s(s) still not deleted after %s seconds",
+                            len(pending), self.resource,
+                            self.client.build_timeout)
+                self._count_failed(len(pending))
+                return
+            poller.sleep()
+
+    def _count_failed(self, count):
+        self.deleted -= count
+        self.failed += count
+
     def dry_run(self):
         pass
 
@@ -141,6 +271,8 @@ class BaseService(object):
 
 
 class SnapshotService(BaseService):
+    resource = 'Snapshot'
+    deleted_key = 'snapshot:DELETED'
 
     def __init__(self, manager, **kwargs):
         super(SnapshotService, self).__init__(kwargs)
@@ -148,25 +280,20 @@ class SnapshotService(BaseService):
 
     def list(self):
         client = self.client
-        snaps = client.list_snapshots()['snapshots']
-        LOG.debug("List count, %s Snapshots" % len(snaps))
-        return snaps
+        return self._paginate(client.list_snapshots, 'snapshots')
 
-    def delete(self):
-        snaps = self.list()
-        client = self.client
-        for snap in snaps:
-            try:
-                client.delete_snapshot(snap['id'])
-            except Exception:
-                LOG.exception("Delete Snapshot exception.")
+    def delete_item(self, item):
+        self.client.delete_snapshot(item['id'])
 
     def dry_run(self):
-        snaps = self.list()
+        snaps = list(self.list())
         self.data['snapshots'] = snaps
 
 
 class ServerService(BaseService):
+    resource = 'Server'
+    deleted_key = 'server:DELETED'
+
     def __init__(self, manager, **kwargs):
         super(ServerService, self).__init__(kwargs)
         self.client = manager.servers_client
@@ -174,26 +301,19 @@ class ServerService(BaseService):
 
     def list(self):
         client = self.client
-        servers_body = client.list_servers()
-        servers = servers_body['servers']
-        LOG.debug("List count, %s Servers" % len(servers))
-        return servers
+        return self._paginate(client.list_servers, 'servers')
 
-    def delete(self):
-        client = self.client
-        servers = self.list()
-        for server in servers:
-            try:
-                client.delete_server(server['id'])
-            except Exception:
-                LOG.exception("Delete Server exception.")
+    def delete_item(self, item):
+        self.client.delete_server(item['id'])
 
     def dry_run(self):
-        servers = self.list()
+        servers = list(self.list())
         self.data['servers'] = servers
 
 
 class ServerGroupService(ServerService):
+    resource = 'Server Group'
+    deleted_key = None
 
     def list(self):
         client = self.server_groups_client
@@ -201,14 +321,8 @@ class ServerGroupService(ServerService):
         LOG.debug("List count, %s Server Groups" % len(sgs))
         return sgs
 
-    def delete(self):
-        client = self.client
-        sgs = self.list()
-        for sg in sgs:
-            try:
-                client.delete_server_group(sg['id'])
-            except Exception:
-                LOG.exception("Delete Server Group exception.")
+    def delete_item(self, item):
+        self.server_groups_client.delete_server_group(item['id'])
 
     def dry_run(self):
         sgs = self.list()
@@ -216,6 +330,8 @@ class ServerGroupService(ServerService):
 
 
 class StackService(BaseService):
+    resource = 'Stack'
+
     def __init__(self, manager, **kwargs):
         super(StackService, self).__init__(kwargs)
         self.client = manager.orchestration_client
@@ -226,14 +342,8 @@ class StackService(BaseService):
         LOG.debug("List count, %s Stacks" % len(stacks))
         return stacks
 
-    def delete(self):
-        client = self.client
-        stacks = self.list()
-        for stack in stacks:
-            try:
-                client.delete_stack(stack['id'])
-            except Exception:
-                LOG.exception("Delete Stack exception.")
+    def delete_item(self, item):
+        self.client.delete_stack(item['id'])
 
     def dry_run(self):
         stacks = self.list()
@@ -241,6 +351,8 @@ class StackService(BaseService):
 
 
 class KeyPairService(BaseService):
+    resource = 'Keypairs'
+
     def __init__(self, manager, **kwargs):
         super(KeyPairService, self).__init__(kwargs)
         self.client = manager.keypairs_client
@@ -251,15 +363,8 @@ class KeyPairService(BaseService):
         LOG.debug("List count, %s Keypairs" % len(keypairs))
         return keypairs
 
-    def delete(self):
-        client = self.client
-        keypairs = self.list()
-        for k in keypairs:
-            try:
-                name = k['keypair']['name']
-                client.delete_keypair(name)
-            except Exception:
-                LOG.exception("Delete Keypairs exception.")
+    def delete_item(self, item):
+        self.client.delete_keypair(item['keypair']['name'])
 
     def dry_run(self):
         keypairs = self.list()
@@ -267,6 +372,8 @@ class KeyPairService(BaseService):
 
 
 class SecurityGroupService(BaseService):
+    resource = 'Security Groups'
+
     def __init__(self, manager, **kwargs):
         super(SecurityGroupService, self).__init__(kwargs)
         self.client = manager.compute_security_groups_client
@@ -278,14 +385,8 @@ class SecurityGroupService(BaseService):
         LOG.debug("List count, %s Security Groups" % len(secgrp_del))
         return secgrp_del
 
-    def delete(self):
-        client = self.client
-        secgrp_del = self.list()
-        for g in secgrp_del:
-            try:
-                client.delete_security_group(g['id'])
-            except Exception:
-                LOG.exception("Delete Security Groups exception.")
+    def delete_item(self, item):
+        self.client.delete_security_group(item['id'])
 
     def dry_run(self):
         secgrp_del = self.list()
@@ -293,6 +394,8 @@ class SecurityGroupService(BaseService):
 
 
 class FloatingIpService(BaseService):
+    resource = 'Floating IPs'
+
     def __init__(self, manager, **kwargs):
         super(FloatingIpService, self).__init__(kwargs)
         self.client = manager.compute_floating_ips_client
@@ -303,14 +406,8 @@ class FloatingIpService(BaseService):
         LOG.debug("List count, %s Floating IPs" % len(floating_ips))
         return floating_ips
 
-    def delete(self):
-        client = self.client
-        floating_ips = self.list()
-        for f in floating_ips:
-            try:
-                client.delete_floating_ip(f['id'])
-            except Exception:
-                LOG.exception("Delete Floating IPs exception.")
+    def delete_item(self, item):
+        self.client.delete_floating_ip(item['id'])
 
     def dry_run(self):
         floating_ips = self.list()
@@ -318,27 +415,23 @@ class FloatingIpService(BaseService):
 
 
 class VolumeService(BaseService):
+    resource = 'Volume'
+    deleted_key = 'volume:DELETED'
+
     def __init__(self, manager, **kwargs):
         super(VolumeService, self).__init__(kwargs)
         self.client = manager.volumes_client
 
     def list(self):
         client = self.client
-        vols = client.list_volumes()['volumes']
-        LOG.debug("List count, %s Volumes" % len(vols))
-        return vols
+        return self._paginate(
+            lambda **params: client.list_volumes(params=params), 'volumes')
 
-    def delete(self):
-        client = self.client
-        vols = self.list()
-        for v in vols:
-            try:
-                client.delete_volume(v['id'])
-            except Exception:
-                LOG.exception("Delete Volume exception.")
+    def delete_item(self, item):
+        self.client.delete_volume(item['id'])
 
     def dry_run(self):
-        vols = self.list()
+        vols = list(self.list())
         self.data['volumes'] = vols
 
 
@@ -380,6 +473,8 @@ class NovaQuotaService(BaseService):
 
 # Begin network service classes
 class NetworkService(BaseService):
+    resource = 'Network'
+
     def __init__(self, manager, **kwargs):
         super(NetworkService, self).__init__(kwargs)
         self.client = manager.network_client
@@ -401,53 +496,40 @@ class NetworkService(BaseService):
 
     def list(self):
         client = self.networks_client
-        networks = client.list_networks(**self.tenant_filter)
-        networks = networks['networks']
+        networks = self._paginate(client.list_networks, 'networks',
+                                  **self.tenant_filter)
         # filter out networks declared in tempest.conf
         if self.is_preserve:
-            networks = [network for network in networks
-                        if network['id'] not in CONF_NETWORKS]
-        LOG.debug("List count, %s Networks" % networks)
+            networks = (network for network in networks
+                        if network['id'] not in CONF_NETWORKS)
         return networks
 
-    def delete(self):
-        client = self.networks_client
-        networks = self.list()
-        for n in networks:
-            try:
-                client.delete_network(n['id'])
-            except Exception:
-                LOG.exception("Delete Network exception.")
+    def delete_item(self, item):
+        self.networks_client.delete_network(item['id'])
 
     def dry_run(self):
-        networks = self.list()
+        networks = list(self.list())
         self.data['networks'] = networks
 
 
 class NetworkFloatingIpService(NetworkService):
+    resource = 'Network Floating IP'
 
     def list(self):
         client = self.floating_ips_client
-        flips = client.list_floatingips(**self.tenant_filter)
-        flips = flips['floatingips']
-        LOG.debug("List count, %s Network Floating IPs" % len(flips))
-        return flips
+        return self._paginate(client.list_floatingips, 'floatingips',
+                              **self.tenant_filter)
 
-    def delete(self):
-        client = self.client
-        flips = self.list()
-        for flip in flips:
-            try:
-                client.delete_floatingip(flip['id'])
-            except Exception:
-                LOG.exception("Delete Network Floating IP exception.")
+    def delete_item(self, item):
+        self.floating_ips_client.delete_floatingip(item['id'])
 
     def dry_run(self):
-        flips = self.list()
+        flips = list(self.list())
         self.data['floating_ips'] = flips
 
 
 class NetworkRouterService(NetworkService):
+    resource = 'Router'
 
     def list(self):
         client = self.routers_client
@@ -460,21 +542,15 @@ class NetworkRouterService(NetworkService):
         LOG.debug("List count, %s Routers" % len(routers))
         return routers
 
-    def delete(self):
-        client = self.routers_client
-        ports_client = self.ports_client
-        routers = self.list()
-        for router in routers:
-            try:
-                rid = router['id']
-                ports = [port for port
-                         in ports_client.list_ports(device_id=rid)['ports']
-                         if port["device_owner"] == "network:router_interface"]
-                for port in ports:
-                    client.remove_router_interface(rid, port_id=port['id'])
-                client.delete_router(rid)
-            except Exception:
-                LOG.exception("Delete Router exception.")
+    def delete_item(self, item):
+        rid = item['id']
+        ports = [port for port
+                 in self.ports_client.list_ports(device_id=rid)['ports']
+                 if port["device_owner"] == "network:router_interface"]
+        for port in ports:
+            self.routers_client.remove_router_interface(rid,
+                                                        port_id=port['id'])
+        self.routers_client.delete_router(rid)
 
     def dry_run(self):
         routers = self.list()
@@ -482,6 +558,7 @@ class NetworkRouterService(NetworkService):
 
 
 class NetworkHealthMonitorService(NetworkService):
+    resource = 'Health Monitor'
 
     def list(self):
         client = self.client
@@ -491,14 +568,8 @@ class NetworkHealthMonitorService(NetworkService):
         LOG.debug("List count, %s Health Monitors" % len(hms))
         return hms
 
-    def delete(self):
-        client = self.client
-        hms = self.list()
-        for hm in hms:
-            try:
-                client.delete_health_monitor(hm['id'])
-            except Exception:
-                LOG.exception("Delete Health Monitor exception.")
+    def delete_item(self, item):
+        self.client.delete_health_monitor(item['id'])
 
     def dry_run(self):
         hms = self.list()
@@ -506,6 +577,7 @@ class NetworkHealthMonitorService(NetworkService):
 
 
 class NetworkMemberService(NetworkService):
+    resource = 'Member'
 
     def list(self):
         client = self.client
@@ -515,14 +587,8 @@ class NetworkMemberService(NetworkService):
         LOG.debug("List count, %s Members" % len(members))
         return members
 
-    def delete(self):
-        client = self.client
-        members = self.list()
-        for member in members:
-            try:
-                client.delete_member(member['id'])
-            except Exception:
-                LOG.exception("Delete Member exception.")
+    def delete_item(self, item):
+        self.client.delete_member(item['id'])
 
     def dry_run(self):
         members = self.list()
@@ -530,6 +596,7 @@ class NetworkMemberService(NetworkService):
 
 
 class NetworkVipService(NetworkService):
+    resource = 'VIP'
 
     def list(self):
         client = self.client
@@ -539,14 +606,8 @@ class NetworkVipService(NetworkService):
         LOG.debug("List count, %s VIPs" % len(vips))
         return vips
 
-    def delete(self):
-        client = self.client
-        vips = self.list()
-        for vip in vips:
-            try:
-                client.delete_vip(vip['id'])
-            except Exception:
-                LOG.exception("Delete VIP exception.")
+    def delete_item(self, item):
+        self.client.delete_vip(item['id'])
 
     def dry_run(self):
         vips = self.list()
@@ -554,6 +615,7 @@ class NetworkVipService(NetworkService):
 
 
 class NetworkPoolService(NetworkService):
+    resource = 'Pool'
 
     def list(self):
         client = self.client
@@ -563,14 +625,8 @@ class NetworkPoolService(NetworkService):
         LOG.debug("List count, %s Pools" % len(pools))
         return pools
 
-    def delete(self):
-        client = self.client
-        pools = self.list()
-        for pool in pools:
-            try:
-                client.delete_pool(pool['id'])
-            except Exception:
-                LOG.exception("Delete Pool exception.")
+    def delete_item(self, item):
+        self.client.delete_pool(item['id'])
 
     def dry_run(self):
         pools = self.list()
@@ -578,6 +634,7 @@ class NetworkPoolService(NetworkService):
 
 
 class NetworkMeteringLabelRuleService(NetworkService):
+    resource = 'Metering Label Rule'
 
     def list(self):
         client = self.metering_label_rules_client
@@ -587,14 +644,9 @@ class NetworkMeteringLabelRuleService(NetworkService):
         LOG.debug("List count, %s Metering Label Rules" % len(rules))
         return rules
 
-    def delete(self):
-        client = self.metering_label_rules_client
-        rules = self.list()
-        for rule in rules:
-            try:
-                client.delete_metering_label_rule(rule['id'])
-            except Exception:
-                LOG.exception("Delete Metering Label Rule exception.")
+    def delete_item(self, item):
+        self.metering_label_rules_client.delete_metering_label_rule(
+            item['id'])
 
     def dry_run(self):
         rules = self.list()
@@ -602,6 +654,7 @@ class NetworkMeteringLabelRuleService(NetworkService):
 
 
 class NetworkMeteringLabelService(NetworkService):
+    resource = 'Metering Label'
 
     def list(self):
         client = self.metering_labels_client
@@ -611,14 +664,8 @@ class NetworkMeteringLabelService(NetworkService):
         LOG.debug("List count, %s Metering Labels" % len(labels))
         return labels
 
-    def delete(self):
-        client = self.metering_labels_client
-        labels = self.list()
-        for label in labels:
-            try:
-                client.delete_metering_label(label['id'])
-            except Exception:
-                LOG.exception("Delete Metering Label exception.")
+    def delete_item(self, item):
+        self.metering_labels_client.delete_metering_label(item['id'])
 
     def dry_run(self):
         labels = self.list()
@@ -626,35 +673,32 @@ class NetworkMeteringLabelService(NetworkService):
 
 
 class NetworkPortService(NetworkService):
+    resource = 'Port'
 
     def list(self):
         client = self.ports_client
-        ports = [port for port in
-                 client.list_ports(**self.tenant_filter)['ports']
+        ports = (port for port in
+                 self._paginate(client.list_ports, 'ports',
+                                **self.tenant_filter)
                  if port["device_owner"] == "" or
-                 port["device_owner"].startswith("compute:")]
+                 port["device_owner"].startswith("compute:"))
 
         if self.is_preserve:
-            ports = self._filter_by_conf_networks(ports)
-
-        LOG.debug("List count, %s Ports" % len(ports))
+            ports = (port for port in ports
+                     if port['network_id'] not in CONF_NETWORKS)
         return ports
 
-    def delete(self):
-        client = self.ports_client
-        ports = self.list()
-        for port in ports:
-            try:
-                client.delete_port(port['id'])
-            except Exception:
-                LOG.exception("Delete Port exception.")
+    def delete_item(self, item):
+        self.ports_client.delete_port(item['id'])
 
     def dry_run(self):
-        ports = self.list()
+        ports = list(self.list())
         self.data['ports'] = ports
 
 
 class NetworkSecGroupService(NetworkService):
+    resource = 'security_group'
+
     def list(self):
         client = self.security_groups_client
         filter = self.tenant_filter
@@ -668,14 +712,8 @@ class NetworkSecGroupService(NetworkService):
         LOG.debug("List count, %s securtiy_groups" % len(secgroups))
         return secgroups
 
-    def delete(self):
-        client = self.client
-        secgroups = self.list()
-        for secgroup in secgroups:
-            try:
-                client.delete_secgroup(secgroup['id'])
-            except Exception:
-                LOG.exception("Delete security_group exception.")
+    def delete_item(self, item):
+        self.security_groups_client.delete_security_group(item['id'])
 
     def dry_run(self):
         secgroups = self.list()
@@ -683,32 +721,29 @@ class NetworkSecGroupService(NetworkService):
 
 
 class NetworkSubnetService(NetworkService):
+    resource = 'Subnet'
 
     def list(self):
         client = self.subnets_client
-        subnets = client.list_subnets(**self.tenant_filter)
-        subnets = subnets['subnets']
+        subnets = self._paginate(client.list_subnets, 'subnets',
+                                 **self.tenant_filter)
         if self.is_preserve:
-            subnets = self._filter_by_conf_networks(subnets)
-        LOG.debug("List count, %s Subnets" % len(subnets))
+            subnets = (subnet for subnet in subnets
+                       if subnet['network_id'] not in CONF_NETWORKS)
         return subnets
 
-    def delete(self):
-        client = self.subnets_client
-        subnets = self.list()
-        for subnet in subnets:
-            try:
-                client.delete_subnet(subnet['id'])
-            except Exception:
-                LOG.exception("Delete Subnet exception.")
+    def delete_item(self, item):
+        self.subnets_client.delete_subnet(item['id'])
 
     def dry_run(self):
-        subnets = self.list()
+        subnets = list(self.list())
         self.data['subnets'] = subnets
 
 
 # Telemetry services
 class TelemetryAlarmService(BaseService):
+    resource = 'Alarms'
+
     def __init__(self, manager, **kwargs):
         super(TelemetryAlarmService, self).__init__(kwargs)
         self.client = manager.telemetry_client
@@ -719,14 +754,8 @@ class TelemetryAlarmService(BaseService):
         LOG.debug("List count, %s Alarms" % len(alarms))
         return alarms
 
-    def delete(self):
-        client = self.client
-        alarms = self.list()
-        for alarm in alarms:
-            try:
-                client.delete_alarm(alarm['id'])
-            except Exception:
-                LOG.exception("Delete Alarms exception.")
+    def delete_item(self, item):
+        self.client.delete_alarm(item['id'])
 
     def dry_run(self):
         alarms = self.list()
@@ -735,6 +764,8 @@ class TelemetryAlarmService(BaseService):
 
 # begin global services
 class FlavorService(BaseService):
+    resource = 'Flavor'
+
     def __init__(self, manager, **kwargs):
         super(FlavorService, self).__init__(kwargs)
         self.client = manager.flavors_client
@@ -745,7 +776,7 @@ class FlavorService(BaseService):
         if not self.is_save_state:
             # recreate list removing saved flavors
             flavors = [flavor for flavor in flavors if flavor['id']
-                       not in self.saved_state_json['flavors'].keys()]
+                       not in self.saved_state_json['flavors']]
 
         if self.is_preserve:
             flavors = [flavor for flavor in flavors
@@ -753,14 +784,8 @@ class FlavorService(BaseService):
         LOG.debug("List count, %s Flavors after reconcile" % len(flavors))
         return flavors
 
-    def delete(self):
-        client = self.client
-        flavors = self.list()
-        for flavor in flavors:
-            try:
-                client.delete_flavor(flavor['id'])
-            except Exception:
-                LOG.exception("Delete Flavor exception.")
+    def delete_item(self, item):
+        self.client.delete_flavor(item['id'])
 
     def dry_run(self):
         flavors = self.list()
@@ -774,6 +799,8 @@ class FlavorService(BaseService):
 
 
 class ImageService(BaseService):
+    resource = 'Image'
+
     def __init__(self, manager, **kwargs):
         super(ImageService, self).__init__(kwargs)
         self.client = manager.compute_images_client
@@ -783,21 +810,15 @@ class ImageService(BaseService):
         images = client.list_images({"all_tenants": True})['images']
         if not self.is_save_state:
             images = [image for image in images if image['id']
-                      not in self.saved_state_json['images'].keys()]
+                      not in self.saved_state_json['images']]
         if self.is_preserve:
             images = [image for image in images
                       if image['id'] not in CONF_IMAGES]
         LOG.debug("List count, %s Images after reconcile" % len(images))
         return images
 
-    def delete(self):
-        client = self.client
-        images = self.list()
-        for image in images:
-            try:
-                client.delete_image(image['id'])
-            except Exception:
-                LOG.exception("Delete Image exception.")
+    def delete_item(self, item):
+        self.client.delete_image(item['id'])
 
     def dry_run(self):
         images = self.list()
@@ -817,6 +838,7 @@ class IdentityService(BaseService):
 
 
 class UserService(BaseService):
+    resource = 'User'
 
     def __init__(self, manager, **kwargs):
         super(UserService, self).__init__(kwargs)
@@ -827,7 +849,7 @@ class UserService(BaseService):
 
         if not self.is_save_state:
             users = [user for user in users if user['id']
-                     not in self.saved_state_json['users'].keys()]
+                     not in self.saved_state_json['users']]
 
         if self.is_preserve:
             users = [user for user in users if user['name']
@@ -840,13 +862,8 @@ class UserService(BaseService):
         LOG.debug("List count, %s Users after reconcile" % len(users))
         return users
 
-    def delete(self):
-        users = self.list()
-        for user in users:
-            try:
-                self.client.delete_user(user['id'])
-            except Exception:
-                LOG.exception("Delete User exception.")
+    def delete_item(self, item):
+        self.client.delete_user(item['id'])
 
     def dry_run(self):
         users = self.list()
@@ -860,6 +877,7 @@ class UserService(BaseService):
 
 
 class RoleService(BaseService):
+    resource = 'Role'
 
     def __init__(self, manager, **kwargs):
         super(RoleService, self).__init__(kwargs)
@@ -872,7 +890,7 @@ class RoleService(BaseService):
             if not self.is_save_state:
                 roles = [role for role in roles if
                          (role['id'] not in
-                          self.saved_state_json['roles'].keys()
+                          self.saved_state_json['roles']
                           and role['name'] != CONF.identity.admin_role)]
                 LOG.debug("List count, %s Roles after reconcile" % len(roles))
             return roles
@@ -880,13 +898,8 @@ class RoleService(BaseService):
             LOG.exception("Cannot retrieve Roles.")
             return []
 
-    def delete(self):
-        roles = self.list()
-        for role in roles:
-            try:
-                self.client.delete_role(role['id'])
-            except Exception:
-                LOG.exception("Delete Role exception.")
+    def delete_item(self, item):
+        self.client.delete_role(item['id'])
 
     def dry_run(self):
         roles = self.list()
@@ -900,6 +913,7 @@ class RoleService(BaseService):
 
 
 class TenantService(BaseService):
+    resource = 'Tenant'
 
     def __init__(self, manager, **kwargs):
         super(TenantService, self).__init__(kwargs)
@@ -909,7 +923,7 @@ class TenantService(BaseService):
         tenants = self.client.list_tenants()['tenants']
         if not self.is_save_state:
             tenants = [tenant for tenant in tenants if (tenant['id']
-                       not in self.saved_state_json['tenants'].keys()
+                       not in self.saved_state_json['tenants']
                        and tenant['name'] != CONF.auth.admin_tenant_name)]
 
         if self.is_preserve:
@@ -919,13 +933,8 @@ class TenantService(BaseService):
         LOG.debug("List count, %s Tenants after reconcile" % len(tenants))
         return tenants
 
-    def delete(self):
-        tenants = self.list()
-        for tenant in tenants:
-            try:
-                self.client.delete_tenant(tenant['id'])
-            except Exception:
-                LOG.exception("Delete Tenant exception.")
+    def delete_item(self, item):
+        self.client.delete_tenant(item['id'])
 
     def dry_run(self):
         tenants = self.list()
@@ -939,6 +948,7 @@ class TenantService(BaseService):
 
 
 class DomainService(BaseService):
+    resource = 'Domain'
 
     def __init__(self, manager, **kwargs):
         super(DomainService, self).__init__(kwargs)
@@ -949,20 +959,14 @@ class DomainService(BaseService):
         domains = client.list_domains()['domains']
         if not self.is_save_state:
             domains = [domain for domain in domains if domain['id']
-                       not in self.saved_state_json['domains'].keys()]
+                       not in self.saved_state_json['domains']]
 
         LOG.debug("List count, %s Domains after reconcile" % len(domains))
         return domains
 
-    def delete(self):
-        client = self.client
-        domains = self.list()
-        for domain in domains:
-            try:
-                client.update_domain(domain['id'], enabled=False)
-                client.delete_domain(domain['id'])
-            except Exception:
-                LOG.exception("Delete Domain exception.")
+    def delete_item(self, item):
+        self.client.update_domain(item['id'], enabled=False)
+        self.client.delete_domain(item['id'])
 
     def dry_run(self):
         domains = self.list()
@@ -1017,3 +1021,94 @@ def get_global_cleanup_services():
     global_services.append(DomainService)
     global_services.append(RoleService)
     return global_services
+
+
+# Services whose resources must be gone before the ones of a service are
+# deleted, e.g. the ports of a subnet before the subnet.
+DEPENDENCIES = {
+    SecurityGroupService: (ServerService,),
+    ServerGroupService: (ServerService,),
+    FloatingIpService: (ServerService,),
+    NovaQuotaService: (ServerService,),
+    NetworkMeteringLabelService: (NetworkMeteringLabelRuleService,),
+    NetworkRouterService: (NetworkFloatingIpService,),
+    NetworkPortService: (ServerService,),
+    NetworkSubnetService: (NetworkPortService, NetworkRouterService),
+    NetworkService: (NetworkSubnetService,),
+    NetworkSecGroupService: (ServerService, NetworkPortService),
+    VolumeService: (ServerService, SnapshotService),
+    VolumeQuotaService: (SnapshotService, VolumeService),
+    DomainService: (UserService, TenantService),
+}
+
+
+def get_dependency_levels(services):
+    """Split services in levels that only depend on earlier levels.
+
+    Dependencies on services which are not in the list are ignored, and
+    the services of a level keep the order of the list.
+    """
+    pending = list(services)
+    done = set()
+    levels = []
+    while pending:
+        level = [service for service in pending
+                 if all(dependency in done or dependency not in services
+                        for dependency in DEPENDENCIES.get(service, ()))]
+        if not level:
+            raise ValueError("Circular dependencies between the cleanup "
+                             "services %s" % pending)
+        levels.append(level)
+        done.update(level)
+        pending = [service for service in pending if service not in done]
+    return levels
+
+
+class CleanupReport(object):
+    """Resources deleted and time spent, summed up per service."""
+
+    def __init__(self):
+        self._stats = collections.defaultdict(lambda: [0, 0, 0.0])
+        self._lock = threading.Lock()
+
+    def record(self, name, deleted, failed, elapsed):
+        with self._lock:
+            stats = self._stats[name]
+            stats[0] += deleted
+            stats[1] += failed
+            stats[2] += elapsed
+
+    def failed(self):
+        """Number of resources which failed to be deleted."""
+        with self._lock:
+            return sum(stats[1] for stats in self._stats.values())
+
+    def lines(self):
+        lines = ["%-32s %8s %8s %10s %8s" % (
+            "Service", "Deleted", "Failed", "Seconds", "Items/s")]
+        with self._lock:
+            stats = sorted(self._stats.items())
+        for name, (deleted, failed, elapsed) in stats:
+            rate = deleted / elapsed if elapsed else 0.0
+            lines.append("%-32s %8d %8d %10.1f %8.1f" % (
+                name, deleted, failed, elapsed, rate))
+        return lines
+
+
+def run_services(services, manager, report=None, **kwargs):
+    """Run cleanup services, the independent ones concurrently.
+
+    The services run level by level, see get_dependency_levels(), so that
+    the resources of a service are gone before the services depending on
+    it run. The keyword arguments are passed to the services.
+    """
+    def run(service):
+        svc = service(manager, **kwargs)
+        start = time.time()
+        svc.run()
+        if report is not None:
+            report.record(service.__name__, svc.deleted, svc.failed,
+                          time.time() - start)
+
+    for level in get_dependency_levels(services):
+        parallel.run_parallel(run, level)
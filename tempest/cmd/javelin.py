@@ -118,6 +118,7 @@ import six
 import yaml
 
 from tempest.common import identity
+from tempest.common.utils import parallel
 from tempest.common import waiters
 from tempest import config
 from tempest.lib import auth
@@ -146,12 +147,23 @@ CONF = config.CONF
 OPTS = {}
 USERS = {}
 RES = collections.defaultdict(list)
+# Maximum number of resources of a kind created or checked concurrently
+WORKERS = 8
 
 LOG = None
 
 JAVELIN_START = datetime.datetime.utcnow()
 
 
+def _run_parallel(func, items):
+    return parallel.run_parallel(func, items, max_workers=WORKERS)
+
+
+def _run_stage(*steps):
+    """Run steps which do not depend on each other concurrently."""
+    parallel.run_parallel(lambda step: step(), steps)
+
+
 class OSClient(object):
     _creds = None
     identity = None
@@ -331,14 +343,17 @@ def create_tenants(tenants):
     """
     admin = keystone_admin()
     body = admin.tenants.list_tenants()['tenants']
-    existing = [x['name'] for x in body]
-    for tenant in tenants:
+    existing = set(x['name'] for x in body)
+
+    def create_tenant(tenant):
         if tenant not in existing:
             admin.tenants.create_tenant(tenant)['tenant']
         else:
             LOG.warning("Tenant '%s' already exists in this environment"
                         % tenant)
 
+    _run_parallel(create_tenant, tenants)
+
 
 def destroy_tenants(tenants):
     admin = keystone_admin()
@@ -393,12 +408,13 @@ def create_users(users):
     global USERS
     LOG.info("Creating users")
     admin = keystone_admin()
-    for u in users:
+
+    def create_user(u):
         try:
             tenant = identity.get_tenant_by_name(admin.tenants, u['tenant'])
         except lib_exc.NotFound:
             LOG.error("Tenant: %s - not found" % u['tenant'])
-            continue
+            return
         try:
             identity.get_user_by_username(admin.tenants,
                                           tenant['id'], u['name'])
@@ -410,6 +426,8 @@ def create_users(users):
                 "%s@%s" % (u['name'], tenant['id']),
                 enabled=True)
 
+    _run_parallel(create_user, users)
+
 
 def destroy_users(users):
     admin = keystone_admin()
@@ -425,13 +443,16 @@ def collect_users(users):
     global USERS
     LOG.info("Collecting users")
     admin = keystone_admin()
-    for u in users:
+
+    def collect_user(u):
         tenant = identity.get_tenant_by_name(admin.tenants, u['tenant'])
         u['tenant_id'] = tenant['id']
-        USERS[u['name']] = u
         body = identity.get_user_by_username(admin.tenants,
                                              tenant['id'], u['name'])
-        USERS[u['name']]['id'] = body['id']
+        u['id'] = body['id']
+        USERS[u['name']] = u
+
+    _run_parallel(collect_user, users)
 
 
 class JavelinCheck(unittest.TestCase):
@@ -457,12 +478,9 @@ class JavelinCheck(unittest.TestCase):
                             "Server is not pingable at %s" % ip_addr)
 
     def check(self):
-        self.check_users()
-        self.check_objects()
-        self.check_servers()
-        self.check_volumes()
-        self.check_telemetry()
-        self.check_secgroups()
+        checks = [self.check_users, self.check_objects, self.check_servers,
+                  self.check_volumes, self.check_telemetry,
+                  self.check_secgroups]
 
         # validate neutron is enabled and ironic disabled:
         # Tenant network isolation is not supported when using ironic.
@@ -472,7 +490,8 @@ class JavelinCheck(unittest.TestCase):
         # server booted the same as nova network.
         if (CONF.service_available.neutron and
                 not CONF.baremetal.driver_enabled):
-            self.check_networking()
+            checks.append(self.check_networking)
+        _run_stage(*checks)
 
     def check_users(self):
         """Check that the users we expect to exist, do.
@@ -481,76 +500,82 @@ class JavelinCheck(unittest.TestCase):
         that things like tenantId didn't drift across versions.
         """
         LOG.info("checking users")
-        for name, user in six.iteritems(self.users):
-            client = keystone_admin()
-            found = client.users.show_user(user['id'])['user']
-            self.assertEqual(found['name'], user['name'])
-            self.assertEqual(found['tenantId'], user['tenant_id'])
-
-            # also ensure we can auth with that user, and do something
-            # on the cloud. We don't care about the results except that it
-            # remains authorized.
-            client = client_for_user(user['name'])
-            client.servers.list_servers()
+        _run_parallel(self._check_user, six.itervalues(self.users))
+
+    def _check_user(self, user):
+        client = keystone_admin()
+        found = client.users.show_user(user['id'])['user']
+        self.assertEqual(found['name'], user['name'])
+        self.assertEqual(found['tenantId'], user['tenant_id'])
+
+        # also ensure we can auth with that user, and do something
+        # on the cloud. We don't care about the results except that it
+        # remains authorized.
+        client = client_for_user(user['name'])
+        client.servers.list_servers()
 
     def check_objects(self):
         """Check that the objects created are still there."""
         if not self.res.get('objects'):
             return
         LOG.info("checking objects")
-        for obj in self.res['objects']:
-            client = client_for_user(obj['owner'])
-            r, contents = client.objects.get_object(
-                obj['container'], obj['name'])
-            source = _file_contents(obj['file'])
-            self.assertEqual(contents, source)
+        _run_parallel(self._check_object, self.res['objects'])
+
+    def _check_object(self, obj):
+        client = client_for_user(obj['owner'])
+        r, contents = client.objects.get_object(
+            obj['container'], obj['name'])
+        source = _file_contents(obj['file'])
+        self.assertEqual(contents, source)
 
     def check_servers(self):
         """Check that the servers are still up and running."""
         if not self.res.get('servers'):
             return
         LOG.info("checking servers")
-        for server in self.res['servers']:
-            client = client_for_user(server['owner'])
-            found = _get_server_by_name(client, server['name'])
-            self.assertIsNotNone(
-                found,
-                "Couldn't find expected server %s" % server['name'])
-
-            found = client.servers.show_server(found['id'])['server']
-            # validate neutron is enabled and ironic disabled:
-            if (CONF.service_available.neutron and
-                    not CONF.baremetal.driver_enabled):
-                _floating_is_alive = False
-                for network_name, body in found['addresses'].items():
-                    for addr in body:
-                        ip = addr['addr']
-                        # Use floating IP, fixed IP or other type to
-                        # reach the server.
-                        # This is useful in multi-node environment.
-                        if CONF.validation.connect_method == 'floating':
-                            if addr.get('OS-EXT-IPS:type',
-                                        'floating') == 'floating':
-                                self._ping_ip(ip, 60)
-                                _floating_is_alive = True
-                        elif CONF.validation.connect_method == 'fixed':
-                            if addr.get('OS-EXT-IPS:type',
-                                        'fixed') == 'fixed':
-                                namespace = _get_router_namespace(client,
-                                                                  network_name)
-                                self._ping_ip(ip, 60, namespace)
-                        else:
+        _run_parallel(self._check_server, self.res['servers'])
+
+    def _check_server(self, server):
+        client = client_for_user(server['owner'])
+        found = _get_server_by_name(client, server['name'])
+        self.assertIsNotNone(
+            found,
+            "Couldn't find expected server %s" % server['name'])
+
+        found = client.servers.show_server(found['id'])['server']
+        # validate neutron is enabled and ironic disabled:
+        if (CONF.service_available.neutron and
+                not CONF.baremetal.driver_enabled):
+            _floating_is_alive = False
+            for network_name, body in found['addresses'].items():
+                for addr in body:
+                    ip = addr['addr']
+                    # Use floating IP, fixed IP or other type to
+                    # reach the server.
+                    # This is useful in multi-node environment.
+                    if CONF.validation.connect_method == 'floating':
+                        if addr.get('OS-EXT-IPS:type',
+                                    'floating') == 'floating':
                             self._ping_ip(ip, 60)
-                # If CONF.validation.connect_method is floating, validate
-                # that the floating IP is attached to the server and the
-                # the server is pingable.
-                if CONF.validation.connect_method == 'floating':
-                    self.assertTrue(_floating_is_alive,
-                                    "Server %s has no floating IP." %
-                                    server['name'])
-            else:
-                addr = found['addresses']['private'][0]['addr']
-                self._ping_ip(addr, 60)
+                            _floating_is_alive = True
+                    elif CONF.validation.connect_method == 'fixed':
+                        if addr.get('OS-EXT-IPS:type',
+                                    'fixed') == 'fixed':
+                            namespace = _get_router_namespace(client,
+                                                              network_name)
+                            self._ping_ip(ip, 60, namespace)
+                    else:
+                        self._ping_ip(ip, 60)
+            # If CONF.validation.connect_method is floating, validate
+            # that the floating IP is attached to the server and the
+            # the server is pingable.
+            if CONF.validation.connect_method == 'floating':
+                self.assertTrue(_floating_is_alive,
+                                "Server %s has no floating IP." %
+                                server['name'])
+        else:
+            addr = found['addresses']['private'][0]['addr']
+            self._ping_ip(addr, 60)
 
     def check_secgroups(self):
         """Check that the security groups still exist."""
@@ -589,18 +614,20 @@ class JavelinCheck(unittest.TestCase):
         if not self.res.get('volumes'):
             return
         LOG.info("checking volumes")
-        for volume in self.res['volumes']:
-            client = client_for_user(volume['owner'])
-            vol_body = _get_volume_by_name(client, volume['name'])
-            self.assertIsNotNone(
-                vol_body,
-                "Couldn't find expected volume %s" % volume['name'])
+        _run_parallel(self._check_volume, self.res['volumes'])
+
+    def _check_volume(self, volume):
+        client = client_for_user(volume['owner'])
+        vol_body = _get_volume_by_name(client, volume['name'])
+        self.assertIsNotNone(
+            vol_body,
+            "Couldn't find expected volume %s" % volume['name'])
 
-            # Verify that a volume's attachment retrieved
-            server_id = _get_server_by_name(client, volume['server'])['id']
-            attachment = client.volumes.get_attachment_from_volume(vol_body)
-            self.assertEqual(vol_body['id'], attachment['volume_id'])
-            self.assertEqual(server_id, attachment['server_id'])
+        # Verify that a volume's attachment retrieved
+        server_id = _get_server_by_name(client, volume['server'])['id']
+        attachment = client.volumes.get_attachment_from_volume(vol_body)
+        self.assertEqual(vol_body['id'], attachment['volume_id'])
+        self.assertEqual(server_id, attachment['server_id'])
 
     def _confirm_telemetry_sample(self, server, sample):
         """Check this sample matches the expected resource metadata."""
@@ -650,7 +677,8 @@ def create_objects(objects):
     if not objects:
         return
     LOG.info("Creating objects")
-    for obj in objects:
+
+    def create_object(obj):
         LOG.debug("Object %s" % obj)
         swift_role = obj.get('swift_role', 'Member')
         _assign_swift_role(obj['owner'], swift_role)
@@ -660,6 +688,8 @@ def create_objects(objects):
             obj['container'], obj['name'],
             _file_contents(obj['file']))
 
+    _run_parallel(create_object, objects)
+
 
 def destroy_objects(objects):
     for obj in objects:
@@ -694,7 +724,8 @@ def create_images(images):
     if not images:
         return
     LOG.info("Creating images")
-    for image in images:
+
+    def create_image(image):
         client = client_for_user(image['owner'])
 
         # DEPRECATED: 'format' was used for ami images
@@ -709,7 +740,7 @@ def create_images(images):
         # only upload a new image if the name isn't there
         if _get_image_by_name(client, image['name']):
             LOG.info("Image '%s' already exists" % image['name'])
-            continue
+            return
 
         # special handling for 3 part image
         extras = {}
@@ -733,6 +764,8 @@ def create_images(images):
         image_id = body.get('id')
         client.images.store_image_file(image_id, open(fname, 'r'))
 
+    _run_parallel(create_image, images)
+
 
 def destroy_images(images):
     if not images:
@@ -786,17 +819,20 @@ def _get_resource_by_name(client, resource, name):
 
 def create_networks(networks):
     LOG.info("Creating networks")
-    for network in networks:
+
+    def create_network(network):
         client = client_for_user(network['owner'])
 
         # only create a network if the name isn't here
         body = client.networks.list_networks()
         if any(item['name'] == network['name'] for item in body['networks']):
             LOG.warning("Duplicated network name: %s" % network['name'])
-            continue
+            return
 
         client.networks.create_network(name=network['name'])
 
+    _run_parallel(create_network, networks)
+
 
 def destroy_networks(networks):
     LOG.info("Destroying subnets")
@@ -809,7 +845,8 @@ def destroy_networks(networks):
 
 def create_subnets(subnets):
     LOG.info("Creating subnets")
-    for subnet in subnets:
+
+    def create_subnet(subnet):
         client = client_for_user(subnet['owner'])
 
         network = _get_resource_by_name(client.networks, 'networks',
@@ -826,6 +863,8 @@ def create_subnets(subnets):
             if not is_overlapping_cidr:
                 raise
 
+    _run_parallel(create_subnet, subnets)
+
 
 def destroy_subnets(subnets):
     LOG.info("Destroying subnets")
@@ -838,17 +877,20 @@ def destroy_subnets(subnets):
 
 def create_routers(routers):
     LOG.info("Creating routers")
-    for router in routers:
+
+    def create_router(router):
         client = client_for_user(router['owner'])
 
         # only create a router if the name isn't here
         body = client.routers.list_routers()
         if any(item['name'] == router['name'] for item in body['routers']):
             LOG.warning("Duplicated router name: %s" % router['name'])
-            continue
+            return
 
         client.networks.create_router(name=router['name'])
 
+    _run_parallel(create_router, routers)
+
 
 def destroy_routers(routers):
     LOG.info("Destroying routers")
@@ -865,7 +907,7 @@ def destroy_routers(routers):
 
 
 def add_router_interface(routers):
-    for router in routers:
+    def add_interfaces(router):
         client = client_for_user(router['owner'])
         router_id = _get_resource_by_name(client.networks,
                                           'routers', router['name'])['id']
@@ -886,6 +928,8 @@ def add_router_interface(routers):
             else:
                 raise ValueError('public_network_id is not configured.')
 
+    _run_parallel(add_interfaces, routers)
+
 
 #######################
 #
@@ -913,12 +957,13 @@ def create_servers(servers):
     if not servers:
         return
     LOG.info("Creating servers")
-    for server in servers:
+
+    def create_server(server):
         client = client_for_user(server['owner'])
 
         if _get_server_by_name(client, server['name']):
             LOG.info("Server '%s' already exists" % server['name'])
-            continue
+            return
 
         image_id = _get_image_by_name(client, server['image'])['id']
         flavor_id = _get_flavor_by_name(client, server['flavor'])['id']
@@ -933,8 +978,10 @@ def create_servers(servers):
         body = client.servers.create_server(
             name=server['name'], imageRef=image_id, flavorRef=flavor_id,
             **kwargs)['server']
-        server_id = body['id']
-        client.servers.wait_for_server_status(server_id, 'ACTIVE')
+        return server, client, body['id']
+
+    def setup_server(created):
+        server, client, server_id = created
         # create security group(s) after server spawning
         for secgroup in server['secgroups']:
             client.servers.add_security_group(server_id, name=secgroup)
@@ -945,6 +992,19 @@ def create_servers(servers):
             client.floating_ips.associate_floating_ip_to_server(
                 floating_ip['ip'], server_id)
 
+    def wait_for_servers(owned):
+        client, server_ids = owned
+        waiters.wait_for_servers_status(client.servers, server_ids, 'ACTIVE')
+
+    created = [c for c in _run_parallel(create_server, servers) if c]
+    # the servers of an owner are waited for together, sharing their polls
+    by_owner = collections.OrderedDict()
+    for server, client, server_id in created:
+        by_owner.setdefault(server['owner'], (client, []))[1].append(
+            server_id)
+    _run_parallel(wait_for_servers, by_owner.values())
+    _run_parallel(setup_server, created)
+
 
 def destroy_servers(servers):
     if not servers:
@@ -966,7 +1026,8 @@ def destroy_servers(servers):
 
 def create_secgroups(secgroups):
     LOG.info("Creating security groups")
-    for secgroup in secgroups:
+
+    def create_secgroup(secgroup):
         client = client_for_user(secgroup['owner'])
 
         # only create a security group if the name isn't here
@@ -976,7 +1037,7 @@ def create_secgroups(secgroups):
         if any(item['name'] == secgroup['name'] for item in body):
             LOG.warning("Security group '%s' already exists" %
                         secgroup['name'])
-            continue
+            return
 
         body = client.secgroups.create_security_group(
             name=secgroup['name'],
@@ -989,6 +1050,8 @@ def create_secgroups(secgroups):
                 parent_group_id=secgroup_id, ip_protocol=ip_proto,
                 from_port=from_port, to_port=to_port, cidr=cidr)
 
+    _run_parallel(create_secgroup, secgroups)
+
 
 def destroy_secgroups(secgroups):
     LOG.info("Destroying security groups")
@@ -1019,19 +1082,28 @@ def create_volumes(volumes):
     if not volumes:
         return
     LOG.info("Creating volumes")
-    for volume in volumes:
+
+    def create_volume(volume):
         client = client_for_user(volume['owner'])
 
         # only create a volume if the name isn't here
         if _get_volume_by_name(client, volume['name']):
             LOG.info("volume '%s' already exists" % volume['name'])
-            continue
+            return
 
         size = volume['gb']
         v_name = volume['name']
         body = client.volumes.create_volume(size=size,
                                             display_name=v_name)['volume']
-        waiters.wait_for_volume_status(client.volumes, body['id'], 'available')
+        return client, body['id']
+
+    def wait_for_volume(created):
+        client, volume_id = created
+        waiters.wait_for_volume_status(client.volumes, volume_id, 'available')
+
+    # all the volumes are requested before waiting for any of them
+    created = [c for c in _run_parallel(create_volume, volumes) if c]
+    _run_parallel(wait_for_volume, created)
 
 
 def destroy_volumes(volumes):
@@ -1043,7 +1115,7 @@ def destroy_volumes(volumes):
 
 
 def attach_volumes(volumes):
-    for volume in volumes:
+    def attach_volume(volume):
         client = client_for_user(volume['owner'])
         server_id = _get_server_by_name(client, volume['server'])['id']
         volume_id = _get_volume_by_name(client, volume['name'])['id']
@@ -1052,6 +1124,8 @@ def attach_volumes(volumes):
                                      instance_uuid=server_id,
                                      mountpoint=device)
 
+    _run_parallel(attach_volume, volumes)
+
 
 #######################
 #
@@ -1059,6 +1133,15 @@ def attach_volumes(volumes):
 #
 #######################
 
+def _create_networking():
+    # validate neutron is enabled and ironic is disabled
+    if CONF.service_available.neutron and not CONF.baremetal.driver_enabled:
+        create_networks(RES['networks'])
+        create_subnets(RES['subnets'])
+        create_routers(RES['routers'])
+        add_router_interface(RES['routers'])
+
+
 def create_resources():
     LOG.info("Creating Resources")
     # first create keystone level resources, and we need to be admin
@@ -1067,19 +1150,13 @@ def create_resources():
     create_users(RES['users'])
     collect_users(RES['users'])
 
-    # next create resources in a well known order
-    create_objects(RES['objects'])
-    create_images(RES['images'])
-
-    # validate neutron is enabled and ironic is disabled
-    if CONF.service_available.neutron and not CONF.baremetal.driver_enabled:
-        create_networks(RES['networks'])
-        create_subnets(RES['subnets'])
-        create_routers(RES['routers'])
-        add_router_interface(RES['routers'])
-
-    create_secgroups(RES['secgroups'])
-    create_volumes(RES['volumes'])
+    # next create the resources which do not depend on each other
+    # concurrently
+    _run_stage(lambda: create_objects(RES['objects']),
+               lambda: create_images(RES['images']),
+               _create_networking,
+               lambda: create_secgroups(RES['secgroups']),
+               lambda: create_volumes(RES['volumes']))
 
     # Only attempt attaching the volumes if servers are defined in the
     # resource file
@@ -1107,6 +1184,7 @@ def destroy_resources():
 
 def get_options():
     global OPTS
+    global WORKERS
     parser = argparse.ArgumentParser(
         description='Create and validate a fixed set of OpenStack resources')
     parser.add_argument('-m', '--mode',
@@ -1142,6 +1220,11 @@ def get_options():
                         default=os.environ.get('OS_TENANT_NAME'),
                         help=('Defaults to env[OS_TENANT_NAME].'))
 
+    parser.add_argument('-w', '--workers', type=int, default=WORKERS,
+                        help=('Maximum number of resources of a kind '
+                              'created or checked concurrently. '
+                              'Defaults to %d.' % WORKERS))
+
     OPTS = parser.parse_args()
     if OPTS.mode not in ('create', 'check', 'destroy'):
         print("ERROR: Unknown mode -m %s\n" % OPTS.mode)
@@ -1149,6 +1232,7 @@ def get_options():
         sys.exit(1)
     if OPTS.config_file:
         config.CONF.set_config_path(OPTS.config_file)
+    WORKERS = OPTS.workers
 
 
 def setup_logging():
@@ -58,7 +58,9 @@ def _get_preprov_provider_params():
         ('accounts_lock_dir', lockutils.get_lock_path(CONF)),
         ('test_accounts_file', CONF.auth.test_accounts_file),
         ('object_storage_operator_role', CONF.object_storage.operator_role),
-        ('object_storage_reseller_admin_role', reseller_admin_role)
+        ('object_storage_reseller_admin_role', reseller_admin_role),
+        ('lease_backend', CONF.auth.test_accounts_lease_backend),
+        ('lease_ttl', CONF.auth.test_accounts_lease_ttl)
     ]))
 
 
@@ -12,6 +12,9 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import atexit
+import threading
+
 import netaddr
 from oslo_log import log as logging
 import six
@@ -20,6 +23,7 @@ from tempest import clients
 from tempest.common import cred_client
 from tempest.common import cred_provider
 from tempest.common.utils import data_utils
+from tempest.common.utils import parallel
 from tempest import config
 from tempest import exceptions
 from tempest.lib import exceptions as lib_exc
@@ -27,6 +31,9 @@ from tempest.lib import exceptions as lib_exc
 CONF = config.CONF
 LOG = logging.getLogger(__name__)
 
+# Credential types served by the pool, the others are always created
+POOLED_CREDENTIAL_TYPES = ('primary', 'alt')
+
 
 class DynamicCredentialProvider(cred_provider.CredentialProvider):
 
@@ -55,6 +62,8 @@ class DynamicCredentialProvider(cred_provider.CredentialProvider):
             network_resources=network_resources)
         self.network_resources = network_resources
         self._creds = {}
+        # Keys of _creds leased from a CredentialPool
+        self._leased = set()
         self.ports = []
         self.default_admin_creds = admin_creds
         (self.identity_admin_client,
@@ -67,7 +76,8 @@ class DynamicCredentialProvider(cred_provider.CredentialProvider):
          self.routers_admin_client,
          self.subnets_admin_client,
          self.ports_admin_client,
-         self.security_groups_admin_client) = self._get_admin_clients()
+         self.security_groups_admin_client,
+         self.servers_admin_client) = self._get_admin_clients()
         # Domain where isolated credentials are provisioned (v3 only).
         # Use that of the admin account is None is configured.
         self.creds_domain_name = None
@@ -95,13 +105,14 @@ class DynamicCredentialProvider(cred_provider.CredentialProvider):
             return (os.identity_client, os.tenants_client, os.users_client,
                     os.roles_client, None, os.network_client,
                     os.networks_client, os.routers_client, os.subnets_client,
-                    os.ports_client, os.security_groups_client)
+                    os.ports_client, os.security_groups_client,
+                    os.servers_client)
         else:
             return (os.identity_v3_client, os.projects_client,
                     os.users_v3_client, os.roles_v3_client, os.domains_client,
                     os.network_client, os.networks_client, os.routers_client,
                     os.subnets_client, os.ports_client,
-                    os.security_groups_client)
+                    os.security_groups_client, os.servers_client)
 
     def _create_creds(self, suffix="", admin=False, roles=None):
         """Create random credentials under the following schema.
@@ -249,9 +260,27 @@ class DynamicCredentialProvider(cred_provider.CredentialProvider):
         self.routers_admin_client.add_router_interface(router_id,
                                                        subnet_id=subnet_id)
 
+    def _set_network_resources(self, credentials):
+        if (CONF.service_available.neutron and
+            not CONF.baremetal.driver_enabled and
+            CONF.auth.create_isolated_networks):
+            network, subnet, router = self._create_network_resources(
+                credentials.tenant_id)
+            credentials.set_resources(network=network, subnet=subnet,
+                                      router=router)
+            LOG.info("Created isolated network resources for : \n"
+                     + " credentials: %s" % credentials)
+
     def get_credentials(self, credential_type):
         if self._creds.get(str(credential_type)):
             credentials = self._creds[str(credential_type)]
+        elif (credential_type in POOLED_CREDENTIAL_TYPES and
+              CONF.auth.dynamic_credentials_pool_size > 0):
+            credentials = get_pool(self).lease()
+            self._creds[str(credential_type)] = credentials
+            self._leased.add(str(credential_type))
+            LOG.info("Leased dynamic creds:\n credentials: %s"
+                     % credentials)
         else:
             if credential_type in ['primary', 'alt', 'admin']:
                 is_admin = (credential_type == 'admin')
@@ -262,15 +291,7 @@ class DynamicCredentialProvider(cred_provider.CredentialProvider):
             # Maintained until tests are ported
             LOG.info("Acquired dynamic creds:\n credentials: %s"
                      % credentials)
-            if (CONF.service_available.neutron and
-                not CONF.baremetal.driver_enabled and
-                CONF.auth.create_isolated_networks):
-                network, subnet, router = self._create_network_resources(
-                    credentials.tenant_id)
-                credentials.set_resources(network=network, subnet=subnet,
-                                          router=router)
-                LOG.info("Created isolated network resources for : \n"
-                         + " credentials: %s" % credentials)
+            self._set_network_resources(credentials)
         return credentials
 
     def get_primary_creds(self):
@@ -363,7 +384,70 @@ class DynamicCredentialProvider(cred_provider.CredentialProvider):
                 self._clear_isolated_network(creds.network['id'],
                                              creds.network['name'])
 
+    def _purge_services(self):
+        """Cleanup services run on a project, and those run as admin"""
+        # NOTE: imported here as cleanup_service imports the credential
+        # providers through tempest.test
+        from tempest.cmd import cleanup_service
+
+        project_services = []
+        admin_services = []
+        if CONF.service_available.nova:
+            project_services.extend([cleanup_service.ServerService,
+                                     cleanup_service.ServerGroupService,
+                                     cleanup_service.KeyPairService])
+            if not CONF.service_available.neutron:
+                project_services.extend([
+                    cleanup_service.SecurityGroupService,
+                    cleanup_service.FloatingIpService])
+            admin_services.append(cleanup_service.NovaQuotaService)
+        if CONF.service_available.neutron:
+            project_services.extend([cleanup_service.NetworkFloatingIpService,
+                                     cleanup_service.NetworkRouterService,
+                                     cleanup_service.NetworkPortService,
+                                     cleanup_service.NetworkSubnetService,
+                                     cleanup_service.NetworkService,
+                                     cleanup_service.NetworkSecGroupService])
+        if CONF.service_available.cinder:
+            project_services.extend([cleanup_service.SnapshotService,
+                                     cleanup_service.VolumeService])
+            admin_services.append(cleanup_service.VolumeQuotaService)
+        return project_services, admin_services
+
+    def _purge_creds_resources(self, creds):
+        """Delete what the tests left in the project of a credential set
+
+        The tenant services of tempest cleanup run on the project, sparing
+        the network, subnet and router of the set, and reset its quotas.
+
+        :raises TearDownException: if any resource could not be deleted.
+        """
+        from tempest.cmd import cleanup_service
+
+        project_services, admin_services = self._purge_services()
+        preserved_ids = frozenset(resource['id'] for resource in (
+            creds.network, creds.subnet, creds.router) if resource)
+        kwargs = {'data': None,
+                  'is_dry_run': False,
+                  'saved_state_json': None,
+                  'is_preserve': False,
+                  'is_save_state': False,
+                  'tenant_id': creds.tenant_id,
+                  'preserved_ids': preserved_ids}
+        report = cleanup_service.CleanupReport()
+        cleanup_service.run_services(
+            project_services, clients.Manager(credentials=creds.credentials),
+            report=report, **kwargs)
+        cleanup_service.run_services(
+            admin_services, clients.Manager(self.default_admin_creds),
+            report=report, **kwargs)
+        if report.failed():
+            raise exceptions.TearDownException(num=report.failed())
+
     def clear_creds(self):
+        for key in self._leased:
+            get_pool(self).release(self._creds.pop(key))
+        self._leased = set()
         if not self._creds:
             return
         self._clear_isolated_net_resources()
@@ -390,3 +474,128 @@ class DynamicCredentialProvider(cred_provider.CredentialProvider):
 
     def is_role_available(self, role):
         return True
+
+
+class CredentialPool(object):
+    """Isolated credentials created up front and leased to test classes
+
+    The credential sets, with their network resources, are created in
+    parallel when the first one is leased. A released set has the
+    resources left in its project purged and is leased again, sets are
+    only deleted when the pool is cleared or could not be purged.
+
+    :param provider: DynamicCredentialProvider creating the sets
+    :param size: number of sets created up front
+    """
+
+    def __init__(self, provider, size):
+        self.provider = provider
+        self.size = size
+        self._free = []
+        self._all = []
+        self._filled = False
+        self._lock = threading.Lock()
+        # The provider deletes the sets it holds, one batch at a time
+        self._delete_lock = threading.Lock()
+
+    def _create(self):
+        credentials = self.provider._create_creds()
+        try:
+            self.provider._set_network_resources(credentials)
+        except Exception:
+            self._delete([credentials])
+            raise
+        return credentials
+
+    def _try_create(self, index):
+        try:
+            return self._create()
+        except Exception:
+            LOG.exception("Failed to create pooled credentials %d of %d",
+                          index + 1, self.size)
+
+    def _fill(self):
+        created = parallel.run_parallel(self._try_create, range(self.size))
+        created = [creds for creds in created if creds is not None]
+        LOG.info("Created a pool of %d dynamic credentials", len(created))
+        self._all.extend(created)
+        self._free.extend(created)
+        self._filled = True
+
+    def lease(self):
+        with self._lock:
+            if not self._filled:
+                self._fill()
+            if self._free:
+                return self._free.pop()
+        # The pool is exhausted, grow it
+        credentials = self._create()
+        with self._lock:
+            self._all.append(credentials)
+        return credentials
+
+    def release(self, credentials):
+        try:
+            self.provider._purge_creds_resources(credentials)
+        except Exception:
+            LOG.exception("Failed to reset pooled credentials %s, deleting "
+                          "them", credentials)
+            with self._lock:
+                self._all.remove(credentials)
+            self._delete([credentials])
+            return
+        with self._lock:
+            self._free.append(credentials)
+
+    def _delete(self, credentials):
+        with self._delete_lock:
+            self.provider._creds = dict(
+                (str(index), creds) for index, creds in enumerate(credentials))
+            self.provider.clear_creds()
+
+    def clear(self):
+        with self._lock:
+            credentials = self._all
+            self._all = []
+            self._free = []
+            self._filled = False
+        if credentials:
+            self._delete(credentials)
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(provider):
+    """Return the process wide pool matching the settings of a provider"""
+    network_resources = provider.network_resources
+    if network_resources is not None:
+        network_resources = tuple(sorted(network_resources.items()))
+    key = (provider.identity_version, provider.credentials_domain,
+           provider.admin_role, network_resources)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool_provider = DynamicCredentialProvider(
+                identity_version=provider.identity_version,
+                name='tempest-pool',
+                network_resources=provider.network_resources,
+                credentials_domain=provider.credentials_domain,
+                admin_role=provider.admin_role,
+                admin_creds=provider.default_admin_creds)
+            pool = CredentialPool(pool_provider,
+                                  CONF.auth.dynamic_credentials_pool_size)
+            _pools[key] = pool
+        return pool
+
+
+def clear_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.clear()
+
+
+atexit.register(clear_pools)
@@ -12,10 +12,15 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import atexit
+import errno
 import hashlib
 import os
+import random
+import sqlite3
+import threading
+import time
 
-from oslo_concurrency import lockutils
 from oslo_log import log as logging
 import six
 import yaml
@@ -41,19 +46,196 @@ def read_accounts_yaml(path):
     return accounts
 
 
+def _makedirs(path):
+    try:
+        os.makedirs(path)
+    except OSError as e:
+        if e.errno != errno.EEXIST:
+            raise
+
+
+class FileLeases(object):
+    """Account leases as files in a lock directory
+
+    A lease is a file named after the account hash and holding the name of
+    its holder. It is created with O_CREAT | O_EXCL, which is atomic, so
+    accounts are leased without any global lock.
+    """
+
+    def __init__(self, lock_dir):
+        self.lock_dir = lock_dir
+
+    def _path(self, account_hash):
+        return os.path.join(self.lock_dir, account_hash)
+
+    def acquire(self, account_hash, holder):
+        # The lock directory is removed with the last lease, retry if that
+        # happens concurrently
+        for _ in range(3):
+            try:
+                fd = os.open(self._path(account_hash),
+                             os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+            except OSError as e:
+                if e.errno == errno.EEXIST:
+                    return False
+                if e.errno != errno.ENOENT:
+                    raise
+                _makedirs(self.lock_dir)
+                continue
+            with os.fdopen(fd, 'w') as lease:
+                lease.write(holder)
+            return True
+        raise lib_exc.InvalidCredentials(
+            'Could not create the accounts lock directory %s' % self.lock_dir)
+
+    def holder(self, account_hash):
+        try:
+            with open(self._path(account_hash), 'r') as lease:
+                return lease.read()
+        except IOError:
+            return None
+
+    def release(self, account_hash, holder):
+        # Lease files never expire, so they are only ever removed by their
+        # holder
+        try:
+            os.remove(self._path(account_hash))
+        except OSError as e:
+            if e.errno != errno.ENOENT:
+                raise
+            return False
+        if not os.listdir(self.lock_dir):
+            try:
+                os.rmdir(self.lock_dir)
+            except OSError:
+                # A lease was taken meanwhile
+                pass
+        return True
+
+
+_stop_renewal = threading.Event()
+atexit.register(_stop_renewal.set)
+
+
+class SQLiteLeases(object):
+    """Account leases as rows of a SQLite table, expiring after a TTL
+
+    The leases held by the process are renewed by a daemon thread every
+    third of the TTL. Leases of crashed workers are not renewed anymore,
+    they are taken over once expired.
+    """
+
+    def __init__(self, lock_dir, ttl):
+        _makedirs(lock_dir)
+        self.path = os.path.join(lock_dir, 'test_accounts_leases.db')
+        self.ttl = ttl
+        self._held = {}
+        self._lock = threading.Lock()
+        self._renewer = None
+        with self._connect() as db:
+            db.execute('CREATE TABLE IF NOT EXISTS leases ('
+                       'hash TEXT PRIMARY KEY, holder TEXT, expires REAL)')
+
+    def _connect(self):
+        # Writers wait for each other instead of failing
+        return sqlite3.connect(self.path, timeout=60)
+
+    def acquire(self, account_hash, holder):
+        now = time.time()
+        db = self._connect()
+        try:
+            with db:
+                db.execute('DELETE FROM leases WHERE hash = ? AND '
+                           'expires < ?', (account_hash, now))
+                cursor = db.execute(
+                    'INSERT OR IGNORE INTO leases VALUES (?, ?, ?)',
+                    (account_hash, holder, now + self.ttl))
+                acquired = cursor.rowcount == 1
+        finally:
+            db.close()
+        if acquired:
+            with self._lock:
+                self._held[account_hash] = holder
+                if self._renewer is None:
+                    self._renewer = threading.Thread(target=self._renew_loop)
+                    self._renewer.daemon = True
+                    self._renewer.start()
+        return acquired
+
+    def holder(self, account_hash):
+        db = self._connect()
+        try:
+            row = db.execute('SELECT holder FROM leases WHERE hash = ?',
+                             (account_hash,)).fetchone()
+        finally:
+            db.close()
+        return row[0] if row else None
+
+    def release(self, account_hash, holder):
+        with self._lock:
+            self._held.pop(account_hash, None)
+        db = self._connect()
+        try:
+            with db:
+                cursor = db.execute(
+                    'DELETE FROM leases WHERE hash = ? AND holder = ?',
+                    (account_hash, holder))
+                return cursor.rowcount == 1
+        finally:
+            db.close()
+
+    def renew(self):
+        """Push back the expiry of the leases held by the process."""
+        with self._lock:
+            held = list(self._held.items())
+        if not held:
+            return
+        expires = time.time() + self.ttl
+        lost = []
+        db = self._connect()
+        try:
+            with db:
+                for account_hash, holder in held:
+                    cursor = db.execute(
+                        'UPDATE leases SET expires = ? WHERE hash = ? AND '
+                        'holder = ?', (expires, account_hash, holder))
+                    if cursor.rowcount != 1:
+                        lost.append(account_hash)
+        finally:
+            db.close()
+        for account_hash in lost:
+            LOG.warning('The lease of account %s expired while held' %
+                        account_hash)
+            with self._lock:
+                self._held.pop(account_hash, None)
+
+    def _renew_loop(self):
+        while not _stop_renewal.wait(self.ttl / 3.0):
+            with self._lock:
+                if not self._held:
+                    self._renewer = None
+                    return
+            try:
+                self.renew()
+            except sqlite3.Error:
+                LOG.exception('Failed to renew the account leases')
+
+
 class PreProvisionedCredentialProvider(cred_provider.CredentialProvider):
 
     def __init__(self, identity_version, test_accounts_file,
                  accounts_lock_dir, name=None, credentials_domain=None,
                  admin_role=None, object_storage_operator_role=None,
-                 object_storage_reseller_admin_role=None):
+                 object_storage_reseller_admin_role=None,
+                 lease_backend='file', lease_ttl=None):
         """Credentials provider using pre-provisioned accounts
 
         This credentials provider loads the details of pre-provisioned
         accounts from a YAML file, in the format specified by
-        `etc/accounts.yaml.sample`. It locks accounts while in use, using the
-        external locking mechanism, allowing for multiple python processes
-        to share a single account file, and thus running tests in parallel.
+        `etc/accounts.yaml.sample`. It leases accounts while in use, through
+        lock files created atomically or a SQLite table, allowing for
+        multiple python processes to share a single account file, and thus
+        running tests in parallel.
 
         The accounts_lock_dir must be generated using `lockutils.get_lock_path`
         from the oslo.concurrency library. For instance:
@@ -74,6 +256,9 @@ class PreProvisionedCredentialProvider(cred_provider.CredentialProvider):
                                    (if no domain is configured)
         :param object_storage_operator_role: name of the role
         :param object_storage_reseller_admin_role: name of the role
+        :param lease_backend: 'file' for a lock file per leased account,
+                              'sqlite' for a lease table with expiring leases
+        :param lease_ttl: seconds after which a SQLite lease expires
         """
         super(PreProvisionedCredentialProvider, self).__init__(
             identity_version=identity_version, name=name,
@@ -89,6 +274,14 @@ class PreProvisionedCredentialProvider(cred_provider.CredentialProvider):
             accounts, admin_role, object_storage_operator_role,
             object_storage_reseller_admin_role)
         self.accounts_dir = accounts_lock_dir
+        # Unique to the process, for a lease to only be released by the
+        # provider which took it
+        self.holder = '%s-%d' % (self.name, os.getpid())
+        if lease_backend == 'sqlite':
+            self._leases = SQLiteLeases(accounts_lock_dir, lease_ttl)
+        else:
+            self._leases = FileLeases(accounts_lock_dir)
+        self._build_role_index()
         self._creds = {}
 
     @classmethod
@@ -167,69 +360,56 @@ class PreProvisionedCredentialProvider(cred_provider.CredentialProvider):
     def is_multi_tenant(self):
         return self.is_multi_user()
 
-    def _create_hash_file(self, hash_string):
-        path = os.path.join(os.path.join(self.accounts_dir, hash_string))
-        if not os.path.isfile(path):
-            with open(path, 'w') as fd:
-                fd.write(self.name)
-            return True
-        return False
+    def _build_role_index(self):
+        # Accounts are bits of an integer, the accounts having a role are
+        # the bits set in the mask of that role
+        self._hashes = sorted(self.hash_dict['creds'])
+        bits = dict((_hash, 1 << i) for i, _hash in enumerate(self._hashes))
+        self._all_mask = (1 << len(self._hashes)) - 1
+        self._role_masks = {}
+        for role, hashes in self.hash_dict['roles'].items():
+            mask = 0
+            for _hash in hashes:
+                mask |= bits[_hash]
+            self._role_masks[role] = mask
+        self._matches = {}
 
-    @lockutils.synchronized('test_accounts_io', external=True)
     def _get_free_hash(self, hashes):
         # Cast as a list because in some edge cases a set will be passed in
         hashes = list(hashes)
-        if not os.path.isdir(self.accounts_dir):
-            os.mkdir(self.accounts_dir)
-            # Create File from first hash (since none are in use)
-            self._create_hash_file(hashes[0])
-            return hashes[0]
-        names = []
-        for _hash in hashes:
-            res = self._create_hash_file(_hash)
-            if res:
-                return _hash
-            else:
-                path = os.path.join(os.path.join(self.accounts_dir,
-                                                 _hash))
-                with open(path, 'r') as fd:
-                    names.append(fd.read())
+        if hashes:
+            # Concurrent workers start from different accounts, instead of
+            # all competing for the first free one
+            start = random.randrange(len(hashes))
+            for _hash in hashes[start:] + hashes[:start]:
+                if self._leases.acquire(_hash, self.holder):
+                    return _hash
+        names = [name for name in map(self._leases.holder, hashes) if name]
         msg = ('Insufficient number of users provided. %s have allocated all '
                'the credentials for this allocation request' % ','.join(names))
         raise lib_exc.InvalidCredentials(msg)
 
     def _get_match_hash_list(self, roles=None):
-        hashes = []
-        if roles:
-            # Loop over all the creds for each role in the subdict and generate
-            # a list of cred lists for each role
-            for role in roles:
-                temp_hashes = self.hash_dict['roles'].get(role, None)
-                if not temp_hashes:
+        key = frozenset(roles or [])
+        if key not in self._matches:
+            mask = self._all_mask
+            # Find the creds which fall under all the specified roles
+            for role in key:
+                role_mask = self._role_masks.get(role)
+                if not role_mask:
                     raise lib_exc.InvalidCredentials(
                         "No credentials with role: %s specified in the "
                         "accounts ""file" % role)
-                hashes.append(temp_hashes)
-            # Take the list of lists and do a boolean and between each list to
-            # find the creds which fall under all the specified roles
-            temp_list = set(hashes[0])
-            for hash_list in hashes[1:]:
-                temp_list = temp_list & set(hash_list)
-            hashes = temp_list
-        else:
-            hashes = self.hash_dict['creds'].keys()
-        # NOTE(mtreinish): admin is a special case because of the increased
-        # privlege set which could potentially cause issues on tests where that
-        # is not expected. So unless the admin role isn't specified do not
-        # allocate admin.
-        admin_hashes = self.hash_dict['roles'].get(self.admin_role,
-                                                   None)
-        if ((not roles or self.admin_role not in roles) and
-                admin_hashes):
-            useable_hashes = [x for x in hashes if x not in admin_hashes]
-        else:
-            useable_hashes = hashes
-        return useable_hashes
+                mask &= role_mask
+            # NOTE(mtreinish): admin is a special case because of the
+            # increased privlege set which could potentially cause issues on
+            # tests where that is not expected. So unless the admin role isn't
+            # specified do not allocate admin.
+            if self.admin_role not in key:
+                mask &= ~self._role_masks.get(self.admin_role, 0)
+            self._matches[key] = [_hash for i, _hash in enumerate(self._hashes)
+                                  if mask >> i & 1]
+        return list(self._matches[key])
 
     def _sanitize_creds(self, creds):
         temp_creds = creds.copy()
@@ -247,16 +427,10 @@ class PreProvisionedCredentialProvider(cred_provider.CredentialProvider):
         LOG.info('%s allocated creds:\n%s' % (self.name, clean_creds))
         return self._wrap_creds_with_network(free_hash)
 
-    @lockutils.synchronized('test_accounts_io', external=True)
     def remove_hash(self, hash_string):
-        hash_path = os.path.join(self.accounts_dir, hash_string)
-        if not os.path.isfile(hash_path):
-            LOG.warning('Expected an account lock file %s to remove, but '
-                        'one did not exist' % hash_path)
-        else:
-            os.remove(hash_path)
-            if not os.listdir(self.accounts_dir):
-                os.rmdir(self.accounts_dir)
+        if not self._leases.release(hash_string, self.holder):
+            LOG.warning('Expected a lease of account %s to remove, but '
+                        'one did not exist' % hash_string)
 
     def get_hash(self, creds):
         for _hash in self.hash_dict['creds']:
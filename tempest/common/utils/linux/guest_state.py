@@ -0,0 +1,98 @@
+# Copyright 2016 Cloudbase Solutions Srl
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+SECTION_MARKER = '@@tempest-section '
+
+# Every source is printed after a marker line naming it, so a single
+# command collects them all. A failing source, e.g. a missing lsblk, only
+# leaves its section empty.
+SOURCES = (
+    ('meminfo', 'cat /proc/meminfo'),
+    ('cpuinfo', 'cat /proc/cpuinfo'),
+    ('partitions', 'cat /proc/partitions'),
+    ('lsblk', 'lsblk -b -d -n -o NAME,SIZE,TYPE'),
+    ('modules', 'cat /proc/modules'),
+    ('kernel', 'uname -r'),
+)
+
+COMMAND = '; '.join("echo '%s%s'; %s 2>/dev/null || true" % (
+    SECTION_MARKER, name, command) for name, command in SOURCES)
+
+
+def _split_sections(output):
+    sections = dict((name, []) for name, _ in SOURCES)
+    lines = None
+    for line in output.splitlines():
+        if line.startswith(SECTION_MARKER):
+            lines = sections.setdefault(line[len(SECTION_MARKER):].strip(),
+                                        [])
+        elif lines is not None:
+            lines.append(line)
+    return sections
+
+
+class GuestState(object):
+    """Memory, CPU, disk, module and kernel state of a guest at one time.
+
+    Built from the output of COMMAND, which is parsed once so that the
+    fields cost nothing to read.
+
+    :ivar meminfo: dict of the /proc/meminfo values, in kB.
+    :ivar cpu_count: number of processors in /proc/cpuinfo.
+    :ivar partitions: dict of the /proc/partitions sizes, in 1 kB blocks.
+    :ivar disks: dict of the lsblk disk sizes, in bytes.
+    :ivar modules: frozenset of the loaded kernel modules.
+    :ivar kernel_version: output of uname -r.
+    """
+
+    def __init__(self, output):
+        sections = _split_sections(output)
+
+        self.meminfo = {}
+        for line in sections['meminfo']:
+            key, _, value = line.partition(':')
+            if value.split():
+                self.meminfo[key.strip()] = int(value.split()[0])
+
+        self.cpu_count = sum(1 for line in sections['cpuinfo']
+                             if line.split(':')[0].strip() == 'processor')
+
+        self.partitions = {}
+        for line in sections['partitions']:
+            fields = line.split()
+            if len(fields) == 4 and fields[2].isdigit():
+                self.partitions[fields[3]] = int(fields[2])
+
+        self.disks = {}
+        for line in sections['lsblk']:
+            fields = line.split()
+            if len(fields) == 3 and fields[2] == 'disk':
+                self.disks[fields[0]] = int(fields[1])
+
+        self.modules = frozenset(line.split()[0]
+                                 for line in sections['modules']
+                                 if line.strip())
+        self.kernel_version = '\n'.join(sections['kernel']).strip()
+
+    def memory(self, key='MemTotal'):
+        """A /proc/meminfo value in kB, like RemoteClient.memory_check."""
+        return self.meminfo[key]
+
+    def disk_count(self, prefix='sd'):
+        """Number of disks named with a prefix, e.g. SCSI and IDE disks."""
+        return sum(1 for name in self.disks if name.startswith(prefix))
+
+    def has_module(self, module):
+        return module in self.modules
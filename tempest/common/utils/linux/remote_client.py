@@ -19,6 +19,8 @@ import time
 
 from oslo_log import log as logging
 
+from tempest.common.utils.linux import guest_state
+from tempest.common.utils.linux import script_cache
 from tempest import config
 from tempest import exceptions
 from tempest.lib.common import ssh
@@ -57,6 +59,13 @@ class RemoteClientBase():
         LOG.debug("Remote command: %s" % cmd)
         return self.ssh_client.exec_command(cmd, ignore_exit_status)
 
+    def exec_command_stream(self, cmd, stdout_callback=None,
+                            stderr_callback=None, ignore_exit_status=False):
+        cmd = CONF.validation.ssh_shell_prologue + " " + cmd
+        LOG.debug("Remote command: %s" % cmd)
+        return self.ssh_client.exec_command_stream(
+            cmd, stdout_callback, stderr_callback, ignore_exit_status)
+
     def copy_over(self, source, destination):
         output = self.ssh_client.sftp(source, destination)
         return output
@@ -68,16 +77,49 @@ class RemoteClientBase():
         """
         self.ssh_client.test_connection_auth()
 
-    def execute_script(self, cmd, cmd_params, source, destination):
-        try:
-            self.copy_over(source, destination)
-            cmd_args = ' '.join(str(x) for x in cmd_params)
-            command = ("cd %(dest)s; chmod +x %(cmd)s; sed -i 's/\r//' %(cmd)s; "
-                       'sudo ./%(cmd)s %(cmd_args)s') % {
-                'dest': destination,
-                'cmd': cmd,
-                'cmd_args': cmd_args}
+    def close(self):
+        """Close the ssh connection shared by the clients of this server."""
+        self.ssh_client.close()
+
+    def deploy_scripts(self, bundle):
+        """Ship a script bundle to the server unless it is already there"""
+        if self.exec_command(bundle.check_command()).strip() == 'present':
+            return False
+        tarball = bundle.new_remote_tarball()
+        self.ssh_client.put_data(bundle.data, tarball)
+        self.exec_command(bundle.extract_command(tarball))
+        LOG.info('Deployed scripts of %s to %s',
+                 bundle.directory, bundle.remote_dir)
+        return True
+
+    def _run_script(self, command, output_file):
+        if output_file is None:
             return self.exec_command(command)
+        with open(output_file, 'ab') as output:
+            self.exec_command_stream(command, output.write, output.write)
+
+    def execute_script(self, cmd, cmd_params, source, destination,
+                       output_file=None):
+        """Run a script on the server from its deployed script bundle
+
+        All the scripts next to source are shipped together, once per
+        server, and cached there by content hash. The script runs with
+        destination as working directory.
+
+        When output_file is given the script output (stdout and stderr) is
+        appended to that local file as it arrives instead of being kept in
+        memory and returned.
+        """
+        try:
+            bundle = script_cache.get_bundle(os.path.dirname(source))
+            command = bundle.run_command(cmd, cmd_params, destination)
+            try:
+                return self._run_script(command, output_file)
+            except tempest.lib.exceptions.SSHExecCommandFailed:
+                # Only a fresh (or reverted) server misses the bundle
+                if not self.deploy_scripts(bundle):
+                    raise
+            return self._run_script(command, output_file)
 
         except tempest.lib.exceptions.SSHExecCommandFailed as exc:
             LOG.exception(exc)
@@ -392,6 +434,17 @@ class RemoteClient(RemoteClientBase):
         memory = self.exec_command(cmd)
         return long(memory)
 
+    def snapshot_state(self):
+        """Collect the guest memory, CPU, disk and module state at once
+
+        /proc/meminfo, /proc/cpuinfo, /proc/partitions, lsblk, the loaded
+        modules and the kernel version are read by a single command, so
+        tests checking several of them pay one round trip.
+        :returns: a guest_state.GuestState
+        """
+        return guest_state.GuestState(
+            self.exec_command(guest_state.COMMAND))
+
 
 class FedoraUtils(RemoteClient):
 
@@ -0,0 +1,130 @@
+# Copyright 2016 Cloudbase Solutions Srl
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import hashlib
+import io
+import os
+import tarfile
+import threading
+import uuid
+
+# Guest directory holding one extracted bundle per content hash. It lives
+# outside of /tmp so the cache survives guest reboots.
+REMOTE_CACHE_DIR = '/var/tmp/tempest-scripts'
+COMPLETE_MARKER = '.complete'
+
+IGNORED_EXTENSIONS = ('.py', '.pyc', '.pyo')
+
+
+class ScriptBundle(object):
+    """The scripts of a local directory packed as a single tarball.
+
+    Line endings of text files are normalized before packing and the
+    bundle is identified by the SHA-256 of its content, so a guest only
+    needs it shipped once no matter how many scripts are run from it.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.files = self._read_files()
+        self.digest = self._digest()
+        self.data = self._pack()
+        self.remote_dir = '%s/%s' % (REMOTE_CACHE_DIR, self.digest)
+
+    def _read_files(self):
+        files = []
+        for name in sorted(os.listdir(self.directory)):
+            path = os.path.join(self.directory, name)
+            if (name.startswith('.') or not os.path.isfile(path) or
+                    name.endswith(IGNORED_EXTENSIONS)):
+                continue
+            with open(path, 'rb') as script:
+                content = script.read()
+            if b'\0' not in content:
+                content = content.replace(b'\r', b'')
+            files.append((name, content))
+        return files
+
+    def _digest(self):
+        sha = hashlib.sha256()
+        for name, content in self.files:
+            sha.update(name.encode('utf-8') + b'\0')
+            sha.update(str(len(content)).encode('ascii') + b'\0')
+            sha.update(content)
+        return sha.hexdigest()
+
+    def _pack(self):
+        buf = io.BytesIO()
+        tar = tarfile.open(fileobj=buf, mode='w:gz')
+        try:
+            for name, content in self.files:
+                info = tarfile.TarInfo(name)
+                info.size = len(content)
+                info.mode = 0o755
+                tar.addfile(info, io.BytesIO(content))
+        finally:
+            tar.close()
+        return buf.getvalue()
+
+    @property
+    def marker(self):
+        return '%s/%s' % (self.remote_dir, COMPLETE_MARKER)
+
+    def run_command(self, script_name, cmd_params, cwd):
+        """Shell command running a script from the guest cache.
+
+        The script runs from ``cwd`` as it used to when it was copied
+        there. The command fails without running anything when the bundle
+        is not on the guest.
+        """
+        cmd_args = ' '.join(str(x) for x in cmd_params)
+        return ('if [ ! -f %(marker)s ]; then exit 1; fi; cd %(cwd)s; '
+                'sudo %(dir)s/%(script)s %(args)s') % {
+            'marker': self.marker,
+            'cwd': cwd,
+            'dir': self.remote_dir,
+            'script': script_name,
+            'args': cmd_args}
+
+    def check_command(self):
+        """Shell command printing 'present' if the guest has the bundle."""
+        return 'if [ -f %s ]; then echo present; fi' % self.marker
+
+    def new_remote_tarball(self):
+        # Unique per upload so concurrent deployments do not clash
+        return '%s-%s.%s.tar.gz' % (REMOTE_CACHE_DIR, self.digest,
+                                    uuid.uuid4().hex)
+
+    def extract_command(self, tarball):
+        return ('mkdir -p %(dir)s && tar -xzf %(tarball)s -C %(dir)s && '
+                'rm -f %(tarball)s && touch %(marker)s') % {
+            'dir': self.remote_dir,
+            'tarball': tarball,
+            'marker': self.marker}
+
+
+_bundles = {}
+_bundles_lock = threading.Lock()
+
+
+def get_bundle(directory):
+    """Return the process wide bundle of a local script directory."""
+    directory = os.path.realpath(directory)
+    with _bundles_lock:
+        bundle = _bundles.get(directory)
+        if bundle is None:
+            bundle = ScriptBundle(directory)
+            _bundles[directory] = bundle
+        return bundle
@@ -0,0 +1,66 @@
+# Copyright 2016 Cloudbase Solutions Srl
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import sys
+import threading
+
+from oslo_log import log as logging
+import six
+
+LOG = logging.getLogger(__name__)
+
+
+def run_parallel(func, items, max_workers=None):
+    """Call func on every item from its own thread.
+
+    All the calls are waited for, even when some of them fail, so that
+    nothing keeps running behind the caller's back.
+
+    :param func: callable taking a single item.
+    :param items: iterable of items.
+    :param max_workers: maximum number of concurrent calls, all the items
+                        run at once by default.
+    :returns: list of the results, in the order of the items.
+    :raises: the exception of the first failed item, once all are done.
+    """
+    items = list(items)
+    results = [None] * len(items)
+    errors = [None] * len(items)
+    semaphore = threading.Semaphore(max_workers or len(items) or 1)
+
+    def worker(index, item):
+        try:
+            results[index] = func(item)
+        except Exception:
+            errors[index] = sys.exc_info()
+            LOG.debug('Parallel call of %s on %s failed', func, item,
+                      exc_info=True)
+        finally:
+            semaphore.release()
+
+    threads = []
+    for index, item in enumerate(items):
+        semaphore.acquire()
+        thread = threading.Thread(target=worker, args=(index, item))
+        thread.daemon = True
+        thread.start()
+        threads.append(thread)
+    for thread in threads:
+        thread.join()
+
+    for error in errors:
+        if error is not None:
+            six.reraise(*error)
+    return results
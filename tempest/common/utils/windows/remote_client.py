@@ -17,9 +17,12 @@
 
 
 from oslo_log import log
-from winrm import protocol
 
+from tempest.common.utils.windows import runspace
+from tempest.common.utils.windows import shell_pool
+from tempest import config
 
+CONF = config.CONF
 LOG = log.getLogger(__name__)
 SUCCESS_RETURN_CODE = 0
 
@@ -31,25 +34,15 @@ class WinRemoteClient(object):
         self.hostname = 'https://' + hostname + ':5986/wsman'
         self.username = username
         self.password = password
+        self.shell_pool = shell_pool.get_shell_pool(
+            self.hostname, username, password,
+            max_idle=CONF.host_credentials.winrm_shell_pool_size,
+            idle_timeout=CONF.host_credentials.winrm_shell_idle_timeout,
+            check_interval=CONF.host_credentials.winrm_shell_check_interval)
 
     def run_wsman_cmd(self, cmd):
-        protocol.Protocol.DEFAULT_TIMEOUT = "PT3600S"
         try:
-            p = protocol.Protocol(endpoint=self.hostname,
-                                  transport='plaintext',
-                                  username=self.username,
-                                  password=self.password)
-
-            shell_id = p.open_shell()
-
-            command_id = p.run_command(shell_id, cmd)
-            std_out, std_err, status_code = p.get_command_output(
-                shell_id, command_id)
-
-            p.cleanup_command(shell_id, command_id)
-            p.close_shell(shell_id)
-
-            return (std_out, std_err, status_code)
+            return self.shell_pool.run_cmd(cmd)
 
         except Exception as exc:
             LOG.exception(exc)
@@ -93,3 +86,22 @@ class WinRemoteClient(object):
         LOG.info('Command %(cmd)s result: %(output)s',
                  {'cmd': full_cmd, 'output': s_out})
         return s_out
+
+    def run_powershell_batch(self, commands):
+        """Run PowerShell commands on the host's resident runspace
+
+        All the commands are sent in one round trip and no new PowerShell
+        process is started.
+        :returns: list with the deserialized output of each command
+        """
+        return runspace.get_runspace(self.shell_pool).execute_batch(commands)
+
+    def get_powershell_cmd_attributes(self, cmd, attributes, **kvargs):
+        """Read several attributes of a cmdlet's output at once
+
+        :returns: dict mapping each attribute to its value
+        """
+        kv_args = " ".join(["-%s %s" % (k, v) for k, v in kvargs.iteritems()])
+        full_cmd = "%s %s | Select-Object %s" % (cmd, kv_args,
+                                                 ",".join(attributes))
+        return self.run_powershell_batch([full_cmd])[0]
@@ -0,0 +1,228 @@
+# Copyright 2016 Cloudbase Solutions Srl
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import atexit
+import base64
+import itertools
+import threading
+
+from oslo_log import log
+from oslo_serialization import jsonutils as json
+
+from tempest.common.utils.windows import shell_pool
+from tempest import exceptions
+
+
+LOG = log.getLogger(__name__)
+
+RESPONSE_MARKER = '#RUNSPACE#'
+
+# Line oriented JSON REPL kept resident on the host. Every request line is
+# {"id": n, "commands": [...]} and gets exactly one response line
+# {"id": n, "results": [{"ok": true, "value": ...}, ...]} prefixed with
+# RESPONSE_MARKER, so stray console output (e.g. Write-Host) is ignored.
+# Every command runs in a child scope, its variables can not clobber the
+# ones of the loop nor leak into the next commands.
+REPL_SCRIPT = r"""
+$ErrorActionPreference = 'Stop'
+$ProgressPreference = 'SilentlyContinue'
+function Send-Response($response) {
+    $json = ConvertTo-Json -InputObject $response -Compress -Depth 5
+    [Console]::Out.WriteLine('%(marker)s' + $json)
+    [Console]::Out.Flush()
+}
+Send-Response @{id = 0; results = @()}
+while ($true) {
+    $line = [Console]::In.ReadLine()
+    if ($line -eq $null) { break }
+    if (-not $line.Trim()) { continue }
+    $request = ConvertFrom-Json $line
+    $results = @()
+    foreach ($command in $request.commands) {
+        try {
+            $value = @(& ([scriptblock]::Create($command)))
+            if ($value.Count -eq 0) { $value = $null }
+            elseif ($value.Count -eq 1) { $value = $value[0] }
+            $results += @{ok = $true; value = $value}
+        } catch {
+            $results += @{ok = $false; error = $_.Exception.Message}
+        }
+    }
+    Send-Response @{id = $request.id; results = $results}
+}
+""" % {'marker': RESPONSE_MARKER}
+
+
+def _encode_script(script):
+    return base64.b64encode(script.encode('utf-16-le')).decode('ascii')
+
+
+class PowerShellRunspace(object):
+    """A PowerShell process kept running on a pooled WinRM shell.
+
+    Commands are sent over stdin and their results are read back as JSON,
+    so a batch of cmdlets costs a single round trip and no PowerShell
+    startup.
+    """
+
+    def __init__(self, pool):
+        self.pool = pool
+        self._lock = threading.Lock()
+        self._shell = None
+        self._command_id = None
+        self._buffer = ''
+        self._request_ids = itertools.count(1)
+
+    def _start(self):
+        cmd = ('powershell -NoLogo -NoProfile -NonInteractive '
+               '-EncodedCommand %s' % _encode_script(REPL_SCRIPT))
+        shell = self.pool.acquire()
+        try:
+            command_id = shell.start_command(cmd)
+        except shell_pool.CONNECTION_ERRORS as exc:
+            LOG.warning("WinRM shell on %s is no longer usable (%s), "
+                        "reconnecting", self.pool.endpoint, exc)
+            shell.close()
+            shell = self.pool.acquire()
+            command_id = shell.start_command(cmd)
+        self._shell = shell
+        self._command_id = command_id
+        self._buffer = ''
+        self._read_response()
+        LOG.debug("Started PowerShell runspace on %s", self.pool.endpoint)
+
+    def _discard(self):
+        if self._shell is not None:
+            self._shell.close()
+        self._shell = None
+        self._command_id = None
+
+    def _read_response(self):
+        while True:
+            while '\n' in self._buffer:
+                line, self._buffer = self._buffer.split('\n', 1)
+                line = line.strip()
+                if line.startswith(RESPONSE_MARKER):
+                    return json.loads(line[len(RESPONSE_MARKER):])
+            std_out, std_err, status_code, done = self._shell.receive(
+                self._command_id)
+            self._buffer += std_out
+            if done:
+                raise exceptions.PowerShellRunspaceError(
+                    host=self.pool.endpoint,
+                    reason='process exited with code %s: %s' % (
+                        status_code, std_err))
+
+    def _send(self, request):
+        """Send a request, on a fresh runspace if the connection dropped
+
+        No command ran before the request is sent, so a connection error
+        while starting the runspace or sending it is retried once.
+        """
+        for attempt in range(2):
+            try:
+                if self._shell is None:
+                    self._start()
+                self._shell.send_input(self._command_id, request + '\r\n')
+                return
+            except shell_pool.CONNECTION_ERRORS as exc:
+                self._discard()
+                if attempt:
+                    raise
+                LOG.warning("PowerShell runspace on %s is no longer usable "
+                            "(%s), restarting it", self.pool.endpoint, exc)
+            except Exception:
+                self._discard()
+                raise
+
+    def execute_batch(self, commands):
+        """Run several PowerShell commands in a single round trip.
+
+        :param commands: list of PowerShell command strings.
+        :returns: list with the deserialized output of each command.
+        :raises: PowerShellCommandFailed for the first failed command.
+        """
+        commands = list(commands)
+        with self._lock:
+            request_id = next(self._request_ids)
+            request = json.dumps({'id': request_id, 'commands': commands})
+            self._send(request)
+            try:
+                response = self._read_response()
+            except Exception:
+                self._discard()
+                raise
+        if response.get('id') != request_id:
+            raise exceptions.PowerShellRunspaceError(
+                host=self.pool.endpoint,
+                reason='unexpected response %s' % response)
+
+        values = []
+        for command, result in zip(commands, response['results']):
+            if not result['ok']:
+                raise exceptions.PowerShellCommandFailed(
+                    command=command, error=result['error'])
+            values.append(result['value'])
+        LOG.info('PowerShell batch %(cmds)s result: %(values)s',
+                 {'cmds': commands, 'values': values})
+        return values
+
+    def execute(self, command):
+        return self.execute_batch([command])[0]
+
+    def close(self):
+        with self._lock:
+            if self._shell is None:
+                return
+            shell = self._shell
+            try:
+                shell.send_input(self._command_id, '', end=True)
+                done = False
+                while not done:
+                    _, _, _, done = shell.receive(self._command_id)
+                shell.cleanup_command(self._command_id)
+            except Exception as exc:
+                LOG.debug("Failed to stop PowerShell runspace on %s: %s",
+                          self.pool.endpoint, exc)
+                self._discard()
+                return
+            self._shell = None
+            self._command_id = None
+        self.pool.release(shell)
+
+
+_runspaces = {}
+_runspaces_lock = threading.Lock()
+
+
+def get_runspace(pool):
+    """Return the process wide runspace bound to a shell pool."""
+    with _runspaces_lock:
+        runspace = _runspaces.get(pool)
+        if runspace is None:
+            runspace = PowerShellRunspace(pool)
+            _runspaces[pool] = runspace
+        return runspace
+
+
+def close_all_runspaces():
+    with _runspaces_lock:
+        runspaces = list(_runspaces.values())
+        _runspaces.clear()
+    for runspace in runspaces:
+        runspace.close()
+
+
+atexit.register(close_all_runspaces)
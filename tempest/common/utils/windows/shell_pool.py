@@ -0,0 +1,235 @@
+# Copyright 2016 Cloudbase Solutions Srl
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import atexit
+import base64
+import collections
+import socket
+import threading
+import time
+
+from oslo_log import log
+from winrm import exceptions as winrm_exc
+from winrm import protocol
+import xmltodict
+
+
+LOG = log.getLogger(__name__)
+
+OPERATION_TIMEOUT = "PT3600S"
+HEALTH_CHECK_CMD = 'echo ok'
+SHELL_RESOURCE_URI = ('http://schemas.microsoft.com/wbem/wsman/1/windows/'
+                      'shell/cmd')
+SEND_ACTION = 'http://schemas.microsoft.com/wbem/wsman/1/windows/shell/Send'
+
+# Errors meaning the shell (or the connection to the host) is unusable.
+CONNECTION_ERRORS = (winrm_exc.WinRMTransportError,
+                     winrm_exc.WinRMWebServiceError,
+                     socket.error,
+                     IOError)
+
+
+class WinRMShell(object):
+    """A WinRM cmd shell kept open across several commands."""
+
+    def __init__(self, endpoint, username, password):
+        protocol.Protocol.DEFAULT_TIMEOUT = OPERATION_TIMEOUT
+        self.protocol = protocol.Protocol(endpoint=endpoint,
+                                          transport='plaintext',
+                                          username=username,
+                                          password=password)
+        self.shell_id = self.protocol.open_shell()
+        self.closed = False
+        self.last_used = time.time()
+
+    def start_command(self, cmd):
+        return self.protocol.run_command(self.shell_id, cmd)
+
+    def get_command_output(self, command_id):
+        std_out, std_err, status_code = self.protocol.get_command_output(
+            self.shell_id, command_id)
+        self.protocol.cleanup_command(self.shell_id, command_id)
+        self.last_used = time.time()
+        return std_out, std_err, status_code
+
+    def run(self, cmd):
+        return self.get_command_output(self.start_command(cmd))
+
+    def send_input(self, command_id, data, end=False):
+        """Write data to the stdin of a running command."""
+        rq = {'env:Envelope': self.protocol._get_soap_header(
+            resource_uri=SHELL_RESOURCE_URI,
+            action=SEND_ACTION,
+            shell_id=self.shell_id)}
+        stream = rq['env:Envelope'].setdefault(
+            'env:Body', {}).setdefault('rsp:Send', {}).setdefault(
+            'rsp:Stream', {})
+        stream['@Name'] = 'stdin'
+        stream['@CommandId'] = command_id
+        stream['#text'] = base64.b64encode(data)
+        if end:
+            stream['@End'] = 'true'
+        self.protocol.send_message(xmltodict.unparse(rq))
+        self.last_used = time.time()
+
+    def receive(self, command_id):
+        """Read the output produced so far by a running command.
+
+        :returns: (stdout, stderr, status_code, done) tuple.
+        """
+        result = self.protocol._raw_get_command_output(self.shell_id,
+                                                       command_id)
+        self.last_used = time.time()
+        return result
+
+    def cleanup_command(self, command_id):
+        self.protocol.cleanup_command(self.shell_id, command_id)
+
+    def is_alive(self):
+        try:
+            _, _, status_code = self.run(HEALTH_CHECK_CMD)
+        except Exception as exc:
+            LOG.debug("WinRM shell %s failed its health check: %s",
+                      self.shell_id, exc)
+            return False
+        return status_code == 0
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self.protocol.close_shell(self.shell_id)
+        except Exception as exc:
+            LOG.debug("Failed to close WinRM shell %s: %s",
+                      self.shell_id, exc)
+
+
+class WinRMShellPool(object):
+    """Pool of open WinRM shells for one host endpoint and user.
+
+    Idle shells are reused in LIFO order so the most recently used (and
+    most likely alive) shell is picked first. A shell idle for longer than
+    ``check_interval`` is health checked before reuse, and shells idle for
+    longer than ``idle_timeout`` are closed.
+    """
+
+    def __init__(self, endpoint, username, password, max_idle=4,
+                 idle_timeout=120, check_interval=30):
+        self.endpoint = endpoint
+        self.username = username
+        self.password = password
+        self.max_idle = max_idle
+        self.idle_timeout = idle_timeout
+        self.check_interval = check_interval
+        self._idle = collections.deque()
+        self._lock = threading.Lock()
+
+    def _open_shell(self):
+        LOG.debug("Opening WinRM shell on %s as %s",
+                  self.endpoint, self.username)
+        return WinRMShell(self.endpoint, self.username, self.password)
+
+    def _pop_expired(self, now):
+        expired = [s for s in self._idle
+                   if now - s.last_used > self.idle_timeout]
+        for shell in expired:
+            self._idle.remove(shell)
+        return expired
+
+    def acquire(self):
+        now = time.time()
+        with self._lock:
+            expired = self._pop_expired(now)
+            shell = self._idle.pop() if self._idle else None
+        for old_shell in expired:
+            old_shell.close()
+
+        if (shell is not None and
+                now - shell.last_used > self.check_interval and
+                not shell.is_alive()):
+            shell.close()
+            shell = None
+        if shell is None:
+            shell = self._open_shell()
+        return shell
+
+    def release(self, shell):
+        if shell.closed:
+            return
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(shell)
+                return
+        shell.close()
+
+    def run_cmd(self, cmd):
+        """Run a command on a pooled shell.
+
+        :returns: (stdout, stderr, status_code) tuple.
+        """
+        shell = self.acquire()
+        try:
+            try:
+                command_id = shell.start_command(cmd)
+            except CONNECTION_ERRORS as exc:
+                # The command never reached the host, so it is safe to
+                # replay it on a freshly opened shell.
+                LOG.warning("WinRM shell on %s is no longer usable (%s), "
+                            "reconnecting", self.endpoint, exc)
+                shell.close()
+                shell = self._open_shell()
+                command_id = shell.start_command(cmd)
+            result = shell.get_command_output(command_id)
+        except Exception:
+            shell.close()
+            raise
+        self.release(shell)
+        return result
+
+    def close(self):
+        with self._lock:
+            shells = list(self._idle)
+            self._idle.clear()
+        for shell in shells:
+            shell.close()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_shell_pool(endpoint, username, password, **kwargs):
+    """Return the process wide shell pool for an endpoint and user."""
+    key = (endpoint, username)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None or pool.password != password:
+            if pool is not None:
+                pool.close()
+            pool = WinRMShellPool(endpoint, username, password, **kwargs)
+            _pools[key] = pool
+        return pool
+
+
+def close_all_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+atexit.register(close_all_pools)
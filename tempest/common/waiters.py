@@ -11,23 +11,236 @@
 #    under the License.
 
 
+import calendar
+import collections
+import datetime
+from email import utils as email_utils
+import threading
 import time
+import weakref
 
 from oslo_log import log as logging
+from six.moves.urllib import parse as urlparse
 
 from tempest import config
 from tempest import exceptions
 from tempest.lib.common.utils import misc as misc_utils
+from tempest.lib.common.utils import polling
 from tempest.lib import exceptions as lib_exc
 
 CONF = config.CONF
 LOG = logging.getLogger(__name__)
 
 
+# Servers listed with changes-since are filtered on their updated_at time
+# as seen by nova. The cursor is taken from nova's clock, allow for the one
+# second resolution of the Date header and for in-flight updates.
+CHANGES_SINCE_SLACK = 60
+
+
+def _nova_time(updated):
+    """Seconds since the epoch of a nova timestamp, or None."""
+    try:
+        return calendar.timegm(datetime.datetime.strptime(
+            updated[:19], '%Y-%m-%dT%H:%M:%S').timetuple())
+    except (TypeError, ValueError):
+        return None
+
+
+def _response_time(body):
+    """Seconds since the epoch of the Date header of a response, or None."""
+    date = getattr(body, 'response', {}).get('date')
+    parsed = date and email_utils.parsedate_tz(date)
+    if not parsed:
+        return None
+    return email_utils.mktime_tz(parsed)
+
+
+class ServerStatusWatcher(object):
+    """Tracks the status of many servers with a single polling loop.
+
+    Every waiter asks for the status of its server as of some time, and
+    one of them polls nova with a detailed list_servers call restricted by
+    changes-since, following its pages; the result is dispatched to all the
+    waiters. Servers the listing does not show, e.g. those of another
+    tenant waited for with an admin client, are fetched with show_server
+    instead. Polls are
+    never closer than min_interval, so concurrent waits cost about one API
+    call per interval instead of one call per server.
+    """
+
+    def __init__(self, client, min_interval=None):
+        self.client = client
+        if min_interval is None:
+            min_interval = (client.build_interval *
+                            polling.INITIAL_FRACTION)
+        self.min_interval = min_interval
+        self._cond = threading.Condition()
+        self._bodies = {}
+        self._watched = collections.Counter()
+        # Watched servers seen in a listing, hence visible to the client
+        self._listed = set()
+        # changes-since cursor, in nova's clock so that a skewed local clock
+        # does not hide changes
+        self._since = None
+        self._polling = False
+        self._last_poll = 0
+
+    def watch(self, server_id, body):
+        """Start tracking a server from its current body."""
+        with self._cond:
+            if not self._watched:
+                # Nothing changed since this fresh body was fetched
+                self._last_poll = time.time()
+                self._since = None
+            updated = _nova_time(body.get('updated'))
+            if updated is not None and (self._since is None or
+                                        updated < self._since):
+                self._since = updated
+            self._watched[server_id] += 1
+            self._bodies[server_id] = body
+
+    def unwatch(self, server_id):
+        with self._cond:
+            self._watched[server_id] -= 1
+            if self._watched[server_id] <= 0:
+                del self._watched[server_id]
+                self._bodies.pop(server_id, None)
+                self._listed.discard(server_id)
+
+    def wait_for_poll(self, not_before=None):
+        """Block until a poll started no earlier than not_before is done.
+
+        The poll is run by the calling thread when it is due and nobody
+        else is running one.
+        """
+        if not_before is None:
+            not_before = time.time()
+        with self._cond:
+            while self._last_poll < not_before:
+                now = time.time()
+                due = max(not_before, self._last_poll + self.min_interval)
+                if not self._polling and now >= due:
+                    self._polling = True
+                    break
+                if self._polling:
+                    self._cond.wait()
+                else:
+                    self._cond.wait(due - now)
+            else:
+                return
+        start = time.time()
+        try:
+            self._poll()
+        finally:
+            with self._cond:
+                self._polling = False
+                self._last_poll = max(self._last_poll, start)
+                self._cond.notify_all()
+
+    def body(self, server_id):
+        """Return the last known body of a watched server.
+
+        :raises: NotFound if the server got deleted.
+        """
+        with self._cond:
+            body = self._bodies[server_id]
+        if body['status'] == 'DELETED':
+            raise lib_exc.NotFound('Server %s was deleted' % server_id)
+        return body
+
+    def next_body(self, server_id, not_before=None):
+        """Return the server body as of a poll after not_before."""
+        self.wait_for_poll(not_before)
+        return self.body(server_id)
+
+    def _list_changes(self):
+        """List the servers changed since the cursor, following pages.
+
+        :returns: the servers, and the next cursor: the Date of the first
+                  page, or else the newest update listed, None when nova
+                  gave no time.
+        """
+        with self._cond:
+            since = self._since
+        if since is None:
+            since = self._last_poll
+        params = {'detail': True,
+                  'changes-since': datetime.datetime.utcfromtimestamp(
+                      since - CHANGES_SINCE_SLACK).strftime(
+                          '%Y-%m-%dT%H:%M:%SZ')}
+        servers = []
+        next_since = None
+        while True:
+            body = self.client.list_servers(**params)
+            if next_since is None:
+                next_since = _response_time(body)
+            servers.extend(body['servers'])
+            marker = None
+            for link in body.get('servers_links', []):
+                if link.get('rel') == 'next':
+                    query = urlparse.urlparse(link['href']).query
+                    marker = urlparse.parse_qs(query).get('marker', [None])[0]
+            if not marker:
+                break
+            params['marker'] = marker
+        if next_since is None:
+            updates = [_nova_time(server.get('updated'))
+                       for server in servers]
+            updates = [updated for updated in updates if updated is not None]
+            next_since = max(updates) if updates else None
+        return servers, next_since
+
+    def _show(self, server_id):
+        try:
+            return self.client.show_server(server_id)['server']
+        except lib_exc.NotFound:
+            return dict(self._bodies.get(server_id, {'id': server_id}),
+                        status='DELETED')
+
+    def _poll(self):
+        servers, since = self._list_changes()
+        with self._cond:
+            if since is not None and (self._since is None or
+                                      since > self._since):
+                self._since = since
+            for body in servers:
+                if body['id'] in self._watched:
+                    self._bodies[body['id']] = body
+                    self._listed.add(body['id'])
+            # The listing is scoped to the tenant of the client, the
+            # servers of other tenants, e.g. waited for by an admin, are
+            # fetched one by one until they show up in it.
+            unlisted = [server_id for server_id in self._watched
+                        if server_id not in self._listed]
+        for server_id in unlisted:
+            body = self._show(server_id)
+            with self._cond:
+                if server_id in self._watched:
+                    self._bodies[server_id] = body
+
+
+_watchers = weakref.WeakKeyDictionary()
+_watchers_lock = threading.Lock()
+
+
+def get_server_watcher(client):
+    """Return the watcher shared by every waiter using a servers client."""
+    with _watchers_lock:
+        watcher = _watchers.get(client)
+        if watcher is None:
+            watcher = ServerStatusWatcher(client)
+            _watchers[client] = watcher
+        return watcher
+
+
 # NOTE(afazekas): This function needs to know a token and a subject.
 def wait_for_server_status(client, server_id, status, ready_wait=True,
                            extra_timeout=0, raise_on_error=True):
-    """Waits for a server to reach a given status."""
+    """Waits for a server to reach a given status.
+
+    :returns: the last server body.
+    """
 
     def _get_task_state(body):
         return body.get('OS-EXT-STS:task_state', None)
@@ -39,71 +252,145 @@ def wait_for_server_status(client, server_id, status, ready_wait=True,
     old_task_state = task_state = _get_task_state(body)
     start_time = int(time.time())
     timeout = client.build_timeout + extra_timeout
-    while True:
-        # NOTE(afazekas): Now the BUILD status only reached
-        # between the UNKNOWN->ACTIVE transition.
-        # TODO(afazekas): enumerate and validate the stable status set
-        if status == 'BUILD' and server_status != 'UNKNOWN':
-            return
-        if server_status == status:
-            if ready_wait:
-                if status == 'BUILD':
-                    return
-                # NOTE(afazekas): The instance is in "ready for action state"
-                # when no task in progress
-                # NOTE(afazekas): Converted to string because of the XML
-                # responses
-                if str(task_state) == "None":
-                    # without state api extension 3 sec usually enough
-                    time.sleep(CONF.compute.ready_wait)
-                    return
-            else:
-                return
-
-        time.sleep(client.build_interval)
-        body = client.show_server(server_id)['server']
-        server_status = body['status']
-        task_state = _get_task_state(body)
-        if (server_status != old_status) or (task_state != old_task_state):
-            LOG.info('State transition "%s" ==> "%s" after %d second wait',
-                     '/'.join((old_status, str(old_task_state))),
-                     '/'.join((server_status, str(task_state))),
-                     time.time() - start_time)
-        if (server_status == 'ERROR') and raise_on_error:
-            if 'fault' in body:
-                raise exceptions.BuildErrorException(body['fault'],
-                                                     server_id=server_id)
-            else:
-                raise exceptions.BuildErrorException(server_id=server_id)
-
-        timed_out = int(time.time()) - start_time >= timeout
-
-        if timed_out:
-            expected_task_state = 'None' if ready_wait else 'n/a'
-            message = ('Server %(server_id)s failed to reach %(status)s '
-                       'status and task state "%(expected_task_state)s" '
-                       'within the required time (%(timeout)s s).' %
-                       {'server_id': server_id,
-                        'status': status,
-                        'expected_task_state': expected_task_state,
-                        'timeout': timeout})
-            message += ' Current status: %s.' % server_status
-            message += ' Current task state: %s.' % task_state
-            caller = misc_utils.find_test_caller()
-            if caller:
-                message = '(%s) %s' % (caller, message)
-            raise exceptions.TimeoutException(message)
-        old_status = server_status
-        old_task_state = task_state
+    poller = polling.Poller(client.build_interval,
+                            key='server:%s' % status, timeout=timeout)
+    watcher = get_server_watcher(client)
+    watcher.watch(server_id, body)
+    try:
+        while True:
+            # NOTE(afazekas): Now the BUILD status only reached
+            # between the UNKNOWN->ACTIVE transition.
+            # TODO(afazekas): enumerate and validate the stable status set
+            if status == 'BUILD' and server_status != 'UNKNOWN':
+                poller.done()
+                return body
+            if server_status == status:
+                if ready_wait:
+                    if status == 'BUILD':
+                        poller.done()
+                        return body
+                    # NOTE(afazekas): The instance is in "ready for action
+                    # state" when no task in progress
+                    # NOTE(afazekas): Converted to string because of the XML
+                    # responses
+                    if str(task_state) == "None":
+                        # without state api extension 3 sec usually enough
+                        time.sleep(CONF.compute.ready_wait)
+                        poller.done()
+                        return body
+                else:
+                    poller.done()
+                    return body
+
+            body = watcher.next_body(server_id, poller.next_poll_at())
+            server_status = body['status']
+            task_state = _get_task_state(body)
+            if (server_status != old_status) or (task_state != old_task_state):
+                LOG.info('State transition "%s" ==> "%s" after %d second wait',
+                         '/'.join((old_status, str(old_task_state))),
+                         '/'.join((server_status, str(task_state))),
+                         time.time() - start_time)
+            if (server_status == 'ERROR') and raise_on_error:
+                if 'fault' in body:
+                    raise exceptions.BuildErrorException(body['fault'],
+                                                         server_id=server_id)
+                else:
+                    raise exceptions.BuildErrorException(server_id=server_id)
+
+            timed_out = int(time.time()) - start_time >= timeout
+
+            if timed_out:
+                expected_task_state = 'None' if ready_wait else 'n/a'
+                message = ('Server %(server_id)s failed to reach %(status)s '
+                           'status and task state "%(expected_task_state)s" '
+                           'within the required time (%(timeout)s s).' %
+                           {'server_id': server_id,
+                            'status': status,
+                            'expected_task_state': expected_task_state,
+                            'timeout': timeout})
+                message += ' Current status: %s.' % server_status
+                message += ' Current task state: %s.' % task_state
+                caller = misc_utils.find_test_caller()
+                if caller:
+                    message = '(%s) %s' % (caller, message)
+                raise exceptions.TimeoutException(message)
+            old_status = server_status
+            old_task_state = task_state
+    finally:
+        watcher.unwatch(server_id)
+
+
+def wait_for_servers_status(client, server_ids, status, extra_timeout=0,
+                            raise_on_error=True):
+    """Waits for several servers to reach a given status.
+
+    The servers share the polls of the client's ServerStatusWatcher.
+
+    :returns: dict mapping each server id to its last server body.
+    """
+    watcher = get_server_watcher(client)
+    watched = []
+    servers = {}
+    try:
+        for server_id in server_ids:
+            watcher.watch(server_id, client.show_server(server_id)['server'])
+            watched.append(server_id)
+        pending = set(watched)
+        start_time = int(time.time())
+        timeout = client.build_timeout + extra_timeout
+        poller = polling.Poller(client.build_interval,
+                                key='server:%s' % status, timeout=timeout)
+        while True:
+            for server_id in list(pending):
+                body = servers[server_id] = watcher.body(server_id)
+                if (body['status'] == 'ERROR') and raise_on_error:
+                    if 'fault' in body:
+                        raise exceptions.BuildErrorException(
+                            body['fault'], server_id=server_id)
+                    raise exceptions.BuildErrorException(server_id=server_id)
+                task_state = body.get('OS-EXT-STS:task_state', None)
+                if body['status'] == status and str(task_state) == "None":
+                    LOG.info('Server %s reached %s status after %d second '
+                             'wait', server_id, status,
+                             time.time() - start_time)
+                    pending.remove(server_id)
+            if not pending:
+                # without state api extension 3 sec usually enough
+                time.sleep(CONF.compute.ready_wait)
+                poller.done()
+                return servers
+
+            if int(time.time()) - start_time >= timeout:
+                message = ('Servers %(server_ids)s failed to reach '
+                           '%(status)s status and task state "None" within '
+                           'the required time (%(timeout)s s).' %
+                           {'server_ids': ', '.join(sorted(pending)),
+                            'status': status,
+                            'timeout': timeout})
+                message += ' Current status: %s.' % ', '.join(
+                    '%s: %s' % (server_id, servers[server_id]['status'])
+                    for server_id in sorted(pending))
+                caller = misc_utils.find_test_caller()
+                if caller:
+                    message = '(%s) %s' % (caller, message)
+                raise exceptions.TimeoutException(message)
+            watcher.wait_for_poll(poller.next_poll_at())
+    finally:
+        for server_id in watched:
+            watcher.unwatch(server_id)
 
 
 def wait_for_server_termination(client, server_id, ignore_error=False):
     """Waits for server to reach termination."""
     start_time = int(time.time())
+    poller = polling.Poller(client.build_interval, key='server:DELETED',
+                            timeout=client.build_timeout,
+                            start=start_time)
     while True:
         try:
             body = client.show_server(server_id)['server']
         except lib_exc.NotFound:
+            poller.done()
             return
 
         server_status = body['status']
@@ -113,7 +400,7 @@ def wait_for_server_termination(client, server_id, ignore_error=False):
         if int(time.time()) - start_time >= client.build_timeout:
             raise exceptions.TimeoutException
 
-        time.sleep(client.build_interval)
+        poller.sleep()
 
 
 def wait_for_image_status(client, image_id, status):
@@ -128,9 +415,12 @@ def wait_for_image_status(client, image_id, status):
     if 'image' in image:
         image = image['image']
     start = int(time.time())
+    poller = polling.Poller(client.build_interval, key='image:%s' % status,
+                            timeout=client.build_timeout,
+                            start=start)
 
     while image['status'] != status:
-        time.sleep(client.build_interval)
+        poller.sleep()
         image = client.show_image(image_id)
         # Compute image client return response wrapped in 'image' element
         # which is not case with glance image client.
@@ -144,7 +434,7 @@ def wait_for_image_status(client, image_id, status):
         # the timeout at the same time that the image reached the expected
         # status
         if status_curr == status:
-            return
+            break
 
         if int(time.time()) - start >= client.build_timeout:
             message = ('Image %(image_id)s failed to reach %(status)s state'
@@ -158,6 +448,7 @@ def wait_for_image_status(client, image_id, status):
             if caller:
                 message = '(%s) %s' % (caller, message)
             raise exceptions.TimeoutException(message)
+    poller.done()
 
 
 def wait_for_volume_status(client, volume_id, status):
@@ -165,9 +456,12 @@ def wait_for_volume_status(client, volume_id, status):
     body = client.show_volume(volume_id)['volume']
     volume_status = body['status']
     start = int(time.time())
+    poller = polling.Poller(client.build_interval, key='volume:%s' % status,
+                            timeout=client.build_timeout,
+                            start=start)
 
     while volume_status != status:
-        time.sleep(client.build_interval)
+        poller.sleep()
         body = client.show_volume(volume_id)['volume']
         volume_status = body['status']
         if volume_status == 'error':
@@ -181,6 +475,7 @@ def wait_for_volume_status(client, volume_id, status):
                        (volume_id, status, volume_status,
                         client.build_timeout))
             raise exceptions.TimeoutException(message)
+    poller.done()
 
 
 def wait_for_snapshot_status(client, snapshot_id, status):
@@ -188,9 +483,12 @@ def wait_for_snapshot_status(client, snapshot_id, status):
     body = client.show_snapshot(snapshot_id)['snapshot']
     snapshot_status = body['status']
     start = int(time.time())
+    poller = polling.Poller(client.build_interval, key='snapshot:%s' % status,
+                            timeout=client.build_timeout,
+                            start=start)
 
     while snapshot_status != status:
-        time.sleep(client.build_interval)
+        poller.sleep()
         body = client.show_snapshot(snapshot_id)['snapshot']
         snapshot_status = body['status']
         if snapshot_status == 'error':
@@ -202,6 +500,7 @@ def wait_for_snapshot_status(client, snapshot_id, status):
                        (snapshot_id, status, snapshot_status,
                         client.build_timeout))
             raise exceptions.TimeoutException(message)
+    poller.done()
 
 
 def wait_for_bm_node_status(client, node_id, attr, status):
@@ -211,13 +510,16 @@ def wait_for_bm_node_status(client, node_id, attr, status):
     """
     _, node = client.show_node(node_id)
     start = int(time.time())
+    poller = polling.Poller(client.build_interval,
+                            key='node:%s:%s' % (attr, status),
+                            timeout=client.build_timeout, start=start)
 
     while node[attr] != status:
-        time.sleep(client.build_interval)
+        poller.sleep()
         _, node = client.show_node(node_id)
         status_curr = node[attr]
         if status_curr == status:
-            return
+            break
 
         if int(time.time()) - start >= client.build_timeout:
             message = ('Node %(node_id)s failed to reach %(attr)s=%(status)s '
@@ -231,3 +533,4 @@ def wait_for_bm_node_status(client, node_id, attr, status):
             if caller:
                 message = '(%s) %s' % (caller, message)
             raise exceptions.TimeoutException(message)
+    poller.done()
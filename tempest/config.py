@@ -23,6 +23,8 @@ from oslo_concurrency import lockutils
 from oslo_config import cfg
 from oslo_log import log as logging
 
+from tempest.lib.common import http
+from tempest.lib.common import rest_client
 from tempest.test_discover import plugins
 
 
@@ -54,6 +56,20 @@ AuthGroup = [
                     "at least `2 * CONC` distinct accounts configured in "
                     " the `test_accounts_file`, with CONC == the "
                     "number of concurrent test processes."),
+    cfg.StrOpt('test_accounts_lease_backend',
+               default='file',
+               choices=['file', 'sqlite'],
+               help="How accounts of the test_accounts_file are leased by "
+                    "the test processes. 'file' creates a lock file per "
+                    "leased account, 'sqlite' records leases in a SQLite "
+                    "table, where the leases of crashed processes expire "
+                    "after test_accounts_lease_ttl."),
+    cfg.IntOpt('test_accounts_lease_ttl',
+               default=600,
+               help="Seconds after which an account lease of the 'sqlite' "
+                    "backend expires. Leases are renewed every third of it "
+                    "while held, so only those of crashed processes "
+                    "expire."),
     cfg.BoolOpt('use_dynamic_credentials',
                 default=True,
                 help="Allows test cases to create/destroy tenants and "
@@ -85,6 +101,15 @@ AuthGroup = [
                      "creates. However in some neutron configurations, like "
                      "with VLAN provider networks, this doesn't work. So if "
                      "set to False the isolated networks will not be created"),
+    cfg.IntOpt('dynamic_credentials_pool_size',
+               default=0,
+               help="If use_dynamic_credentials is set to True, number of "
+                    "primary and alt credential sets, with their network "
+                    "resources, created in parallel up front and leased to "
+                    "the test classes. A released set has the resources left "
+                    "in its project purged before it is leased again, and "
+                    "all the sets are deleted when the test run ends. 0 "
+                    "creates and deletes credentials for every test class."),
     cfg.StrOpt('admin_username',
                help="Username for an administrative user. This is needed for "
                     "authenticating requests made by tenant isolation to "
@@ -327,7 +352,21 @@ HostGroup = [
     cfg.StrOpt('host_vssbackup_drive',
                help='Target drive for the Hyper-V VSS backups.'
                     'This drive has to be different from the boot drive.'
-                    'This is a required option')
+                    'This is a required option'),
+    cfg.IntOpt('winrm_shell_pool_size',
+               default=4,
+               help="Maximum number of idle WinRM shells kept open per "
+                    "Hyper-V host and user. Shells are shared by every "
+                    "test running against the same host."),
+    cfg.IntOpt('winrm_shell_idle_timeout',
+               default=120,
+               help="Seconds after which an idle pooled WinRM shell is "
+                    "closed. Keep this below the WinRM IdleTimeout "
+                    "configured on the host."),
+    cfg.IntOpt('winrm_shell_check_interval',
+               default=30,
+               help="Seconds a pooled WinRM shell can stay idle before it "
+                    "is health checked again prior to reuse.")
 ]
 
 lis_group = cfg.OptGroup(name='lis',
@@ -337,7 +376,26 @@ LisGroup = [
     cfg.StrOpt('private_network',
                help='Valid private network needed by some test cases'
                     'This has to not overlap with existing openstack networks'
-                    "This is a required option")
+                    "This is a required option"),
+    cfg.BoolOpt('golden_vm',
+                default=False,
+                help="Boot one VM per image and flavor for each LIS test "
+                     "class, checkpoint it once it is reachable over SSH and "
+                     "restore that checkpoint for every test, instead of "
+                     "booting a new VM per test."),
+    cfg.StrOpt('availability_zone',
+               help="Availability zone, or zone:host, the LIS test VMs are "
+                    "booted in. Set per worker by the host aware test "
+                    "scheduler, tempest.lis.scheduler."),
+    cfg.BoolOpt('vhd_template_pool',
+                default=False,
+                help="Make the disks of the storage tests from VHD(X) "
+                     "templates built once on each host, instead of "
+                     "creating and zero filling a new disk every time."),
+    cfg.BoolOpt('vhd_template_keep',
+                default=True,
+                help="Keep the VHD(X) templates on the hosts once no test "
+                     "disk uses them, so that the next runs reuse them."),
 ]
 
 compute_features_group = cfg.OptGroup(name='compute-feature-enabled',
@@ -1151,6 +1209,34 @@ specify .* as the regex.
 """)
 ]
 
+service_clients_group = cfg.OptGroup(name='service-clients',
+                                     title='Service Clients Options')
+
+ServiceClientsGroup = [
+    cfg.StrOpt('http_transport',
+               default='pooled',
+               choices=['pooled', 'closing'],
+               help="HTTP transport used by the REST clients. 'pooled' keeps "
+                    "connections alive in per endpoint pools shared by all "
+                    "the clients, 'closing' opens a new connection for "
+                    "every request."),
+    cfg.IntOpt('http_pool_size',
+               default=10,
+               help="Idle connections kept alive per endpoint by the pooled "
+                    "HTTP transport."),
+    cfg.IntOpt('http_pool_idle_timeout',
+               default=30,
+               help="Seconds an idle connection is kept alive by the pooled "
+                    "HTTP transport. Keep it below the keep-alive timeout of "
+                    "the API endpoints and their load balancers."),
+    cfg.IntOpt('response_validation_sample_rate',
+               default=1,
+               help="Validate one in N successful responses of each API "
+                    "against its JSON schema. Values above 1 lower the CPU "
+                    "cost of the clients in stress and load runs, 1 "
+                    "validates every response."),
+]
+
 input_scenario_group = cfg.OptGroup(name="input-scenario",
                                     title="Filters and values for"
                                           " input scenarios")
@@ -1268,6 +1354,7 @@ _opts = [
     (scenario_group, ScenarioGroup),
     (service_available_group, ServiceAvailableGroup),
     (debug_group, DebugGroup),
+    (service_clients_group, ServiceClientsGroup),
     (baremetal_group, BaremetalGroup),
     (input_scenario_group, InputScenarioGroup),
     (negative_group, NegativeGroup),
@@ -1339,6 +1426,7 @@ class TempestConfigPrivate(object):
         self.scenario = _CONF.scenario
         self.service_available = _CONF.service_available
         self.debug = _CONF.debug
+        self.service_clients = _CONF['service-clients']
         self.baremetal = _CONF.baremetal
         self.input_scenario = _CONF['input-scenario']
         self.negative = _CONF.negative
@@ -1348,6 +1436,12 @@ class TempestConfigPrivate(object):
         _CONF.set_default('alt_domain_name',
                           self.auth.default_credentials_domain_name,
                           group='identity')
+        http.configure_transport(
+            self.service_clients.http_transport,
+            pool_size=self.service_clients.http_pool_size,
+            idle_timeout=self.service_clients.http_pool_idle_timeout)
+        rest_client.configure_validation(
+            self.service_clients.response_validation_sample_rate)
         logging.tempest_set_log_file('tempest.log')
 
     def __init__(self, parse_conf=True, config_path=None):
@@ -139,6 +139,14 @@ class TearDownException(TempestException):
     message = "%(num)d cleanUp operation failed"
 
 
+class PowerShellCommandFailed(TempestException):
+    message = "PowerShell command %(command)s failed: %(error)s"
+
+
+class PowerShellRunspaceError(TempestException):
+    message = "PowerShell runspace on %(host)s is not usable: %(reason)s"
+
+
 # NOTE(andreaf) This exception is added here to facilitate the migration
 # of get_network_from_name and preprov_creds to tempest-lib, and it should
 # be migrated along with them
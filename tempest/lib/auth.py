@@ -17,6 +17,7 @@ import abc
 import copy
 import datetime
 import re
+import threading
 
 from oslo_log import log as logging
 import six
@@ -190,20 +191,219 @@ class AuthProvider(object):
         return
 
 
+class CachedAuth(object):
+    """Auth data shared by the providers of the same credentials
+
+    Base URLs looked up in the catalog of the token are kept in the
+    endpoints index, so a catalog is walked once per distinct filter.
+    """
+
+    def __init__(self, auth_data):
+        self.auth_data = auth_data
+        self.endpoints = {}
+        self.valid = True
+
+
+class AuthCache(object):
+    """Thread-safe cache of auth data keyed by auth URL and credentials
+
+    Only one thread at a time fetches the auth data of a key, concurrent
+    providers of the same credentials wait for it and reuse its token.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._key_locks = {}
+        self._lock = threading.Lock()
+
+    def _key_lock(self, key):
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def get(self, key, fetch, is_fresh):
+        """Return the entry of key, calling fetch if it is missing or stale
+
+        :param key: hashable identity of the credentials
+        :param fetch: callable returning new auth data
+        :param is_fresh: callable telling whether auth data can be reused
+        """
+        entry = self._entries.get(key)
+        if entry is not None and is_fresh(entry.auth_data):
+            return entry
+        with self._key_lock(key):
+            entry = self._entries.get(key)
+            if entry is None or not is_fresh(entry.auth_data):
+                entry = self.set(key, fetch())
+        return entry
+
+    def set(self, key, auth_data):
+        entry = CachedAuth(auth_data)
+        with self._lock:
+            old = self._entries.get(key)
+            if old is not None:
+                old.valid = False
+            self._entries[key] = entry
+        return entry
+
+    def alias(self, key, entry):
+        """Make entry available under another key too"""
+        with self._lock:
+            if entry.valid:
+                self._entries.setdefault(key, entry)
+
+    def invalidate(self, key):
+        """Drop the entry of key, and all the aliases of it"""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return
+            entry.valid = False
+            for other in [k for k, v in self._entries.items()
+                          if v is entry]:
+                del self._entries[other]
+
+    def clear(self):
+        with self._lock:
+            for entry in self._entries.values():
+                entry.valid = False
+            self._entries.clear()
+
+
+AUTH_CACHE = AuthCache()
+
+
 class KeystoneAuthProvider(AuthProvider):
 
     EXPIRY_DATE_FORMATS = (ISO8601_FLOAT_SECONDS, ISO8601_INT_SECONDS)
 
     token_expiry_threshold = datetime.timedelta(seconds=60)
+    # Shared tokens are renewed this long before they are considered expired
+    # so that no request has to wait for a token to be renewed. It is capped
+    # to a quarter of the token's lifetime, so that short-lived tokens are
+    # still reused, and never below token_expiry_threshold.
+    token_refresh_threshold = datetime.timedelta(seconds=300)
 
     def __init__(self, credentials, auth_url,
                  disable_ssl_certificate_validation=None,
-                 ca_certs=None, trace_requests=None):
+                 ca_certs=None, trace_requests=None, auth_cache=None):
         super(KeystoneAuthProvider, self).__init__(credentials)
         self.dsvm = disable_ssl_certificate_validation
         self.ca_certs = ca_certs
         self.trace_requests = trace_requests
         self.auth_client = self._auth_client(auth_url)
+        self.auth_cache = AUTH_CACHE if auth_cache is None else auth_cache
+        self._cached_auth = None
+
+    def _auth_cache_key(self):
+        params = self._auth_params()
+        return (self.__class__.__name__, self.auth_client.auth_url,
+                tuple(sorted(params.items())))
+
+    def _use_cached_auth(self, entry, key):
+        self._cached_auth = entry
+        self.cache = entry.auth_data
+        self._fill_credentials(self.cache[1])
+        filled_key = self._auth_cache_key()
+        if filled_key != key:
+            # Providers created with the filled in credentials share it too
+            self.auth_cache.alias(filled_key, entry)
+
+    def _refresh_threshold(self, auth_data):
+        threshold = self.token_refresh_threshold
+        issued = self._token_issued(auth_data)
+        if issued is not None:
+            lifetime = self._token_expiry(auth_data) - issued
+            threshold = min(threshold, lifetime // 4)
+        return max(threshold, self.token_expiry_threshold)
+
+    def _is_fresh(self, auth_data):
+        return not self._expires_within(auth_data,
+                                        self._refresh_threshold(auth_data))
+
+    def get_auth(self):
+        """Returns auth from the shared cache, auth first if needed"""
+        entry = self._cached_auth
+        if (self.cache is None or entry is None or not entry.valid or
+                entry.auth_data is not self.cache or
+                not self._is_fresh(self.cache)):
+            key = self._auth_cache_key()
+            entry = self.auth_cache.get(key, self._get_auth, self._is_fresh)
+            self._use_cached_auth(entry, key)
+        return self.cache
+
+    def set_auth(self):
+        """Forces setting auth.
+
+        Forces setting auth, ignores cache if it exists, and shares the new
+        auth with the other providers of the same credentials.
+        Refills credentials
+        """
+        key = self._auth_cache_key()
+        entry = self.auth_cache.set(key, self._get_auth())
+        self._use_cached_auth(entry, key)
+
+    def clear_auth(self):
+        """Clear access cache
+
+        The shared auth is dropped too, so that the next request of any
+        provider of the same credentials fetches a new token.
+        """
+        self.auth_cache.invalidate(self._auth_cache_key())
+        self._cached_auth = None
+        super(KeystoneAuthProvider, self).clear_auth()
+
+    def base_url(self, filters, auth_data=None):
+        """Base URL from catalog
+
+        Filters can be:
+        - service: compute, image, etc
+        - region: the service region
+        - endpoint_type: adminURL, publicURL, internalURL
+        - api_version: replace catalog version with this
+        - skip_path: take just the base URL
+        """
+        if auth_data is None:
+            auth_data = self.auth_data
+        entry = self._cached_auth
+        if entry is None or entry.auth_data is not auth_data:
+            return self._catalog_base_url(filters, auth_data)
+        key = (filters.get('service'), filters.get('region'),
+               filters.get('endpoint_type'), filters.get('api_version'),
+               filters.get('skip_path'))
+        try:
+            return entry.endpoints[key]
+        except KeyError:
+            _base_url = self._catalog_base_url(filters, auth_data)
+            entry.endpoints[key] = _base_url
+            return _base_url
+
+    @abc.abstractmethod
+    def _catalog_base_url(self, filters, auth_data):
+        return
+
+    @abc.abstractmethod
+    def _token_expiry(self, auth_data):
+        return
+
+    @abc.abstractmethod
+    def _token_issued(self, auth_data):
+        """Issue time of the token, None if keystone did not give it"""
+        return
+
+    def _parse_issued_time(self, issued_string):
+        if issued_string is None:
+            return None
+        try:
+            return self._parse_expiry_time(issued_string)
+        except ValueError:
+            return None
+
+    def _expires_within(self, auth_data, threshold):
+        expiry = self._token_expiry(auth_data)
+        return expiry - threshold <= datetime.datetime.utcnow()
+
+    def is_expired(self, auth_data):
+        return self._expires_within(auth_data, self.token_expiry_threshold)
 
     def _decorate_request(self, filters, method, url, headers=None, body=None,
                           auth_data=None):
@@ -288,18 +488,7 @@ class KeystoneV2AuthProvider(KeystoneAuthProvider):
         if self.credentials.user_id is None:
             self.credentials.user_id = user['id']
 
-    def base_url(self, filters, auth_data=None):
-        """Base URL from catalog
-
-        Filters can be:
-        - service: compute, image, etc
-        - region: the service region
-        - endpoint_type: adminURL, publicURL, internalURL
-        - api_version: replace catalog version with this
-        - skip_path: take just the base URL
-        """
-        if auth_data is None:
-            auth_data = self.auth_data
+    def _catalog_base_url(self, filters, auth_data):
         token, _auth_data = auth_data
         service = filters.get('service')
         region = filters.get('region')
@@ -346,11 +535,13 @@ class KeystoneV2AuthProvider(KeystoneAuthProvider):
 
         return _base_url
 
-    def is_expired(self, auth_data):
+    def _token_expiry(self, auth_data):
         _, access = auth_data
-        expiry = self._parse_expiry_time(access['token']['expires'])
-        return (expiry - self.token_expiry_threshold <=
-                datetime.datetime.utcnow())
+        return self._parse_expiry_time(access['token']['expires'])
+
+    def _token_issued(self, auth_data):
+        _, access = auth_data
+        return self._parse_issued_time(access['token'].get('issued_at'))
 
 
 class KeystoneV3AuthProvider(KeystoneAuthProvider):
@@ -408,18 +599,7 @@ class KeystoneV3AuthProvider(KeystoneAuthProvider):
         if self.credentials.user_domain_name is None:
             self.credentials.user_domain_name = user['domain']['name']
 
-    def base_url(self, filters, auth_data=None):
-        """Base URL from catalog
-
-        Filters can be:
-        - service: compute, image, etc
-        - region: the service region
-        - endpoint_type: adminURL, publicURL, internalURL
-        - api_version: replace catalog version with this
-        - skip_path: take just the base URL
-        """
-        if auth_data is None:
-            auth_data = self.auth_data
+    def _catalog_base_url(self, filters, auth_data):
         token, _auth_data = auth_data
         service = filters.get('service')
         region = filters.get('region')
@@ -479,11 +659,13 @@ class KeystoneV3AuthProvider(KeystoneAuthProvider):
 
         return _base_url
 
-    def is_expired(self, auth_data):
+    def _token_expiry(self, auth_data):
+        _, access = auth_data
+        return self._parse_expiry_time(access['expires_at'])
+
+    def _token_issued(self, auth_data):
         _, access = auth_data
-        expiry = self._parse_expiry_time(access['expires_at'])
-        return (expiry - self.token_expiry_threshold <=
-                datetime.datetime.utcnow())
+        return self._parse_issued_time(access.get('issued_at'))
 
 
 def is_identity_version_supported(identity_version):
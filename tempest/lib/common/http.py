@@ -14,7 +14,20 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import atexit
+import collections
+import os
+import select
+import socket
+import threading
+import time
+
 import httplib2
+from oslo_log import log as logging
+from six.moves import http_client
+from six.moves import urllib
+
+LOG = logging.getLogger(__name__)
 
 
 class ClosingHttp(httplib2.Http):
@@ -23,3 +36,217 @@ class ClosingHttp(httplib2.Http):
         new_headers = dict(original_headers, connection='close')
         new_kwargs = dict(kwargs, headers=new_headers)
         return super(ClosingHttp, self).request(*args, **new_kwargs)
+
+
+# Errors showing that a kept alive connection was closed by the server
+STALE_CONNECTION_ERRORS = (socket.error, http_client.BadStatusLine,
+                           http_client.ResponseNotReady)
+# Methods which can be replayed without side effects
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS', 'TRACE')
+
+
+def _close_connections(http):
+    for connection in http.connections.values():
+        connection.close()
+    http.connections.clear()
+
+
+def _drop_stale_connections(http):
+    """Close kept alive connections the server already gave up on.
+
+    An idle keep-alive socket must not be readable: data or EOF on it
+    means the server closed (or is closing) the connection.
+    """
+    for key, connection in list(http.connections.items()):
+        sock = getattr(connection, 'sock', None)
+        if sock is None:
+            continue
+        try:
+            readable = select.select([sock], [], [], 0)[0]
+        except (socket.error, ValueError):
+            readable = True
+        if readable:
+            connection.close()
+            del http.connections[key]
+
+
+class PooledHttp(object):
+    """HTTP transport keeping connections alive in per endpoint pools
+
+    Every pooled httplib2.Http object holds the kept alive connection of a
+    single endpoint (scheme and authority) and is used by one request at a
+    time, so the transport can be shared by threads. Idle connections are
+    reused most recent first, up to pool_size are kept per endpoint and
+    those idle for longer than idle_timeout are closed.
+
+    Requests failing because the server dropped a reused connection are
+    replayed once on a new connection when the method is idempotent.
+
+    The pools are owned by the process which filled them: a forked child
+    starts with empty pools rather than sharing the sockets of its parent.
+    """
+
+    def __init__(self, disable_ssl_certificate_validation=False,
+                 ca_certs=None, pool_size=10, idle_timeout=30):
+        self.disable_ssl_certificate_validation = (
+            disable_ssl_certificate_validation)
+        self.ca_certs = ca_certs
+        self.pool_size = pool_size
+        self.idle_timeout = idle_timeout
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._pools = collections.defaultdict(collections.deque)
+        self._lock = threading.Lock()
+
+    def _check_pid(self):
+        # The connections inherited from the parent process are left to it,
+        # closing them here could shut down its SSL sessions.
+        if self._pid != os.getpid():
+            self._reset()
+
+    @staticmethod
+    def _endpoint(uri):
+        scheme, authority = urllib.parse.urlsplit(uri)[:2]
+        return scheme.lower(), authority.lower()
+
+    def _new_http(self):
+        dscv = self.disable_ssl_certificate_validation
+        return httplib2.Http(disable_ssl_certificate_validation=dscv,
+                             ca_certs=self.ca_certs)
+
+    def _acquire(self, endpoint):
+        self._check_pid()
+        now = time.time()
+        http = None
+        expired = []
+        with self._lock:
+            pool = self._pools[endpoint]
+            while pool:
+                candidate, last_used = pool.pop()
+                if now - last_used > self.idle_timeout:
+                    expired.append(candidate)
+                    continue
+                http = candidate
+                break
+        for old_http in expired:
+            _close_connections(old_http)
+        if http is None:
+            return self._new_http(), False
+        _drop_stale_connections(http)
+        return http, bool(http.connections)
+
+    def _release(self, endpoint, http):
+        self._check_pid()
+        with self._lock:
+            pool = self._pools[endpoint]
+            if len(pool) < self.pool_size:
+                pool.append((http, time.time()))
+                return
+        _close_connections(http)
+
+    def request(self, uri, method='GET', body=None, headers=None, **kwargs):
+        endpoint = self._endpoint(uri)
+        http, reused = self._acquire(endpoint)
+        while True:
+            try:
+                response = http.request(uri, method, body=body,
+                                        headers=headers, **kwargs)
+            except STALE_CONNECTION_ERRORS as exc:
+                _close_connections(http)
+                if not reused or method.upper() not in IDEMPOTENT_METHODS:
+                    raise
+                LOG.debug('Kept alive connection to %s was dropped (%s), '
+                          'retrying %s %s', endpoint[1], exc, method, uri)
+                http, reused = self._new_http(), False
+                continue
+            except Exception:
+                _close_connections(http)
+                raise
+            self._release(endpoint, http)
+            return response
+
+    def close(self):
+        self._check_pid()
+        with self._lock:
+            pools = list(self._pools.values())
+            self._pools.clear()
+        for pool in pools:
+            for http, _ in pool:
+                _close_connections(http)
+
+
+TRANSPORTS = ('pooled', 'closing')
+
+_transport_settings = {'transport': 'pooled',
+                       'pool_size': 10,
+                       'idle_timeout': 30}
+_pooled_transports = {}
+_pooled_transports_lock = threading.Lock()
+_pooled_transports_pid = os.getpid()
+
+
+def _check_pid():
+    """Forget the transports of the parent process in a forked child."""
+    global _pooled_transports_lock, _pooled_transports_pid
+    if _pooled_transports_pid != os.getpid():
+        _pooled_transports_lock = threading.Lock()
+        _pooled_transports.clear()
+        _pooled_transports_pid = os.getpid()
+
+
+def configure_transport(transport='pooled', pool_size=10, idle_timeout=30):
+    """Set the transport get_http hands out from now on.
+
+    :param transport: 'pooled' for kept alive connections shared by all
+                      the clients, 'closing' for a new connection on every
+                      request.
+    :param pool_size: idle connections kept per endpoint.
+    :param idle_timeout: seconds an idle connection is kept open.
+    """
+    if transport not in TRANSPORTS:
+        raise ValueError('Unknown HTTP transport %s, expected one of %s' %
+                         (transport, ', '.join(TRANSPORTS)))
+    _check_pid()
+    with _pooled_transports_lock:
+        settings = {'transport': transport,
+                    'pool_size': pool_size,
+                    'idle_timeout': idle_timeout}
+        if settings == _transport_settings:
+            return
+        _transport_settings.update(settings)
+        transports = list(_pooled_transports.values())
+        _pooled_transports.clear()
+    for pooled in transports:
+        pooled.close()
+
+
+def get_http(disable_ssl_certificate_validation=False, ca_certs=None):
+    """Return the HTTP transport used by the REST clients."""
+    dscv = disable_ssl_certificate_validation
+    _check_pid()
+    with _pooled_transports_lock:
+        if _transport_settings['transport'] == 'closing':
+            return ClosingHttp(disable_ssl_certificate_validation=dscv,
+                               ca_certs=ca_certs)
+        key = (bool(dscv), ca_certs)
+        pooled = _pooled_transports.get(key)
+        if pooled is None:
+            pooled = PooledHttp(dscv, ca_certs,
+                                _transport_settings['pool_size'],
+                                _transport_settings['idle_timeout'])
+            _pooled_transports[key] = pooled
+        return pooled
+
+
+def close_all_transports():
+    _check_pid()
+    with _pooled_transports_lock:
+        transports = list(_pooled_transports.values())
+        _pooled_transports.clear()
+    for pooled in transports:
+        pooled.close()
+
+
+atexit.register(close_all_transports)
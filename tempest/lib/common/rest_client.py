@@ -15,8 +15,10 @@
 #    under the License.
 
 import collections
+import itertools
 import logging as real_logging
 import re
+import threading
 import time
 
 import jsonschema
@@ -26,6 +28,7 @@ import six
 
 from tempest.lib.common import http
 from tempest.lib.common.utils import misc as misc_utils
+from tempest.lib.common.utils import polling
 from tempest.lib import exceptions
 
 # redrive rate limited calls at most twice
@@ -42,6 +45,65 @@ JSONSCHEMA_VALIDATOR = jsonschema.Draft4Validator
 FORMAT_CHECKER = jsonschema.draft4_format_checker
 
 
+class SchemaValidators(object):
+    """JSON Schema validators compiled once per schema
+
+    Response schemas are module level constants, so validators are keyed by
+    the identity of the schema: each schema is checked and compiled on first
+    use and its validator is reused for every response.
+
+    :param sample_rate: validate only one in sample_rate instances of each
+                        schema, 1 validates them all.
+    """
+
+    # Bounds the memory used by schemas built on the fly
+    max_size = 1000
+
+    def __init__(self, validator_class=None, format_checker=None,
+                 sample_rate=1):
+        self.validator_class = validator_class or JSONSCHEMA_VALIDATOR
+        self.format_checker = format_checker or FORMAT_CHECKER
+        self.sample_rate = sample_rate
+        self._validators = {}
+        self._lock = threading.Lock()
+
+    def _get(self, schema):
+        entry = self._validators.get(id(schema))
+        # The entry holds the schema, so its id cannot be reused
+        if entry is not None and entry[0] is schema:
+            return entry
+        self.validator_class.check_schema(schema)
+        validator = self.validator_class(schema,
+                                         format_checker=self.format_checker)
+        entry = (schema, validator, itertools.count())
+        with self._lock:
+            if len(self._validators) >= self.max_size:
+                self._validators.clear()
+            self._validators[id(schema)] = entry
+        return entry
+
+    def get(self, schema):
+        return self._get(schema)[1]
+
+    def validate(self, instance, schema):
+        """Validate instance against schema, subject to sampling
+
+        :raises jsonschema.ValidationError: if instance is invalid
+        """
+        _, validator, count = self._get(schema)
+        if self.sample_rate > 1 and next(count) % self.sample_rate:
+            return
+        validator.validate(instance)
+
+
+VALIDATORS = SchemaValidators()
+
+
+def configure_validation(sample_rate):
+    """Validate one in sample_rate responses of each schema"""
+    VALIDATORS.sample_rate = max(1, sample_rate)
+
+
 class RestClient(object):
     """Unified OpenStack RestClient class
 
@@ -94,7 +156,7 @@ class RestClient(object):
                                        'retry-after', 'server',
                                        'vary', 'www-authenticate'))
         dscv = disable_ssl_certificate_validation
-        self.http_obj = http.ClosingHttp(
+        self.http_obj = http.get_http(
             disable_ssl_certificate_validation=dscv, ca_certs=ca_certs)
 
     def _get_type(self):
@@ -389,8 +451,10 @@ class RestClient(object):
                            req_body=None):
         if req_headers is None:
             req_headers = {}
+        if not self.trace_requests:
+            return
         caller_name = misc_utils.find_test_caller()
-        if self.trace_requests and re.search(self.trace_requests, caller_name):
+        if re.search(self.trace_requests, caller_name):
             self.LOG.debug('Starting Request (%s): %s %s' %
                            (caller_name, method, req_url))
 
@@ -785,8 +849,13 @@ class RestClient(object):
                                   resource still hasn't been deleted
         """
         start_time = int(time.time())
+        poller = polling.Poller(self.build_interval,
+                                key='%s:deleted' % self.resource_type,
+                                timeout=self.build_timeout,
+                                start=start_time)
         while True:
             if self.is_resource_deleted(id):
+                poller.done()
                 return
             if int(time.time()) - start_time >= self.build_timeout:
                 message = ('Failed to delete %(resource_type)s %(id)s within '
@@ -797,7 +866,7 @@ class RestClient(object):
                 if caller:
                     message = '(%s) %s' % (caller, message)
                 raise exceptions.TimeoutException(message)
-            time.sleep(self.build_interval)
+            poller.sleep()
 
     def is_resource_deleted(self, id):
         """Subclasses override with specific deletion detection."""
@@ -824,9 +893,7 @@ class RestClient(object):
             body_schema = schema.get('response_body')
             if body_schema:
                 try:
-                    jsonschema.validate(body, body_schema,
-                                        cls=JSONSCHEMA_VALIDATOR,
-                                        format_checker=FORMAT_CHECKER)
+                    VALIDATORS.validate(body, body_schema)
                 except jsonschema.ValidationError as ex:
                     msg = ("HTTP response body is invalid (%s)") % ex
                     raise exceptions.InvalidHTTPResponseBody(msg)
@@ -839,9 +906,7 @@ class RestClient(object):
             header_schema = schema.get('response_header')
             if header_schema:
                 try:
-                    jsonschema.validate(resp, header_schema,
-                                        cls=JSONSCHEMA_VALIDATOR,
-                                        format_checker=FORMAT_CHECKER)
+                    VALIDATORS.validate(resp, header_schema)
                 except jsonschema.ValidationError as ex:
                     msg = ("HTTP response header is invalid (%s)") % ex
                     raise exceptions.InvalidHTTPResponseHeader(msg)
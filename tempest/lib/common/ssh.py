@@ -13,9 +13,11 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import atexit
 import os
 import select
 import socket
+import threading
 import time
 import warnings
 
@@ -32,11 +34,32 @@ with warnings.catch_warnings():
 
 LOG = logging.getLogger(__name__)
 
+# Authenticated connections shared by every Client using the same host,
+# user and credentials. Commands are multiplexed over them as channels.
+_connections = {}
+_connections_lock = threading.Lock()
+# One lock per connection key, held while checking and opening the
+# connection, so that concurrent callers share a single new connection
+_connection_locks = {}
+
+
+def close_all_connections():
+    """Close every cached ssh connection."""
+    with _connections_lock:
+        connections = list(_connections.values())
+        _connections.clear()
+    for connection in connections:
+        connection.close()
+
+
+atexit.register(close_all_connections)
+
 
 class Client(object):
 
     def __init__(self, host, username, password=None, timeout=300, pkey=None,
-                 channel_timeout=10, look_for_keys=False, key_filename=None):
+                 channel_timeout=10, look_for_keys=False, key_filename=None,
+                 buf_size=65536, tail_size=16384):
         self.host = host
         self.port = 22
         self.username = username
@@ -49,7 +72,8 @@ class Client(object):
         self.key_filename = key_filename
         self.timeout = int(timeout)
         self.channel_timeout = float(channel_timeout)
-        self.buf_size = 1024
+        self.buf_size = int(buf_size)
+        self.tail_size = int(tail_size)
 
     def _get_ssh_connection(self, sleep=1.5, backoff=1):
         """Returns an ssh connection to the specified host."""
@@ -98,88 +122,106 @@ class Client(object):
     def _is_timed_out(self, start_time):
         return (time.time() - self.timeout) > start_time
 
-    def sftp(self, source, destination):
+    def _connection_key(self):
+        if self.pkey is not None:
+            credential = self.pkey.get_fingerprint()
+        else:
+            credential = (self.password, self.key_filename)
+        return (self.host, self.port, self.username, credential)
 
-        try:
-            transport = paramiko.Transport((self.host, self.port))
-            transport.start_client()
-            self.agent_auth(transport, self.username)
-            sftp = transport.open_session()
-            sftp = paramiko.SFTPClient.from_transport(transport)
-            is_up_to_date = False
+    def _get_transport(self):
+        """Returns the cached transport, reconnecting if it is dead."""
+        key = self._connection_key()
+        with _connections_lock:
+            lock = _connection_locks.setdefault(key, threading.Lock())
+        with lock:
+            with _connections_lock:
+                connection = _connections.get(key)
+            if connection is not None:
+                transport = connection.get_transport()
+                if transport is not None and transport.is_active():
+                    return transport
+                LOG.info("Cached ssh connection to %s@%s is no longer "
+                         "active, reconnecting", self.username, self.host)
+                self._drop_connection(connection)
 
-            try:
-                sftp.mkdir(destination)
-            except IOError as e:
-                LOG.exception(e)
+            connection = self._get_ssh_connection()
+            with _connections_lock:
+                _connections[key] = connection
+            return connection.get_transport()
 
-            destination_file = destination + '/' + os.path.basename(source)
-            try:
-                if sftp.stat(destination):
-                    source_data = open(source, "rb").read()
-                    destination_data = sftp.open(destination_file).read()
-                    md1 = md5.new(source_data).digest()
-                    md2 = md5.new(destination_data).digest()
-                    if md1 == md2:
-                        is_up_to_date = True
-            except:
-                pass
+    def _drop_connection(self, connection):
+        key = self._connection_key()
+        with _connections_lock:
+            if _connections.get(key) is connection:
+                del _connections[key]
+        connection.close()
 
-            if not is_up_to_date:
-                sftp.put(source, destination_file)
-                LOG.info(
-                    "Successfuly copied over %s to %s", source, destination)
-        except Exception as e:
-            raise Exception ('*** Failed to sftp: %s: %s' % (e.__class__, e))
-            try:
-                transport.close()
-            except:
-                pass
+    def _open_session(self):
+        transport = self._get_transport()
+        try:
+            return transport.open_session()
+        except (EOFError, socket.error, paramiko.SSHException) as e:
+            # The transport may die between the liveness check and the
+            # channel request (e.g. the guest rebooted).
+            LOG.info("Failed to open a channel to %s@%s (%s), reconnecting",
+                     self.username, self.host, e)
+            self.close()
+            return self._get_transport().open_session()
 
-    def agent_auth(self, transport, username):
+    def close(self):
+        """Close the ssh connection cached for this host and user."""
+        with _connections_lock:
+            connection = _connections.pop(self._connection_key(), None)
+        if connection is not None:
+            connection.close()
 
-        agent = paramiko.Agent()
-        agent_keys = agent.get_keys() + (self.pkey,)
-        if len(agent_keys) == 0:
-            return
+    def _open_sftp(self):
+        return paramiko.SFTPClient.from_transport(self._get_transport())
 
-        for key in agent_keys:
+    def sftp(self, source, destination):
+        """Copy a local file into a remote directory."""
+        destination_file = (destination.rstrip('/') + '/' +
+                            os.path.basename(source))
+        sftp = self._open_sftp()
+        try:
             try:
-                transport.auth_publickey(username, key)
-                return
-            except paramiko.SSHException, e:
-                raise e
+                sftp.mkdir(destination)
+            except IOError:
+                # The directory already exists
+                pass
+            sftp.put(source, destination_file)
+        finally:
+            sftp.close()
+        LOG.info("Successfuly copied over %s to %s", source, destination)
+
+    def put_data(self, data, remote_path):
+        """Write a bytes payload to a remote file."""
+        sftp = self._open_sftp()
+        try:
+            sftp.putfo(six.BytesIO(data), remote_path)
+        finally:
+            sftp.close()
 
     @staticmethod
     def _can_system_poll():
         return hasattr(select, 'poll')
 
-    def exec_command(self, cmd, ignore_exit_status=False, encoding="utf-8"):
-        """Execute the specified command on the server
-
-        Note that this method is reading whole command outputs to memory, thus
-        shouldn't be used for large outputs.
-
-        :param str cmd: Command to run at remote server.
-        :param str encoding: Encoding for result from paramiko.
-                             Result will not be decoded if None.
-        :returns: data read from standard output of the command.
-        :raises: SSHExecCommandFailed if command returns nonzero
-                 status. The exception contains command status stderr content.
-        :raises: TimeoutException if cmd doesn't end when timeout expires.
-        """
-        ssh = self._get_ssh_connection()
-        transport = ssh.get_transport()
-        channel = transport.open_session()
+    def _start_command(self, cmd):
+        channel = self._open_session()
         channel.fileno()  # Register event pipe
         channel.exec_command(cmd)
         channel.shutdown_write()
-        exit_status = channel.recv_exit_status()
+        return channel
 
+    def _read_channel(self, cmd, channel):
+        """Yields (is_stderr, data) chunks as the command produces them.
+
+        The output is drained before the exit status is read, so commands
+        writing more than the channel window can not block.
+        """
         # If the executing host is linux-based, poll the channel
         if self._can_system_poll():
-            out_data_chunks = []
-            err_data_chunks = []
             poll = select.poll()
             poll.register(channel, select.POLLIN)
             start_time = time.time()
@@ -197,20 +239,47 @@ class Client(object):
                 out_chunk = err_chunk = None
                 if channel.recv_ready():
                     out_chunk = channel.recv(self.buf_size)
-                    out_data_chunks += out_chunk,
+                    if out_chunk:
+                        yield False, out_chunk
                 if channel.recv_stderr_ready():
                     err_chunk = channel.recv_stderr(self.buf_size)
-                    err_data_chunks += err_chunk,
+                    if err_chunk:
+                        yield True, err_chunk
                 if channel.closed and not err_chunk and not out_chunk:
                     break
-            out_data = b''.join(out_data_chunks)
-            err_data = b''.join(err_data_chunks)
         # Just read from the channels
         else:
             out_file = channel.makefile('rb', self.buf_size)
             err_file = channel.makefile_stderr('rb', self.buf_size)
-            out_data = out_file.read()
-            err_data = err_file.read()
+            yield False, out_file.read()
+            yield True, err_file.read()
+
+    def exec_command(self, cmd, ignore_exit_status=False, encoding="utf-8"):
+        """Execute the specified command on the server
+
+        Note that this method is reading whole command outputs to memory, thus
+        shouldn't be used for large outputs. Use exec_command_stream instead.
+
+        :param str cmd: Command to run at remote server.
+        :param str encoding: Encoding for result from paramiko.
+                             Result will not be decoded if None.
+        :returns: data read from standard output of the command.
+        :raises: SSHExecCommandFailed if command returns nonzero
+                 status. The exception contains command status stderr content.
+        :raises: TimeoutException if cmd doesn't end when timeout expires.
+        """
+        channel = self._start_command(cmd)
+        out_data_chunks = []
+        err_data_chunks = []
+        for is_stderr, chunk in self._read_channel(cmd, channel):
+            if is_stderr:
+                err_data_chunks.append(chunk)
+            else:
+                out_data_chunks.append(chunk)
+        exit_status = channel.recv_exit_status()
+
+        out_data = b''.join(out_data_chunks)
+        err_data = b''.join(err_data_chunks)
         if encoding:
             out_data = out_data.decode(encoding)
             err_data = err_data.decode(encoding)
@@ -221,7 +290,50 @@ class Client(object):
                 stderr=err_data, stdout=out_data)
         return out_data
 
+    def exec_command_stream(self, cmd, stdout_callback=None,
+                            stderr_callback=None, ignore_exit_status=False,
+                            tail_size=None, encoding="utf-8"):
+        """Execute the specified command, handing out its output as it comes
+
+        The output is not accumulated in memory: every chunk is passed to
+        the callbacks as raw bytes (e.g. a file's write method), and only
+        the last ``tail_size`` bytes of each stream are kept for the error
+        message.
+
+        :param str cmd: Command to run at remote server.
+        :param stdout_callback: callable receiving standard output chunks.
+        :param stderr_callback: callable receiving standard error chunks.
+        :param int tail_size: bytes of each stream kept for error reporting,
+                              defaults to the client's tail_size.
+        :param str encoding: Encoding used to decode the tails.
+        :returns: the exit status of the command.
+        :raises: SSHExecCommandFailed if command returns nonzero status.
+        :raises: TimeoutException if cmd doesn't end when timeout expires.
+        """
+        if tail_size is None:
+            tail_size = self.tail_size
+        tails = {False: b'', True: b''}
+        callbacks = {False: stdout_callback, True: stderr_callback}
+
+        channel = self._start_command(cmd)
+        for is_stderr, chunk in self._read_channel(cmd, channel):
+            if callbacks[is_stderr] is not None:
+                callbacks[is_stderr](chunk)
+            tails[is_stderr] = (tails[is_stderr] + chunk)[-tail_size:]
+        exit_status = channel.recv_exit_status()
+
+        if 0 != exit_status and not ignore_exit_status:
+            raise exceptions.SSHExecCommandFailed(
+                command=cmd, exit_status=exit_status,
+                stderr=tails[True].decode(encoding, 'replace'),
+                stdout=tails[False].decode(encoding, 'replace'))
+        return exit_status
+
     def test_connection_auth(self):
-        """Raises an exception when we can not connect to server via ssh."""
-        connection = self._get_ssh_connection()
-        connection.close()
+        """Raises an exception when we can not connect to server via ssh.
+
+        A cached connection may predate a reboot of the server, so it is
+        dropped and a new one is opened, which the next commands reuse.
+        """
+        self.close()
+        self._get_transport()
@@ -15,11 +15,48 @@
 
 import inspect
 import re
+import threading
 
 from oslo_log import log as logging
 
 LOG = logging.getLogger(__name__)
 
+_TEST_METHOD_RE = re.compile("^(test_|setUp|tearDown)")
+_CLEANUP_RE = re.compile("^_run_cleanup")
+_RUNTEST_RE = re.compile("^RunTest")
+
+
+class _CallerTracker(threading.local):
+    name = None
+
+
+_tracker = _CallerTracker()
+# Caller of the last test that set one in any thread, used for the threads
+# a test starts itself
+_process_caller = None
+
+
+def set_test_caller(caller_name):
+    """Record the test step running in the current thread.
+
+    :param caller_name: name in the "Class:method" format returned by
+                        find_test_caller, e.g. "TestServers:test_reboot".
+    """
+    global _process_caller
+    _tracker.name = caller_name
+    _process_caller = caller_name
+
+
+def clear_test_caller():
+    global _process_caller
+    _tracker.name = None
+    _process_caller = None
+
+
+def get_test_caller():
+    """Return the recorded test caller, None if there is none."""
+    return _tracker.name or _process_caller
+
 
 def singleton(cls):
     """Simple wrapper for classes that should only have a single instance."""
@@ -39,8 +76,14 @@ def find_test_caller():
     test_* methods, and various kinds of setUp / tearDown, we
     can look through the call stack to find appropriate methods,
     and the class we were in when those were called.
+
+    The stack is only walked when no caller was recorded with
+    set_test_caller, which the tempest base test class does for each step
+    of a test.
     """
-    caller_name = None
+    caller_name = get_test_caller()
+    if caller_name is not None:
+        return caller_name
     names = []
     frame = inspect.currentframe()
     is_cleanup = False
@@ -50,7 +93,7 @@ def find_test_caller():
             frame = frame.f_back
             name = frame.f_code.co_name
             names.append(name)
-            if re.search("^(test_|setUp|tearDown)", name):
+            if _TEST_METHOD_RE.search(name):
                 cname = ""
                 if 'self' in frame.f_locals:
                     cname = frame.f_locals['self'].__class__.__name__
@@ -58,7 +101,7 @@ def find_test_caller():
                     cname = frame.f_locals['cls'].__name__
                 caller_name = cname + ":" + name
                 break
-            elif re.search("^_run_cleanup", name):
+            elif _CLEANUP_RE.search(name):
                 is_cleanup = True
             elif name == 'main':
                 caller_name = 'main'
@@ -75,7 +118,7 @@ def find_test_caller():
                 # start looking for a real class name, and declare victory
                 # once we do.
                 if is_cleanup and cname:
-                    if not re.search("^RunTest", cname):
+                    if not _RUNTEST_RE.search(cname):
                         caller_name = cname + ":_run_cleanups"
                         break
         except Exception:
@@ -0,0 +1,190 @@
+# Copyright 2016 Cloudbase Solutions Srl
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Polling schedules shared by the status waiters.
+
+A waiter creates a Poller and calls its sleep() method instead of sleeping
+for a fixed interval between two checks. The delay strategy decides how
+long that is; the default one polls fast at first, backs off exponentially
+with jitter up to a cap, and jumps close to the expected completion time
+when earlier transitions of the same kind were recorded.
+"""
+
+import collections
+import math
+import random
+import threading
+import time
+
+from oslo_log import log as logging
+
+LOG = logging.getLogger(__name__)
+
+# The first delay is this fraction of the nominal interval, and delays
+# grow up to CAP_FACTOR times the nominal interval.
+INITIAL_FRACTION = 0.25
+CAP_FACTOR = 4
+BACKOFF_FACTOR = 2
+JITTER = 0.1
+# Fraction of the expected completion time the first hinted poll aims for.
+HINT_FRACTION = 0.8
+
+
+class TransitionStats(object):
+    """Histograms of how long transitions took, keyed by kind.
+
+    Durations are counted in power of two buckets, so the memory used does
+    not grow with the number of samples.
+    """
+
+    def __init__(self, min_samples=3):
+        self.min_samples = min_samples
+        self._histograms = collections.defaultdict(collections.Counter)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _bucket(duration):
+        if duration < 1:
+            return 0
+        return int(math.log(duration, 2)) + 1
+
+    def record(self, key, duration):
+        with self._lock:
+            self._histograms[key][self._bucket(duration)] += 1
+
+    def histogram(self, key):
+        """Return {bucket upper bound in seconds: count} for a key."""
+        with self._lock:
+            histogram = dict(self._histograms.get(key, {}))
+        return dict((2 ** bucket, count)
+                    for bucket, count in histogram.items())
+
+    def expected(self, key):
+        """Lower bound of the median duration, None without enough data."""
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if not histogram:
+                return None
+            total = sum(histogram.values())
+            if total < self.min_samples:
+                return None
+            seen = 0
+            for bucket in sorted(histogram):
+                seen += histogram[bucket]
+                if seen * 2 >= total:
+                    return 2 ** (bucket - 1) if bucket else 0
+
+
+STATS = TransitionStats()
+
+
+class FixedInterval(object):
+    """Always wait the nominal interval, the historical behavior."""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.min_delay = interval
+
+    def delays(self, expected=None):
+        while True:
+            yield self.interval, None
+
+
+class ExponentialBackoff(object):
+    """Fast first polls, then exponentially longer waits with jitter.
+
+    When the expected duration of the transition is known, the first
+    delays are stretched to land shortly before it.
+    """
+
+    def __init__(self, interval, initial_fraction=INITIAL_FRACTION,
+                 factor=BACKOFF_FACTOR, cap_factor=CAP_FACTOR,
+                 jitter=JITTER):
+        self.min_delay = interval * initial_fraction
+        self.cap = interval * cap_factor
+        self.factor = factor
+        self.jitter = jitter
+
+    def _jittered(self, delay):
+        return delay * (1 + random.uniform(-self.jitter, self.jitter))
+
+    def delays(self, expected=None):
+        """Yield (delay, hint) tuples.
+
+        The hint is the time, relative to the start of the wait, the
+        strategy would like the next poll to happen at, if any.
+        """
+        delay = self.min_delay
+        while True:
+            hint = None
+            if expected:
+                hint = expected * HINT_FRACTION
+            yield min(self._jittered(delay), self.cap), hint
+            delay = min(delay * self.factor, self.cap)
+
+
+class Poller(object):
+    """Sleeps between the checks of one wait.
+
+    :param interval: nominal polling interval (e.g. the build_interval).
+    :param key: kind of transition (e.g. 'volume:available'), used to
+                record and predict its duration.
+    :param timeout: the wait never sleeps past start + timeout.
+    :param strategy: delay strategy, ExponentialBackoff by default.
+    :param stats: TransitionStats used for the key.
+    :param start: start time of the wait, now by default.
+    """
+
+    def __init__(self, interval, key=None, timeout=None, strategy=None,
+                 stats=STATS, start=None):
+        self.key = key
+        self.timeout = timeout
+        self.stats = stats
+        self.strategy = strategy or ExponentialBackoff(interval)
+        self.start = time.time() if start is None else start
+        self.polls = 0
+        expected = stats.expected(key) if key else None
+        self._delays = self.strategy.delays(expected)
+
+    @property
+    def min_delay(self):
+        return self.strategy.min_delay
+
+    def next_delay(self):
+        delay, hint = next(self._delays)
+        elapsed = time.time() - self.start
+        if hint is not None and hint > elapsed + delay:
+            delay = hint - elapsed
+        if self.timeout is not None:
+            # Wake up for the timeout check, but never spin on it
+            delay = min(delay, max(self.timeout - elapsed, self.min_delay))
+        return delay
+
+    def next_poll_at(self):
+        """Time of the next check, for waiters that do not sleep() here."""
+        self.polls += 1
+        return time.time() + self.next_delay()
+
+    def sleep(self):
+        self.polls += 1
+        time.sleep(self.next_delay())
+
+    def done(self):
+        """Record the duration of a transition that completed."""
+        if self.key:
+            duration = time.time() - self.start
+            self.stats.record(self.key, duration)
+            LOG.debug('%s took %.1f s and %d polls', self.key, duration,
+                      self.polls + 1)
@@ -88,4 +88,4 @@ class Clocksource(manager.LisBase):
         self._initiate_linux_client(self.floating_ip['floatingip']['floating_ip_address'],
                                     self.ssh_user, self.keypair['private_key'])
         self.check_clocksource(self.linux_client)
-        self.servers_client.delete_server(self.instance['id'])
+        self.release_vm()
@@ -69,7 +69,7 @@ class KVP(manager.LisBase):
             self._log_console_output()
             raise
         self.check_kvp_basic(self.instance_name)
-        self.servers_client.delete_server(self.instance['id'])
+        self.release_vm()
 
     @test.attr(type=['smoke', 'core', 'kvp'])
     @test.services('compute', 'network')
@@ -84,4 +84,4 @@ class KVP(manager.LisBase):
         self.kvp_modify_value(self.instance_name, 'EEE', '999', '0')
         self.linux_client.kvp_verify_value('EEE', '999', '0')
         self.kvp_remove_value(self.instance_name, 'EEE', '999', '0')
-        self.servers_client.delete_server(self.instance['id'])
+        self.release_vm()
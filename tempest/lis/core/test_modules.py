@@ -116,7 +116,7 @@ class LisModules(manager.LisBase):
         self._initiate_linux_client(self.floating_ip['floatingip']['floating_ip_address'],
                                     self.ssh_user, self.keypair['private_key'])
         self.check_lis_modules()
-        self.servers_client.delete_server(self.instance['id'])
+        self.release_vm()
 
     @test.attr(type=['core', 'lis_modules'])
     @test.services('compute', 'network')
@@ -125,4 +125,4 @@ class LisModules(manager.LisBase):
         self._initiate_linux_client(self.floating_ip['floatingip']['floating_ip_address'],
                                     self.ssh_user, self.keypair['private_key'])
         self.reload_modules()
-        self.servers_client.delete_server(self.instance['id'])
+        self.release_vm()
@@ -102,7 +102,7 @@ class Numa(manager.LisBase):
         self._initiate_linux_client(self.floating_ip['floatingip']['floating_ip_address'],
                                     self.ssh_user, self.keypair['private_key'])
         self.check_numa_nodes(4, 1, 1)
-        self.servers_client.delete_server(self.instance['id'])
+        self.release_vm()
 
     @test.attr(type=['core', 'numa'])
     @test.services('compute', 'network')
@@ -114,4 +114,4 @@ class Numa(manager.LisBase):
         self._initiate_linux_client(self.floating_ip['floatingip']['floating_ip_address'],
                                     self.ssh_user, self.keypair['private_key'])
         self.check_numa_nodes(8, 4, 2)
-        self.servers_client.delete_server(self.instance['id'])
+        self.release_vm()
@@ -90,4 +90,4 @@ class IntegratedShutdown(manager.LisBase):
         self._initiate_linux_client(self.floating_ip['floatingip']['floating_ip_address'],
                                     self.ssh_user, self.keypair['private_key'])
         self.check_vcpu_offline()
-        self.servers_client.delete_server(self.instance['id'])
+        self.release_vm()
@@ -72,36 +72,28 @@ class StorageBase(manager.LisBase):
     def _test_storage(self, pos, vhd_type, exc_dsk_cnt, filesystem):
         self.spawn_vm()
         self.stop_vm(self.server_id)
-        if isinstance(pos, list):
-            for position in pos:
-                self.add_disk(self.instance_name, self.disk_type,
-                              position, vhd_type, self.sector_size)
-        else:
-            self.add_disk(self.instance_name, self.disk_type,
-                          pos, vhd_type, self.sector_size)
+        positions = pos if isinstance(pos, list) else [pos]
+        self.add_disks(self.instance_name, self.disk_type,
+                       positions, vhd_type, self.sector_size)
         self.start_vm(self.server_id)
 
         self._initiate_linux_client(self.floating_ip['floatingip']['floating_ip_address'],
                                     self.ssh_user, self.keypair['private_key'])
         self.format_disk(exc_dsk_cnt, filesystem)
-        self.servers_client.delete_server(self.instance['id'])
+        self.release_vm()
 
     def _test_large_disk(self, pos, vhd_type, exc_dsk_cnt, filesystem, size):
         self.spawn_vm()
         self.stop_vm(self.server_id)
-        if isinstance(pos, list):
-            for position in pos:
-                self.add_disk(self.instance_name, self.disk_type,
-                              position, vhd_type, self.sector_size, size)
-        else:
-            self.add_disk(self.instance_name, self.disk_type,
-                          pos, vhd_type, self.sector_size, size)
+        positions = pos if isinstance(pos, list) else [pos]
+        self.add_disks(self.instance_name, self.disk_type,
+                       positions, vhd_type, self.sector_size, size)
         self.start_vm(self.server_id)
 
         self._initiate_linux_client(self.floating_ip['floatingip']['floating_ip_address'],
                                     self.ssh_user, self.keypair['private_key'])
         self.format_disk(exc_dsk_cnt, filesystem)
-        self.servers_client.delete_server(self.instance['id'])
+        self.release_vm()
 
     def _test_add_passthrough(self, count, exc_dsk_cnt, filesystem):
         self.spawn_vm()
@@ -125,12 +117,12 @@ class StorageBase(manager.LisBase):
         finally:
             for disk in self.disks:
                 self.detach_passthrough(disk)
-        self.servers_client.delete_server(self.instance['id'])
+        self.release_vm()
 
     def _test_hot_add_passthrough(self, pos, exc_dsk_cnt, filesystem):
         self.spawn_vm()
         waiters.wait_for_server_status(
-            self.servers_client, self.server_id, 'ACTIVE')
+            self.vm_manager.servers_client, self.server_id, 'ACTIVE')
         if isinstance(pos, list):
             for position in pos:
                 self.add_pass_disk(self.instance_name, position)
@@ -139,7 +131,7 @@ class StorageBase(manager.LisBase):
         self._initiate_linux_client(self.floating_ip['floatingip']['floating_ip_address'],
                                     self.ssh_user, self.keypair['private_key'])
         self.format_disk(exc_dsk_cnt, filesystem)
-        self.servers_client.delete_server(self.instance['id'])
+        self.release_vm()
 
     def _test_hot_remove_passthrough(self, pos, vhd_type, exc_dsk_cnt):
         self.spawn_vm()
@@ -157,7 +149,7 @@ class StorageBase(manager.LisBase):
             self.detach_disk(self.instance_name, disk)
         disk_count = self.count_disks()
         self.assertEqual(disk_count, 1)
-        self.servers_client.delete_server(self.instance['id'])
+        self.release_vm()
 
     def _test_hot_add_storage(self, pos, vhd_type, exc_dsk_cnt, filesystem):
         self.add_keypair()
@@ -169,29 +161,21 @@ class StorageBase(manager.LisBase):
         waiters.wait_for_server_status(
             self.servers_client, server_id, 'ACTIVE')
 
-        if isinstance(pos, list):
-            for position in pos:
-                self.add_disk(self.instance_name, self.disk_type,
-                              position, vhd_type, self.sector_size)
-        else:
-            self.add_disk(self.instance_name, self.disk_type,
-                          pos, vhd_type, self.sector_size)
+        positions = pos if isinstance(pos, list) else [pos]
+        self.add_disks(self.instance_name, self.disk_type,
+                       positions, vhd_type, self.sector_size)
 
         self._initiate_linux_client(self.floating_ip['floatingip']['floating_ip_address'],
                                     self.ssh_user, self.keypair['private_key'])
         self.format_disk(exc_dsk_cnt, filesystem)
-        self.servers_client.delete_server(self.instance['id'])
+        self.release_vm()
 
     def _test_hot_remove(self, pos, vhd_type, exc_dsk_cnt):
         self.spawn_vm()
         self.stop_vm(self.server_id)
-        if isinstance(pos, list):
-            for position in pos:
-                self.add_disk(self.instance_name, self.disk_type,
-                              position, vhd_type, self.sector_size)
-        else:
-            self.add_disk(self.instance_name, self.disk_type,
-                          pos, vhd_type, self.sector_size)
+        positions = pos if isinstance(pos, list) else [pos]
+        self.add_disks(self.instance_name, self.disk_type,
+                       positions, vhd_type, self.sector_size)
         self.start_vm(self.server_id)
 
         self._initiate_linux_client(self.floating_ip['floatingip']['floating_ip_address'],
@@ -200,20 +184,16 @@ class StorageBase(manager.LisBase):
             self.detach_disk(self.instance_name, disk)
         disk_count = self.count_disks()
         self.assertEqual(disk_count, 1)
-        self.servers_client.delete_server(self.instance['id'])
+        self.release_vm()
 
     def _test_hot_swap(self, pos, vhd_type, exc_dsk_cnt, filesystem):
         self.spawn_vm()
         waiters.wait_for_server_status(
-            self.servers_client, self.server_id, 'ACTIVE')
+            self.vm_manager.servers_client, self.server_id, 'ACTIVE')
 
-        if isinstance(pos, list):
-            for position in pos:
-                self.add_disk(self.instance_name, self.disk_type,
-                              position, vhd_type, self.sector_size)
-        else:
-            self.add_disk(self.instance_name, self.disk_type,
-                          pos, vhd_type, self.sector_size)
+        positions = pos if isinstance(pos, list) else [pos]
+        self.add_disks(self.instance_name, self.disk_type,
+                       positions, vhd_type, self.sector_size)
 
         self._initiate_linux_client(self.floating_ip['floatingip']['floating_ip_address'],
                                     self.ssh_user, self.keypair['private_key'])
@@ -223,31 +203,23 @@ class StorageBase(manager.LisBase):
             self.detach_disk(self.instance_name, disk)
         disk_count = self.count_disks()
         self.assertEqual(disk_count, 1)
-        self.servers_client.delete_server(self.instance['id'])
+        self.release_vm()
 
     def _test_hot_swap_smp(self, pos, vhd_type, exc_dsk_cnt, filesystem):
         self.spawn_vm()
         waiters.wait_for_server_status(
-            self.servers_client, self.server_id, 'ACTIVE')
+            self.vm_manager.servers_client, self.server_id, 'ACTIVE')
         self._initiate_linux_client(self.floating_ip['floatingip']['floating_ip_address'],
                                     self.ssh_user, self.keypair['private_key'])
         vcpu_count = self.linux_client.get_number_of_vcpus()
         if vcpu_count < 2:
-            self.servers_client.stop_server(self.server_id)
-            waiters.wait_for_server_status(self.servers_client,
-                                           self.server_id, 'SHUTOFF')
+            self.stop_vm(self.server_id)
             self.change_cpu(self.instance_name, 4)
-            self.servers_client.start_server(self.server_id)
-            waiters.wait_for_server_status(self.servers_client,
-                                           self.server_id, 'ACTIVE')
+            self.start_vm(self.server_id)
 
-        if isinstance(pos, list):
-            for position in pos:
-                self.add_disk(self.instance_name, self.disk_type,
-                              position, vhd_type, self.sector_size)
-        else:
-            self.add_disk(self.instance_name, self.disk_type,
-                          pos, vhd_type, self.sector_size)
+        positions = pos if isinstance(pos, list) else [pos]
+        self.add_disks(self.instance_name, self.disk_type,
+                       positions, vhd_type, self.sector_size)
 
         self._initiate_linux_client(self.floating_ip['floatingip']['floating_ip_address'],
                                     self.ssh_user, self.keypair['private_key'])
@@ -257,7 +229,7 @@ class StorageBase(manager.LisBase):
             self.detach_disk(self.instance_name, disk)
         disk_count = self.count_disks()
         self.assertEqual(disk_count, 1)
-        self.servers_client.delete_server(self.instance['id'])
+        self.release_vm()
 
     def _test_pass_ide(self, pos, exc_dsk_cnt, filesystem):
         self.spawn_vm()
@@ -271,7 +243,7 @@ class StorageBase(manager.LisBase):
         self._initiate_linux_client(self.floating_ip['floatingip']['floating_ip_address'],
                                     self.ssh_user, self.keypair['private_key'])
         self.format_disk(exc_dsk_cnt, filesystem)
-        self.servers_client.delete_server(self.instance['id'])
+        self.release_vm()
 
     def _test_pass_offline(self, pos, exc_dsk_cnt, filesystem):
         self.spawn_vm()
@@ -289,7 +261,7 @@ class StorageBase(manager.LisBase):
             self.make_passthrough_offline(disk)
         disk_count = self.count_disks()
         self.assertEqual(disk_count, 1)
-        self.servers_client.delete_server(self.instance['id'])
+        self.release_vm()
 
     def _test_diff_disk(self, pos):
         self.spawn_vm()
@@ -302,7 +274,7 @@ class StorageBase(manager.LisBase):
         self.increase_disk_size()
         final_disk_size = self.get_parent_disk_size(self.disks[0])
         self.assertEqual(initial_disk_size, final_disk_size)
-        self.servers_client.delete_server(self.instance['id'])
+        self.release_vm()
 
     def _test_take_revert_snapshot(self):
         positions = [('SCSI', 1, 1), ('SCSI', 1, 2)]
@@ -326,7 +298,7 @@ class StorageBase(manager.LisBase):
         self.start_vm(self.server_id)
         result = self.linux_client.check_file_existence('snapshot_test')
         self.assertEqual(result, 0)
-        self.servers_client.delete_server(self.instance['id'])
+        self.release_vm()
 
     def _test_fixed_ide(self):
         position = ('IDE', 1, 1)
@@ -448,12 +420,12 @@ class Storage(StorageBase):
         self.add_iso(self.instance_name)
         self.start_vm(self.server_id)
         waiters.wait_for_server_status(
-            self.servers_client, self.server_id, 'ACTIVE')
+            self.vm_manager.servers_client, self.server_id, 'ACTIVE')
         self._initiate_linux_client(self.floating_ip['floatingip']['floating_ip_address'],
                                     self.ssh_user, self.keypair['private_key'])
 
         self.check_iso()
-        self.servers_client.delete_server(self.instance['id'])
+        self.release_vm()
 
     @test.attr(type=['smoke', 'core_storage'])
     @test.services('compute', 'network')
@@ -465,18 +437,18 @@ class Storage(StorageBase):
         self._initiate_linux_client(self.floating_ip['floatingip']['floating_ip_address'],
                                     self.ssh_user, self.keypair['private_key'])
         self.check_floppy()
-        self.servers_client.delete_server(self.instance['id'])
+        self.release_vm()
 
     @test.attr(type=['smoke', 'core_storage'])
     @test.services('compute', 'network')
     def test_export_import(self):
         self.spawn_vm()
         waiters.wait_for_server_status(
-            self.servers_client, self.server_id, 'ACTIVE')
+            self.vm_manager.servers_client, self.server_id, 'ACTIVE')
         self._initiate_linux_client(self.floating_ip['floatingip']['floating_ip_address'],
                                     self.ssh_user, self.keypair['private_key'])
         self.export_import(self.instance_name)
-        self.servers_client.delete_server(self.instance['id'])
+        self.release_vm()
 
 
 class TestVHD(StorageBase):
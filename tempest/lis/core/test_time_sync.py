@@ -34,6 +34,9 @@ SLEEP_TIME = 600    # 600 seconds
 
 class TimeSync(manager.LisBase):
 
+    # The guest clock restored from a checkpoint is behind the host
+    reuse_golden_vm = False
+
     def setUp(self):
         super(TimeSync, self).setUp()
         # Setup image and flavor the test instance
@@ -90,7 +93,7 @@ class TimeSync(manager.LisBase):
         self._initiate_linux_client(self.floating_ip['floatingip']['floating_ip_address'],
                                     self.ssh_user, self.keypair['private_key'])
         self.check_ntp_time()
-        self.servers_client.delete_server(self.instance['id'])
+        self.release_vm()
 
     @test.attr(type=['smoke', 'core', 'timesync'])
     @test.services('compute', 'network')
@@ -105,7 +108,7 @@ class TimeSync(manager.LisBase):
         exec_time = t1 - t0
         LOG.debug('Duration of get_host_time %s', exec_time)
         self.assertTrue(abs(vm_time - host_time) - exec_time < MAXIMUM_DELAY)
-        self.servers_client.delete_server(self.instance['id'])
+        self.release_vm()
 
     @test.attr(type=['smoke', 'core', 'timesync'])
     @test.services('compute', 'network')
@@ -124,4 +127,4 @@ class TimeSync(manager.LisBase):
         exec_time = t1 - t0
         LOG.debug('Duration of get_host_time %s', exec_time)
         self.assertTrue(abs(vm_time - host_time) - exec_time < MAXIMUM_DELAY)
-        self.servers_client.delete_server(self.instance['id'])
+        self.release_vm()
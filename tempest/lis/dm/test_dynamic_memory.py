@@ -66,7 +66,7 @@ class DynamicMemory(manager.LisBase):
                                     self.ssh_user, self.keypair['private_key'])
         self.linux_client.verify_lis_module('balloon')
         self.linux_client.verify_memory_hotadd_support()
-        self.servers_client.delete_server(self.instance['id'])
+        self.release_vm()
 
     @test.attr(type=['smoke', 'core', 'dynamic', 'memory'])
     @test.services('compute', 'network')
@@ -110,13 +110,13 @@ class DynamicMemory(manager.LisBase):
         host_memory_total = self.get_host_memory('total')
         host_memory_free = self.get_host_memory('free')
 
-        instance_memory_total = self.get_ram_status(
-            self.instance_name, 'MemoryAssigned')
-        instance_memory_demand = self.get_ram_status(
-            self.instance_name, 'MemoryDemand')
+        instance_memory = self.get_memory_status(self.instance_name)
+        instance_memory_total = instance_memory['MemoryAssigned']
+        instance_memory_demand = instance_memory['MemoryDemand']
 
-        guest_memory_total = self.linux_client.memory_check()
-        guest_memory_free = self.linux_client.memory_check('MemFree')
+        guest_state = self.linux_client.snapshot_state()
+        guest_memory_total = guest_state.memory('MemTotal')
+        guest_memory_free = guest_state.memory('MemFree')
         guest_memory_used = guest_memory_total - guest_memory_free
 
         instance_memory_total_progress.append(instance_memory_total)
@@ -131,13 +131,13 @@ class DynamicMemory(manager.LisBase):
 
         # Check memory status on the Hyper-V host and in the Linux guest
         # after memory stress has been applied
-        instance_memory_total = self.get_ram_status(
-            self.instance_name, 'MemoryAssigned')
-        instance_memory_demand = self.get_ram_status(
-            self.instance_name, 'MemoryDemand')
+        instance_memory = self.get_memory_status(self.instance_name)
+        instance_memory_total = instance_memory['MemoryAssigned']
+        instance_memory_demand = instance_memory['MemoryDemand']
 
-        guest_memory_total = self.linux_client.memory_check()
-        guest_memory_free = self.linux_client.memory_check('MemFree')
+        guest_state = self.linux_client.snapshot_state()
+        guest_memory_total = guest_state.memory('MemTotal')
+        guest_memory_free = guest_state.memory('MemFree')
         guest_memory_used = guest_memory_total - guest_memory_free
 
         instance_memory_total_progress.append(instance_memory_total)
@@ -152,8 +152,9 @@ class DynamicMemory(manager.LisBase):
         # Also check swap. If it is unusually high, there is something wrong
         # with hot add support and the test should fail
 
-        guest_memory_swap_total = self.linux_client.memory_check('SwapTotal')
-        guest_memory_swap_free = self.linux_client.memory_check('SwapFree')
+        guest_state = self.linux_client.snapshot_state()
+        guest_memory_swap_total = guest_state.memory('SwapTotal')
+        guest_memory_swap_free = guest_state.memory('SwapFree')
         guest_memory_swap_used = guest_memory_swap_total - \
             guest_memory_swap_free
 
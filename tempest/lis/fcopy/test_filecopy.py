@@ -85,7 +85,7 @@ class FileCopy(manager.LisBase):
         self.assertTrue(file_size == test_size,
                         "ERROR: File size {size} mismatch!".format(size=size))
 
-        self.servers_client.delete_server(self.instance['id'])
+        self.release_vm()
 
     @test.attr(type=['smoke', 'core', 'filecopy', 'guest', 'exists'])
     @test.services('compute', 'network')
@@ -127,7 +127,7 @@ class FileCopy(manager.LisBase):
         self.assertTrue(code == 0,
                         "ERROR {code}: Couldn't overwrite the file: {err}".format(code=code, err=err))
 
-        self.servers_client.delete_server(self.instance['id'])
+        self.release_vm()
 
     @test.attr(type=['smoke', 'core', 'filecopy', 'large'])
     @test.services('compute', 'network')
@@ -161,7 +161,7 @@ class FileCopy(manager.LisBase):
         self.assertTrue(file_size == test_size,
                         "ERROR: File size {size} mismatch!".format(size=size))
 
-        self.servers_client.delete_server(self.instance['id'])
+        self.release_vm()
 
     @test.attr(type=['core', 'fcopy'])
     @test.services('compute', 'network')
@@ -202,4 +202,4 @@ class FileCopy(manager.LisBase):
 
             # delete the file from the VM
             self.linux_client.delete_file('/tmp/{file}'.format(file=self.test_file))
-        self.servers_client.delete_server(self.instance['id'])
+        self.release_vm()
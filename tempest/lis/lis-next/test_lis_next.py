@@ -65,7 +65,8 @@ class LisNext(manager.LisBase):
             full_script_path = my_path + script_path
             cmd_params = []
             self.linux_client.execute_script(
-                script_name, cmd_params, full_script_path, destination)
+                script_name, cmd_params, full_script_path, destination,
+                output_file=self.script_output_file(script_name))
 
         except lib_exc.SSHExecCommandFailed as exc:
 
@@ -113,9 +114,9 @@ class LisNext(manager.LisBase):
             server=self.instance, name="lis-next-temp")
         # boot a second instance from the snapshot
         self.image_ref = snapshot_image['id']
-        self.servers_client.delete_server(self.instance['id'])
+        self.release_vm()
         self.spawn_vm()
         self._initiate_linux_client(self.floating_ip['floatingip']['floating_ip_address'],
                                     self.ssh_user, self.keypair['private_key'])
         self.check_lis_modules()
-        self.servers_client.delete_server(self.instance['id'])
\ No newline at end of file
+        self.release_vm()
\ No newline at end of file
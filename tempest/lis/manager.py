@@ -15,23 +15,35 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-import time
-import subprocess
+import atexit
+import glob
 import os
+import re
+import subprocess
+import tempfile
+import threading
+import time
+
 import netaddr
 from oslo_log import log
 from oslo_serialization import jsonutils as json
 import six
 
+from tempest import clients
 from tempest.common import compute
+from tempest.common import credentials_factory
+from tempest.common import fixed_network
 from tempest.common.utils import data_utils
 from tempest.common.utils.linux import remote_client
+from tempest.common.utils.linux import script_cache
+from tempest.common.utils import parallel
 from tempest.common import waiters
 from tempest import config
 from tempest import exceptions
 from tempest.lib.common.utils import misc as misc_utils
 from tempest.common.utils.windows.remote_client import WinRemoteClient
 from tempest.lib import exceptions as lib_exc
+from tempest.lis import vhd_templates
 from tempest.services.network import resources as net_resources
 import tempest.test
 
@@ -265,7 +277,9 @@ class ScenarioTest(tempest.test.BaseTestCase):
         return server
 
     def create_volume(self, size=None, name=None, snapshot_id=None,
-                      imageRef=None, volume_type=None):
+                      imageRef=None, volume_type=None, client=None):
+        if client is None:
+            client = self.volumes_client
         if name is None:
             name = data_utils.rand_name(self.__class__.__name__)
         kwargs = {'display_name': name,
@@ -274,23 +288,23 @@ class ScenarioTest(tempest.test.BaseTestCase):
                   'volume_type': volume_type}
         if size is not None:
             kwargs.update({'size': size})
-        volume = self.volumes_client.create_volume(**kwargs)['volume']
+        volume = client.create_volume(**kwargs)['volume']
 
-        self.addCleanup(self.volumes_client.wait_for_resource_deletion,
+        self.addCleanup(client.wait_for_resource_deletion,
                         volume['id'])
         self.addCleanup(self.delete_wrapper,
-                        self.volumes_client.delete_volume, volume['id'])
+                        client.delete_volume, volume['id'])
 
         # NOTE(e0ne): Cinder API v2 uses name instead of display_name
         if 'display_name' in volume:
             self.assertEqual(name, volume['display_name'])
         else:
             self.assertEqual(name, volume['name'])
-        waiters.wait_for_volume_status(self.volumes_client,
+        waiters.wait_for_volume_status(client,
                                        volume['id'], 'available')
         # The volume retrieved on creation has a non-up-to-date status.
         # Retrieval after it becomes active ensures correct details.
-        volume = self.volumes_client.show_volume(volume['id'])['volume']
+        volume = client.show_volume(volume['id'])['volume']
         return volume
 
     def _create_loginable_secgroup_rule(self, secgroup_id=None):
@@ -1501,13 +1515,186 @@ class ObjectStorageScenarioTest(ScenarioTest):
         self.assertEqual(obj, expected_data)
 
 
+# Creates the VHDs concurrently on a runspace pool, then attaches them to
+# the VM one by one, and outputs an {ok, output, error} result per disk in
+# the order of the disks
+PARALLEL_DISKS_TEMPLATE = """
+$folder = (Get-VMHost).VirtualHardDiskPath
+$disks = @(%(disks)s)
+$create = {
+    param($path, $disk)
+    $ErrorActionPreference = 'Stop'
+    if ($disk.fixed) {
+        New-VHD -Path $path -SizeBytes $disk.size -Fixed `
+            -LogicalSectorSizeBytes $disk.sector | Out-Null
+    } else {
+        New-VHD -Path $path -SizeBytes $disk.size -Dynamic `
+            -LogicalSectorSizeBytes $disk.sector | Out-Null
+    }
+    $path
+}
+$pool = [runspacefactory]::CreateRunspacePool(1, $disks.Count)
+$pool.Open()
+$runs = @(foreach ($disk in $disks) {
+    $path = Join-Path $folder $disk.name
+    $ps = [powershell]::Create().AddScript($create.ToString())
+    $ps = $ps.AddArgument($path).AddArgument($disk)
+    $ps.RunspacePool = $pool
+    @{ps = $ps; handle = $ps.BeginInvoke(); path = $path}
+})
+$diskResults = @(foreach ($run in $runs) {
+    $result = @{ok = $false; output = ''; error = ''}
+    try {
+        $output = @($run.ps.EndInvoke($run.handle))
+        if ($run.ps.HadErrors) {
+            $result.error = $run.ps.Streams.Error | Out-String
+        } elseif ($output[-1] -ne $run.path -or
+                  -not (Test-Path $run.path)) {
+            $result.error = 'New-VHD did not create ' + $run.path
+        } else {
+            $result.ok = $true
+            $result.output = $run.path
+        }
+    } catch {
+        $result.error = $_.Exception.Message
+    } finally {
+        $run.ps.Dispose()
+    }
+    $result
+})
+$pool.Close()
+for ($i = 0; $i -lt $disks.Count; $i++) {
+    $disk = $disks[$i]
+    $result = $diskResults[$i]
+    if (-not $result.ok) { continue }
+    try {
+        if ($disk.ctrl_type -eq 'SCSI') {
+            while (-not (Get-VMScsiController -VMName %(vm)s `
+                    -ControllerNumber $disk.ctrl_id `
+                    -ErrorAction SilentlyContinue)) {
+                Add-VMScsiController -VMName %(vm)s -ErrorAction Stop
+            }
+        }
+        Add-VMHardDiskDrive -VMName %(vm)s -ControllerType $disk.ctrl_type `
+            -ControllerNumber $disk.ctrl_id `
+            -ControllerLocation $disk.ctrl_loc `
+            -Path $result.output -ErrorAction Stop
+    } catch {
+        $result.ok = $false
+        $result.error = $_.Exception.Message
+        Remove-Item -Force $result.output -ErrorAction SilentlyContinue
+    }
+}
+$diskResults
+"""
+
+
+def _ps_quote(value):
+    return "'%s'" % six.text_type(value).replace("'", "''")
+
+
+def _ps_disk(name, fixed, size, sector_size, position):
+    if not re.match(r'^\d+[KMGT]B$', size):
+        raise ValueError("Unsupported disk size %s" % size)
+    ctrl_type, ctrl_id, ctrl_loc = position
+    return ('@{name = %s; fixed = %s; size = %s; sector = %d; '
+            'ctrl_type = %s; ctrl_id = %d; ctrl_loc = %d}' % (
+                _ps_quote(name), '$true' if fixed else '$false', size,
+                sector_size, _ps_quote(ctrl_type), ctrl_id, ctrl_loc))
+
+
+class GoldenVM(object):
+    """A VM booted once per image and flavor and restored for each test
+
+    The VM is checkpointed on its Hyper-V host once it is reachable over
+    SSH and has the guest scripts, tests get it back from that checkpoint
+    instead of booting a new one. It is owned by an account held for the
+    whole run, see golden_vm_owner(), so it outlives the test class which
+    booted it. Its resources are released by destroy().
+    """
+
+    CHECKPOINT = 'tempest-golden'
+
+    def __init__(self, key, image_stamp, manager):
+        self.key = key
+        self.image_stamp = image_stamp
+        self.manager = manager
+        self.keypair = None
+        self.server = None
+        self.floating_ip = None
+        self.instance_name = None
+        self.host_name = None
+        self._cleanups = []
+
+    def add_cleanup(self, function, *args, **kwargs):
+        self._cleanups.append((function, args, kwargs))
+
+    def destroy(self):
+        while self._cleanups:
+            function, args, kwargs = self._cleanups.pop()
+            try:
+                function(*args, **kwargs)
+            except lib_exc.NotFound:
+                pass
+            except Exception:
+                LOG.exception("Failed to clean up golden VM resource")
+
+
+# Idle golden VMs by (image_ref, flavor_ref), a leased one is taken out
+_golden_vms = {}
+_golden_vms_lock = threading.Lock()
+_golden_vm_owner = {}
+
+
+def golden_vm_owner():
+    """Credentials provider and clients of the owner of the golden VMs"""
+    with _golden_vms_lock:
+        if not _golden_vm_owner:
+            provider = credentials_factory.get_credentials_provider(
+                name='tempest-golden-vms',
+                identity_version=CONF.identity.auth_version)
+            _golden_vm_owner['provider'] = provider
+            _golden_vm_owner['manager'] = clients.Manager(
+                credentials=provider.get_primary_creds())
+        return _golden_vm_owner['provider'], _golden_vm_owner['manager']
+
+
+def destroy_golden_vms():
+    with _golden_vms_lock:
+        golden_vms = list(_golden_vms.values())
+        _golden_vms.clear()
+        owner = dict(_golden_vm_owner)
+        _golden_vm_owner.clear()
+    for golden in golden_vms:
+        golden.destroy()
+    if owner:
+        owner['provider'].clear_creds()
+
+
+atexit.register(destroy_golden_vms)
+
+
+def guest_script_directories():
+    """Directories of the script bundles the LIS tests run on guests"""
+    lis_dir = os.path.dirname(os.path.abspath(__file__))
+    return ([os.path.dirname(os.path.abspath(remote_client.__file__))] +
+            sorted(glob.glob(os.path.join(lis_dir, '*', 'scripts'))))
+
+
 class LisBase(ScenarioTest):
 
+    # Set to False by the tests which need a freshly booted VM, e.g. when
+    # the guest state restored from a checkpoint would skew their results
+    reuse_golden_vm = True
+
     def setUp(self):
         super(LisBase, self).setUp()
         self.host_username = CONF.host_credentials.host_user_name
         self.host_password = CONF.host_credentials.host_password
         self.script_folder = CONF.host_credentials.host_setupscripts_folder
+        self.golden_vm = None
+        # Client manager of the project owning the VM of spawn_vm
+        self.vm_manager = self.manager
 
     def _initiate_host_client(self, host_name):
         try:
@@ -1556,6 +1743,7 @@ class LisBase(ScenarioTest):
             self._log_console_output()
             raise
 
+        self.addCleanup(linux_client.close)
         return linux_client
 
     def _initiate_linux_client(self, server_or_ip, username, private_key):
@@ -1570,33 +1758,45 @@ class LisBase(ScenarioTest):
             raise exc
 
     def start_vm(self, vm_id):
-        self.servers_client.start_server(vm_id)
-        waiters.wait_for_server_status(self.servers_client, vm_id, 'ACTIVE')
+        servers_client = self.vm_manager.servers_client
+        servers_client.start_server(vm_id)
+        waiters.wait_for_server_status(servers_client, vm_id, 'ACTIVE')
 
     def save_vm(self, vm_id):
-        self.servers_client.suspend_server(vm_id)
-        waiters.wait_for_server_status(self.servers_client, vm_id, 'SUSPENDED')
+        servers_client = self.vm_manager.servers_client
+        servers_client.suspend_server(vm_id)
+        waiters.wait_for_server_status(servers_client, vm_id, 'SUSPENDED')
 
     def unsave_vm(self, vm_id):
-        self.servers_client.resume_server(vm_id)
-        waiters.wait_for_server_status(self.servers_client, vm_id, 'ACTIVE')
+        servers_client = self.vm_manager.servers_client
+        servers_client.resume_server(vm_id)
+        waiters.wait_for_server_status(servers_client, vm_id, 'ACTIVE')
 
     def pause_vm(self, vm_id):
-        self.servers_client.pause_server(vm_id)
-        waiters.wait_for_server_status(self.servers_client, vm_id, 'PAUSED')
+        servers_client = self.vm_manager.servers_client
+        servers_client.pause_server(vm_id)
+        waiters.wait_for_server_status(servers_client, vm_id, 'PAUSED')
 
     def unpause_vm(self, vm_id):
-        self.servers_client.unpause_server(vm_id)
-        waiters.wait_for_server_status(self.servers_client, vm_id, 'ACTIVE')
+        servers_client = self.vm_manager.servers_client
+        servers_client.unpause_server(vm_id)
+        waiters.wait_for_server_status(servers_client, vm_id, 'ACTIVE')
 
     def stop_vm(self, vm_id):
-        self.servers_client.stop_server(vm_id)
-        waiters.wait_for_server_status(self.servers_client, vm_id, 'SHUTOFF')
+        servers_client = self.vm_manager.servers_client
+        servers_client.stop_server(vm_id)
+        waiters.wait_for_server_status(servers_client, vm_id, 'SHUTOFF')
 
     def add_disk(self, instance_name, disk_type,
-                 position, vhd_type, sec_size, size='1GB'):
+                 position, vhd_type, sec_size, size='1GB',
+                 differencing=True):
         """Attach Disk to VM"""
 
+        if self._use_vhd_templates(vhd_type):
+            self.add_disks(instance_name, disk_type, [position], vhd_type,
+                           sec_size, size, differencing)
+            return
+
         ctrl_type, ctrl_id, ctrl_loc = position
         script_location = "%s%s" % (self.script_folder,
                                     'setupscripts\\attach-disk.ps1')
@@ -1617,6 +1817,123 @@ class LisBase(ScenarioTest):
         self.addCleanup(self.remove_disk, instance_name, disk_name)
         self.disks.append(disk_name)
 
+    def add_disks(self, instance_name, disk_type,
+                  positions, vhd_type, sec_size, size='1GB',
+                  differencing=True):
+        """Attach several disks to a VM in one host round trip
+
+        The VHDs are created concurrently, on a runspace pool of the host's
+        resident PowerShell, then attached one by one in the same command,
+        as Hyper-V applies the changes to a VM's configuration in turn. The
+        removal of the attached disks is registered as a single cleanup.
+        Disks of other types than Fixed and Dynamic are added one at a
+        time by add_disk.
+
+        With [lis] vhd_template_pool, the disks are made from the host's
+        templates instead, as differencing children unless differencing
+        is False, in which case they are copies of the templates.
+
+        :returns: list of {'disk': name, 'ok': bool, 'output': str,
+                  'error': str} dicts, in the order of the positions.
+        :raises: PowerShellCommandFailed if any disk failed to attach,
+                 once the attached ones are registered for cleanup.
+        """
+        if self._use_vhd_templates(vhd_type):
+            return self._add_template_disks(instance_name, disk_type,
+                                            positions, vhd_type, sec_size,
+                                            size, differencing)
+        if vhd_type not in ('Fixed', 'Dynamic'):
+            results = []
+            for position in positions:
+                self.add_disk(instance_name, disk_type, position, vhd_type,
+                              sec_size, size)
+                results.append({'disk': self.disks[-1], 'ok': True,
+                                'output': '', 'error': ''})
+            return results
+
+        disk_names = []
+        disks = []
+        for position in positions:
+            ctrl_type, ctrl_id, ctrl_loc = position
+            disk_name = '-'.join([instance_name, ctrl_type, str(ctrl_id),
+                                  str(ctrl_loc), vhd_type])
+            disk_names.append(disk_name + '.*')
+            disks.append(_ps_disk('%s.%s' % (disk_name, disk_type),
+                                  vhd_type == 'Fixed', size, sec_size,
+                                  position))
+
+        results = self.host_client.run_powershell_batch(
+            [PARALLEL_DISKS_TEMPLATE % {
+                'vm': _ps_quote(instance_name),
+                'disks': ', '.join(disks)}])[0]
+        if isinstance(results, dict):
+            results = [results]
+
+        attached = []
+        failed = []
+        for disk_name, result in zip(disk_names, results):
+            result['disk'] = disk_name
+            if result['ok']:
+                attached.append(disk_name)
+            else:
+                failed.append(result)
+        if attached:
+            self.addCleanup(self.remove_disks, instance_name, attached)
+            self.disks.extend(attached)
+        if failed:
+            raise exceptions.PowerShellCommandFailed(
+                command='New-VHD',
+                error='; '.join('%s: %s' % (result['disk'], result['error'])
+                                for result in failed))
+        return results
+
+    def _use_vhd_templates(self, vhd_type):
+        return (CONF.lis.vhd_template_pool and
+                vhd_type in ('Fixed', 'Dynamic'))
+
+    def _add_template_disks(self, instance_name, disk_type, positions,
+                            vhd_type, sec_size, size, differencing):
+        commands = []
+        disk_names = []
+        for position in positions:
+            ctrl_type, ctrl_id, ctrl_loc = position
+            disk_name = '-'.join([instance_name, ctrl_type, str(ctrl_id),
+                                  str(ctrl_loc), vhd_type])
+            disk_names.append(disk_name + '.*')
+            commands.append(vhd_templates.acquire_command(
+                instance_name, '%s.%s' % (disk_name, disk_type), position,
+                disk_type, vhd_type, sec_size, size, differencing))
+        results = self.host_client.run_powershell_batch(commands)
+
+        attached = []
+        failed = []
+        for disk_name, result in zip(disk_names, results):
+            result['disk'] = disk_name
+            if result['ok']:
+                attached.append(disk_name)
+            else:
+                failed.append(result)
+        if attached and differencing:
+            # Registered first to run last, once the children are removed
+            key = vhd_templates.template_key(disk_type, vhd_type, sec_size,
+                                             size)
+            self.addCleanup(self.release_vhd_templates,
+                            [key] * len(attached))
+        if attached:
+            self.addCleanup(self.remove_disks, instance_name, attached)
+            self.disks.extend(attached)
+        if failed:
+            raise exceptions.PowerShellCommandFailed(
+                command='New-VHD',
+                error='; '.join('%s: %s' % (result['disk'], result['error'])
+                                for result in failed))
+        return results
+
+    def release_vhd_templates(self, keys):
+        self.host_client.run_powershell_batch(
+            [vhd_templates.release_command(keys,
+                                           CONF.lis.vhd_template_keep)])
+
     def add_pass_disk(self, instance_name, position):
         """Create a passthrough disk and attach to VM"""
         ctrl_type, ctrl_id, ctrl_loc = position
@@ -1657,20 +1974,27 @@ class LisBase(ScenarioTest):
         self.addCleanup(self.remove_disk, instance_name, disk_name)
         self.disks.append(disk_name)
 
+    def _vm_volumes_client(self):
+        if CONF.volume_feature_enabled.api_v1:
+            return self.vm_manager.volumes_client
+        return self.vm_manager.volumes_v2_client
+
     def attach_passthrough(self, volume_id, device):
-        _, volume = self.servers_client.attach_volume(
+        _, volume = self.vm_manager.servers_client.attach_volume(
             self.server_id, volume_id, device='/dev/%s' % device)
         self.assertEqual(volume_id, volume["volumeAttachment"]["id"])
-        self.volumes_client.wait_for_volume_status(volume_id, 'in-use')
+        self._vm_volumes_client().wait_for_volume_status(volume_id, 'in-use')
         return volume_id
 
     def detach_passthrough(self, volume_id):
-        _, volume = self.servers_client.detach_volume(
+        _, volume = self.vm_manager.servers_client.detach_volume(
             self.server_id, volume_id)
-        self.volumes_client.wait_for_volume_status(volume_id, 'available')
+        self._vm_volumes_client().wait_for_volume_status(volume_id,
+                                                         'available')
 
     def add_passthrough_disk(self, device):
-        vol = self.create_volume()
+        # The volume belongs to the project of the VM
+        vol = self.create_volume(client=self._vm_volumes_client())
         try:
             return self.attach_passthrough(vol["id"], device)
         except Exception as exc:
@@ -1688,6 +2012,17 @@ class LisBase(ScenarioTest):
             hvServer=self.host_name,
             diskName=disk_name)
 
+    def remove_disks(self, instance_name, disk_names):
+        """Cleanup for temporary disks, in one host round trip"""
+
+        script_location = "%s%s" % (self.script_folder,
+                                    'setupscripts\\remove-disk.ps1')
+        self.host_client.run_powershell_batch(
+            ['& %s -vmName %s -hvServer %s -diskName %s' % (
+                _ps_quote(script_location), _ps_quote(instance_name),
+                _ps_quote(self.host_name), _ps_quote(disk_name))
+             for disk_name in disk_names])
+
     def detach_disk(self, instance_name, disk_name):
         """Detach a disk from a vm"""
 
@@ -1844,12 +2179,12 @@ class LisBase(ScenarioTest):
             Pool=pool)
 
     def get_cpu_settings(self, instance_name):
-        s_out = self.host_client.get_powershell_cmd_attribute(
-            'Get-VM', 'ProcessorCount',
+        vm = self.host_client.get_powershell_cmd_attributes(
+            'Get-VM', ['ProcessorCount'],
             ComputerName=self.host_name,
             VMName=instance_name)
 
-        return int(s_out)
+        return int(vm['ProcessorCount'])
 
     def change_cpu(self, instance_name, new_cpu_count):
         """Change the vcpu of a vm"""
@@ -1992,29 +2327,48 @@ class LisBase(ScenarioTest):
             DynamicMemoryEnabled='$false')
 
     def get_ram_settings(self, instance_name, memory_setting='Startup'):
-        s_out = self.host_client.get_powershell_cmd_attribute(
-            'Get-VMMemory', memory_setting,
+        memory = self.host_client.get_powershell_cmd_attributes(
+            'Get-VMMemory', [memory_setting],
             ComputerName=self.host_name,
             VMName=instance_name)
 
         # setting can be: Minimum, Startup, Maximum
 
-        memory_size = long(s_out)
+        memory_size = long(memory[memory_setting])
         memory_size = memory_size / 1024 / 1024
         return memory_size
 
     def get_ram_status(self, instance_name, status='MemoryDemand'):
-        s_out = self.host_client.get_powershell_cmd_attribute(
-            'Get-VM', status,
+        memory = self.host_client.get_powershell_cmd_attributes(
+            'Get-VM', [status],
             ComputerName=self.host_name,
             VMName=instance_name)
 
         # status can be: MemoryDemand, MemoryAssigned
 
-        memory_size = long(s_out)
+        memory_size = long(memory[status])
         memory_size = memory_size / 1024 / 1024
         return memory_size
 
+    def get_memory_status(self, instance_name):
+        """Read the memory status and settings of a VM in one round trip
+
+        Returns a dict with the MemoryAssigned, MemoryDemand, Minimum,
+        Startup and Maximum values of the VM, in MB.
+        """
+
+        vm_args = '-ComputerName {host} -VMName {vm}'.format(
+            host=self.host_name, vm=instance_name)
+        status, settings = self.host_client.run_powershell_batch([
+            'Get-VM %s | Select-Object MemoryAssigned,MemoryDemand' % vm_args,
+            'Get-VMMemory %s | Select-Object Minimum,Startup,Maximum' %
+            vm_args])
+
+        memory = dict(status)
+        memory.update(settings)
+        return dict((key, long(value) / 1024 / 1024)
+                    for key, value in memory.items())
+
     def set_ram_settings(self, instance_name, new_memory):
         self.host_client.run_powershell_cmd(
             'Set-VMMemory',
@@ -2210,6 +2564,20 @@ class LisBase(ScenarioTest):
         full_script_path = my_path + script_path
         self.linux_client.copy_over(full_script_path, destination)
 
+    def script_output_file(self, script_name):
+        """Local file collecting the output of a long running guest script
+
+        The file is named after the test and the process and starts empty,
+        so that reruns and concurrent workers do not mix their output.
+        """
+
+        output_file = os.path.join(
+            tempfile.gettempdir(),
+            '{0}-{1}-{2}.log'.format(self.id(), script_name, os.getpid()))
+        open(output_file, 'w').close()
+        LOG.info('Output of %s is written to %s', script_name, output_file)
+        return output_file
+
     def get_vm_time(self):
         unix_time = self.linux_client.get_unix_time()
         LOG.debug('VM unix time %s ', unix_time)
@@ -2267,6 +2635,11 @@ class LisBase(ScenarioTest):
     def add_keypair(self):
         self.keypair = self.create_keypair()
 
+    def _zone_kwargs(self):
+        if CONF.lis.availability_zone:
+            return {'availability_zone': CONF.lis.availability_zone}
+        return {}
+
     def boot_instance(self):
         # Create server with image and flavor from input scenario
         security_group = self._create_security_group()
@@ -2275,7 +2648,8 @@ class LisBase(ScenarioTest):
                                            image_id=self.image_ref,
                                            key_name=self.keypair['name'],
                                            security_groups=security_groups,
-                                           wait_until='ACTIVE')
+                                           wait_until='ACTIVE',
+                                           **self._zone_kwargs())
         self.instance_name = self.instance["OS-EXT-SRV-ATTR:instance_name"]
         self.host_name = self.instance["OS-EXT-SRV-ATTR:hypervisor_hostname"]
         self._initiate_host_client(self.host_name)
@@ -2294,8 +2668,198 @@ class LisBase(ScenarioTest):
             self.instance['id'])
 
     def spawn_vm(self):
+        # A test spawning a second VM gets a booted one
+        if (CONF.lis.golden_vm and self.reuse_golden_vm and
+                self.golden_vm is None):
+            self.lease_golden_vm()
+            return
         self.add_keypair()
         self.boot_instance()
         self.nova_floating_ip_create()
         self.nova_floating_ip_add()
         self.server_id = self.instance['id']
+
+    def release_vm(self):
+        """Delete the VM of spawn_vm, or hand the golden VM back"""
+        if self.golden_vm is None:
+            self.servers_client.delete_server(self.instance['id'])
+        else:
+            self.return_golden_vm()
+
+    def _image_stamp(self):
+        image = self.compute_images_client.show_image(self.image_ref)['image']
+        return image.get('updated')
+
+    def _boot_golden_vm(self, key, image_stamp):
+        provider, owner = golden_vm_owner()
+        golden = GoldenVM(key, image_stamp, owner)
+        try:
+            name = data_utils.rand_name('tempest-golden')
+            golden.keypair = owner.keypairs_client.create_keypair(
+                name=name)['keypair']
+            golden.add_cleanup(owner.keypairs_client.delete_keypair, name)
+
+            secgroups_client = owner.compute_security_groups_client
+            secgroup = secgroups_client.create_security_group(
+                name=name, description=name + " description")['security_group']
+            golden.add_cleanup(secgroups_client.delete_security_group,
+                               secgroup['id'])
+            for rule in ({'ip_protocol': 'tcp', 'from_port': 22,
+                          'to_port': 22, 'cidr': '0.0.0.0/0'},
+                         {'ip_protocol': 'icmp', 'from_port': -1,
+                          'to_port': -1, 'cidr': '0.0.0.0/0'}):
+                owner.compute_security_group_rules_client.\
+                    create_security_group_rule(parent_group_id=secgroup['id'],
+                                               **rule)
+
+            tenant_network = fixed_network.get_tenant_network(
+                provider, owner.compute_networks_client,
+                CONF.compute.fixed_network_name)
+            body, _ = compute.create_test_server(
+                owner, tenant_network=tenant_network,
+                name=name, flavor=self.flavor_ref, image_id=self.image_ref,
+                key_name=name, security_groups=[{'name': name}],
+                **self._zone_kwargs())
+            golden.add_cleanup(waiters.wait_for_server_termination,
+                               owner.servers_client, body['id'])
+            golden.add_cleanup(owner.servers_client.delete_server, body['id'])
+            waiters.wait_for_server_status(owner.servers_client, body['id'],
+                                           'ACTIVE')
+            golden.server = owner.servers_client.show_server(
+                body['id'])['server']
+            golden.instance_name = golden.server[
+                "OS-EXT-SRV-ATTR:instance_name"]
+            golden.host_name = golden.server[
+                "OS-EXT-SRV-ATTR:hypervisor_hostname"]
+
+            golden.floating_ip = owner.floating_ips_client.create_floatingip(
+                floating_network_id=CONF.network.public_network_id)
+            golden.add_cleanup(owner.floating_ips_client.delete_floatingip,
+                               golden.floating_ip['floatingip']['id'])
+            owner.compute_floating_ips_client.associate_floating_ip_to_server(
+                golden.floating_ip['floatingip']['floating_ip_address'],
+                body['id'])
+
+            # Only checkpoint a guest which finished booting, with the
+            # scripts the tests run on it
+            linux_client = self.get_remote_client(
+                golden.floating_ip['floatingip']['floating_ip_address'],
+                private_key=golden.keypair['private_key'])
+            for directory in guest_script_directories():
+                linux_client.deploy_scripts(script_cache.get_bundle(directory))
+            self._initiate_host_client(golden.host_name)
+            self.take_snapshot(golden.instance_name, GoldenVM.CHECKPOINT)
+        except Exception:
+            golden.destroy()
+            raise
+        return golden
+
+    def lease_golden_vm(self):
+        """Restore the golden VM of the image and flavor for this test
+
+        The golden VM is booted and checkpointed on first use, and again
+        when the image was updated since then. spawn_vm attributes are set
+        as if the VM had been booted for the test, and vm_manager to the
+        clients of the owner of the VM. The clients of the test are left
+        to its own project.
+        """
+        key = (self.image_ref, self.flavor_ref)
+        image_stamp = self._image_stamp()
+        with _golden_vms_lock:
+            golden = _golden_vms.pop(key, None)
+        if golden is not None and golden.image_stamp != image_stamp:
+            LOG.info("Image %s changed, refreshing its golden VM",
+                     self.image_ref)
+            golden.destroy()
+            golden = None
+        if golden is None:
+            golden = self._boot_golden_vm(key, image_stamp)
+        else:
+            try:
+                self._initiate_host_client(golden.host_name)
+                self.revert_snapshot(golden.instance_name,
+                                     GoldenVM.CHECKPOINT)
+                self.host_client.run_powershell_cmd(
+                    'Start-VM',
+                    ComputerName=golden.host_name,
+                    Name=golden.instance_name)
+            except Exception:
+                golden.destroy()
+                raise
+        self.golden_vm = golden
+        self.addCleanup(self.return_golden_vm)
+
+        self.vm_manager = golden.manager
+        self.keypair = golden.keypair
+        self.instance = golden.server
+        self.instance_name = golden.instance_name
+        self.host_name = golden.host_name
+        self.floating_ip = golden.floating_ip
+        self.server_id = golden.server['id']
+
+    def return_golden_vm(self):
+        """Give the golden VM back, unless the test changed it in nova"""
+        golden, self.golden_vm = self.golden_vm, None
+        if golden is None:
+            return
+        self.vm_manager = self.manager
+        try:
+            server = golden.manager.servers_client.show_server(
+                golden.server['id'])['server']
+        except lib_exc.NotFound:
+            server = {'id': golden.server['id'], 'status': 'DELETED'}
+        if server['status'] == 'ACTIVE':
+            with _golden_vms_lock:
+                if golden.key not in _golden_vms:
+                    _golden_vms[golden.key] = golden
+                    return
+        else:
+            LOG.info("Golden VM %s left %s, it will be booted again",
+                     server['id'], server['status'])
+        golden.destroy()
+
+    def spawn_vms(self, count, availability_zone=None):
+        """Boot several servers at once and return ready ssh clients
+
+        The servers share a new keypair and security group. They are booted
+        concurrently, waited on with a single batched status poll and get
+        their floating IPs in parallel.
+
+        @param count number of servers to spawn
+        @param availability_zone optional zone (or zone:host) to boot in
+        @return a list of (server, RemoteClient) tuples, the server dict
+                carries its address under 'floating_ip'
+        """
+        self.add_keypair()
+        security_group = self._create_security_group()
+        kwargs = self._zone_kwargs()
+        if availability_zone is not None:
+            kwargs['availability_zone'] = availability_zone
+
+        def boot(index):
+            return self.create_server(
+                flavor=self.flavor_ref,
+                image_id=self.image_ref,
+                key_name=self.keypair['name'],
+                security_groups=[{'name': security_group['name']}],
+                **kwargs)
+
+        server_ids = [server['id'] for server in
+                      parallel.run_parallel(boot, range(count))]
+        servers = waiters.wait_for_servers_status(
+            self.servers_client, server_ids, 'ACTIVE')
+
+        def connect(server):
+            floating_ip = self.floating_ips_client.create_floatingip(
+                floating_network_id=CONF.network.public_network_id)
+            self.addCleanup(self.delete_wrapper,
+                            self.floating_ips_client.delete_floatingip,
+                            floating_ip['floatingip']['id'])
+            address = floating_ip['floatingip']['floating_ip_address']
+            self.compute_floating_ips_client.associate_floating_ip_to_server(
+                address, server['id'])
+            server['floating_ip'] = address
+            return server, self.get_remote_client(address)
+
+        return parallel.run_parallel(
+            connect, [servers[server_id] for server_id in server_ids])
@@ -583,7 +583,7 @@ class Basic(Network):
         self.security_group = self._create_security_group()
         self.boot_instance()
         self.verify_ssh()
-        self.servers_client.delete_server(self.instance['id'])
+        self.release_vm()
 
     @test.services('compute', 'network')
     def test_external_network(self):
@@ -94,7 +94,7 @@ class nmi(manager.LisBase):
                                     self.ssh_user, self.keypair['private_key'])
         self.send_nmi_interrupt(self.instance_name)
         self.check_nmi_interrupt()
-        self.servers_client.delete_server(self.instance['id'])
+        self.release_vm()
 
     @test.attr(type=['smoke', 'nmi'])
     @test.services('compute')
@@ -115,7 +115,7 @@ class nmi(manager.LisBase):
         self.unpause_vm(self.server_id)
         self._initiate_linux_client(self.floating_ip['floatingip']['floating_ip_address'],
                                     self.ssh_user, self.keypair['private_key'])
-        self.servers_client.delete_server(self.instance['id'])
+        self.release_vm()
 
     @test.attr(type=['smoke', 'nmi'])
     @test.services('compute')
@@ -124,4 +124,4 @@ class nmi(manager.LisBase):
         self._initiate_linux_client(self.floating_ip['floatingip']['floating_ip_address'],
                                     self.ssh_user, self.keypair['private_key'])
         self.send_nmi_unprivileged(self.instance_name)
-        self.servers_client.delete_server(self.instance['id'])
+        self.release_vm()
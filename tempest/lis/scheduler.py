@@ -0,0 +1,195 @@
+# Copyright 2016 Cloudbase Solutions Srl
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Host aware partitioning of the LIS tests over the test workers.
+
+Reads the test ids listed by lis-setup/get-tests.sh on stdin and writes,
+for every worker, the tests it runs and a tempest configuration booting
+their VMs on the Hyper-V host the worker is bound to.
+
+The workers are shared among the hosts in proportion to their capacity,
+read with Get-VMHost. The test classes, which keep their tests together
+as testr does, are then packed on the workers longest first (LPT), using
+the durations of the previous runs recorded by testr.
+"""
+
+import argparse
+import collections
+import os
+import re
+import sys
+
+from six.moves import configparser
+
+try:
+    import anydbm as dbm
+except ImportError:
+    import dbm
+
+from tempest.common.utils import parallel
+from tempest.common.utils.windows.remote_client import WinRemoteClient
+from tempest import config
+
+CONF = config.CONF
+
+# Assumed duration of the tests which never ran, in seconds
+DEFAULT_DURATION = 300.0
+
+Worker = collections.namedtuple('Worker', ['host', 'load', 'tests'])
+
+
+def test_class(test_id):
+    """The class of a test id, which also drops its [attributes]."""
+    return re.sub(r'\[.*\]$', '', test_id).rsplit('.', 1)[0]
+
+
+def load_durations(path):
+    """Durations of the tests from a testr times.dbm, by test id."""
+    if not os.path.exists(path):
+        return {}
+    times = dbm.open(path, 'r')
+    try:
+        return dict((key, float(times[key])) for key in times.keys())
+    finally:
+        times.close()
+
+
+def host_capacities(hosts, username, password):
+    """Logical processors and memory of the hosts, from Get-VMHost.
+
+    :returns: dict mapping each host to a (processors, memory) tuple.
+    """
+    def capacity(host):
+        client = WinRemoteClient(host, username, password)
+        attributes = client.get_powershell_cmd_attributes(
+            'Get-VMHost', ['LogicalProcessorCount', 'MemoryCapacity'],
+            ComputerName=host)
+        return (int(attributes['LogicalProcessorCount']),
+                int(attributes['MemoryCapacity']))
+
+    return dict(zip(hosts, parallel.run_parallel(capacity, hosts)))
+
+
+def share_workers(capacities, workers):
+    """Number of workers of every host, in proportion to its capacity.
+
+    The capacity of a host is the smaller of its shares of the processors
+    and of the memory of all the hosts. Every host gets a worker when
+    there are enough of them.
+
+    :returns: dict mapping each host to its number of workers.
+    """
+    total_cpus = float(sum(cpus for cpus, _ in capacities.values()))
+    total_memory = float(sum(memory for _, memory in capacities.values()))
+    weights = dict((host, min(cpus / total_cpus, memory / total_memory))
+                   for host, (cpus, memory) in capacities.items())
+    total_weight = sum(weights.values())
+    hosts = sorted(capacities, key=lambda host: -weights[host])
+
+    # Largest remainder apportionment
+    quotas = dict((host, workers * weights[host] / total_weight)
+                  for host in hosts)
+    shares = dict((host, int(quotas[host])) for host in hosts)
+    left = workers - sum(shares.values())
+    for host in sorted(hosts, key=lambda host: int(quotas[host]) -
+                       quotas[host])[:left]:
+        shares[host] += 1
+    if workers >= len(hosts):
+        for host in hosts:
+            if not shares[host]:
+                donor = max(hosts, key=lambda host: shares[host])
+                shares[donor] -= 1
+                shares[host] += 1
+    return shares
+
+
+def partition(test_ids, durations, shares):
+    """Pack the test classes on the workers, longest first.
+
+    :param test_ids: ids of the tests to run.
+    :param durations: dict of the known durations of the tests.
+    :param shares: dict mapping each host to its number of workers.
+    :returns: list of Worker tuples.
+    """
+    known = sorted(durations.values())
+    default = known[len(known) // 2] if known else DEFAULT_DURATION
+    classes = collections.OrderedDict()
+    for test_id in test_ids:
+        tests = classes.setdefault(test_class(test_id), [])
+        tests.append(test_id)
+    units = sorted(classes.values(), key=lambda tests: -sum(
+        durations.get(test_id, default) for test_id in tests))
+
+    workers = [Worker(host, [0.0], [])
+               for host in sorted(shares) for _ in range(shares[host])]
+    for tests in units:
+        worker = min(workers, key=lambda worker: worker.load[0])
+        worker.load[0] += sum(durations.get(test_id, default)
+                              for test_id in tests)
+        worker.tests.extend(tests)
+    return [Worker(packed.host, packed.load[0], packed.tests)
+            for packed in workers]
+
+
+def write_worker(worker, index, output_dir, config_file, zone):
+    """Write the test list and the configuration of a worker."""
+    with open(os.path.join(output_dir, 'worker-%d.txt' % index), 'w') as f:
+        f.writelines(test_id + '\n' for test_id in worker.tests)
+
+    parser = configparser.RawConfigParser()
+    parser.read(config_file)
+    if not parser.has_section('lis'):
+        parser.add_section('lis')
+    parser.set('lis', 'availability_zone', '%s:%s' % (zone, worker.host))
+    with open(os.path.join(output_dir, 'worker-%d.conf' % index), 'w') as f:
+        parser.write(f)
+
+
+def parse_args(args=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--workers', type=int, required=True,
+                        help='Number of test workers.')
+    parser.add_argument('--hosts', required=True,
+                        help='Comma separated Hyper-V hosts to run on.')
+    parser.add_argument('--zone', default='nova',
+                        help='Availability zone of the hosts.')
+    parser.add_argument('--times', default='.testrepository/times.dbm',
+                        help='testr database of the test durations.')
+    parser.add_argument('--config-file', default='etc/tempest.conf',
+                        help='Tempest configuration the workers start '
+                             'from.')
+    parser.add_argument('--output-dir', default='.',
+                        help='Directory of the worker files.')
+    return parser.parse_args(args)
+
+
+def main(args=None):
+    opts = parse_args(args)
+    hosts = opts.hosts.split(',')
+    test_ids = [line.strip() for line in sys.stdin if line.strip()]
+    capacities = host_capacities(hosts, CONF.host_credentials.host_user_name,
+                                 CONF.host_credentials.host_password)
+    workers = partition(test_ids, load_durations(opts.times),
+                        share_workers(capacities, opts.workers))
+    for index, worker in enumerate(workers):
+        write_worker(worker, index, opts.output_dir, opts.config_file,
+                     opts.zone)
+        print('worker-%d: %s, %d tests, %.0fs' % (
+            index, worker.host, len(worker.tests), worker.load))
+    print('makespan: %.0fs' % max(worker.load for worker in workers))
+
+
+if __name__ == '__main__':
+    main()
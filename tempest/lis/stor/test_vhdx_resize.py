@@ -72,8 +72,10 @@ class StorageResize(manager.LisBase):
     def _create_vm_with_disk(self, pos, vhd_type, size, exc_dsk_cnt, filesys):
         self.spawn_vm()
         self.stop_vm(self.server_id)
+        # Differencing disks can not be shrunk, the disk must stand alone
         self.add_disk(self.instance_name, self.disk_type,
-                      pos, vhd_type, self.sector_size, size)
+                      pos, vhd_type, self.sector_size, size,
+                      differencing=False)
         self.start_vm(self.server_id)
 
         self._initiate_linux_client(
@@ -0,0 +1,213 @@
+# Copyright 2016 Cloudbase Solutions Srl
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Pool of VHD(X) templates kept on the Hyper-V hosts.
+
+Creating a fixed disk zero fills it, which takes most of the time of the
+storage tests. The pool builds one template per format, type, sector
+size and size in a folder of the host's virtual hard disk path, and the
+test disks are made from it: a differencing child, which is instant, or
+a copy where the test needs a standalone disk, e.g. to shrink it.
+
+The templates are listed in a manifest.json next to them, with the
+number of differencing children using each one. As the test workers
+share them, the manifest is only read and written under a host wide
+mutex, held for that alone, and a template is built, attached from and
+removed under a mutex of its own, so that building one does not hold
+up the disks of the others.
+"""
+
+import re
+
+import six
+
+TEMPLATE_FOLDER = 'tempest-templates'
+MUTEX_NAME = 'Global\\tempest-vhd-templates'
+TEMPLATE_MUTEX_PREFIX = 'Global\\tempest-vhd-template-'
+
+# Update-Manifest runs a script block on the manifest, under MUTEX_NAME,
+# and outputs what the block does
+_MANIFEST = """
+$ErrorActionPreference = 'Stop'
+$folder = Join-Path (Get-VMHost).VirtualHardDiskPath %(folder)s
+New-Item -ItemType Directory -Force -Path $folder | Out-Null
+$manifestPath = Join-Path $folder 'manifest.json'
+
+function Lock-Mutex($name) {
+    $mutex = New-Object System.Threading.Mutex($false, $name)
+    [void]$mutex.WaitOne()
+    $mutex
+}
+
+function Update-Manifest([scriptblock]$update) {
+    $mutex = Lock-Mutex %(mutex)s
+    try {
+        $manifest = @{}
+        if (Test-Path $manifestPath) {
+            $stored = Get-Content -Raw $manifestPath | ConvertFrom-Json
+            foreach ($property in $stored.PSObject.Properties) {
+                $manifest[$property.Name] = $property.Value
+            }
+        }
+        & $update $manifest
+        $manifest | ConvertTo-Json | Set-Content $manifestPath
+    } finally {
+        $mutex.ReleaseMutex()
+    }
+}
+%(body)s
+"""
+
+_ACQUIRE = """
+$result = @{ok = $true; output = ''; error = ''}
+$key = %(key)s
+$templateMutex = Lock-Mutex (%(template_mutex)s + $key)
+try {
+    $template = Update-Manifest { param($manifest) $manifest[$key] }
+    if (-not $template -or -not (Test-Path $template.path)) {
+        $path = Join-Path $folder ($key + '.' + %(format)s)
+        Remove-Item -Force $path -ErrorAction SilentlyContinue
+        New-VHD -Path $path -SizeBytes %(size)s -%(type)s `
+            -LogicalSectorSizeBytes %(sector_size)d | Out-Null
+        $template = New-Object PSObject -Property @{path = $path; refs = 0}
+        Update-Manifest {
+            param($manifest)
+            $manifest[$key] = $template
+        } | Out-Null
+    }
+    $clone = Join-Path (Get-VMHost).VirtualHardDiskPath %(name)s
+    if (%(differencing)s) {
+        New-VHD -Path $clone -ParentPath $template.path `
+            -Differencing | Out-Null
+    } else {
+        Copy-Item $template.path $clone
+    }
+    try {
+        if (%(scsi)s) {
+            while (-not (Get-VMScsiController -VMName %(vm)s `
+                    -ControllerNumber %(ctrl_id)d `
+                    -ErrorAction SilentlyContinue)) {
+                Add-VMScsiController -VMName %(vm)s
+            }
+        }
+        Add-VMHardDiskDrive -VMName %(vm)s -ControllerType %(ctrl_type)s `
+            -ControllerNumber %(ctrl_id)d -ControllerLocation %(ctrl_loc)d `
+            -Path $clone
+    } catch {
+        Remove-Item -Force $clone -ErrorAction SilentlyContinue
+        throw
+    }
+    # Only an attached child is counted, release_command drops it
+    if (%(differencing)s) {
+        Update-Manifest {
+            param($manifest)
+            $manifest[$key].refs += 1
+        } | Out-Null
+    }
+    $result.output = $clone
+} catch {
+    $result.ok = $false
+    $result.error = $_.Exception.Message
+} finally {
+    $templateMutex.ReleaseMutex()
+}
+$result
+"""
+
+_RELEASE = """
+foreach ($key in @(%(keys)s)) {
+    $templateMutex = Lock-Mutex (%(template_mutex)s + $key)
+    try {
+        Update-Manifest {
+            param($manifest)
+            $template = $manifest[$key]
+            if ($template) {
+                $template.refs = [Math]::Max(0, $template.refs - 1)
+                if (-not %(keep)s -and $template.refs -eq 0) {
+                    Remove-Item -Force $template.path `
+                        -ErrorAction SilentlyContinue
+                    $manifest.Remove($key)
+                }
+            }
+        } | Out-Null
+    } finally {
+        $templateMutex.ReleaseMutex()
+    }
+}
+"""
+
+
+def _quote(value):
+    return "'%s'" % six.text_type(value).replace("'", "''")
+
+
+def _bool(value):
+    return '$true' if value else '$false'
+
+
+def template_key(disk_type, vhd_type, sector_size, size):
+    """Name of the template of a kind of disk, e.g. vhdx-Fixed-4096-1GB."""
+    if not re.match(r'^\d+[KMGT]B$', size):
+        raise ValueError("Unsupported disk size %s" % size)
+    return '%s-%s-%d-%s' % (disk_type, vhd_type, sector_size, size)
+
+
+def acquire_command(instance_name, disk_name, position, disk_type, vhd_type,
+                    sector_size, size, differencing):
+    """PowerShell attaching a disk made from its template to a VM.
+
+    The template is built the first time it is needed. The command
+    outputs an {ok, output, error} result, the output being the path of
+    the new disk.
+
+    :param disk_name: file name of the new disk, in the host's virtual
+                      hard disk path.
+    :param differencing: make a differencing child of the template rather
+                         than a copy.
+    """
+    ctrl_type, ctrl_id, ctrl_loc = position
+    body = _ACQUIRE % {
+        'key': _quote(template_key(disk_type, vhd_type, sector_size, size)),
+        'format': _quote(disk_type),
+        'size': size,
+        'type': {'Fixed': 'Fixed', 'Dynamic': 'Dynamic'}[vhd_type],
+        'sector_size': sector_size,
+        'name': _quote(disk_name),
+        'differencing': _bool(differencing),
+        'scsi': _bool(ctrl_type == 'SCSI'),
+        'vm': _quote(instance_name),
+        'ctrl_type': ctrl_type,
+        'ctrl_id': ctrl_id,
+        'ctrl_loc': ctrl_loc,
+        'template_mutex': _quote(TEMPLATE_MUTEX_PREFIX)}
+    return _with_manifest(body)
+
+
+def release_command(keys, keep):
+    """PowerShell dropping a differencing child of each template key.
+
+    :param keep: keep the templates nothing uses anymore, for the next
+                 runs.
+    """
+    return _with_manifest(_RELEASE % {
+        'keys': ', '.join(_quote(key) for key in keys),
+        'keep': _bool(keep),
+        'template_mutex': _quote(TEMPLATE_MUTEX_PREFIX)})
+
+
+def _with_manifest(body):
+    return _MANIFEST % {'mutex': _quote(MUTEX_NAME),
+                        'folder': _quote(TEMPLATE_FOLDER),
+                        'body': body}
@@ -83,4 +83,4 @@ class Vmbus(manager.LisBase):
         self._initiate_linux_client(self.floating_ip['floatingip']['floating_ip_address'],
                                     self.ssh_user, self.keypair['private_key'])
         self.check_vmbus_version()
-        self.servers_client.delete_server(self.instance['id'])
+        self.release_vm()
@@ -12,6 +12,7 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 
+import collections
 import multiprocessing
 import os
 import signal
@@ -31,6 +32,8 @@ from tempest import config
 from tempest import exceptions
 from tempest.lib.common import ssh
 from tempest.stress import cleanup
+from tempest.stress import schedule
+from tempest.stress import statistics
 
 CONF = config.CONF
 
@@ -113,6 +116,31 @@ def terminate_all_processes(check_interval=20):
         process['process'].join()
 
 
+def _thread_count(test, default_thread_num):
+    """Number of worker processes of an action.
+
+    Open loop actions, which have a target rate, default to a pool sized
+    to sustain that rate given their expected latency.
+    """
+    if 'threads' in test:
+        return test['threads']
+    if 'rate' in test:
+        return schedule.pool_size(test['rate'],
+                                  test.get('expected_latency', 1))
+    return default_thread_num
+
+
+def _schedule(test, p_number, threads):
+    """Arrival schedule of a worker of an open loop action, else None."""
+    if 'rate' not in test:
+        return None
+    return schedule.ArrivalSchedule(
+        float(test['rate']) / threads,
+        arrival=test.get('arrival', 'constant'),
+        ramp_up=test.get('ramp_up', 0),
+        phase=float(p_number) / threads)
+
+
 def stress_openstack(tests, duration, max_runs=None, stop_on_error=False):
     """Workload driver. Executes an action function against a nova-cluster."""
     admin_manager = credentials.AdminManager()
@@ -127,6 +155,11 @@ def stress_openstack(tests, duration, max_runs=None, stop_on_error=False):
         computes = _get_compute_nodes(controller, ssh_user, ssh_key)
         for node in computes:
             do_ssh("rm -f %s" % logfiles, node, ssh_user, ssh_key)
+    # One statistics slot per worker process, allocated before any of them
+    # is forked
+    shared_statistics = statistics.SharedStatistics(
+        sum(_thread_count(test, default_thread_num) for test in tests))
+    workers = 0
     skip = False
     for test in tests:
         for service in test.get('required_services', []):
@@ -139,7 +172,8 @@ def stress_openstack(tests, duration, max_runs=None, stop_on_error=False):
             manager = admin_manager
         else:
             manager = credentials.ConfiguredUserManager()
-        for p_number in moves.xrange(test.get('threads', default_thread_num)):
+        threads = _thread_count(test, default_thread_num)
+        for p_number in moves.xrange(threads):
             if test.get('use_isolated_tenants', False):
                 username = data_utils.rand_name("stress_user")
                 tenant_name = data_utils.rand_name("stress_tenant")
@@ -182,17 +216,17 @@ def stress_openstack(tests, duration, max_runs=None, stop_on_error=False):
             LOG.debug("calling Target Object %s" %
                       test_run.__class__.__name__)
 
-            mp_manager = multiprocessing.Manager()
-            shared_statistic = mp_manager.dict()
-            shared_statistic['runs'] = 0
-            shared_statistic['fails'] = 0
+            shared_statistic = shared_statistics.worker(workers)
+            workers += 1
 
+            arrivals = _schedule(test, p_number, threads)
             p = multiprocessing.Process(target=test_run.execute,
-                                        args=(shared_statistic,))
+                                        args=(shared_statistic, arrivals))
 
             process = {'process': p,
                        'p_number': p_number,
                        'action': test_run.action,
+                       'open_loop': arrivals is not None,
                        'statistic': shared_statistic}
 
             processes.append(process)
@@ -254,6 +288,26 @@ def stress_openstack(tests, duration, max_runs=None, stop_on_error=False):
     print ("Summary:")
     print ("Run %d actions (%d failed)" % (sum_runs, sum_fails))
 
+    action_statistics = collections.OrderedDict()
+    for process in processes:
+        action_statistics.setdefault(
+            (process['action'], process['open_loop']), []).append(
+            process['statistic'])
+    LOG.info("Latencies (per action):")
+    for (action, open_loop), action_statistic in action_statistics.items():
+        latencies = statistics.percentiles(action_statistic)
+        if latencies[50] is None:
+            continue
+        print ("%s: p50 %.3fs, p95 %.3fs, p99 %.3fs" % (
+               action, latencies[50], latencies[95], latencies[99]))
+        if open_loop:
+            # Counted from the intended starts, which the service time
+            # hides when runs start late
+            latencies = statistics.percentiles(action_statistic,
+                                               corrected=True)
+            print ("%s (corrected): p50 %.3fs, p95 %.3fs, p99 %.3fs" % (
+                   action, latencies[50], latencies[95], latencies[99]))
+
     if not had_errors and CONF.stress.full_clean_stack:
         LOG.info("cleaning up")
         cleanup.cleanup()
@@ -0,0 +1,86 @@
+# Copyright 2016 Cloudbase Solutions Srl
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Arrival schedules of the open loop stress mode.
+
+In open loop mode an action is started at the times of its schedule,
+whatever the latency of the previous runs, so that the offered load does
+not depend on how fast the cloud answers. The arrivals of an action are
+spread over its worker processes, each of them following its own
+schedule with a share of the rate.
+"""
+
+import math
+import random
+import time
+
+ARRIVALS = ('constant', 'poisson')
+# Headroom over Little's law when sizing the worker pool of an action
+POOL_HEADROOM = 2
+
+
+class ArrivalSchedule(object):
+    """Intended start times of the runs of one worker.
+
+    :param rate: arrivals per second of this worker, once ramped up.
+    :param arrival: 'constant' for evenly spaced arrivals, 'poisson' for
+                    exponentially distributed gaps.
+    :param ramp_up: seconds over which the rate grows linearly from 0.
+    :param phase: fraction of a gap the constant arrivals are shifted by,
+                  so that the workers of an action do not start together.
+    :param start: time of the start of the schedule, by default the time
+                  the first arrival is asked for.
+    """
+
+    def __init__(self, rate, arrival='constant', ramp_up=0, phase=0.0,
+                 start=None, seed=None):
+        if arrival not in ARRIVALS:
+            raise ValueError("Unknown arrival process %s, expected one of "
+                             "%s" % (arrival, ', '.join(ARRIVALS)))
+        if rate <= 0:
+            raise ValueError("The rate must be positive, got %s" % rate)
+        self.rate = float(rate)
+        self.arrival = arrival
+        self.ramp_up = float(ramp_up)
+        self.phase = phase
+        self.start = start
+        self._random = random.Random(seed)
+
+    def _time_of(self, count):
+        """Time at which count arrivals are expected since the start.
+
+        The inverse of the expected number of arrivals, which grows
+        quadratically during the ramp up and linearly after it.
+        """
+        ramped = self.rate * self.ramp_up / 2
+        if count < ramped:
+            return math.sqrt(2 * self.ramp_up * count / self.rate)
+        return (count - ramped) / self.rate + self.ramp_up
+
+    def __iter__(self):
+        start = time.time() if self.start is None else self.start
+        count = self.phase
+        while True:
+            if self.arrival == 'poisson':
+                # Unit rate arrivals, stretched by the expected count
+                count += self._random.expovariate(1)
+            yield start + self._time_of(count)
+            if self.arrival == 'constant':
+                count += 1
+
+
+def pool_size(rate, expected_latency):
+    """Worker processes needed to sustain a rate, from Little's law."""
+    return max(1, int(math.ceil(rate * expected_latency * POOL_HEADROOM)))
@@ -0,0 +1,131 @@
+# Copyright 2016 Cloudbase Solutions Srl
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Statistics of the stress workers, kept in shared memory.
+
+Every worker process owns one slot of a shared array, holding its run and
+failure counters and histograms of its run latencies. A worker only
+writes to its own slot, so updates need neither a lock nor a round trip
+to another process; the driver reads all the slots.
+"""
+
+import math
+import multiprocessing
+
+# Latency buckets are a quarter of a power of two wide, starting at 1 ms:
+# 96 of them reach more than 4 hours.
+BUCKETS_PER_OCTAVE = 4
+BUCKETS = 96
+
+_RUNS = 0
+_FAILS = 1
+_HISTOGRAM = 2
+# Latencies counted from the intended start of the runs, which include
+# the time a late run waited for its worker (coordinated omission)
+_CORRECTED_HISTOGRAM = _HISTOGRAM + BUCKETS
+_SLOT_SIZE = _CORRECTED_HISTOGRAM + BUCKETS
+
+
+def _bucket(seconds):
+    milliseconds = seconds * 1000
+    if milliseconds < 1:
+        return 0
+    bucket = int(math.log(milliseconds, 2) * BUCKETS_PER_OCTAVE) + 1
+    return min(bucket, BUCKETS - 1)
+
+
+def _bucket_limit(bucket):
+    """Upper bound of the latencies of a bucket, in seconds."""
+    return 2 ** (float(bucket) / BUCKETS_PER_OCTAVE) / 1000
+
+
+class WorkerStatistic(object):
+    """The slot of a worker, with the {'runs': n, 'fails': n} interface."""
+
+    _counters = {'runs': _RUNS, 'fails': _FAILS}
+
+    def __init__(self, array, index):
+        self._array = array
+        self._offset = index * _SLOT_SIZE
+
+    def __getitem__(self, key):
+        return self._array[self._offset + self._counters[key]]
+
+    def __setitem__(self, key, value):
+        self._array[self._offset + self._counters[key]] = value
+
+    def record_latency(self, seconds, corrected=None):
+        """Count the latency of a run.
+
+        :param seconds: duration of the run.
+        :param corrected: time from the intended start of the run to its
+                          end, the duration by default.
+        """
+        if corrected is None:
+            corrected = seconds
+        self._array[self._offset + _HISTOGRAM + _bucket(seconds)] += 1
+        self._array[self._offset + _CORRECTED_HISTOGRAM +
+                    _bucket(corrected)] += 1
+
+    def histogram(self, corrected=False):
+        start = self._offset + (_CORRECTED_HISTOGRAM if corrected
+                                else _HISTOGRAM)
+        return self._array[start:start + BUCKETS]
+
+
+class SharedStatistics(object):
+    """Statistics of a fixed number of workers.
+
+    Must be created before the worker processes are started, so that they
+    inherit the shared memory.
+    """
+
+    def __init__(self, workers):
+        self._array = multiprocessing.Array('l', workers * _SLOT_SIZE,
+                                            lock=False)
+        self.workers = workers
+
+    def worker(self, index):
+        if not 0 <= index < self.workers:
+            raise IndexError("No statistics slot for worker %d" % index)
+        return WorkerStatistic(self._array, index)
+
+
+def percentiles(statistics, percents=(50, 95, 99), corrected=False):
+    """Latency percentiles over the histograms of some workers.
+
+    :param statistics: WorkerStatistic objects.
+    :param corrected: use the latencies from the intended starts.
+    :returns: dict mapping each percent to the upper bound of the latency
+              bucket it falls in, in seconds, or None without any run.
+    """
+    histogram = [0] * BUCKETS
+    for statistic in statistics:
+        for bucket, count in enumerate(statistic.histogram(corrected)):
+            histogram[bucket] += count
+    total = sum(histogram)
+    result = {}
+    for percent in percents:
+        if not total:
+            result[percent] = None
+            continue
+        rank = total * percent / 100.0
+        seen = 0
+        for bucket, count in enumerate(histogram):
+            seen += count
+            if seen >= rank:
+                result[percent] = _bucket_limit(bucket)
+                break
+    return result
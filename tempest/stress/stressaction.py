@@ -15,6 +15,7 @@
 import abc
 import signal
 import sys
+import time
 
 import six
 
@@ -64,25 +65,44 @@ class StressAction(object):
         """
         self.logger.debug("tearDown")
 
-    def execute(self, shared_statistic):
+    def execute(self, shared_statistic, schedule=None):
         """This is the main execution entry point called by the driver.
 
         We register a signal handler to allow us to tearDown gracefully,
-        and then exit. We also keep track of how many runs we do.
+        and then exit. We also keep track of how many runs we do, and of
+        their latencies when the statistic has a record_latency() method.
+
+        Without a schedule the runs follow each other back to back. With
+        one, an iterable of intended start times, each run starts at its
+        time, or right away when the previous runs made it late.
         """
         signal.signal(signal.SIGHUP, self._shutdown_handler)
         signal.signal(signal.SIGTERM, self._shutdown_handler)
+        record_latency = getattr(shared_statistic, 'record_latency', None)
+        intended_starts = iter(schedule) if schedule is not None else None
 
         while self.max_runs is None or (shared_statistic['runs'] <
                                         self.max_runs):
+            intended = None
+            if intended_starts is not None:
+                intended = next(intended_starts)
+                delay = intended - time.time()
+                if delay > 0:
+                    time.sleep(delay)
             self.logger.debug("Trigger new run (run %d)" %
                               shared_statistic['runs'])
+            start = time.time()
             try:
                 self.run()
             except Exception:
                 shared_statistic['fails'] += 1
                 self.logger.exception("Failure in run")
             finally:
+                if record_latency is not None:
+                    end = time.time()
+                    intended_start = (start if intended is None
+                                      else min(intended, start))
+                    record_latency(end - start, end - intended_start)
                 shared_statistic['runs'] += 1
                 if self.stop_on_error and (shared_statistic['fails'] > 1):
                     self.logger.warning("Stop process due to"
@@ -38,6 +38,8 @@ import tempest.common.generator.valid_generator as valid
 import tempest.common.validation_resources as vresources
 from tempest import config
 from tempest import exceptions
+from tempest.lib.common.utils import misc as misc_utils
+from tempest.lib.common.utils import polling
 from tempest.lib import decorators
 
 LOG = logging.getLogger(__name__)
@@ -442,6 +444,28 @@ class BaseTestCase(testtools.testcase.WithAttributes,
                                                    format=self.log_format,
                                                    level=None))
 
+    def _set_test_caller(self, step):
+        misc_utils.set_test_caller('%s:%s' % (self.__class__.__name__, step))
+
+    # NOTE: the steps of a test are recorded as they start, so that request
+    # logging can name the caller without walking the stack. Added first,
+    # the cleanup clearing the caller runs last.
+    def _run_setup(self, result):
+        self.addCleanup(misc_utils.clear_test_caller)
+        self._set_test_caller('setUp')
+        return super(BaseTestCase, self)._run_setup(result)
+
+    def _run_test_method(self, result):
+        self._set_test_caller(self._testMethodName)
+        return super(BaseTestCase, self)._run_test_method(result)
+
+    def _run_teardown(self, result):
+        self._set_test_caller('tearDown')
+        try:
+            return super(BaseTestCase, self)._run_teardown(result)
+        finally:
+            self._set_test_caller('_run_cleanups')
+
     @property
     def credentials_provider(self):
         return self._get_credentials_provider()
@@ -877,14 +901,17 @@ def call_until_true(func, duration, sleep_for):
     :param func: A zero argument callable that returns True on success.
     :param duration: The number of seconds for which to attempt a
         successful call of the function.
-    :param sleep_for: The number of seconds to sleep after an unsuccessful
-                      invocation of the function.
+    :param sleep_for: The nominal number of seconds to sleep after an
+                      unsuccessful invocation of the function, the actual
+                      delays start shorter and back off (see
+                      tempest.lib.common.utils.polling).
     """
     now = time.time()
     timeout = now + duration
+    poller = polling.Poller(sleep_for, timeout=duration)
     while now < timeout:
         if func():
             return True
-        time.sleep(sleep_for)
+        poller.sleep()
         now = time.time()
     return False
@@ -0,0 +1,216 @@
+# Copyright 2016 Cloudbase Solutions Srl
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+
+from tempest.cmd import cleanup_service
+from tempest.lib.services.compute import server_groups_client
+from tempest.lib.services.network import floating_ips_client
+from tempest.lib.services.network import security_groups_client
+from tempest.services.network.json import network_client
+from tempest.tests import base
+
+
+class TestCleanupService(base.TestCase):
+
+    def _service(self, service_class, client, **kwargs):
+        manager = mock.Mock(servers_client=client)
+        kwargs.setdefault('is_dry_run', False)
+        kwargs.setdefault('is_save_state', False)
+        kwargs.setdefault('is_preserve', False)
+        kwargs.setdefault('data', {})
+        return service_class(manager, **kwargs)
+
+    def test_dependency_levels(self):
+        services = [cleanup_service.NetworkService,
+                    cleanup_service.NetworkSubnetService,
+                    cleanup_service.NetworkPortService,
+                    cleanup_service.NetworkRouterService,
+                    cleanup_service.KeyPairService]
+        levels = cleanup_service.get_dependency_levels(services)
+        self.assertEqual([[cleanup_service.NetworkPortService,
+                           cleanup_service.NetworkRouterService,
+                           cleanup_service.KeyPairService],
+                          [cleanup_service.NetworkSubnetService],
+                          [cleanup_service.NetworkService]], levels)
+
+    def test_dependency_levels_missing_dependency(self):
+        services = [cleanup_service.VolumeService]
+        self.assertEqual([services],
+                         cleanup_service.get_dependency_levels(services))
+
+    def test_delete_counts_failures(self):
+        svc = self._service(cleanup_service.ServerGroupService, mock.Mock(),
+                            max_workers=1)
+        client = svc.server_groups_client
+        client.delete_server_group.side_effect = [None, Exception, None]
+        client.list_server_groups.return_value = {
+            'server_groups': [{'id': '1'}, {'id': '2'}, {'id': '3'}]}
+        svc.delete()
+        self.assertEqual(3, client.delete_server_group.call_count)
+        self.assertEqual(2, svc.deleted)
+        self.assertEqual(1, svc.failed)
+
+    def _delete_with_clients(self, service_class, client_name, key):
+        # Clients restricted to the methods of the real ones, so that a
+        # service calling a missing method counts a failure
+        manager = mock.Mock(
+            network_client=mock.create_autospec(network_client.NetworkClient,
+                                                instance=True),
+            server_groups_client=mock.create_autospec(
+                server_groups_client.ServerGroupsClient, instance=True),
+            floating_ips_client=mock.create_autospec(
+                floating_ips_client.FloatingIPsClient, instance=True),
+            security_groups_client=mock.create_autospec(
+                security_groups_client.SecurityGroupsClient, instance=True))
+        client = getattr(manager, client_name)
+        list_method = getattr(client, 'list_' + key)
+        list_method.return_value = {key: [{'id': '1', 'name': 'group'}]}
+        svc = service_class(manager, is_dry_run=False, is_save_state=False,
+                            is_preserve=False, data={})
+        svc.delete()
+        self.assertEqual(1, svc.deleted)
+        self.assertEqual(0, svc.failed)
+        return client
+
+    def test_delete_server_groups(self):
+        client = self._delete_with_clients(
+            cleanup_service.ServerGroupService, 'server_groups_client',
+            'server_groups')
+        client.delete_server_group.assert_called_once_with('1')
+
+    def test_delete_network_floating_ips(self):
+        client = self._delete_with_clients(
+            cleanup_service.NetworkFloatingIpService, 'floating_ips_client',
+            'floatingips')
+        client.delete_floatingip.assert_called_once_with('1')
+
+    def test_delete_network_security_groups(self):
+        client = self._delete_with_clients(
+            cleanup_service.NetworkSecGroupService, 'security_groups_client',
+            'security_groups')
+        client.delete_security_group.assert_called_once_with('1')
+
+    @mock.patch('time.sleep')
+    def test_delete_waits_with_one_listing_per_poll(self, sleep):
+        client = mock.Mock(build_interval=1, build_timeout=60)
+        client.list_servers.side_effect = [
+            {'servers': [{'id': '1'}, {'id': '2'}]},
+            {'servers': [{'id': '1'}, {'id': '2'}]},
+            {'servers': [{'id': '2'}]},
+            {'servers': []}]
+        svc = self._service(cleanup_service.ServerService, client,
+                            max_workers=2)
+        svc.delete()
+        self.assertEqual(2, client.delete_server.call_count)
+        self.assertEqual(4, client.list_servers.call_count)
+        self.assertEqual(2, sleep.call_count)
+
+    @mock.patch('time.sleep')
+    def test_delete_stops_waiting_for_errored_items(self, sleep):
+        client = mock.Mock(build_interval=1, build_timeout=60)
+        client.list_servers.side_effect = [
+            {'servers': [{'id': '1', 'status': 'ACTIVE'},
+                         {'id': '2', 'status': 'ACTIVE'}]},
+            {'servers': [{'id': '1', 'status': 'ERROR'},
+                         {'id': '2', 'status': 'DELETING'}]},
+            {'servers': [{'id': '1', 'status': 'ERROR'}]}]
+        svc = self._service(cleanup_service.ServerService, client,
+                            max_workers=2)
+        svc.delete()
+        self.assertEqual(3, client.list_servers.call_count)
+        self.assertEqual(1, svc.deleted)
+        self.assertEqual(1, svc.failed)
+
+    def test_run_services_by_level(self):
+        calls = []
+
+        def fake_run(svc):
+            calls.append(type(svc))
+
+        report = cleanup_service.CleanupReport()
+        services = [cleanup_service.NetworkSubnetService,
+                    cleanup_service.NetworkPortService]
+        with mock.patch.object(cleanup_service.BaseService, 'run', fake_run):
+            cleanup_service.run_services(services, mock.Mock(), report=report,
+                                         is_dry_run=False)
+        self.assertEqual([cleanup_service.NetworkPortService,
+                          cleanup_service.NetworkSubnetService], calls)
+        self.assertEqual(3, len(report.lines()))
+
+    def test_paginate(self):
+        pages = [{'servers': [{'id': '1'}, {'id': '2'}]},
+                 {'servers': [{'id': '3'}, {'id': '4'}]},
+                 {'servers': [{'id': '5'}]}]
+        client = mock.Mock()
+        client.list_servers.side_effect = pages
+        svc = self._service(cleanup_service.ServerService, client,
+                            page_size=2)
+        self.assertEqual(['1', '2', '3', '4', '5'],
+                         [server['id'] for server in svc.list()])
+        client.list_servers.assert_has_calls([
+            mock.call(limit=2), mock.call(limit=2, marker='2'),
+            mock.call(limit=2, marker='4')])
+
+    def test_delete_streams_pages(self):
+        deleted = []
+        pages = [{'servers': [{'id': '1'}, {'id': '2'}]},
+                 {'servers': [{'id': '3'}, {'id': '4'}]},
+                 {'servers': [{'id': '5'}]}]
+
+        def list_servers(**params):
+            # Every page is listed while its marker still exists
+            self.assertNotIn(params.get('marker'), deleted)
+            return pages[len(client.list_servers.call_args_list) - 1]
+        client = mock.Mock()
+        client.list_servers.side_effect = list_servers
+        client.delete_server.side_effect = deleted.append
+        svc = self._service(cleanup_service.ServerService, client,
+                            page_size=2, max_workers=1)
+        svc.deleted_key = None
+        svc.delete()
+        self.assertEqual(['1', '2', '3', '4', '5'], deleted)
+        self.assertEqual(5, svc.deleted)
+
+    def test_paginate_limit_ignored(self):
+        client = mock.Mock()
+        client.list_servers.return_value = {
+            'servers': [{'id': '1'}, {'id': '2'}, {'id': '3'}]}
+        svc = self._service(cleanup_service.ServerService, client,
+                            page_size=2)
+        self.assertEqual(3, len(list(svc.list())))
+        self.assertEqual(1, client.list_servers.call_count)
+
+    def test_paginate_marker_ignored(self):
+        client = mock.Mock()
+        client.list_servers.return_value = {
+            'servers': [{'id': '1'}, {'id': '2'}]}
+        svc = self._service(cleanup_service.ServerService, client,
+                            page_size=2)
+        self.assertEqual(2, len(list(svc.list())))
+        self.assertEqual(2, client.list_servers.call_count)
+
+    def test_saved_state_filter(self):
+        saved_state = cleanup_service.index_saved_state(
+            {'flavors': {'1': 'saved', '2': 'saved too'}})
+        self.assertEqual({'flavors': frozenset(['1', '2'])}, saved_state)
+        client = mock.Mock()
+        client.list_flavors.return_value = {
+            'flavors': [{'id': '1'}, {'id': '2'}, {'id': '3'}]}
+        manager = mock.Mock(flavors_client=client)
+        svc = cleanup_service.FlavorService(
+            manager, is_save_state=False, is_preserve=False,
+            saved_state_json=saved_state)
+        self.assertEqual([{'id': '3'}], svc.list())
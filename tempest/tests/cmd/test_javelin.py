@@ -247,6 +247,29 @@ class TestCreateResources(JavelinUnitTest):
         self.assertFalse(mocked_function.called)
         self.assertFalse(mock_wait_for_volume_status.called)
 
+    @mock.patch("tempest.common.waiters.wait_for_servers_status")
+    def test_create_servers_waits_per_owner(self, mock_wait):
+        self.useFixture(mockpatch.PatchObject(javelin, "client_for_user",
+                                              return_value=self.fake_client))
+        self.useFixture(mockpatch.PatchObject(javelin, "_get_server_by_name",
+                                              return_value=None))
+        self.useFixture(mockpatch.PatchObject(javelin, "_get_image_by_name"))
+        self.useFixture(mockpatch.PatchObject(javelin, "_get_flavor_by_name"))
+        self.fake_client.servers.create_server.side_effect = [
+            {'server': {'id': 'id1'}}, {'server': {'id': 'id2'}}]
+        servers = [{'name': 'server%d' % i, 'owner': 'owner', 'image': 'img',
+                    'flavor': 'flavor', 'secgroups': ['sg']}
+                   for i in range(2)]
+        self.useFixture(mockpatch.PatchObject(javelin, "WORKERS", 1))
+
+        javelin.create_servers(servers)
+
+        mock_wait.assert_called_once_with(self.fake_client.servers,
+                                          ['id1', 'id2'], 'ACTIVE')
+        mocked_function = self.fake_client.servers.add_security_group
+        mocked_function.assert_has_calls([mock.call('id1', name='sg'),
+                                          mock.call('id2', name='sg')])
+
     def test_create_router(self):
 
         self.fake_client.routers.list_routers.return_value = {'routers': []}
@@ -16,12 +16,25 @@ import mock
 from oslo_config import cfg
 from oslotest import mockpatch
 
+from tempest.cmd import cleanup_service
 from tempest.common import credentials_factory as credentials
 from tempest.common import dynamic_creds
 from tempest import config
 from tempest import exceptions
 from tempest.lib.common import rest_client
+from tempest.lib.services.compute import limits_client
+from tempest.lib.services.compute import quotas_client
+from tempest.lib.services.compute import server_groups_client
+from tempest.lib.services.compute import servers_client
 from tempest.lib.services.identity.v2 import token_client as json_token_client
+from tempest.lib.services.network import floating_ips_client
+from tempest.lib.services.network import metering_label_rules_client
+from tempest.lib.services.network import metering_labels_client
+from tempest.lib.services.network import networks_client
+from tempest.lib.services.network import ports_client
+from tempest.lib.services.network import security_groups_client
+from tempest.lib.services.network import subnets_client
+from tempest.services.compute.json import keypairs_client
 from tempest.services.identity.v2.json import identity_client as \
     json_iden_client
 from tempest.services.identity.v2.json import roles_client as \
@@ -590,3 +603,191 @@ class TestDynamicCredentialProvider(base.TestCase):
         self._mock_tenant_create('1234', 'fake_prim_tenant')
         self.assertRaises(exceptions.InvalidConfiguration,
                           creds.get_primary_creds)
+
+    def test_pooled_credentials(self):
+        cfg.CONF.set_default('dynamic_credentials_pool_size', 2,
+                             group='auth')
+        pool = mock.Mock()
+        self.useFixture(mockpatch.Patch(
+            'tempest.common.dynamic_creds.get_pool', return_value=pool))
+        creds = dynamic_creds.DynamicCredentialProvider(**self.fixed_params)
+        primary = creds.get_primary_creds()
+        self.assertEqual(pool.lease.return_value, primary)
+        self.assertEqual(primary, creds.get_primary_creds())
+        self.assertEqual(1, pool.lease.call_count)
+        creds.clear_creds()
+        pool.release.assert_called_once_with(primary)
+
+    def test_purge_creds_resources(self):
+        creds = dynamic_creds.DynamicCredentialProvider(**self.fixed_params)
+        run_services = self.patch(
+            'tempest.cmd.cleanup_service.run_services')
+        manager = self.patch('tempest.clients.Manager')
+        resources = mock.Mock(tenant_id='1234', network={'id': 'net'},
+                              subnet={'id': 'subnet'}, router=None)
+
+        creds._purge_creds_resources(resources)
+
+        self.assertEqual(2, run_services.call_count)
+        (project_services, project_manager), kwargs = (
+            run_services.call_args_list[0])
+        self.assertIn(cleanup_service.VolumeService, project_services)
+        self.assertIn(cleanup_service.NetworkPortService, project_services)
+        manager.assert_any_call(credentials=resources.credentials)
+        self.assertEqual('1234', kwargs['tenant_id'])
+        self.assertEqual(frozenset(['net', 'subnet']),
+                         kwargs['preserved_ids'])
+        self.assertIn(cleanup_service.NovaQuotaService,
+                      run_services.call_args_list[1][0][0])
+
+    def _fake_manager(self, listed):
+        """Client manager with clients specced on the real ones
+
+        :param listed: dict of the items listed by each list method
+        """
+        clients = {
+            'servers_client': servers_client.ServersClient,
+            'server_groups_client': server_groups_client.ServerGroupsClient,
+            'keypairs_client': keypairs_client.KeyPairsClient,
+            'quotas_client': quotas_client.QuotasClient,
+            'limits_client': limits_client.LimitsClient,
+            'network_client': json_network_client.NetworkClient,
+            'networks_client': networks_client.NetworksClient,
+            'subnets_client': subnets_client.SubnetsClient,
+            'ports_client': ports_client.PortsClient,
+            'routers_client': routers_client.RoutersClient,
+            'floating_ips_client': floating_ips_client.FloatingIPsClient,
+            'metering_labels_client':
+                metering_labels_client.MeteringLabelsClient,
+            'metering_label_rules_client':
+                metering_label_rules_client.MeteringLabelRulesClient,
+            'security_groups_client':
+                security_groups_client.SecurityGroupsClient}
+        manager = mock.Mock()
+        for name, client_class in clients.items():
+            client = mock.create_autospec(client_class, instance=True)
+            for method, key in (('list_servers', 'servers'),
+                                ('list_server_groups', 'server_groups'),
+                                ('list_keypairs', 'keypairs'),
+                                ('list_networks', 'networks'),
+                                ('list_subnets', 'subnets'),
+                                ('list_ports', 'ports'),
+                                ('list_routers', 'routers'),
+                                ('list_floatingips', 'floatingips'),
+                                ('list_security_groups', 'security_groups')):
+                if hasattr(client, method):
+                    getattr(client, method).return_value = {
+                        key: listed.get(key, [])}
+            setattr(manager, name, client)
+        return manager
+
+    def test_pool_release_purges_with_cleanup_services(self):
+        cfg.CONF.set_default('cinder', False, 'service_available')
+        cfg.CONF.set_default('dynamic_credentials_pool_size', 1,
+                             group='auth')
+        provider = dynamic_creds.DynamicCredentialProvider(
+            **self.fixed_params)
+        resources = mock.Mock(tenant_id='1234', network={'id': 'net'},
+                              subnet={'id': 'subnet'},
+                              router={'id': 'router'})
+        manager = self._fake_manager({
+            'server_groups': [{'id': 'group'}],
+            'floatingips': [{'id': 'fip'}],
+            'security_groups': [{'id': 'default', 'name': 'default'},
+                                {'id': 'secgroup', 'name': 'secgroup'}],
+            'networks': [{'id': 'net'}],
+            'subnets': [{'id': 'subnet', 'network_id': 'net'}],
+            'routers': [{'id': 'router'}]})
+        self.patch('tempest.clients.Manager', return_value=manager)
+        self.useFixture(mockpatch.PatchObject(provider, '_create_creds',
+                                              return_value=resources))
+        self.useFixture(mockpatch.PatchObject(provider,
+                                              '_set_network_resources'))
+        pool = dynamic_creds.CredentialPool(provider, 1)
+        pool.release(pool.lease())
+
+        # The set was reset, not deleted
+        self.assertIs(resources, pool.lease())
+        manager.server_groups_client.delete_server_group.\
+            assert_called_once_with('group')
+        manager.floating_ips_client.delete_floatingip.\
+            assert_called_once_with('fip')
+        manager.security_groups_client.delete_security_group.\
+            assert_called_once_with('secgroup')
+        self.assertFalse(manager.networks_client.delete_network.called)
+        self.assertFalse(manager.subnets_client.delete_subnet.called)
+        self.assertFalse(manager.routers_client.delete_router.called)
+        manager.quotas_client.delete_quota_set.assert_called_once_with('1234')
+
+    def test_purge_creds_resources_failed(self):
+        creds = dynamic_creds.DynamicCredentialProvider(**self.fixed_params)
+        self.patch('tempest.cmd.cleanup_service.run_services')
+        self.patch('tempest.clients.Manager')
+        self.patch('tempest.cmd.cleanup_service.CleanupReport.failed',
+                   return_value=2)
+        self.assertRaises(exceptions.TearDownException,
+                          creds._purge_creds_resources,
+                          mock.Mock(network=None, subnet=None, router=None))
+
+
+class TestCredentialPool(base.TestCase):
+
+    def setUp(self):
+        super(TestCredentialPool, self).setUp()
+        self.provider = mock.Mock()
+        self.created = []
+
+        def create_creds():
+            creds = mock.Mock(name='creds%d' % len(self.created))
+            self.created.append(creds)
+            return creds
+        self.provider._create_creds.side_effect = create_creds
+        # Create the mocked methods before the threads of the pool race
+        # to do it
+        self.provider._set_network_resources.return_value = None
+        self.provider.clear_creds.return_value = None
+        self.pool = dynamic_creds.CredentialPool(self.provider, 3)
+
+    def test_lease_fills_pool(self):
+        creds = self.pool.lease()
+        self.assertEqual(3, len(self.created))
+        self.assertIn(creds, self.created)
+        self.assertEqual(
+            3, len(self.provider._set_network_resources.call_args_list))
+
+    def test_release_and_lease_again(self):
+        creds = self.pool.lease()
+        self.pool.release(creds)
+        self.provider._purge_creds_resources.assert_called_once_with(creds)
+        self.assertIs(creds, self.pool.lease())
+        self.assertEqual(3, len(self.created))
+
+    def test_lease_grows_exhausted_pool(self):
+        leased = set(self.pool.lease() for _ in range(4))
+        self.assertEqual(4, len(leased))
+        self.assertEqual(4, len(self.created))
+
+    def test_failed_creation_skipped(self):
+        self.provider._set_network_resources.side_effect = [
+            None, Exception('boom'), None]
+        self.pool.lease()
+        self.pool.lease()
+        self.assertEqual(1, self.provider.clear_creds.call_count)
+        self.provider._set_network_resources.side_effect = None
+        self.pool.lease()
+        self.assertEqual(4, len(self.created))
+
+    def test_failed_reset_deletes_credentials(self):
+        creds = self.pool.lease()
+        self.provider._purge_creds_resources.side_effect = Exception('boom')
+        self.pool.release(creds)
+        self.provider.clear_creds.assert_called_once_with()
+        self.assertEqual({'0': creds}, self.provider._creds)
+        self.assertIsNot(creds, self.pool.lease())
+
+    def test_clear(self):
+        creds = self.pool.lease()
+        self.pool.clear()
+        self.provider.clear_creds.assert_called_once_with()
+        self.assertEqual(3, len(self.provider._creds))
+        self.assertIn(creds, self.provider._creds.values())
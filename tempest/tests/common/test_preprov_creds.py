@@ -14,7 +14,9 @@
 
 import hashlib
 import os
+import time
 
+import fixtures
 import mock
 from oslo_concurrency.fixture import lockutils as lockutils_fixtures
 from oslo_config import cfg
@@ -119,84 +121,100 @@ class TestPreProvisionedCredentials(base.TestCase):
             self.assertIn(hash, hash_dict['creds'].keys())
             self.assertIn(hash_dict['creds'][hash], self.test_accounts)
 
-    def test_create_hash_file_previous_file(self):
-        # Emulate the lock existing on the filesystem
-        self.useFixture(mockpatch.Patch('os.path.isfile', return_value=True))
-        with mock.patch('six.moves.builtins.open', mock.mock_open(),
-                        create=True):
-            test_account_class = (
-                preprov_creds.PreProvisionedCredentialProvider(
-                    **self.fixed_params))
-            res = test_account_class._create_hash_file('12345')
-        self.assertFalse(res, "_create_hash_file should return False if the "
-                         "pseudo-lock file already exists")
+    def _lock_dir_provider(self, **kwargs):
+        lock_dir = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                                'test_accounts')
+        params = dict(self.fixed_params, accounts_lock_dir=lock_dir)
+        params.update(kwargs)
+        return preprov_creds.PreProvisionedCredentialProvider(**params)
 
-    def test_create_hash_file_no_previous_file(self):
-        # Emulate the lock not existing on the filesystem
-        self.useFixture(mockpatch.Patch('os.path.isfile', return_value=False))
-        with mock.patch('six.moves.builtins.open', mock.mock_open(),
-                        create=True):
-            test_account_class = (
-                preprov_creds.PreProvisionedCredentialProvider(
-                    **self.fixed_params))
-            res = test_account_class._create_hash_file('12345')
-        self.assertTrue(res, "_create_hash_file should return True if the "
-                        "pseudo-lock doesn't already exist")
+    def test_get_free_hash_no_previous_accounts(self):
+        test_account_class = self._lock_dir_provider()
+        hash_list = self._get_hash_list(self.test_accounts)
+        free_hash = test_account_class._get_free_hash(hash_list)
+        self.assertIn(free_hash, hash_list)
+        lock_path = os.path.join(test_account_class.accounts_dir, free_hash)
+        with open(lock_path) as lock:
+            self.assertEqual(test_account_class.holder, lock.read())
 
-    @mock.patch('oslo_concurrency.lockutils.lock')
-    def test_get_free_hash_no_previous_accounts(self, lock_mock):
-        # Emulate no pre-existing lock
-        self.useFixture(mockpatch.Patch('os.path.isdir', return_value=False))
+    def test_get_free_hash_no_free_accounts(self):
         hash_list = self._get_hash_list(self.test_accounts)
-        mkdir_mock = self.useFixture(mockpatch.Patch('os.mkdir'))
-        self.useFixture(mockpatch.Patch('os.path.isfile', return_value=False))
-        test_account_class = preprov_creds.PreProvisionedCredentialProvider(
-            **self.fixed_params)
-        with mock.patch('six.moves.builtins.open', mock.mock_open(),
-                        create=True) as open_mock:
+        test_account_class = self._lock_dir_provider()
+        for _ in hash_list:
             test_account_class._get_free_hash(hash_list)
-            lock_path = os.path.join(self.fixed_params['accounts_lock_dir'],
-                                     hash_list[0])
-            open_mock.assert_called_once_with(lock_path, 'w')
-        mkdir_path = os.path.join(self.fixed_params['accounts_lock_dir'])
-        mkdir_mock.mock.assert_called_once_with(mkdir_path)
+        ex = self.assertRaises(lib_exc.InvalidCredentials,
+                               test_account_class._get_free_hash, hash_list)
+        self.assertIn(test_account_class.name, str(ex))
 
-    @mock.patch('oslo_concurrency.lockutils.lock')
-    def test_get_free_hash_no_free_accounts(self, lock_mock):
+    def test_get_free_hash_some_in_use_accounts(self):
         hash_list = self._get_hash_list(self.test_accounts)
-        # Emulate pre-existing lock dir
-        self.useFixture(mockpatch.Patch('os.path.isdir', return_value=True))
-        # Emulate all lcoks in list are in use
-        self.useFixture(mockpatch.Patch('os.path.isfile', return_value=True))
-        test_account_class = preprov_creds.PreProvisionedCredentialProvider(
-            **self.fixed_params)
-        with mock.patch('six.moves.builtins.open', mock.mock_open(),
-                        create=True):
-            self.assertRaises(lib_exc.InvalidCredentials,
-                              test_account_class._get_free_hash, hash_list)
+        test_account_class = self._lock_dir_provider()
+        leases = preprov_creds.FileLeases(test_account_class.accounts_dir)
+        for _hash in hash_list:
+            if _hash != hash_list[3]:
+                self.assertTrue(leases.acquire(_hash, 'other'))
+        self.assertEqual(hash_list[3],
+                         test_account_class._get_free_hash(hash_list))
 
-    @mock.patch('oslo_concurrency.lockutils.lock')
-    def test_get_free_hash_some_in_use_accounts(self, lock_mock):
-        # Emulate no pre-existing lock
-        self.useFixture(mockpatch.Patch('os.path.isdir', return_value=True))
-        hash_list = self._get_hash_list(self.test_accounts)
-        test_account_class = preprov_creds.PreProvisionedCredentialProvider(
-            **self.fixed_params)
+    def test_remove_hash_releases_account(self):
+        hash_list = self._get_hash_list(self.test_accounts)[:1]
+        test_account_class = self._lock_dir_provider()
+        test_account_class._get_free_hash(hash_list)
+        test_account_class.remove_hash(hash_list[0])
+        self.assertFalse(os.path.exists(test_account_class.accounts_dir))
+        self.assertEqual(hash_list[0],
+                         test_account_class._get_free_hash(hash_list))
 
-        def _fake_is_file(path):
-            # Fake isfile() to return that the path exists unless a specific
-            # hash is in the path
-            if hash_list[3] in path:
-                return False
-            return True
+    def test_sqlite_leases(self):
+        hash_list = self._get_hash_list(self.test_accounts)[:2]
+        test_account_class = self._lock_dir_provider(lease_backend='sqlite',
+                                                     lease_ttl=60)
+        self.assertIsInstance(test_account_class._leases,
+                              preprov_creds.SQLiteLeases)
+        leased = set(test_account_class._get_free_hash(hash_list)
+                     for _ in hash_list)
+        self.assertEqual(set(hash_list), leased)
+        self.assertRaises(lib_exc.InvalidCredentials,
+                          test_account_class._get_free_hash, hash_list)
+        test_account_class.remove_hash(hash_list[1])
+        self.assertEqual(hash_list[1],
+                         test_account_class._get_free_hash(hash_list))
 
-        self.stubs.Set(os.path, 'isfile', _fake_is_file)
-        with mock.patch('six.moves.builtins.open', mock.mock_open(),
-                        create=True) as open_mock:
-            test_account_class._get_free_hash(hash_list)
-            lock_path = os.path.join(self.fixed_params['accounts_lock_dir'],
-                                     hash_list[3])
-            open_mock.assert_has_calls([mock.call(lock_path, 'w')])
+    def test_sqlite_leases_expire(self):
+        hash_list = self._get_hash_list(self.test_accounts)[:1]
+        test_account_class = self._lock_dir_provider(lease_backend='sqlite',
+                                                     lease_ttl=60)
+        test_account_class._get_free_hash(hash_list)
+        now = time.time()
+        self.useFixture(mockpatch.Patch('time.time', return_value=now + 61))
+        self.assertEqual(hash_list[0],
+                         test_account_class._get_free_hash(hash_list))
+
+    def test_sqlite_leases_released_by_holder_only(self):
+        hash_list = self._get_hash_list(self.test_accounts)[:1]
+        test_account_class = self._lock_dir_provider(lease_backend='sqlite',
+                                                     lease_ttl=60)
+        test_account_class._get_free_hash(hash_list)
+        leases = test_account_class._leases
+        self.assertEqual(test_account_class.holder,
+                         leases.holder(hash_list[0]))
+        self.assertIn(str(os.getpid()), test_account_class.holder)
+        self.assertFalse(leases.release(hash_list[0], 'other'))
+        self.assertTrue(leases.release(hash_list[0],
+                                       test_account_class.holder))
+
+    def test_sqlite_leases_renewed(self):
+        hash_list = self._get_hash_list(self.test_accounts)[:1]
+        test_account_class = self._lock_dir_provider(lease_backend='sqlite',
+                                                     lease_ttl=60)
+        test_account_class._get_free_hash(hash_list)
+        now = time.time()
+        time_mock = self.useFixture(mockpatch.Patch('time.time',
+                                                    return_value=now + 50))
+        test_account_class._leases.renew()
+        time_mock.mock.return_value = now + 61
+        self.assertRaises(lib_exc.InvalidCredentials,
+                          test_account_class._get_free_hash, hash_list)
 
     @mock.patch('oslo_concurrency.lockutils.lock')
     def test_remove_hash_last_account(self, lock_mock):
@@ -286,6 +304,23 @@ class TestPreProvisionedCredentials(base.TestCase):
         for i in hashes:
             self.assertIn(i, args)
 
+    def test__get_creds_by_roles_admin(self):
+        test_accounts_class = preprov_creds.PreProvisionedCredentialProvider(
+            **self.fixed_params)
+        admin_hashes = test_accounts_class.hash_dict['roles'][
+            cfg.CONF.identity.admin_role]
+        self.assertEqual(
+            sorted(admin_hashes),
+            test_accounts_class._get_match_hash_list(
+                [cfg.CONF.identity.admin_role]))
+
+    def test__get_creds_by_roles_unknown_role(self):
+        test_accounts_class = preprov_creds.PreProvisionedCredentialProvider(
+            **self.fixed_params)
+        self.assertRaises(lib_exc.InvalidCredentials,
+                          test_accounts_class._get_match_hash_list,
+                          ['role1', 'unknown_role'])
+
     def test__get_creds_by_roles_no_admin(self):
         self.useFixture(mockpatch.Patch(
             'tempest.common.preprov_creds.read_accounts_yaml',
@@ -18,6 +18,8 @@ import mock
 
 from tempest.common import waiters
 from tempest import exceptions
+from tempest.lib.common import rest_client
+from tempest.lib import exceptions as lib_exc
 from tempest.services.volume.base import base_volumes_client
 from tempest.tests import base
 import tempest.tests.utils as utils
@@ -29,6 +31,8 @@ class TestImageWaiters(base.TestCase):
         self.client = mock.MagicMock()
         self.client.build_timeout = 1
         self.client.build_interval = 1
+        # No jitter, the first delay is a quarter of the build interval
+        self.patch('random.uniform', return_value=0)
 
     def test_wait_for_image_status(self):
         self.client.show_image.return_value = ({'status': 'active'})
@@ -47,7 +51,7 @@ class TestImageWaiters(base.TestCase):
         self.assertRaises(exceptions.TimeoutException,
                           waiters.wait_for_image_status,
                           self.client, 'fake_image_id', 'active')
-        mock_sleep.assert_called_once_with(1)
+        mock_sleep.assert_called_once_with(0.25)
 
     @mock.patch('time.sleep')
     def test_wait_for_image_status_error_on_image_create(self, mock_sleep):
@@ -55,14 +59,14 @@ class TestImageWaiters(base.TestCase):
         self.assertRaises(exceptions.AddImageException,
                           waiters.wait_for_image_status,
                           self.client, 'fake_image_id', 'active')
-        mock_sleep.assert_called_once_with(1)
+        mock_sleep.assert_called_once_with(0.25)
 
     @mock.patch.object(time, 'sleep')
     def test_wait_for_volume_status_error_restoring(self, mock_sleep):
         # Tests that the wait method raises VolumeRestoreErrorException if
         # the volume status is 'error_restoring'.
         client = mock.Mock(spec=base_volumes_client.BaseVolumesClient,
-                           build_interval=1)
+                           build_interval=1, build_timeout=1)
         volume1 = {'volume': {'status': 'restoring-backup'}}
         volume2 = {'volume': {'status': 'error_restoring'}}
         mock_show = mock.Mock(side_effect=(volume1, volume2))
@@ -73,4 +77,188 @@ class TestImageWaiters(base.TestCase):
                           client, volume_id, 'available')
         mock_show.assert_has_calls([mock.call(volume_id),
                                     mock.call(volume_id)])
-        mock_sleep.assert_called_once_with(1)
+        mock_sleep.assert_called_once_with(0.25)
+
+
+class TestServerWaiters(base.TestCase):
+    def setUp(self):
+        super(TestServerWaiters, self).setUp()
+        self.client = mock.MagicMock()
+        self.client.build_timeout = 1
+        self.client.build_interval = 0
+        self.patch('time.sleep')
+
+    @staticmethod
+    def _server(server_id, status, task_state=None):
+        return {'id': server_id, 'status': status,
+                'OS-EXT-STS:task_state': task_state}
+
+    def _show(self, *statuses):
+        self.client.show_server.side_effect = [
+            {'server': self._server('server%d' % index, status)}
+            for index, status in enumerate(statuses)]
+
+    def _list(self, *statuses):
+        return {'servers': [self._server('server%d' % index, status)
+                            for index, status in enumerate(statuses)]}
+
+    def test_wait_for_server_status_polls_changes(self):
+        self._show('BUILD')
+        self.client.list_servers.side_effect = [self._list('BUILD'),
+                                                {'servers': []},
+                                                self._list('ACTIVE')]
+
+        body = waiters.wait_for_server_status(self.client, 'server0',
+                                              'ACTIVE')
+
+        self.assertEqual('ACTIVE', body['status'])
+        self.client.show_server.assert_called_once_with('server0')
+        self.assertEqual(3, self.client.list_servers.call_count)
+        for call in self.client.list_servers.call_args_list:
+            self.assertTrue(call[1]['detail'])
+            self.assertIn('changes-since', call[1])
+
+    def test_wait_for_server_status_error(self):
+        self._show('BUILD')
+        self.client.list_servers.return_value = self._list('ERROR')
+        self.assertRaises(exceptions.BuildErrorException,
+                          waiters.wait_for_server_status,
+                          self.client, 'server0', 'ACTIVE')
+
+    def test_wait_for_server_status_timeout(self):
+        time_mock = self.patch('time.time')
+        time_mock.side_effect = utils.generate_timeout_series(1)
+        self._show('BUILD')
+        self.client.list_servers.return_value = self._list('BUILD')
+
+        exc = self.assertRaises(exceptions.TimeoutException,
+                                waiters.wait_for_server_status,
+                                self.client, 'server0', 'ACTIVE')
+        self.assertIn('Server server0 failed to reach ACTIVE status and '
+                      'task state "None"', str(exc))
+        self.assertIn('Current status: BUILD.', str(exc))
+
+    def test_wait_for_deleted_server(self):
+        self._show('ACTIVE')
+        self.client.list_servers.return_value = self._list('DELETED')
+        self.assertRaises(lib_exc.NotFound,
+                          waiters.wait_for_server_status,
+                          self.client, 'server0', 'SHUTOFF')
+
+    def test_watcher_shares_polls(self):
+        watcher = waiters.ServerStatusWatcher(self.client)
+        watcher.watch('server0', self._server('server0', 'BUILD'))
+        watcher.watch('server1', self._server('server1', 'BUILD'))
+        self.client.list_servers.return_value = self._list('ACTIVE',
+                                                           'ACTIVE')
+
+        self.assertEqual('ACTIVE', watcher.next_body('server0')['status'])
+        self.assertEqual('ACTIVE', watcher.body('server1')['status'])
+        self.assertEqual(1, self.client.list_servers.call_count)
+
+        watcher.unwatch('server0')
+        self.assertRaises(KeyError, watcher.body, 'server0')
+
+    def test_watcher_follows_pages(self):
+        watcher = waiters.ServerStatusWatcher(self.client)
+        watcher.watch('server1', self._server('server1', 'BUILD'))
+        first = self._list('BUILD')
+        first['servers_links'] = [
+            {'rel': 'next',
+             'href': 'http://nova/v2.1/servers/detail?marker=server0'}]
+        self.client.list_servers.side_effect = [first,
+                                                self._list('ACTIVE',
+                                                           'ACTIVE')]
+
+        self.assertEqual('ACTIVE', watcher.next_body('server1')['status'])
+        self.assertEqual('server0',
+                         self.client.list_servers.call_args[1]['marker'])
+        self.assertFalse(self.client.show_server.called)
+
+    def test_watcher_shows_unlisted_servers(self):
+        watcher = waiters.ServerStatusWatcher(self.client)
+        watcher.watch('server0', self._server('server0', 'BUILD'))
+        self.client.list_servers.return_value = {'servers': []}
+        self._show('ACTIVE')
+
+        self.assertEqual('ACTIVE', watcher.next_body('server0')['status'])
+        self.client.show_server.assert_called_once_with('server0')
+
+        self.client.show_server.side_effect = lib_exc.NotFound()
+        self.assertRaises(lib_exc.NotFound, watcher.next_body, 'server0')
+
+    def test_watcher_cursor_in_nova_time(self):
+        # The local clock is an hour ahead of nova's
+        local_time = iter(range(1451610000, 1451620000))
+        self.patch('time.time', side_effect=lambda: next(local_time))
+        watcher = waiters.ServerStatusWatcher(self.client)
+        watcher.watch('server0', dict(self._server('server0', 'BUILD'),
+                                      updated='2016-01-01T00:00:00Z'))
+        self.client.list_servers.side_effect = [
+            rest_client.ResponseBody(
+                {'date': 'Fri, 01 Jan 2016 00:01:00 GMT'},
+                self._list('BUILD')),
+            rest_client.ResponseBody({}, self._list('ACTIVE'))]
+
+        self.assertEqual('BUILD', watcher.next_body('server0')['status'])
+        self.assertEqual('ACTIVE', watcher.next_body('server0')['status'])
+
+        self.assertEqual(
+            ['2015-12-31T23:59:00Z', '2016-01-01T00:00:00Z'],
+            [call[1]['changes-since']
+             for call in self.client.list_servers.call_args_list])
+
+    def test_watcher_cursor_from_updated(self):
+        watcher = waiters.ServerStatusWatcher(self.client)
+        watcher.watch('server0', dict(self._server('server0', 'BUILD'),
+                                      updated='2016-01-01T00:00:00Z'))
+        self.client.list_servers.side_effect = [
+            {'servers': [dict(self._server('server0', 'BUILD'),
+                              updated='2016-01-01T00:02:00Z')]},
+            self._list('ACTIVE')]
+
+        watcher.next_body('server0')
+        watcher.next_body('server0')
+
+        self.assertEqual(
+            '2016-01-01T00:01:00Z',
+            self.client.list_servers.call_args[1]['changes-since'])
+
+    def test_get_server_watcher(self):
+        watcher = waiters.get_server_watcher(self.client)
+        self.assertIs(watcher, waiters.get_server_watcher(self.client))
+        self.assertIsNot(watcher,
+                         waiters.get_server_watcher(mock.MagicMock()))
+
+    def test_wait_for_servers_status(self):
+        self._show('BUILD', 'BUILD')
+        self.client.list_servers.side_effect = [
+            self._list('BUILD', 'ACTIVE'),
+            self._list('ACTIVE', 'ACTIVE')]
+
+        servers = waiters.wait_for_servers_status(
+            self.client, ['server0', 'server1'], 'ACTIVE')
+
+        self.assertEqual(['server0', 'server1'], sorted(servers))
+        self.assertEqual(2, self.client.list_servers.call_count)
+
+    def test_wait_for_servers_status_error(self):
+        self._show('BUILD', 'BUILD')
+        self.client.list_servers.return_value = self._list('BUILD', 'ERROR')
+        self.assertRaises(exceptions.BuildErrorException,
+                          waiters.wait_for_servers_status,
+                          self.client, ['server0', 'server1'], 'ACTIVE')
+
+    def test_wait_for_servers_status_timeout(self):
+        time_mock = self.patch('time.time')
+        time_mock.side_effect = utils.generate_timeout_series(1)
+        self._show('ACTIVE', 'BUILD')
+        self.client.list_servers.return_value = self._list('ACTIVE',
+                                                           'BUILD')
+
+        exc = self.assertRaises(exceptions.TimeoutException,
+                                waiters.wait_for_servers_status,
+                                self.client, ['server0', 'server1'],
+                                'ACTIVE')
+        self.assertIn('server1: BUILD', str(exc))
+        self.assertNotIn('server0', str(exc))
@@ -14,11 +14,14 @@
 
 import time
 
+import fixtures
 from oslo_config import cfg
 from oslotest import mockpatch
 
+from tempest.common.utils.linux import guest_state
 from tempest.common.utils.linux import remote_client
 from tempest import config
+from tempest.lib import exceptions as lib_exc
 from tempest.tests import base
 from tempest.tests import fake_config
 
@@ -154,3 +157,117 @@ a0:b0:c0:d0:e0:f0"""
         self.conn.set_nic_state(nic, "down")
         self._assert_exec_called_with(
             'sudo ip link set %s down' % nic)
+
+    def _script_dir(self):
+        script_dir = self.useFixture(fixtures.TempDir()).path
+        with open(script_dir + '/build.sh', 'w') as script:
+            script.write('#!/bin/bash\r\necho building\r\n')
+        return script_dir
+
+    def test_execute_script_runs_cached_bundle(self):
+        script_dir = self._script_dir()
+        self.ssh_mock.mock.exec_command.return_value = 'built'
+
+        output = self.conn.execute_script('build.sh', ['a', 1],
+                                          script_dir + '/build.sh', '/tmp/')
+
+        self.assertEqual('built', output)
+        self.assertEqual(1, self.ssh_mock.mock.exec_command.call_count)
+        command = self.ssh_mock.mock.exec_command.call_args[0][0]
+        self.assertIn('cd /tmp/; sudo /var/tmp/tempest-scripts/', command)
+        self.assertIn('/build.sh a 1', command)
+        self.assertFalse(self.ssh_mock.mock.put_data.called)
+
+    def test_execute_script_deploys_missing_bundle(self):
+        script_dir = self._script_dir()
+        self.ssh_mock.mock.exec_command.side_effect = [
+            lib_exc.SSHExecCommandFailed(command='run', exit_status=1,
+                                         stderr='', stdout=''),
+            '',
+            '',
+            'built']
+
+        output = self.conn.execute_script('build.sh', [],
+                                          script_dir + '/build.sh', '/tmp/')
+
+        self.assertEqual('built', output)
+        self.assertEqual(4, self.ssh_mock.mock.exec_command.call_count)
+        data, tarball = self.ssh_mock.mock.put_data.call_args[0]
+        self.assertTrue(tarball.endswith('.tar.gz'))
+        extract = self.ssh_mock.mock.exec_command.call_args_list[2][0][0]
+        self.assertIn('tar -xzf %s' % tarball, extract)
+
+    def test_execute_script_failure_with_bundle_present(self):
+        script_dir = self._script_dir()
+        self.ssh_mock.mock.exec_command.side_effect = [
+            lib_exc.SSHExecCommandFailed(command='run', exit_status=2,
+                                         stderr='', stdout=''),
+            'present\n']
+
+        self.assertRaises(lib_exc.SSHExecCommandFailed,
+                          self.conn.execute_script, 'build.sh', [],
+                          script_dir + '/build.sh', '/tmp/')
+        self.assertFalse(self.ssh_mock.mock.put_data.called)
+
+    def test_execute_script_to_output_file(self):
+        script_dir = self._script_dir()
+        output_file = self.useFixture(fixtures.TempDir()).path + '/out.log'
+
+        def stream(cmd, stdout_callback, stderr_callback, ignore_exit_status):
+            stdout_callback(b'building\n')
+            stderr_callback(b'warning\n')
+            return 0
+        self.ssh_mock.mock.exec_command_stream.side_effect = stream
+
+        self.conn.execute_script('build.sh', [], script_dir + '/build.sh',
+                                 '/tmp/', output_file=output_file)
+
+        self.assertFalse(self.ssh_mock.mock.exec_command.called)
+        with open(output_file, 'rb') as output:
+            self.assertEqual(b'building\nwarning\n', output.read())
+
+    def test_snapshot_state(self):
+        marker = guest_state.SECTION_MARKER
+        self.ssh_mock.mock.exec_command.return_value = '\n'.join([
+            marker + 'meminfo',
+            'MemTotal:        2048000 kB',
+            'MemFree:          512000 kB',
+            'SwapTotal:             0 kB',
+            'HugePages_Total:       0',
+            marker + 'cpuinfo',
+            'processor\t: 0',
+            'model name\t: Intel(R) Xeon(R)',
+            '',
+            'processor\t: 1',
+            marker + 'partitions',
+            'major minor  #blocks  name',
+            '',
+            '   8        0   20971520 sda',
+            '   8        1   20970496 sda1',
+            '   8       16    1048576 sdb',
+            marker + 'lsblk',
+            'sda 21474836480 disk',
+            'sdb  1073741824 disk',
+            'sr0    1073741312 rom',
+            marker + 'modules',
+            'hv_storvsc 22140 2 - Live 0x0000000000000000',
+            'hv_vmbus 61434 7 hv_storvsc, Live 0x0000000000000000',
+            marker + 'kernel',
+            '4.4.0-21-generic'])
+
+        state = self.conn.snapshot_state()
+
+        self.assertEqual(1, self.ssh_mock.mock.exec_command.call_count)
+        self.assertIn(guest_state.COMMAND,
+                      self.ssh_mock.mock.exec_command.call_args[0][0])
+        self.assertEqual(2048000, state.memory())
+        self.assertEqual(512000, state.memory('MemFree'))
+        self.assertEqual(0, state.meminfo['HugePages_Total'])
+        self.assertEqual(2, state.cpu_count)
+        self.assertEqual({'sda': 20971520, 'sda1': 20970496,
+                          'sdb': 1048576}, state.partitions)
+        self.assertEqual(1073741824, state.disks['sdb'])
+        self.assertEqual(2, state.disk_count())
+        self.assertTrue(state.has_module('hv_vmbus'))
+        self.assertFalse(state.has_module('hv_balloon'))
+        self.assertEqual('4.4.0-21-generic', state.kernel_version)
@@ -0,0 +1,70 @@
+# Copyright 2016 Cloudbase Solutions Srl
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import io
+import os
+import tarfile
+
+import fixtures
+
+from tempest.common.utils.linux import script_cache
+from tempest.tests import base
+
+
+class TestScriptBundle(base.TestCase):
+
+    def setUp(self):
+        super(TestScriptBundle, self).setUp()
+        self.script_dir = self.useFixture(fixtures.TempDir()).path
+        self._write('run.sh', b'#!/bin/bash\r\necho run\r\n')
+        self._write('tool', b'\x7fELF\0\r\n')
+        self._write('__init__.py', b'')
+
+    def _write(self, name, content):
+        with open(os.path.join(self.script_dir, name), 'wb') as script:
+            script.write(content)
+
+    def _members(self, bundle):
+        tar = tarfile.open(fileobj=io.BytesIO(bundle.data), mode='r:gz')
+        return dict((info.name, (info.mode, tar.extractfile(info).read()))
+                    for info in tar.getmembers())
+
+    def test_bundle_content(self):
+        members = self._members(script_cache.ScriptBundle(self.script_dir))
+
+        self.assertEqual({'run.sh': (0o755, b'#!/bin/bash\necho run\n'),
+                          'tool': (0o755, b'\x7fELF\0\r\n')}, members)
+
+    def test_digest_follows_content(self):
+        digest = script_cache.ScriptBundle(self.script_dir).digest
+        self.assertEqual(digest,
+                         script_cache.ScriptBundle(self.script_dir).digest)
+
+        # Line endings alone do not make a new bundle
+        self._write('run.sh', b'#!/bin/bash\necho run\n')
+        self.assertEqual(digest,
+                         script_cache.ScriptBundle(self.script_dir).digest)
+
+        self._write('run.sh', b'#!/bin/bash\necho changed\n')
+        bundle = script_cache.ScriptBundle(self.script_dir)
+        self.assertNotEqual(digest, bundle.digest)
+        self.assertEqual('%s/%s' % (script_cache.REMOTE_CACHE_DIR,
+                                    bundle.digest), bundle.remote_dir)
+
+    def test_get_bundle_is_cached(self):
+        bundle = script_cache.get_bundle(self.script_dir)
+        self.addCleanup(script_cache._bundles.clear)
+        self.assertIs(bundle,
+                      script_cache.get_bundle(self.script_dir + '/.'))
@@ -0,0 +1,69 @@
+# Copyright 2016 Cloudbase Solutions Srl
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import threading
+
+from tempest.common.utils import parallel
+from tempest.tests import base
+
+
+class TestRunParallel(base.TestCase):
+
+    def test_results_keep_item_order(self):
+        self.assertEqual([0, 2, 4, 6],
+                         parallel.run_parallel(lambda x: x * 2, range(4)))
+
+    def test_calls_run_concurrently(self):
+        barrier = threading.Event()
+        started = []
+
+        def call(item):
+            started.append(item)
+            if len(started) == 3:
+                barrier.set()
+            # Only returns if every call got started
+            self.assertTrue(barrier.wait(5))
+            return item
+
+        self.assertEqual([1, 2, 3], parallel.run_parallel(call, [1, 2, 3]))
+
+    def test_max_workers(self):
+        lock = threading.Lock()
+        running = [0, 0]
+
+        def call(item):
+            with lock:
+                running[0] += 1
+                running[1] = max(running)
+            with lock:
+                running[0] -= 1
+
+        parallel.run_parallel(call, range(10), max_workers=1)
+        self.assertEqual(1, running[1])
+
+    def test_error_waits_for_all_calls(self):
+        done = []
+
+        def call(item):
+            if item == 'bad':
+                raise ValueError(item)
+            done.append(item)
+
+        self.assertRaises(ValueError, parallel.run_parallel, call,
+                          ['good', 'bad', 'other'])
+        self.assertEqual(['good', 'other'], sorted(done))
+
+    def test_no_items(self):
+        self.assertEqual([], parallel.run_parallel(lambda x: x, []))
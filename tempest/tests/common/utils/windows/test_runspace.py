@@ -0,0 +1,145 @@
+# Copyright 2016 Cloudbase Solutions Srl
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import socket
+
+import mock
+from oslo_serialization import jsonutils as json
+
+from tempest.common.utils.windows import runspace
+from tempest import exceptions
+from tempest.tests import base
+
+
+def _response(request_id, *results):
+    return '%s%s\r\n' % (runspace.RESPONSE_MARKER,
+                         json.dumps({'id': request_id,
+                                     'results': list(results)}))
+
+
+class TestPowerShellRunspace(base.TestCase):
+
+    def setUp(self):
+        super(TestPowerShellRunspace, self).setUp()
+        self.pool = mock.Mock(endpoint='https://host:5986/wsman')
+        self.shell = self.pool.acquire.return_value
+        self.shell.start_command.return_value = 'cmd-id'
+        self.runspace = runspace.PowerShellRunspace(self.pool)
+
+    def test_execute_batch_single_round_trip(self):
+        self.shell.receive.side_effect = [
+            ('banner\r\n' + _response(0), '', 0, False),
+            (_response(1, {'ok': True, 'value': 1024},
+                       {'ok': True, 'value': {'Startup': 2048}}),
+             '', 0, False)]
+
+        values = self.runspace.execute_batch(['cmd1', 'cmd2'])
+
+        self.assertEqual([1024, {'Startup': 2048}], values)
+        self.assertEqual(1, self.shell.start_command.call_count)
+        self.assertIn('-EncodedCommand',
+                      self.shell.start_command.call_args[0][0])
+        self.shell.send_input.assert_called_once_with(
+            'cmd-id', mock.ANY)
+        sent = json.loads(self.shell.send_input.call_args[0][1])
+        self.assertEqual({'id': 1, 'commands': ['cmd1', 'cmd2']}, sent)
+
+    def test_runspace_is_reused(self):
+        self.shell.receive.side_effect = [
+            (_response(0), '', 0, False),
+            (_response(1, {'ok': True, 'value': 1}), '', 0, False),
+            (_response(2, {'ok': True, 'value': 2}), '', 0, False)]
+
+        self.assertEqual(1, self.runspace.execute('cmd1'))
+        self.assertEqual(2, self.runspace.execute('cmd2'))
+        self.assertEqual(1, self.shell.start_command.call_count)
+
+    def test_response_split_across_receives(self):
+        response = _response(1, {'ok': True, 'value': 'x'})
+        self.shell.receive.side_effect = [
+            (_response(0), '', 0, False),
+            (response[:10], '', 0, False),
+            (response[10:], '', 0, False)]
+
+        self.assertEqual('x', self.runspace.execute('cmd'))
+
+    def test_failed_command_raises(self):
+        self.shell.receive.side_effect = [
+            (_response(0), '', 0, False),
+            (_response(1, {'ok': True, 'value': 1},
+                       {'ok': False, 'error': 'VM not found'}),
+             '', 0, False)]
+
+        exc = self.assertRaises(exceptions.PowerShellCommandFailed,
+                                self.runspace.execute_batch,
+                                ['cmd1', 'cmd2'])
+        self.assertIn('VM not found', str(exc))
+        self.assertFalse(self.shell.close.called)
+
+    def test_exited_process_is_discarded(self):
+        self.shell.receive.side_effect = [
+            (_response(0), '', 0, False),
+            ('', 'boom', 1, True)]
+
+        self.assertRaises(exceptions.PowerShellRunspaceError,
+                          self.runspace.execute, 'cmd')
+        self.shell.close.assert_called_once_with()
+        self.assertIsNone(self.runspace._shell)
+
+    def test_send_retried_on_fresh_runspace(self):
+        self.shell.receive.side_effect = [
+            (_response(0), '', 0, False),
+            (_response(0), '', 0, False),
+            (_response(1, {'ok': True, 'value': 1}), '', 0, False)]
+        self.shell.send_input.side_effect = [socket.error('reset'), None]
+
+        self.assertEqual(1, self.runspace.execute('cmd'))
+        self.assertEqual(2, self.shell.start_command.call_count)
+        self.shell.close.assert_called_once_with()
+
+    def test_send_retried_once(self):
+        self.shell.receive.return_value = (_response(0), '', 0, False)
+        self.shell.send_input.side_effect = socket.error('reset')
+
+        self.assertRaises(socket.error, self.runspace.execute, 'cmd')
+        self.assertEqual(2, self.shell.send_input.call_count)
+        self.assertIsNone(self.runspace._shell)
+
+    def test_no_retry_once_response_started(self):
+        self.shell.receive.side_effect = [
+            (_response(0), '', 0, False),
+            socket.error('reset')]
+
+        self.assertRaises(socket.error, self.runspace.execute, 'cmd')
+        self.assertEqual(1, self.shell.send_input.call_count)
+        self.assertIsNone(self.runspace._shell)
+
+    def test_close_releases_shell(self):
+        self.shell.receive.side_effect = [
+            (_response(0), '', 0, False),
+            (_response(1, {'ok': True, 'value': 1}), '', 0, False),
+            ('', '', 0, True)]
+        self.runspace.execute('cmd')
+
+        self.runspace.close()
+
+        self.shell.send_input.assert_called_with('cmd-id', '', end=True)
+        self.shell.cleanup_command.assert_called_once_with('cmd-id')
+        self.pool.release.assert_called_once_with(self.shell)
+
+    def test_commands_run_in_child_scope(self):
+        # A command assigning e.g. $results must not replace the REPL's
+        self.assertIn('& ([scriptblock]::Create($command))',
+                      runspace.REPL_SCRIPT)
+        self.assertNotIn('Invoke-Expression', runspace.REPL_SCRIPT)
@@ -0,0 +1,112 @@
+# Copyright 2016 Cloudbase Solutions Srl
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+from winrm import exceptions as winrm_exc
+
+from tempest.common.utils.windows import shell_pool
+from tempest.tests import base
+
+
+class TestWinRMShellPool(base.TestCase):
+
+    def setUp(self):
+        super(TestWinRMShellPool, self).setUp()
+        self.protocol_mock = self.patch(
+            'tempest.common.utils.windows.shell_pool.protocol.Protocol')
+        self.proto = self.protocol_mock.return_value
+        self.proto.open_shell.side_effect = ['shell-1', 'shell-2', 'shell-3']
+        self.proto.run_command.return_value = 'cmd-id'
+        self.proto.get_command_output.return_value = ('out', '', 0)
+        self.time_mock = self.patch('time.time')
+        self.time_mock.return_value = 1000
+        self.pool = shell_pool.WinRMShellPool(
+            'https://host:5986/wsman', 'user', 'pass',
+            max_idle=2, idle_timeout=120, check_interval=30)
+
+    def test_run_cmd_reuses_shell(self):
+        self.assertEqual(('out', '', 0), self.pool.run_cmd('dir'))
+        self.assertEqual(('out', '', 0), self.pool.run_cmd('dir'))
+
+        self.proto.open_shell.assert_called_once_with()
+        self.assertEqual(2, self.proto.run_command.call_count)
+        self.assertEqual(2, self.proto.cleanup_command.call_count)
+        self.assertFalse(self.proto.close_shell.called)
+
+    def test_idle_shell_is_health_checked(self):
+        self.pool.run_cmd('dir')
+        self.time_mock.return_value = 1000 + 60
+        self.pool.run_cmd('dir')
+
+        self.proto.open_shell.assert_called_once_with()
+        self.proto.run_command.assert_has_calls([
+            mock.call('shell-1', 'dir'),
+            mock.call('shell-1', shell_pool.HEALTH_CHECK_CMD),
+            mock.call('shell-1', 'dir')])
+
+    def test_dead_shell_is_replaced(self):
+        self.pool.run_cmd('dir')
+        self.time_mock.return_value = 1000 + 60
+        self.proto.get_command_output.side_effect = [
+            ('', 'gone', 1), ('out', '', 0)]
+        self.pool.run_cmd('dir')
+
+        self.assertEqual(2, self.proto.open_shell.call_count)
+        self.proto.close_shell.assert_called_once_with('shell-1')
+        self.assertEqual(mock.call('shell-2', 'dir'),
+                         self.proto.run_command.call_args)
+
+    def test_expired_shell_is_evicted(self):
+        self.pool.run_cmd('dir')
+        self.time_mock.return_value = 1000 + 300
+        self.pool.run_cmd('dir')
+
+        self.proto.close_shell.assert_called_once_with('shell-1')
+        self.assertEqual(2, self.proto.open_shell.call_count)
+
+    def test_reconnect_when_command_cannot_start(self):
+        self.pool.run_cmd('dir')
+        self.proto.run_command.side_effect = [
+            winrm_exc.WinRMTransportError('http', 'reset'), 'cmd-id']
+        self.assertEqual(('out', '', 0), self.pool.run_cmd('dir'))
+
+        self.assertEqual(2, self.proto.open_shell.call_count)
+        self.proto.close_shell.assert_called_once_with('shell-1')
+
+    def test_failed_output_is_not_replayed(self):
+        self.proto.get_command_output.side_effect = (
+            winrm_exc.WinRMTransportError('http', 'reset'))
+        self.assertRaises(winrm_exc.WinRMTransportError,
+                          self.pool.run_cmd, 'dir')
+
+        self.proto.run_command.assert_called_once_with('shell-1', 'dir')
+        self.proto.close_shell.assert_called_once_with('shell-1')
+        self.assertEqual(0, len(self.pool._idle))
+
+    def test_release_closes_shells_over_limit(self):
+        shells = [self.pool.acquire() for _ in range(3)]
+        for shell in shells:
+            self.pool.release(shell)
+
+        self.assertEqual(2, len(self.pool._idle))
+        self.proto.close_shell.assert_called_once_with('shell-3')
+
+    def test_get_shell_pool_is_shared(self):
+        self.addCleanup(shell_pool.close_all_pools)
+        pool = shell_pool.get_shell_pool('https://host:5986/wsman',
+                                         'user', 'pass')
+        self.assertIs(pool, shell_pool.get_shell_pool(
+            'https://host:5986/wsman', 'user', 'pass'))
+        self.assertIsNot(pool, shell_pool.get_shell_pool(
+            'https://other:5986/wsman', 'user', 'pass'))
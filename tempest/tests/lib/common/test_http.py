@@ -0,0 +1,152 @@
+# Copyright 2016 Cloudbase Solutions Srl
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import socket
+
+import mock
+from six.moves import http_client
+
+from tempest.lib.common import http
+from tempest.tests.lib import base
+
+
+class TestPooledHttp(base.TestCase):
+
+    def setUp(self):
+        super(TestPooledHttp, self).setUp()
+        self.https = []
+        self.http_class = self.patch('httplib2.Http',
+                                     side_effect=self._new_http)
+        self.select = self.patch('select.select', return_value=([], [], []))
+        self.time = self.patch('time.time', return_value=1000)
+        self.pooled = http.PooledHttp(ca_certs='/ca.pem', pool_size=2,
+                                      idle_timeout=30)
+
+    def _new_http(self, **kwargs):
+        fake = mock.Mock(connections={})
+
+        def request(uri, method, **kwargs):
+            # A successful request leaves a kept alive connection behind
+            fake.connections['https:' + uri.split('/')[2]] = mock.Mock()
+            return 'response', 'body'
+        fake.request.side_effect = request
+        self.https.append(fake)
+        return fake
+
+    def test_connection_reused_per_endpoint(self):
+        self.pooled.request('https://nova:8774/servers', 'GET')
+        self.pooled.request('https://nova:8774/flavors', 'GET')
+        self.pooled.request('https://glance:9292/images', 'GET')
+
+        self.assertEqual(2, len(self.https))
+        self.assertEqual(2, self.https[0].request.call_count)
+        self.http_class.assert_called_with(
+            disable_ssl_certificate_validation=False, ca_certs='/ca.pem')
+
+    def test_forked_child_does_not_reuse_connections(self):
+        self.pooled.request('https://nova:8774/servers', 'GET')
+        parent = self.https[0]
+        self.patch('os.getpid', return_value=self.pooled._pid + 1)
+
+        self.pooled.request('https://nova:8774/servers', 'GET')
+
+        self.assertEqual(2, len(self.https))
+        self.assertEqual(1, parent.request.call_count)
+        self.assertFalse(
+            parent.connections['https:nova:8774'].close.called)
+
+    def test_pool_size(self):
+        held = [self.pooled._acquire(('https', 'nova'))[0]
+                for _ in range(3)]
+        for fake in held:
+            self.pooled._release(('https', 'nova'), fake)
+
+        self.assertEqual(2, len(self.pooled._pools[('https', 'nova')]))
+        self.assertFalse(held[0].connections)
+
+    def test_idle_timeout(self):
+        self.pooled.request('https://nova:8774/servers', 'GET')
+        self.time.return_value = 1031
+        self.pooled.request('https://nova:8774/servers', 'GET')
+
+        self.assertEqual(2, len(self.https))
+        self.assertFalse(self.https[0].connections)
+
+    def test_stale_socket_dropped_before_reuse(self):
+        self.pooled.request('https://nova:8774/servers', 'GET')
+        connection = list(self.https[0].connections.values())[0]
+        self.select.return_value = ([connection.sock], [], [])
+
+        self.assertEqual(self.https[0],
+                         self.pooled._acquire(('https', 'nova:8774'))[0])
+        connection.close.assert_called_once_with()
+        self.assertFalse(self.https[0].connections)
+
+    def _drop_connection_on_next_request(self):
+        self.pooled.request('https://nova:8774/servers', 'GET')
+        self.https[0].request.side_effect = http_client.BadStatusLine('')
+
+    def test_dropped_connection_retried_for_idempotent_method(self):
+        self._drop_connection_on_next_request()
+
+        self.assertEqual(('response', 'body'), self.pooled.request(
+            'https://nova:8774/servers/1', 'DELETE'))
+        self.assertEqual(2, len(self.https))
+
+    def test_dropped_connection_not_retried_for_post(self):
+        self._drop_connection_on_next_request()
+
+        self.assertRaises(http_client.BadStatusLine, self.pooled.request,
+                          'https://nova:8774/servers', 'POST', body='{}')
+        self.assertEqual(1, len(self.https))
+        self.assertFalse(self.pooled._pools[('https', 'nova:8774')])
+
+    def test_new_connection_failure_not_retried(self):
+        self.http_class.side_effect = None
+        self.http_class.return_value.connections = {}
+        self.http_class.return_value.request.side_effect = socket.error
+
+        self.assertRaises(socket.error, self.pooled.request,
+                          'https://nova:8774/servers', 'GET')
+        self.assertEqual(1, self.http_class.call_count)
+
+
+class TestGetHttp(base.TestCase):
+
+    def setUp(self):
+        super(TestGetHttp, self).setUp()
+        self.addCleanup(http.configure_transport,
+                        **dict(http._transport_settings))
+        http.configure_transport('pooled', pool_size=3, idle_timeout=5)
+
+    def test_pooled_transport_is_shared(self):
+        pooled = http.get_http(ca_certs='/ca.pem')
+        self.assertIsInstance(pooled, http.PooledHttp)
+        self.assertIs(pooled, http.get_http(ca_certs='/ca.pem'))
+        self.assertIsNot(pooled, http.get_http(
+            disable_ssl_certificate_validation=True, ca_certs='/ca.pem'))
+        self.assertEqual((3, 5), (pooled.pool_size, pooled.idle_timeout))
+
+    def test_forked_child_gets_new_transport(self):
+        pooled = http.get_http(ca_certs='/ca.pem')
+        self.patch('os.getpid', return_value=pooled._pid + 1)
+        self.assertIsNot(pooled, http.get_http(ca_certs='/ca.pem'))
+
+    def test_closing_transport(self):
+        http.configure_transport('closing')
+        self.assertIsInstance(http.get_http(), http.ClosingHttp)
+
+    def test_unknown_transport(self):
+        self.assertRaises(ValueError, http.configure_transport, 'carrier')
@@ -13,6 +13,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import threading
 
 from tempest.lib.common.utils import misc
 from tempest.tests.lib import base
@@ -86,3 +87,28 @@ class TestMisc(base.TestCase):
             return misc.find_test_caller()
         self.assertEqual('TestMisc:tearDownClass',
                          tearDownClass(self.__class__))
+
+    def test_find_test_caller_recorded(self):
+        self.addCleanup(misc.clear_test_caller)
+        misc.set_test_caller('FakeTest:test_fake')
+
+        def setUp(self):
+            return misc.find_test_caller()
+        self.assertEqual('FakeTest:test_fake', setUp(self))
+
+    def test_find_test_caller_recorded_other_thread(self):
+        self.addCleanup(misc.clear_test_caller)
+        misc.set_test_caller('FakeTest:test_fake')
+        callers = []
+        thread = threading.Thread(
+            target=lambda: callers.append(misc.find_test_caller()))
+        thread.start()
+        thread.join()
+        self.assertEqual(['FakeTest:test_fake'], callers)
+
+    def test_find_test_caller_cleared(self):
+        misc.set_test_caller('FakeTest:test_fake')
+        misc.clear_test_caller()
+        self.assertIsNone(misc.get_test_caller())
+        self.assertEqual('TestMisc:test_find_test_caller_cleared',
+                         misc.find_test_caller())
@@ -0,0 +1,90 @@
+# Copyright 2016 Cloudbase Solutions Srl
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+
+from tempest.lib.common.utils import polling
+from tempest.tests.lib import base
+
+
+class TestTransitionStats(base.TestCase):
+
+    def test_expected_needs_samples(self):
+        stats = polling.TransitionStats(min_samples=3)
+        stats.record('volume:available', 10)
+        stats.record('volume:available', 12)
+        self.assertIsNone(stats.expected('volume:available'))
+        self.assertIsNone(stats.expected('unknown'))
+
+    def test_expected_is_median_bucket(self):
+        stats = polling.TransitionStats(min_samples=3)
+        for duration in (0.5, 40, 50, 60, 300):
+            stats.record('snapshot:available', duration)
+
+        self.assertEqual(32, stats.expected('snapshot:available'))
+        self.assertEqual({1: 1, 64: 3, 512: 1},
+                         stats.histogram('snapshot:available'))
+
+
+class TestPoller(base.TestCase):
+
+    def setUp(self):
+        super(TestPoller, self).setUp()
+        self.patch('random.uniform', return_value=0)
+        self.time = self.patch('time.time', return_value=1000)
+        self.stats = polling.TransitionStats(min_samples=1)
+
+    def test_backoff_is_capped(self):
+        poller = polling.Poller(1, stats=self.stats)
+        delays = [poller.next_delay() for _ in range(6)]
+        self.assertEqual([0.25, 0.5, 1, 2, 4, 4], delays)
+
+    def test_jitter(self):
+        strategy = polling.ExponentialBackoff(2, jitter=0.5)
+        with mock.patch('random.uniform', return_value=0.5):
+            delay, hint = next(strategy.delays())
+        self.assertEqual(0.75, delay)
+        self.assertIsNone(hint)
+
+    def test_fixed_interval(self):
+        poller = polling.Poller(3, strategy=polling.FixedInterval(3),
+                                stats=self.stats)
+        self.assertEqual([3, 3], [poller.next_delay(), poller.next_delay()])
+
+    def test_timeout_bounds_delay(self):
+        poller = polling.Poller(8, timeout=5, stats=self.stats)
+        self.assertEqual(2, poller.next_delay())
+        self.time.return_value = 1002
+        self.assertEqual(3, poller.next_delay())
+        self.time.return_value = 1010
+        # Past the timeout: no busy loop
+        self.assertEqual(2, poller.next_delay())
+
+    def test_expected_duration_hint(self):
+        self.stats.record('server:ACTIVE', 100)
+        poller = polling.Poller(1, key='server:ACTIVE', stats=self.stats)
+        # Median bucket starts at 64 s, first poll aims at 80% of it
+        self.assertAlmostEqual(51.2, poller.next_delay())
+        self.time.return_value = 1000 + 51.2
+        self.assertEqual(0.5, poller.next_delay())
+
+    def test_done_records_duration(self):
+        sleep = self.patch('time.sleep')
+        poller = polling.Poller(1, key='image:active', stats=self.stats)
+        poller.sleep()
+        sleep.assert_called_once_with(0.25)
+        self.time.return_value = 1003
+        poller.done()
+        self.assertEqual({4: 1}, self.stats.histogram('image:active'))
@@ -420,6 +420,85 @@ class TestKeystoneV2AuthProvider(BaseAuthTestsSetUp):
                        self.auth_provider.token_expiry_threshold / 2)
         self._verify_expiry(expiry_data=expiry_data, should_be_expired=True)
 
+    def _fresh_auth_data(self, expires_in=datetime.timedelta(days=1),
+                         lifetime=None):
+        now = datetime.datetime.utcnow()
+        expiry = now + expires_in
+        auth_data = copy.deepcopy(self._auth_data_with_expiry(
+            expiry.strftime(auth.ISO8601_INT_SECONDS)))
+        if lifetime is not None:
+            self._set_issued_at(auth_data, (expiry - lifetime).strftime(
+                auth.ISO8601_INT_SECONDS))
+        return auth_data
+
+    def _set_issued_at(self, auth_data, date_as_string):
+        auth_data[1]['token']['issued_at'] = date_as_string
+
+    def _shared_providers(self, auth_data, count=2):
+        cache = auth.AuthCache()
+        providers = [self._auth(self.credentials, fake_identity.FAKE_AUTH_URL,
+                                auth_cache=cache) for _ in range(count)]
+        get_auth = self.useFixture(mockpatch.PatchObject(
+            self._auth_provider_class, '_get_auth',
+            return_value=auth_data)).mock
+        return providers, get_auth
+
+    def test_auth_shared_between_providers(self):
+        auth_data = self._fresh_auth_data()
+        (first, second), get_auth = self._shared_providers(auth_data)
+        self.assertEqual(auth_data, first.get_auth())
+        self.assertEqual(auth_data, second.get_auth())
+        self.assertEqual(auth_data, first.get_auth())
+        self.assertEqual(1, get_auth.call_count)
+
+    def test_clear_auth_invalidates_shared_auth(self):
+        (first, second), get_auth = self._shared_providers(
+            self._fresh_auth_data())
+        first.get_auth()
+        second.get_auth()
+        first.clear_auth()
+        second.get_auth()
+        self.assertEqual(2, get_auth.call_count)
+
+    def test_token_refreshed_before_expiry(self):
+        expires_in = self.auth_provider.token_refresh_threshold / 2
+        auth_data = self._fresh_auth_data(expires_in)
+        (provider,), get_auth = self._shared_providers(auth_data, count=1)
+        self.assertFalse(provider.is_expired(auth_data))
+        provider.get_auth()
+        provider.get_auth()
+        self.assertEqual(2, get_auth.call_count)
+
+    def test_short_lived_token_reused(self):
+        # A 300s token, 100s into its life
+        auth_data = self._fresh_auth_data(
+            expires_in=datetime.timedelta(seconds=200),
+            lifetime=datetime.timedelta(seconds=300))
+        (provider,), get_auth = self._shared_providers(auth_data, count=1)
+        provider.get_auth()
+        provider.get_auth()
+        self.assertEqual(1, get_auth.call_count)
+
+    def test_short_lived_token_refreshed_before_expiry(self):
+        # Refreshed no later than token_expiry_threshold before it expires
+        auth_data = self._fresh_auth_data(
+            expires_in=self.auth_provider.token_expiry_threshold / 2,
+            lifetime=datetime.timedelta(seconds=120))
+        (provider,), get_auth = self._shared_providers(auth_data, count=1)
+        provider.get_auth()
+        provider.get_auth()
+        self.assertEqual(2, get_auth.call_count)
+
+    def test_base_url_looked_up_once(self):
+        (first, second), _ = self._shared_providers(self._fresh_auth_data())
+        filters = {'service': 'compute', 'region': 'FakeRegion'}
+        expected = first.base_url(filters)
+        catalog_base_url = self.useFixture(mockpatch.PatchObject(
+            self._auth_provider_class, '_catalog_base_url')).mock
+        self.assertEqual(expected, first.base_url(filters))
+        self.assertEqual(expected, second.base_url(filters))
+        self.assertFalse(catalog_base_url.called)
+
     def _verify_expiry(self, expiry_data, should_be_expired):
         for expiry_format in self.auth_provider.EXPIRY_DATE_FORMATS:
             auth_data = self._auth_data_with_expiry(
@@ -454,6 +533,9 @@ class TestKeystoneV3AuthProvider(TestKeystoneV2AuthProvider):
         access['expires_at'] = date_as_string
         return token, access
 
+    def _set_issued_at(self, auth_data, date_as_string):
+        auth_data[1]['issued_at'] = date_as_string
+
     def _get_from_fake_identity(self, attr):
         token = fake_identity.IDENTITY_V3_RESPONSE['token']
         if attr == 'user_id':
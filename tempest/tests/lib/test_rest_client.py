@@ -675,6 +675,8 @@ class TestJSONSchemaValidationBase(base.TestCase):
 
     def setUp(self):
         super(TestJSONSchemaValidationBase, self).setUp()
+        self.useFixture(mockpatch.PatchObject(
+            rest_client, 'VALIDATORS', rest_client.SchemaValidators()))
         self.fake_auth_provider = fake_auth_provider.FakeAuthProvider()
         self.rest_client = rest_client.RestClient(
             self.fake_auth_provider, None, None)
@@ -1073,3 +1075,53 @@ class TestRestClientJSONSchemaValidatorVersion(TestJSONSchemaValidationBase):
             self._test_validate_pass(self.schema, body)
             chk_schema.mock.assert_called_once_with(
                 self.schema['response_body'])
+
+
+class TestSchemaValidators(base.TestCase):
+
+    schema = {
+        'type': 'object',
+        'properties': {
+            'foo': {'type': 'string'}
+        }
+    }
+
+    def setUp(self):
+        super(TestSchemaValidators, self).setUp()
+        self.validators = rest_client.SchemaValidators()
+
+    def test_validator_compiled_once(self):
+        with mockpatch.PatchObject(jsonschema.Draft4Validator,
+                                   "check_schema") as chk_schema:
+            validator = self.validators.get(self.schema)
+            for _ in range(3):
+                self.validators.validate({'foo': 'test'}, self.schema)
+            self.assertIs(validator, self.validators.get(self.schema))
+            chk_schema.mock.assert_called_once_with(self.schema)
+
+    def test_equal_schemas_compiled_separately(self):
+        other = copy.deepcopy(self.schema)
+        self.assertIsNot(self.validators.get(self.schema),
+                         self.validators.get(other))
+
+    def test_validate_fail(self):
+        self.assertRaises(jsonschema.ValidationError,
+                          self.validators.validate, {'foo': 1}, self.schema)
+
+    def test_sampled_validation(self):
+        self.validators.sample_rate = 3
+        failures = 0
+        for _ in range(6):
+            try:
+                self.validators.validate({'foo': 1}, self.schema)
+            except jsonschema.ValidationError:
+                failures += 1
+        self.assertEqual(2, failures)
+
+    def test_configure_validation(self):
+        self.useFixture(mockpatch.PatchObject(
+            rest_client, 'VALIDATORS', self.validators))
+        rest_client.configure_validation(0)
+        self.assertEqual(1, self.validators.sample_rate)
+        rest_client.configure_validation(10)
+        self.assertEqual(10, self.validators.sample_rate)
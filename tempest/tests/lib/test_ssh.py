@@ -14,6 +14,8 @@
 
 from io import StringIO
 import socket
+import threading
+import time
 
 import mock
 import six
@@ -29,6 +31,10 @@ class TestSshClient(base.TestCase):
 
     SELECT_POLLIN = 1
 
+    def setUp(self):
+        super(TestSshClient, self).setUp()
+        self.addCleanup(ssh.close_all_connections)
+
     @mock.patch('paramiko.RSAKey.from_private_key')
     @mock.patch('six.StringIO')
     def test_pkey_calls_paramiko_RSAKey(self, cs_mock, rsa_mock):
@@ -160,9 +166,9 @@ class TestSshClient(base.TestCase):
             chan_mock, self.SELECT_POLLIN)
         poll_mock.poll.assert_called_once_with(10)
         chan_mock.recv_ready.assert_called_once_with()
-        chan_mock.recv.assert_called_once_with(1024)
+        chan_mock.recv.assert_called_once_with(client.buf_size)
         chan_mock.recv_stderr_ready.assert_called_once_with()
-        chan_mock.recv_stderr.assert_called_once_with(1024)
+        chan_mock.recv_stderr.assert_called_once_with(client.buf_size)
         chan_mock.recv_exit_status.assert_called_once_with()
         closed_prop.assert_called_once_with()
 
@@ -226,6 +232,60 @@ class TestSshClient(base.TestCase):
                                 client.exec_command, "test")
         self.assertIn('R' + self._utf8_string, six.text_type(exc))
 
+    @mock.patch('select.POLLIN', SELECT_POLLIN, create=True)
+    def test_exec_command_drains_output_before_exit_status(self):
+        chan_mock, poll_mock, _ = self._set_mocks_for_select([1, 0, 0])
+        type(chan_mock).closed = mock.PropertyMock(return_value=True)
+        calls = []
+        chan_mock.recv.side_effect = lambda size: calls.append('recv') or b''
+        chan_mock.recv_stderr.return_value = b''
+        chan_mock.recv_exit_status.side_effect = (
+            lambda: calls.append('exit_status') or 0)
+
+        client = ssh.Client('localhost', 'root', timeout=2)
+        client.exec_command("test")
+
+        self.assertEqual(['recv', 'exit_status'], calls)
+
+    @mock.patch('select.POLLIN', SELECT_POLLIN, create=True)
+    def test_exec_command_stream(self):
+        chan_mock, poll_mock, _ = self._set_mocks_for_select([1, 0, 0])
+        type(chan_mock).closed = mock.PropertyMock(return_value=True)
+        chan_mock.recv_exit_status.return_value = 0
+        chan_mock.recv.side_effect = [b'abc', b'def', b'', b'']
+        chan_mock.recv_stderr.side_effect = [b'', b'err', b'', b'']
+        stdout_cb = mock.Mock()
+        stderr_cb = mock.Mock()
+
+        client = ssh.Client('localhost', 'root', timeout=2,
+                            buf_size=4096)
+        exit_status = client.exec_command_stream(
+            "test", stdout_callback=stdout_cb, stderr_callback=stderr_cb)
+
+        self.assertEqual(0, exit_status)
+        self.assertEqual([mock.call(b'abc'), mock.call(b'def')],
+                         stdout_cb.mock_calls)
+        stderr_cb.assert_called_once_with(b'err')
+        chan_mock.recv.assert_called_with(4096)
+
+    @mock.patch('select.POLLIN', SELECT_POLLIN, create=True)
+    def test_exec_command_stream_failure_keeps_tail(self):
+        chan_mock, poll_mock, _ = self._set_mocks_for_select([1, 0, 0])
+        type(chan_mock).closed = mock.PropertyMock(return_value=True)
+        chan_mock.recv_exit_status.return_value = 2
+        chan_mock.recv.side_effect = [b'0123456789', b'abcdef', b'']
+        chan_mock.recv_stderr.side_effect = [b'', b'bad thing', b'']
+
+        client = ssh.Client('localhost', 'root', timeout=2, tail_size=8)
+        exc = self.assertRaises(exceptions.SSHExecCommandFailed,
+                                client.exec_command_stream, "test")
+        self.assertIn('89abcdef', six.text_type(exc))
+        self.assertNotIn('01234567', six.text_type(exc))
+        self.assertIn('ad thing', six.text_type(exc))
+
+        self.assertEqual(2, client.exec_command_stream(
+            "test", ignore_exit_status=True))
+
     def test_exec_command_no_select(self):
         gsc_mock = self.patch('tempest.lib.common.ssh.Client.'
                               '_get_ssh_connection')
@@ -247,14 +307,122 @@ class TestSshClient(base.TestCase):
 
         std_out_mock = mock.MagicMock(StringIO)
         std_err_mock = mock.MagicMock(StringIO)
+        std_out_mock.read.return_value = b''
+        std_err_mock.read.return_value = b''
         chan_mock.makefile.return_value = std_out_mock
         chan_mock.makefile_stderr.return_value = std_err_mock
 
         client = ssh.Client('localhost', 'root', timeout=2)
         client.exec_command("test")
 
-        chan_mock.makefile.assert_called_once_with('rb', 1024)
-        chan_mock.makefile_stderr.assert_called_once_with('rb', 1024)
+        chan_mock.makefile.assert_called_once_with('rb', client.buf_size)
+        chan_mock.makefile_stderr.assert_called_once_with(
+            'rb', client.buf_size)
         std_out_mock.read.assert_called_once_with()
         std_err_mock.read.assert_called_once_with()
         self.assertFalse(select_mock.called)
+
+    def _set_mocks_for_connection(self):
+        gsc_mock = self.patch('tempest.lib.common.ssh.Client.'
+                              '_get_ssh_connection')
+        client_mock = mock.MagicMock()
+        tran_mock = mock.MagicMock()
+        tran_mock.is_active.return_value = True
+        gsc_mock.return_value = client_mock
+        client_mock.get_transport.return_value = tran_mock
+        return gsc_mock, client_mock, tran_mock
+
+    def test_connection_is_reused(self):
+        gsc_mock, client_mock, tran_mock = self._set_mocks_for_connection()
+
+        ssh.Client('localhost', 'root', password='pass').test_connection_auth()
+        client = ssh.Client('localhost', 'root', password='pass')
+        client._open_session()
+        client._open_session()
+
+        gsc_mock.assert_called_once_with()
+        self.assertEqual(2, tran_mock.open_session.call_count)
+        self.assertFalse(client_mock.close.called)
+
+    def test_connection_auth_reconnects(self):
+        gsc_mock, client_mock, tran_mock = self._set_mocks_for_connection()
+        client = ssh.Client('localhost', 'root', password='pass')
+        client._open_session()
+
+        client.test_connection_auth()
+
+        self.assertEqual(2, gsc_mock.call_count)
+        client_mock.close.assert_called_once_with()
+
+    def test_concurrent_callers_share_connection(self):
+        gsc_mock, client_mock, tran_mock = self._set_mocks_for_connection()
+        started = threading.Event()
+
+        def connect():
+            started.set()
+            time.sleep(0.1)
+            return client_mock
+        gsc_mock.side_effect = connect
+
+        client = ssh.Client('localhost', 'root', password='pass')
+        thread = threading.Thread(target=client._get_transport)
+        thread.start()
+        started.wait()
+        client._get_transport()
+        thread.join()
+
+        gsc_mock.assert_called_once_with()
+
+    def test_connection_per_credentials(self):
+        gsc_mock, _, _ = self._set_mocks_for_connection()
+
+        ssh.Client('localhost', 'root', password='pass')._open_session()
+        ssh.Client('localhost', 'user', password='pass')._open_session()
+        ssh.Client('otherhost', 'root', password='pass')._open_session()
+
+        self.assertEqual(3, gsc_mock.call_count)
+
+    def test_dead_transport_reconnects(self):
+        gsc_mock, client_mock, tran_mock = self._set_mocks_for_connection()
+        client = ssh.Client('localhost', 'root', password='pass')
+        client._open_session()
+
+        tran_mock.is_active.return_value = False
+        client._open_session()
+
+        self.assertEqual(2, gsc_mock.call_count)
+        client_mock.close.assert_called_once_with()
+
+    def test_open_session_failure_reconnects(self):
+        gsc_mock, client_mock, tran_mock = self._set_mocks_for_connection()
+        tran_mock.open_session.side_effect = [EOFError,
+                                              mock.sentinel.channel]
+
+        client = ssh.Client('localhost', 'root', password='pass')
+        self.assertEqual(mock.sentinel.channel, client._open_session())
+        self.assertEqual(2, gsc_mock.call_count)
+        client_mock.close.assert_called_once_with()
+
+    def test_close(self):
+        gsc_mock, client_mock, _ = self._set_mocks_for_connection()
+        client = ssh.Client('localhost', 'root', password='pass')
+        client._open_session()
+
+        client.close()
+        client_mock.close.assert_called_once_with()
+        client._open_session()
+        self.assertEqual(2, gsc_mock.call_count)
+
+    def test_put_data_uses_cached_transport(self):
+        _, _, tran_mock = self._set_mocks_for_connection()
+        sftp_mock = self.patch('paramiko.SFTPClient.from_transport')
+        client = ssh.Client('localhost', 'root', password='pass')
+
+        client.put_data(b'payload', '/var/tmp/bundle.tar.gz')
+
+        sftp_mock.assert_called_once_with(tran_mock)
+        sftp = sftp_mock.return_value
+        data, remote_path = sftp.putfo.call_args[0]
+        self.assertEqual(b'payload', data.read())
+        self.assertEqual('/var/tmp/bundle.tar.gz', remote_path)
+        sftp.close.assert_called_once_with()
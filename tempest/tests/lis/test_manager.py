@@ -0,0 +1,251 @@
+# Copyright 2016 Cloudbase Solutions Srl
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+from oslo_serialization import jsonutils as json
+
+from tempest.common.utils.windows import runspace
+from tempest import exceptions
+from tempest.lis import manager
+from tempest.tests import base
+
+
+def _lis_test():
+    # Defined here so that the test loader does not pick it up
+    class FakeLisTest(manager.LisBase):
+
+        def runTest(self):
+            pass
+
+    return FakeLisTest()
+
+
+def _response(request_id, *results):
+    return '%s%s\r\n' % (runspace.RESPONSE_MARKER,
+                         json.dumps({'id': request_id,
+                                     'results': list(results)}))
+
+
+def _disk_result(path=None, error=''):
+    return {'ok': path is not None, 'output': path or '', 'error': error}
+
+
+class TestAddDisks(base.TestCase):
+
+    def setUp(self):
+        super(TestAddDisks, self).setUp()
+        self.lis_test = _lis_test()
+        self.lis_test.disks = []
+        self.lis_test.addCleanup = mock.Mock()
+        self.shell = mock.Mock()
+        self.shell.start_command.return_value = 'cmd-id'
+        pool = mock.Mock(endpoint='https://host:5986/wsman')
+        pool.acquire.return_value = self.shell
+        self.lis_test.host_client = mock.Mock()
+        self.lis_test.host_client.run_powershell_batch.side_effect = (
+            runspace.PowerShellRunspace(pool).execute_batch)
+
+    def _add_disks(self, *disk_results):
+        # The runspace answers with one result for the single command,
+        # whose value is the list of the disk results
+        self.shell.receive.side_effect = [
+            (_response(0), '', 0, False),
+            (_response(1, {'ok': True, 'value': list(disk_results)}),
+             '', 0, False)]
+        return self.lis_test.add_disks(
+            'instance-1', 'vhdx', [('SCSI', 0, 1), ('SCSI', 0, 2)],
+            'Dynamic', 512)
+
+    def test_add_disks(self):
+        results = self._add_disks(_disk_result('C:\\disk-1.vhdx'),
+                                  _disk_result('C:\\disk-2.vhdx'))
+
+        self.assertEqual(['instance-1-SCSI-0-1-Dynamic.*',
+                          'instance-1-SCSI-0-2-Dynamic.*'],
+                         [result['disk'] for result in results])
+        self.assertEqual(['C:\\disk-1.vhdx', 'C:\\disk-2.vhdx'],
+                         [result['output'] for result in results])
+        self.assertEqual(['instance-1-SCSI-0-1-Dynamic.*',
+                          'instance-1-SCSI-0-2-Dynamic.*'],
+                         self.lis_test.disks)
+        self.lis_test.addCleanup.assert_called_once_with(
+            self.lis_test.remove_disks, 'instance-1', self.lis_test.disks)
+        sent = json.loads(self.shell.send_input.call_args[0][1])
+        self.assertEqual(1, len(sent['commands']))
+
+    def test_add_disks_failed_disk(self):
+        self.assertRaisesRegexp(
+            exceptions.PowerShellCommandFailed,
+            'instance-1-SCSI-0-2-Dynamic.*: disk full',
+            self._add_disks, _disk_result('C:\\disk-1.vhdx'),
+            _disk_result(error='disk full'))
+
+        self.assertEqual(['instance-1-SCSI-0-1-Dynamic.*'],
+                         self.lis_test.disks)
+
+
+class TestGoldenVM(base.TestCase):
+
+    def setUp(self):
+        super(TestGoldenVM, self).setUp()
+        golden_vms = mock.patch.dict(manager._golden_vms, clear=True)
+        golden_vms.start()
+        self.addCleanup(golden_vms.stop)
+        self.owner = mock.Mock()
+        self.owner.keypairs_client.create_keypair.return_value = {
+            'keypair': {'name': 'golden', 'private_key': 'key'}}
+        self.owner.compute_security_groups_client.create_security_group.\
+            return_value = {'security_group': {'id': 'secgroup'}}
+        self.owner.servers_client.show_server.return_value = {
+            'server': {'id': 'server-1', 'status': 'ACTIVE',
+                       'OS-EXT-SRV-ATTR:instance_name': 'instance-1',
+                       'OS-EXT-SRV-ATTR:hypervisor_hostname': 'host-1'}}
+        self.owner.floating_ips_client.create_floatingip.return_value = {
+            'floatingip': {'id': 'fip', 'floating_ip_address': '10.0.0.1'}}
+        self.patch('tempest.lis.manager.golden_vm_owner',
+                   return_value=(mock.Mock(), self.owner))
+        self.create_server = self.patch(
+            'tempest.common.compute.create_test_server',
+            return_value=({'id': 'server-1'}, None))
+        self.patch('tempest.common.waiters.wait_for_server_status')
+        self.patch('tempest.common.fixed_network.get_tenant_network')
+        self.patch('tempest.lis.manager.guest_script_directories',
+                   return_value=['core', 'net'])
+        self.patch('tempest.common.utils.linux.script_cache.get_bundle',
+                   side_effect=lambda directory: 'bundle-' + directory)
+
+    def _lis_test(self, image_stamp='stamp-1'):
+        lis_test = _lis_test()
+        lis_test.image_ref = 'image'
+        lis_test.flavor_ref = 'flavor'
+        lis_test.manager = lis_test.vm_manager = mock.Mock()
+        lis_test.servers_client = lis_test.manager.servers_client
+        lis_test.golden_vm = None
+        lis_test.addCleanup = mock.Mock()
+        lis_test.compute_images_client = mock.Mock()
+        lis_test.compute_images_client.show_image.return_value = {
+            'image': {'updated': image_stamp}}
+        # Records the guest and host calls in order
+        lis_test.calls = mock.Mock()
+        lis_test.get_remote_client = lis_test.calls.get_remote_client
+        lis_test._initiate_host_client = lis_test.calls.initiate_host_client
+        lis_test.take_snapshot = lis_test.calls.take_snapshot
+        lis_test.revert_snapshot = lis_test.calls.revert_snapshot
+        lis_test.host_client = lis_test.calls.host_client
+        return lis_test
+
+    def _golden(self, image_stamp='stamp-1'):
+        golden = manager.GoldenVM(('image', 'flavor'), image_stamp,
+                                  self.owner)
+        golden.server = {'id': 'server-1'}
+        golden.instance_name = 'instance-1'
+        golden.host_name = 'host-1'
+        golden.keypair = {'private_key': 'key'}
+        golden.floating_ip = {'floatingip': {'id': 'fip'}}
+        golden.destroyed = mock.Mock()
+        golden.add_cleanup(golden.destroyed)
+        manager._golden_vms[golden.key] = golden
+        return golden
+
+    def test_lease_boots_and_checkpoints(self):
+        lis_test = self._lis_test()
+        test_manager = lis_test.manager
+
+        lis_test.lease_golden_vm()
+
+        self.create_server.assert_called_once_with(
+            self.owner, tenant_network=mock.ANY, name=mock.ANY,
+            flavor='flavor', image_id='image', key_name=mock.ANY,
+            security_groups=mock.ANY)
+        linux_client = lis_test.calls.get_remote_client.return_value
+        self.assertEqual(
+            [mock.call.get_remote_client('10.0.0.1', private_key='key'),
+             mock.call.get_remote_client().deploy_scripts('bundle-core'),
+             mock.call.get_remote_client().deploy_scripts('bundle-net'),
+             mock.call.initiate_host_client('host-1'),
+             mock.call.take_snapshot('instance-1',
+                                     manager.GoldenVM.CHECKPOINT)],
+            lis_test.calls.mock_calls)
+        self.assertEqual(2, linux_client.deploy_scripts.call_count)
+        self.assertEqual('server-1', lis_test.server_id)
+        self.assertEqual('instance-1', lis_test.instance_name)
+        self.assertIs(self.owner, lis_test.vm_manager)
+        # The test keeps its own clients
+        self.assertIs(test_manager, lis_test.manager)
+        self.assertIs(test_manager.servers_client, lis_test.servers_client)
+        lis_test.addCleanup.assert_called_once_with(
+            lis_test.return_golden_vm)
+        self.assertEqual({}, manager._golden_vms)
+
+    def test_return_and_lease_reverts_checkpoint(self):
+        lis_test = self._lis_test()
+        lis_test.lease_golden_vm()
+        lis_test.return_golden_vm()
+
+        self.assertIs(lis_test.golden_vm, None)
+        self.assertIs(lis_test.manager, lis_test.vm_manager)
+        self.assertIn(('image', 'flavor'), manager._golden_vms)
+
+        next_test = self._lis_test()
+        next_test.lease_golden_vm()
+
+        self.assertEqual(1, self.create_server.call_count)
+        self.assertEqual(
+            [mock.call.initiate_host_client('host-1'),
+             mock.call.revert_snapshot('instance-1',
+                                       manager.GoldenVM.CHECKPOINT),
+             mock.call.host_client.run_powershell_cmd(
+                 'Start-VM', ComputerName='host-1', Name='instance-1')],
+            next_test.calls.mock_calls)
+        self.assertIs(self.owner, next_test.vm_manager)
+        self.assertEqual({}, manager._golden_vms)
+
+    def test_lease_refreshes_changed_image(self):
+        golden = self._golden(image_stamp='stamp-0')
+        lis_test = self._lis_test()
+
+        lis_test.lease_golden_vm()
+
+        golden.destroyed.assert_called_once_with()
+        self.assertEqual(1, self.create_server.call_count)
+        self.assertIsNot(golden, lis_test.golden_vm)
+
+    def test_return_destroys_changed_vm(self):
+        golden = self._golden()
+        lis_test = self._lis_test()
+        lis_test.lease_golden_vm()
+        self.owner.servers_client.show_server.return_value = {
+            'server': {'id': 'server-1', 'status': 'SHUTOFF'}}
+
+        lis_test.return_golden_vm()
+
+        golden.destroyed.assert_called_once_with()
+        self.assertEqual({}, manager._golden_vms)
+
+    def test_failed_revert_destroys_golden_vm(self):
+        golden = self._golden()
+        lis_test = self._lis_test()
+        lis_test.calls.revert_snapshot.side_effect = (
+            exceptions.PowerShellCommandFailed(command='Restore-VMSnapshot',
+                                               error='revert'))
+
+        self.assertRaises(exceptions.PowerShellCommandFailed,
+                          lis_test.lease_golden_vm)
+
+        golden.destroyed.assert_called_once_with()
+        self.assertEqual({}, manager._golden_vms)
+        self.assertIs(lis_test.golden_vm, None)
+        self.assertIs(lis_test.manager, lis_test.vm_manager)
+        self.assertFalse(lis_test.addCleanup.called)
@@ -0,0 +1,65 @@
+# Copyright 2016 Cloudbase Solutions Srl
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from tempest.lis import scheduler
+from tempest.tests import base
+
+GiB = 1024 ** 3
+
+
+class TestScheduler(base.TestCase):
+
+    def test_test_class(self):
+        self.assertEqual(
+            'tempest.lis.core.test_storage.Storage',
+            scheduler.test_class('tempest.lis.core.test_storage.Storage.'
+                                 'test_hot_add_disk[core,smoke]'))
+
+    def test_share_workers_by_capacity(self):
+        capacities = {'big': (32, 256 * GiB), 'small': (8, 64 * GiB)}
+        self.assertEqual({'big': 4, 'small': 1},
+                         scheduler.share_workers(capacities, 5))
+
+    def test_share_workers_limited_by_memory(self):
+        capacities = {'a': (32, 64 * GiB), 'b': (32, 192 * GiB)}
+        self.assertEqual({'a': 1, 'b': 3},
+                         scheduler.share_workers(capacities, 4))
+
+    def test_share_workers_fewer_than_hosts(self):
+        capacities = {'a': (8, 64 * GiB), 'b': (16, 128 * GiB),
+                      'c': (8, 64 * GiB)}
+        shares = scheduler.share_workers(capacities, 2)
+        self.assertEqual(2, sum(shares.values()))
+        self.assertEqual(1, shares['b'])
+
+    def test_partition_longest_first(self):
+        test_ids = ['pkg.A.test_1', 'pkg.A.test_2', 'pkg.B.test_1',
+                    'pkg.C.test_1', 'pkg.D.test_1']
+        durations = {'pkg.A.test_1': 50, 'pkg.A.test_2': 50,
+                     'pkg.B.test_1': 60, 'pkg.C.test_1': 30,
+                     'pkg.D.test_1': 30}
+        workers = scheduler.partition(test_ids, durations, {'h': 2})
+        self.assertEqual([100, 120], sorted(w.load for w in workers))
+        by_load = dict((w.load, w.tests) for w in workers)
+        self.assertEqual(['pkg.A.test_1', 'pkg.A.test_2'], by_load[100])
+        self.assertEqual(['pkg.B.test_1', 'pkg.C.test_1', 'pkg.D.test_1'],
+                         by_load[120])
+
+    def test_partition_unknown_durations(self):
+        workers = scheduler.partition(
+            ['pkg.A.test_1', 'pkg.B.test_1'], {'pkg.A.test_1': 10},
+            {'h1': 1, 'h2': 1})
+        self.assertEqual([10, 10], sorted(w.load for w in workers))
+        self.assertEqual(['h1', 'h2'], [w.host for w in workers])
@@ -0,0 +1,60 @@
+# Copyright 2016 Cloudbase Solutions Srl
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from tempest.lis import vhd_templates
+from tempest.tests import base
+
+
+class TestVhdTemplates(base.TestCase):
+
+    def test_template_key(self):
+        self.assertEqual('vhdx-Fixed-4096-1GB',
+                         vhd_templates.template_key('vhdx', 'Fixed', 4096,
+                                                    '1GB'))
+
+    def test_template_key_rejects_size(self):
+        self.assertRaises(ValueError, vhd_templates.template_key,
+                          'vhd', 'Fixed', 512, "1GB; Remove-Item C:\\")
+
+    def test_acquire_differencing(self):
+        command = vhd_templates.acquire_command(
+            'instance-1', 'instance-1-SCSI-0-1-Dynamic.vhdx',
+            ('SCSI', 0, 1), 'vhdx', 'Dynamic', 512, '3TB', True)
+        self.assertIn("$key = 'vhdx-Dynamic-512-3TB'", command)
+        self.assertIn('-SizeBytes 3TB -Dynamic', command)
+        self.assertIn('if ($true) {', command)
+        self.assertIn("-VMName 'instance-1' -ControllerType SCSI", command)
+        self.assertIn(vhd_templates.MUTEX_NAME, command)
+        self.assertIn(vhd_templates.TEMPLATE_MUTEX_PREFIX, command)
+        # The manifest lock is not held while the template is built
+        self.assertLess(command.index('} finally {'),
+                        command.index('New-VHD -Path $path'))
+        # A child is only counted once attached
+        self.assertLess(command.index('Add-VMHardDiskDrive'),
+                        command.index('.refs += 1'))
+
+    def test_acquire_copy(self):
+        command = vhd_templates.acquire_command(
+            'instance-1', 'instance-1-IDE-1-1-Fixed.vhd', ('IDE', 1, 1),
+            'vhd', 'Fixed', 512, '1GB', False)
+        self.assertIn('if ($false) {', command)
+        self.assertIn('-SizeBytes 1GB -Fixed', command)
+
+    def test_release(self):
+        command = vhd_templates.release_command(
+            ['vhd-Fixed-512-1GB', 'vhd-Fixed-512-1GB'], keep=False)
+        self.assertIn("@('vhd-Fixed-512-1GB', 'vhd-Fixed-512-1GB')", command)
+        self.assertIn('if (-not $false -and', command)
+        self.assertIn(vhd_templates.TEMPLATE_MUTEX_PREFIX, command)
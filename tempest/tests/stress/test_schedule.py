@@ -0,0 +1,62 @@
+# Copyright 2016 Cloudbase Solutions Srl
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import itertools
+
+from tempest.stress import schedule
+from tempest.tests import base
+
+
+def _arrivals(arrival_schedule, count):
+    return list(itertools.islice(arrival_schedule, count))
+
+
+class TestArrivalSchedule(base.TestCase):
+
+    def test_constant(self):
+        arrivals = _arrivals(schedule.ArrivalSchedule(2, start=10), 3)
+        self.assertEqual([10, 10.5, 11], arrivals)
+
+    def test_constant_phase(self):
+        arrivals = _arrivals(
+            schedule.ArrivalSchedule(2, phase=0.5, start=10), 2)
+        self.assertEqual([10.25, 10.75], arrivals)
+
+    def test_ramp_up(self):
+        arrivals = _arrivals(
+            schedule.ArrivalSchedule(1, ramp_up=8, start=0), 7)
+        # 4 arrivals expected during the ramp up, then one per second
+        self.assertEqual(0, arrivals[0])
+        self.assertAlmostEqual(4, arrivals[1])
+        self.assertEqual(8, arrivals[4])
+        self.assertEqual(10, arrivals[6])
+        gaps = [b - a for a, b in zip(arrivals, arrivals[1:])]
+        self.assertEqual(sorted(gaps[:4], reverse=True), gaps[:4])
+
+    def test_poisson_rate(self):
+        arrivals = _arrivals(
+            schedule.ArrivalSchedule(10, arrival='poisson', start=0,
+                                     seed=42), 10000)
+        self.assertEqual(sorted(arrivals), arrivals)
+        self.assertTrue(950 < arrivals[-1] < 1050)
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, schedule.ArrivalSchedule, 1,
+                          arrival='bursty')
+        self.assertRaises(ValueError, schedule.ArrivalSchedule, 0)
+
+    def test_pool_size(self):
+        self.assertEqual(40, schedule.pool_size(2, 10))
+        self.assertEqual(1, schedule.pool_size(0.01, 1))
@@ -0,0 +1,67 @@
+# Copyright 2016 Cloudbase Solutions Srl
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import multiprocessing
+
+from tempest.stress import statistics
+from tempest.tests import base
+
+
+def _count_runs(statistic, runs):
+    for _ in range(runs):
+        statistic['runs'] += 1
+        statistic.record_latency(0.1)
+
+
+class TestSharedStatistics(base.TestCase):
+
+    def test_counters_per_worker(self):
+        stats = statistics.SharedStatistics(2)
+        stats.worker(0)['runs'] += 3
+        stats.worker(1)['fails'] = 1
+        self.assertEqual(3, stats.worker(0)['runs'])
+        self.assertEqual(0, stats.worker(0)['fails'])
+        self.assertEqual(0, stats.worker(1)['runs'])
+        self.assertEqual(1, stats.worker(1)['fails'])
+
+    def test_no_slot(self):
+        stats = statistics.SharedStatistics(1)
+        self.assertRaises(IndexError, stats.worker, 1)
+
+    def test_shared_with_worker_process(self):
+        stats = statistics.SharedStatistics(1)
+        process = multiprocessing.Process(target=_count_runs,
+                                          args=(stats.worker(0), 5))
+        process.start()
+        process.join()
+        self.assertEqual(5, stats.worker(0)['runs'])
+        self.assertEqual(5, sum(stats.worker(0).histogram()))
+
+    def test_percentiles(self):
+        stats = statistics.SharedStatistics(2)
+        for _ in range(98):
+            stats.worker(0).record_latency(0.01)
+        stats.worker(1).record_latency(1)
+        stats.worker(1).record_latency(10)
+        latencies = statistics.percentiles([stats.worker(0),
+                                            stats.worker(1)])
+        self.assertTrue(0.01 <= latencies[50] < 0.012)
+        self.assertTrue(0.01 <= latencies[95] < 0.012)
+        self.assertTrue(1 <= latencies[99] < 1.2)
+
+    def test_percentiles_without_runs(self):
+        stats = statistics.SharedStatistics(1)
+        self.assertEqual({50: None, 95: None, 99: None},
+                         statistics.percentiles([stats.worker(0)]))
@@ -13,6 +13,8 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import mock
+
 import tempest.stress.stressaction as stressaction
 import tempest.test
 
@@ -61,3 +63,32 @@ class TestStressAction(tempest.test.BaseTestCase):
         stressAction.execute(stats)
         self.assertEqual(stats['runs'], 1)
         self.assertEqual(stats['fails'], 1)
+
+    def testStressTestRunRecordsLatency(self):
+        latencies = []
+
+        class Statistic(dict):
+            def record_latency(self, seconds, corrected=None):
+                latencies.append(seconds)
+
+        stressAction = FakeStressAction(manager=None, max_runs=2)
+        stats = Statistic(runs=0, fails=0)
+        stressAction.execute(stats)
+        self.assertEqual(2, len(latencies))
+
+    @mock.patch('time.sleep')
+    @mock.patch('time.time')
+    def testStressTestRunOpenLoop(self, time_mock, sleep_mock):
+        latencies = []
+
+        class Statistic(dict):
+            def record_latency(self, seconds, corrected=None):
+                latencies.append((seconds, corrected))
+
+        # on time for the first run, which takes 2 seconds and makes the
+        # second one start 1 second late
+        time_mock.side_effect = [9, 10, 12, 12, 12, 13]
+        stressAction = FakeStressAction(manager=None, max_runs=2)
+        stressAction.execute(Statistic(runs=0, fails=0), schedule=[10, 11])
+        sleep_mock.assert_called_once_with(1)
+        self.assertEqual([(2, 2), (1, 2)], latencies)
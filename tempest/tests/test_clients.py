@@ -0,0 +1,71 @@
+# Copyright 2016 Cloudbase Solutions Srl
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from oslotest import mockpatch
+
+from tempest import clients
+from tempest import config
+from tempest.tests import base
+from tempest.tests import fake_auth_provider
+from tempest.tests import fake_config
+from tempest.tests.lib import fake_credentials
+
+
+class TestManager(base.TestCase):
+
+    def setUp(self):
+        super(TestManager, self).setUp()
+        self.useFixture(fake_config.ConfigFixture())
+        self.stubs.Set(config, 'TempestConfigPrivate', fake_config.FakePrivate)
+        self.auth_provider = fake_auth_provider.FakeAuthProvider()
+        self.useFixture(mockpatch.Patch(
+            'tempest.manager.get_auth_provider',
+            return_value=self.auth_provider))
+        self.servers_client = self.useFixture(mockpatch.Patch(
+            'tempest.clients.ServersClient')).mock
+
+    def _manager(self):
+        return clients.Manager(fake_credentials.FakeKeystoneV2Credentials())
+
+    def test_clients_not_built_on_init(self):
+        self._manager()
+        self.assertFalse(self.servers_client.called)
+
+    def test_client_built_once(self):
+        os = self._manager()
+        client = os.servers_client
+        self.assertIs(client, os.servers_client)
+        self.assertEqual(1, self.servers_client.call_count)
+        args, kwargs = self.servers_client.call_args
+        self.assertEqual((self.auth_provider,), args)
+        self.assertEqual('compute', kwargs['service'])
+
+    def test_clients_per_manager(self):
+        self.servers_client.side_effect = lambda *args, **kwargs: object()
+        self.assertIsNot(self._manager().servers_client,
+                         self._manager().servers_client)
+
+    def test_client_override(self):
+        os = self._manager()
+        os.servers_client = 'fake_client'
+        self.assertEqual('fake_client', os.servers_client)
+        self.assertFalse(self.servers_client.called)
+
+    def test_client_of_unavailable_service(self):
+        self.useFixture(mockpatch.Patch('tempest.clients.ImagesClient'))
+        config.CONF.set_override('glance', False, group='service_available')
+        self.assertFalse(hasattr(self._manager(), 'image_client'))
+        config.CONF.set_override('glance', True, group='service_available')
+        self.assertTrue(hasattr(self._manager(), 'image_client'))
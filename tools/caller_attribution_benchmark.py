@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+
+# Copyright 2016 Cloudbase Solutions Srl
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Measure the per request cost of the caller attribution done by the
+RestClient request logging, with the caller found by walking the stack
+(the behavior outside of a tempest test) and with the caller recorded by
+the test base class.
+"""
+
+import argparse
+import timeit
+
+from tempest.lib.common import rest_client
+from tempest.lib.common.utils import misc
+from tempest.tests.lib import fake_auth_provider
+
+
+RESP = {'status': '200', 'x-openstack-request-id': 'req-bench'}
+
+
+class FakeTestCase(object):
+    """Calls the client from under a test_* frame, like a real test."""
+
+    def __init__(self, client, depth):
+        self.client = client
+        self.depth = depth
+
+    def _nested(self, depth):
+        # Frames between the test method and the client, e.g. service
+        # clients, waiters and fixtures
+        if depth:
+            return self._nested(depth - 1)
+        self.client._log_request_start('GET', 'http://bench/servers')
+        self.client._log_request('GET', 'http://bench/servers', RESP,
+                                 secs=0.001)
+
+    def test_request(self):
+        self._nested(self.depth)
+
+
+def measure(case, number, repeat):
+    timer = timeit.Timer(case.test_request)
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--number', type=int, default=2000,
+                        help='requests per measurement')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='measurements, the best one is kept')
+    parser.add_argument('--depth', type=int, default=30,
+                        help='frames between the test and the client')
+    parser.add_argument('--trace-requests', default='',
+                        help='trace_requests regex of the client')
+    args = parser.parse_args()
+
+    client = rest_client.RestClient(
+        fake_auth_provider.FakeAuthProvider(), 'compute', 'regionOne',
+        trace_requests=args.trace_requests)
+    case = FakeTestCase(client, args.depth)
+
+    misc.clear_test_caller()
+    walked = measure(case, args.number, args.repeat)
+    misc.set_test_caller('FakeTestCase:test_request')
+    try:
+        tracked = measure(case, args.number, args.repeat)
+    finally:
+        misc.clear_test_caller()
+
+    print('stack walk: %8.2f us/request' % (walked * 1e6))
+    print('tracked:    %8.2f us/request' % (tracked * 1e6))
+    print('speedup:    %8.1fx' % (walked / tracked))
+
+
+if __name__ == "__main__":
+    main()